@@ -417,6 +417,7 @@ if search_term in src_content:
 
 
 import hashlib
+import io
 import json
 import gc
 import os
@@ -425,7 +426,6 @@ import sys
 import shutil
 import tempfile
 import time
-import zipfile
 from datetime import date, datetime
 from pathlib import Path
 from typing import Optional, List, Dict
@@ -453,6 +453,7 @@ except ImportError:
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from run_on_dicom import process_dicom
 from audit_manager import AuditLogger, embed_compliance_tags, AtomicScrubOperation
+from audit_sink import default_async_writer
 # Import from standalone audit.py module (not the audit/ package)
 import importlib.util
 _audit_spec = importlib.util.spec_from_file_location("audit_module", os.path.join(os.path.dirname(__file__), "audit.py"))
@@ -462,17 +463,23 @@ generate_audit_receipt = _audit_module.generate_audit_receipt
 from research_mode.anonymizer import DicomAnonymizer, AnonymizationConfig
 from interactive_canvas import draw_canvas_with_image
 from compliance_engine import DicomComplianceManager
-from utils import should_render_pixels, evaluate_us_mask_memory_guard, require_file_size_limit  # Memory guard
+from utils import should_render_pixels, require_file_size_limit  # Memory guard
+from memory_scheduler import MemoryBudgetScheduler  # Memory-budgeted pixel admission
+from detection_cache import DetectionCache  # Persistent OCR detection cache
+from layout_templates import DeviceSignature, LayoutTemplateStore  # Learned per-device mask layouts
+from header_rewrite import HeaderRewriteUnsupported, rewrite_header, rewrite_header_in_place  # Metadata-only rewrite, PixelData stream-copied
+from zip_ingest import SKIP_EXTENSIONS, ZipIngest  # Lazy ZIP members, no extraction
+from header_cache import HeaderCache  # Header records by content hash, across runs
 from nifti_handler import NiftiConverter, convert_dataset_to_nifti, generate_nifti_readme, generate_fallback_warning_file, check_dicom2nifti_available
 from foi_engine import FOIEngine, process_foi_request, exclude_scanned_documents
 from pdf_reporter import PDFReporter, create_report
-from review_session import ReviewSession, ReviewRegion, RegionSource, RegionAction, preflight_scan_dataset
+from review_session import ReviewSession, ReviewRegion, RegionSource, RegionAction, preflight_scan_header
 from decision_trace import DecisionTraceCollector, DecisionTraceWriter, record_region_decisions
 from phase5a_ui_semantics import RegionSemantics  # Phase 5A: Presentation-only UX semantics
 from selection_scope import SelectionScope, ObjectCategory, classify_object, should_include_object, get_category_label, generate_scope_audit_block, generate_scope_json  # Phase 6: Explicit selection semantics
 from viewer_state import ViewerStudyState, build_viewer_state, ViewerOrderingMethod, SeriesOrderingMethod, get_instance_ordering_label, get_series_ordering_label  # Phase 6: Viewer UX
 from export.viewer_index import generate_viewer_index  # Phase 6: HTML export viewer
-from run_context import generate_run_id, build_run_paths, ensure_run_dirs  # Phase 8: Operational hardening
+from run_context import generate_run_id, build_run_paths, ensure_run_dirs, build_cache_dir  # Phase 8: Operational hardening
 from preflight import run_preflight, raise_if_failed, PreflightError  # Phase 8: Startup gate
 from evidence_capture import build_run_receipt, write_run_receipt, assert_phi_sterile  # Phase 8: Evidence capture
 from session_state import reset_run_state, RUN_ID_KEY  # Phase 12: Centralized run state
@@ -492,12 +499,22 @@ from voxelmask_core import (
     is_pixel_clean_modality,
     PIXEL_CLEAN_MODALITIES as CORE_PIXEL_CLEAN_MODALITIES,
     PREVIEW_REQUIRED_MODALITIES as CORE_PREVIEW_REQUIRED_MODALITIES,
+    DEDUPE_ALGORITHMS,
+    InputStore,
+    HeaderIndex,
+    HeaderRecord,
+    read_header_record,
+    CLASSIFY_TAGS,
+    hash_file,
+    StreamingZipBundle,
 )
 
 # Define base directory for dynamic path construction
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DOWNLOADS_ROOT = Path(BASE_DIR) / "downloads"
-US_PIXEL_MASK_MAX_MB = 768
+# Global pixel memory budget for masking (estimated peak, not raw size).
+# Files over budget are masked in frame chunks rather than skipped.
+PIXEL_MEMORY_BUDGET_MB = 768
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # PHASE 12: RUN-SCOPED VIEWER CACHE
@@ -710,6 +727,75 @@ def _ensure_early_run_context() -> 'RunPaths':
     return st.session_state.run_paths
 
 
+def _get_input_store() -> 'InputStore':
+    """
+    Get the run's content-addressed input store (tmp_dir/inputs).
+
+    Every stage (manifest analysis, viewer cache, processing) takes its
+    input path from here, so each upload is written to disk once per run.
+    A store left over from a previous run is closed and replaced.
+
+    Returns:
+        InputStore for the current run
+    """
+    run_paths = _ensure_early_run_context()
+    store_root = run_paths.tmp_dir / "inputs"
+    store = st.session_state.get('input_store')
+    if store is None or store.root != store_root:
+        if store is not None:
+            store.close()
+        store = InputStore(store_root)
+        st.session_state.input_store = store
+    return store
+
+
+def _get_header_index() -> 'HeaderIndex':
+    """
+    Get the run's shared header index (one header read per input file).
+
+    Backed by the persistent header cache, so files already seen in an
+    earlier run (same content hash) are not parsed again. The index works
+    without the cache if the database cannot be opened.
+    """
+    index = st.session_state.get('header_index')
+    if index is None:
+        cache = None
+        try:
+            cache = HeaderCache(build_cache_dir(DOWNLOADS_ROOT, "headers") / "headers.db")
+        except Exception as e:
+            print(f"[HEADERS] Warning: header cache unavailable, parsing all headers: {e}")
+        index = HeaderIndex(cache=cache)
+        st.session_state.header_index = index
+    return index
+
+
+def _index_headers(file_buffers) -> list:
+    """
+    Header records for uploads, read concurrently on first use.
+
+    Each upload is taken from the input store and its header read once per
+    run; manifest analysis, bucketing, viewer info and preflight all share
+    the records.
+
+    Returns:
+        HeaderRecord per buffer (None where the upload could not be stored)
+    """
+    store = _get_input_store()
+    entries = []
+    for file_buffer in file_buffers:
+        try:
+            entries.append(store.put(file_buffer))
+        except Exception as e:
+            logger.warning("Input could not be stored for header read (%s)", e.__class__.__name__)
+            entries.append(None)
+    stored = [entry for entry in entries if entry is not None]
+    records = iter(_get_header_index().build(
+        [entry.path for entry in stored],
+        digests=[entry.sha256 for entry in stored],
+    ))
+    return [next(records) if entry is not None else None for entry in entries]
+
+
 def _get_viewer_cache_path(file_buffer, run_paths: 'RunPaths') -> str:
     """
     Get a deterministic, run-scoped path for caching a viewer input file.
@@ -718,19 +804,15 @@ def _get_viewer_cache_path(file_buffer, run_paths: 'RunPaths') -> str:
     referenced throughout the review session.
     
     Args:
-        file_buffer: File buffer with name and getbuffer() method
+        file_buffer: File buffer with name and getbuffer() method, or a ZipMemberBuffer
         run_paths: RunPaths for the current session
         
     Returns:
         Absolute path to the cached file in viewer_cache/
     """
-    import hashlib
-    
-    # Get file content
-    content = file_buffer.getbuffer()
-    
-    # Generate content hash for deterministic filename
-    content_hash = hashlib.sha256(content).hexdigest()[:16]
+    # Content hash comes from the input store (written and hashed once per run)
+    entry = _get_input_store().put(file_buffer)
+    content_hash = entry.sha256[:16]
     
     # Use original filename + hash for human-readable + unique naming
     # Sanitize filename to be filesystem-safe
@@ -743,12 +825,12 @@ def _get_viewer_cache_path(file_buffer, run_paths: 'RunPaths') -> str:
     
     cache_path = run_paths.viewer_cache / cached_filename
     
-    # Write file if not already cached
-    # Write file if not already cached
+    # Link the stored input if not already cached (copy across filesystems)
     if not cache_path.exists():
-        # Optimization: Write directly from memoryview/buffer to avoid RAM copy
-        with cache_path.open("wb") as f:
-            f.write(content)
+        try:
+            os.link(entry.path, cache_path)
+        except OSError:
+            shutil.copyfile(entry.path, cache_path)
     
     return str(cache_path)
 
@@ -791,65 +873,60 @@ def assert_run_active(context: str = "operation") -> None:
 
 
 
-def analyze_dicom_context(file_path):
+def analyze_dicom_context(header):
     """
     Analyze a DICOM file to determine its type and risk level for processing.
     
     Args:
-        file_path: Path to the DICOM file
+        header: HeaderRecord from the run's header index (or a file path)
         
     Returns:
         dict: Analysis results with keys: Type, Risk, Include
     """
-    try:
-        ds = pydicom.dcmread(file_path, stop_before_pixels=True, force=True)
-        # Add fallback for missing TransferSyntaxUID
-        if not hasattr(ds, 'file_meta') or not hasattr(ds.file_meta, 'TransferSyntaxUID'):
-            ds.file_meta.TransferSyntaxUID = pydicom.uid.ImplicitVRLittleEndian
-        
-        modality = str(getattr(ds, 'Modality', '')).upper()
-        sop_class_uid = str(getattr(ds, 'SOPClassUID', ''))
-        series_description = str(getattr(ds, 'SeriesDescription', '')).upper()
-        
-        # Determine file type
-        file_type = "Image"  # Default
-        
-        # Check for Structured Report
-        if modality == 'SR' or 'STRUCTURED REPORT' in sop_class_uid:
-            file_type = "SR"
-        # Check for PDF
-        elif 'ENCAPSULATED PDF' in sop_class_uid.upper():
-            file_type = "PDF"
-        # Check for Form/Worksheet (SC/OT)
-        elif modality in ['SC', 'OT']:
-            file_type = "Document"
-        
-        # Determine risk and inclusion
-        # Documents are EXCLUDED by default - user can opt-in if needed
-        if file_type == "Image":
-            risk = "Low"
-            include = True
-        elif file_type == "Document":
-            risk = "Medium"  # Documents may have PHI but we can mask them
-            include = False  # EXCLUDE by default - forms usually not needed
-        else:
-            # SR, PDF - higher risk, exclude by default
-            risk = "High"
-            include = False  # Exclude by default - user can opt-in if needed
-            
-        return {
-            'Type': file_type,
-            'Risk': risk,
-            'Include': include
-        }
-        
-    except Exception as e:
+    if not isinstance(header, HeaderRecord):
+        header = read_header_record(header, tags=CLASSIFY_TAGS)
+    if not header.ok:
         # If analysis fails, assume needs review
         return {
             'Type': 'Unknown',
             'Risk': 'High',
             'Include': True  # Include by default so user can see it
         }
+    
+    modality = header.modality
+    sop_class_uid = header.sop_class_uid
+    
+    # Determine file type
+    file_type = "Image"  # Default
+    
+    # Check for Structured Report
+    if modality == 'SR' or 'STRUCTURED REPORT' in sop_class_uid:
+        file_type = "SR"
+    # Check for PDF
+    elif 'ENCAPSULATED PDF' in sop_class_uid.upper():
+        file_type = "PDF"
+    # Check for Form/Worksheet (SC/OT)
+    elif modality in ['SC', 'OT']:
+        file_type = "Document"
+    
+    # Determine risk and inclusion
+    # Documents are EXCLUDED by default - user can opt-in if needed
+    if file_type == "Image":
+        risk = "Low"
+        include = True
+    elif file_type == "Document":
+        risk = "Medium"  # Documents may have PHI but we can mask them
+        include = False  # EXCLUDE by default - forms usually not needed
+    else:
+        # SR, PDF - higher risk, exclude by default
+        risk = "High"
+        include = False  # Exclude by default - user can opt-in if needed
+        
+    return {
+        'Type': file_type,
+        'Risk': risk,
+        'Include': include
+    }
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # PHASE 12: SESSION STATE INITIALIZATION
@@ -2371,6 +2448,107 @@ def render_dicom_bytes_to_png(data: bytes) -> Optional[bytes]:
             os.unlink(tmp_path)
 
 
+# Modalities whose exports get a PNG preview beside each DICOM
+PNG_PREVIEW_MODALITIES = ('US', 'CT', 'MR', 'DX', 'CR', 'MG', 'XA', 'RF', 'NM', 'PT')
+
+
+def _export_root_folder(
+    first_file_meta: Dict,
+    pacs_operation_mode: Optional[str],
+    repair_context: Optional[Dict],
+    research_context: Optional[Dict],
+    run_id: str,
+) -> tuple:
+    """
+    Name the export's ZIP root folder from the run mode and the first processed file.
+    
+    SMART NAMING: Use meaningful identifiers for easy identification
+    Priority: StudyID > AccessionNumber > PatientName > Fallback
+    
+    Returns:
+        (root_folder_raw, root_folder): the display name (used in reports) and
+        the sanitized, run-scoped folder name (also the ZIP file name)
+    """
+    root_folder_raw = None
+    
+    if pacs_operation_mode and pacs_operation_mode.startswith('foi_'):
+        # FOI MODE: Use AccessionNumber or StudyDate for legal traceability
+        accession = first_file_meta.get('accession', '')
+        study_date = first_file_meta.get('study_date', '')
+        
+        if accession and accession not in ['Unknown', 'N/A', '']:
+            root_folder_raw = f"FOI_{accession}"
+        elif study_date and study_date not in ['Unknown', 'N/A', '']:
+            root_folder_raw = f"FOI_{study_date.replace('-', '')}"
+        else:
+            root_folder_raw = f"FOI_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    
+    elif repair_context:
+        # REPAIR MODE: Use patient name (this is an internal repair)
+        patient_name = repair_context.get('patient_name', '')
+        uid_only = repair_context.get('uid_only_mode', False)
+        
+        if uid_only:
+            # In UID-only mode, get original patient name from first file
+            original_name = first_file_meta.get('patient_name', '')
+            root_folder_raw = f"UID_Regen_{original_name}" if original_name else f"UID_Regen_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        elif patient_name and patient_name != "PRESERVED":
+            # TODO(RUNCTX): Patient names in export folders risk PHI leakage. Replace with governance-safe identifier.
+            logger.warning("RUNCTX: patient name used in export folder naming; replace with PHI-neutral token")
+            root_folder_raw = patient_name
+        else:
+            root_folder_raw = f"Repair_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    
+    elif research_context:
+        # RESEARCH MODE: Use subject_id + trial_id (de-identified)
+        subject_id = research_context.get('subject_id', 'SUB')
+        trial_id = research_context.get('trial_id', 'TRIAL')
+        root_folder_raw = f"{subject_id}_{trial_id}"
+    
+    else:
+        # FALLBACK: Try to extract from first file's modality + study date
+        modality = first_file_meta.get('modality', 'DICOM')
+        study_date = first_file_meta.get('study_date', '')
+        
+        if study_date and study_date not in ['Unknown', 'N/A', '']:
+            root_folder_raw = f"{modality}_{study_date.replace('-', '')}"
+        else:
+            root_folder_raw = f"{modality}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    
+    # Sanitize folder name (remove invalid chars, replace spaces with underscores)
+    root_folder = re.sub(r'[<>:"/\\|?*]', '', root_folder_raw)
+    root_folder = root_folder.replace(' ', '_').replace('^', '_').strip('_')
+    if not root_folder:
+        root_folder = f"VoxelMask_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+    # Run-scoped ZIP root to prevent cross-run ambiguity
+    return root_folder_raw, f"{run_id}_{root_folder}"
+
+
+def _stream_export_file(export_zip: "StreamingZipBundle", file_info: Dict, include_png: bool) -> None:
+    """
+    Append one processed DICOM (and its viewer PNG preview) to the export ZIP.
+    
+    Phase 14: called as each file finishes, so outputs go to disk as they are
+    produced instead of being held in memory until the run ends.
+    """
+    # Use full_path if available, otherwise fallback to filename
+    original_path = file_info.get('full_path', file_info['filename'])
+    export_zip.add_file(file_info['output_path'], original_path)
+    
+    # PHASE 6: PNG PREVIEW FOR HTML VIEWER (Presentation only)
+    if include_png and file_info.get('modality', '').upper() in PNG_PREVIEW_MODALITIES:
+        try:
+            with open(file_info['output_path'], 'rb') as f:
+                png_bytes = render_dicom_bytes_to_png(f.read())
+            if png_bytes:
+                # Write PNG adjacent to DICOM (same path, .png extension)
+                export_zip.add_bytes(original_path.rsplit('.', 1)[0] + '.png', png_bytes)
+        except Exception:
+            # Silent skip - viewer.js will show "Image unavailable" if missing
+            pass
+
+
 def _build_viewer_ordered_entries(processed_files: List[Dict], file_info_cache: Dict, root_folder: str) -> List[Dict]:
     """
     Build ordered_entries for viewer_index.json from processed files.
@@ -2522,6 +2700,17 @@ if _has_zip:
             st.metric("💾 Throughput", f"{mb_per_sec:.1f} MB/s")
         
         st.caption(f"📥 Input: {input_mb:.2f} MB  |  🏷️ Profile: {profile_display}  |  🕐 {stats.get('timestamp', '')[:19].replace('T', ' ')}")
+        
+        compression = stats.get('compression')
+        if compression:
+            st.caption(
+                f"🗜️ ZIP: {compression['bytes'] / (1024 * 1024):.2f} MB → {compression['compressed_bytes'] / (1024 * 1024):.2f} MB "
+                f"(ratio {compression['ratio']:.2f})  |  {compression['deflated']} deflated, {compression['stored']} stored  |  "
+                f"mode: {compression['mode']}, level {compression['level']}"
+            )
+            with st.expander("View per-file compression"):
+                for member in compression['members']:
+                    st.write(f"- `{member['name']}`: {member['method']} ({member['reason']}), ratio {member['ratio']:.2f}")
     
     num_files = len(st.session_state.processed_files)
     
@@ -2529,29 +2718,36 @@ if _has_zip:
     zip_path = st.session_state.get('output_zip_path')
     zip_buffer = st.session_state.get('output_zip_buffer')
     zip_data = None
-    _zip_source = "none"
+    source_zip_path = None
     
-    # Prefer disk-backed ZIP (memory-efficient for Steam Deck)
+    # Prefer disk-backed ZIP (memory-efficient for Steam Deck): served from the
+    # file, never read into session memory
     if zip_path and os.path.exists(zip_path):
-        try:
-            with open(zip_path, 'rb') as f:
-                zip_data = f.read()
-            _zip_source = "disk"
-        except Exception as e:
-            print(f"[Phase14] Failed to read ZIP from disk: {e}")
+        source_zip_path = zip_path
     
     # Fallback to RAM-backed buffer (but NOT the DISK_BACKED sentinel)
-    if zip_data is None and zip_buffer and zip_buffer != b"DISK_BACKED":
+    elif zip_buffer and zip_buffer != b"DISK_BACKED":
         zip_data = zip_buffer
-        _zip_source = "buffer"
     
     # Guard: if no ZIP data available, show calm error
-    if zip_data is None:
+    if source_zip_path is None and zip_data is None:
         st.warning("⚠️ Export artifact missing — please click 'Start New Job' and re-process your files.")
         print(f"[Phase14] ZIP missing: path={zip_path}, exists={os.path.exists(zip_path) if zip_path else False}, buffer={type(zip_buffer)}")
         st.stop()
     
-    print(f"[Phase14] ZIP loaded from {_zip_source} ({len(zip_data)//1024}KB)")
+    if source_zip_path:
+        print(f"[Phase14] ZIP served from disk ({os.path.getsize(source_zip_path)//1024}KB)")
+    else:
+        print(f"[Phase14] ZIP served from buffer ({len(zip_data)//1024}KB)")
+    
+    def _save_export_zip(dst_path: Path) -> None:
+        """Copy the export ZIP to downloads/ (file to file when disk-backed)."""
+        if source_zip_path:
+            if os.path.abspath(source_zip_path) != os.path.abspath(dst_path):
+                shutil.copyfile(source_zip_path, dst_path)
+        else:
+            with open(dst_path, 'wb') as f:
+                f.write(zip_data)
     
     # Create downloads directory
     downloads_dir = DOWNLOADS_ROOT
@@ -2567,21 +2763,21 @@ if _has_zip:
         zip_path = downloads_dir / zip_filename
         
         # Write ZIP to disk
-        with open(zip_path, 'wb') as f:
-            f.write(zip_data)
+        _save_export_zip(zip_path)
         
         st.info(f"📁 **File saved to:** `downloads/{zip_filename}`")
         
-        # Show the download button with explicit bytes
-        st.download_button(
-            label=f"📦 Download ZIP ({num_files} files)",
-            data=bytes(zip_data),  # Explicit bytes conversion
-            file_name=zip_filename,
-            mime="application/zip",
-            key=f"zip_dl_{hash(zip_filename)}",
-            type="primary",
-            use_container_width=True
-        )
+        # Show the download button, file-backed when the ZIP is on disk
+        with (open(zip_path, 'rb') if source_zip_path else io.BytesIO(zip_data)) as zip_stream:
+            st.download_button(
+                label=f"📦 Download ZIP ({num_files} files)",
+                data=zip_stream,
+                file_name=zip_filename,
+                mime="application/zip",
+                key=f"zip_dl_{hash(zip_filename)}",
+                type="primary",
+                use_container_width=True
+            )
         
         st.markdown(f"""
         <div style="background: #161b22; border: 1px solid #30363d; border-radius: 8px; padding: 12px; margin-top: 10px;">
@@ -2622,21 +2818,21 @@ if _has_zip:
         zip_path = downloads_dir / zip_filename
         
         # Write ZIP to disk (already created with viewer in processing step)
-        with open(zip_path, 'wb') as f:
-            f.write(zip_data)
+        _save_export_zip(zip_path)
         
         st.info(f"📁 **File saved to:** `downloads/{zip_filename}`")
         
-        # Show the download button with explicit bytes
-        st.download_button(
-            label="📦 Download Export ZIP",
-            data=bytes(zip_data),  # Explicit bytes conversion
-            file_name=zip_filename,
-            mime="application/zip",
-            key=f"zip_dl_single_{hash(zip_filename)}",
-            type="primary",
-            use_container_width=True
-        )
+        # Show the download button, file-backed when the ZIP is on disk
+        with (open(zip_path, 'rb') if source_zip_path else io.BytesIO(zip_data)) as zip_stream:
+            st.download_button(
+                label="📦 Download Export ZIP",
+                data=zip_stream,
+                file_name=zip_filename,
+                mime="application/zip",
+                key=f"zip_dl_single_{hash(zip_filename)}",
+                type="primary",
+                use_container_width=True
+            )
         
         st.markdown(f"""
         <div style="background: #161b22; border: 1px solid #30363d; border-radius: 8px; padding: 12px; margin-top: 10px;">
@@ -2910,45 +3106,18 @@ dicom_files = []
 if uploaded_files:
     for uploaded_file in uploaded_files:
         if uploaded_file.name.lower().endswith('.zip'):
-            # Extract ZIP and find DICOM files
+            # Find DICOM members in place: only 132 header bytes are read per
+            # member; members stay in the archive until a stage needs them
             try:
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    zip_path = os.path.join(temp_dir, "upload.zip")
-                    with open(zip_path, "wb") as f:
-                        f.write(uploaded_file.getbuffer())
-                    
-                    with zipfile.ZipFile(zip_path, 'r') as zf:
-                        zf.extractall(temp_dir)
-                    
-                    # Find all DICOM files (skip HTML, CSS, JS, text files)
-                    skip_extensions = ('.html', '.htm', '.css', '.js', '.txt', '.md', '.json', '.xml', '.pdf', '.doc', '.docx')
-                    for root, dirs, files in os.walk(temp_dir):
-                        for file in files:
-                            if not file.startswith('.') and not file.startswith('__') and not file.lower().endswith(skip_extensions):
-                                file_path = os.path.join(root, file)
-                                try:
-                                    with open(file_path, 'rb') as f:
-                                        header = f.read(132)
-                                        if len(header) >= 132 and header[128:132] == b'DICM':
-                                            with open(file_path, 'rb') as df:
-                                                file_bytes = df.read()
-                                            
-                                            class FileBuffer:
-                                                def __init__(self, name, data):
-                                                    self.name = name
-                                                    self._data = data
-                                                def getbuffer(self):
-                                                    return self._data
-                                            
-                                            dicom_files.append(FileBuffer(file, file_bytes))
-                                except:
-                                    pass
+                zip_ingest = ZipIngest(uploaded_file)
+                dicom_files.extend(zip_ingest.members)
+                if zip_ingest.unreadable:
+                    print(f"[ZIP] {uploaded_file.name}: skipped {zip_ingest.unreadable} unreadable member(s)")
             except Exception as e:
                 st.error("Could not read this ZIP file. Try uploading DICOM files directly instead.")
         else:
             # Regular file - filter out non-DICOM files (HTML, CSS, JS, text, etc.)
-            skip_extensions = ('.html', '.htm', '.css', '.js', '.txt', '.md', '.json', '.xml', '.pdf', '.doc', '.docx')
-            if not uploaded_file.name.lower().endswith(skip_extensions):
+            if not uploaded_file.name.lower().endswith(SKIP_EXTENSIONS):
                 dicom_files.append(uploaded_file)
 
 # Store uploaded files in session state to persist across form interactions
@@ -2989,17 +3158,18 @@ if st.session_state.get('uploaded_dicom_files'):
     if needs_reanalysis:
         # Analyze all DICOM files to determine type and risk
         manifest_data = []
+        # Every header is read once, concurrently; later stages reuse the records
+        header_records = _index_headers(dicom_files)
         for file_idx, file_buffer in enumerate(dicom_files):
             # Create unique file ID (index + name to handle duplicates)
             file_id = f"{file_idx}_{file_buffer.name}"
             
             try:
-                # Read DICOM metadata without pixel data for analysis
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.dcm') as tmp:
-                    tmp.write(file_buffer.getbuffer())
-                    temp_path = tmp.name
+                header = header_records[file_idx]
+                if header is None:
+                    raise OSError("input could not be stored")
                 
-                analysis = analyze_dicom_context(temp_path)
+                analysis = analyze_dicom_context(header)
                 analysis['Filename'] = file_buffer.name
                 analysis['FileID'] = file_id  # Unique identifier
                 analysis['FileIndex'] = file_idx  # For mapping back to dicom_files
@@ -3022,9 +3192,6 @@ if st.session_state.get('uploaded_dicom_files'):
                         st.session_state.manifest_selections[file_id] = analysis['Include']
                 
                 manifest_data.append(analysis)
-                
-                # Clean up temp file
-                os.unlink(temp_path)
             except Exception as e:
                 # If analysis fails, mark as high risk
                 manifest_data.append({
@@ -3126,7 +3293,8 @@ if st.session_state.get('uploaded_dicom_files'):
     
     if selected_file_buffers:
         with st.spinner("🔍 Analyzing file modalities..."):
-            for file_buffer in selected_file_buffers:
+            selected_headers = _index_headers(selected_file_buffers)
+            for file_buffer, header in zip(selected_file_buffers, selected_headers):
                 try:
                     # ═══════════════════════════════════════════════════════════════
                     # MEMORY FIX: Persist immediately to disk
@@ -3138,11 +3306,13 @@ if st.session_state.get('uploaded_dicom_files'):
                     # effectively "upload straight to disk"
                     local_path = _get_viewer_cache_path(file_buffer, run_paths)
                     
-                    # Read minimal dataset header from DISK (no pixel data)
-                    ds = pydicom.dcmread(local_path, stop_before_pixels=True)
-                    modality = str(getattr(ds, 'Modality', '')).upper()
-                    series_desc = str(getattr(ds, 'SeriesDescription', '')).upper()
-                    sop_class_uid = str(getattr(ds, 'SOPClassUID', ''))
+                    # Header from the shared index (read once, no pixel data);
+                    # non-Part 10 files are rejected as a strict read would
+                    if header is None or not header.ok or not header.part10:
+                        raise ValueError("not a readable DICOM Part 10 file")
+                    modality = header.modality
+                    series_desc = header.series_description.upper()
+                    sop_class_uid = header.sop_class_uid
                     
                     # ═══════════════════════════════════════════════════════════════
                     # PHASE 6 FIX: SOP Class–Based Classification (Single Source of Truth)
@@ -3232,20 +3402,23 @@ if st.session_state.get('uploaded_dicom_files'):
     run_paths = _ensure_early_run_context()
     
     file_info_cache = {}
-    for f in preview_files:
+    preview_headers = {}
+    for f, header in zip(preview_files, _index_headers(preview_files)):
         # Use run-scoped viewer cache instead of ephemeral /tmp
         temp_path = _get_viewer_cache_path(f, run_paths)
         try:
-            ds = pydicom.dcmread(temp_path, force=True)
-            modality = str(getattr(ds, 'Modality', 'UNK')).upper()
-            series_desc = str(getattr(ds, 'SeriesDescription', '')).upper()
-            image_type = str(getattr(ds, 'ImageType', [])).upper()
+            if header is None or not header.ok:
+                raise ValueError("header unreadable")
+            preview_headers[f.name] = header
+            modality = header.modality or 'UNK'
+            series_desc = header.series_description.upper()
+            image_type = header.image_type.upper()
             
             # Get image dimensions for aspect ratio check
-            rows = int(getattr(ds, 'Rows', 0))
-            cols = int(getattr(ds, 'Columns', 0))
+            rows = header.rows or 0
+            cols = header.columns or 0
             aspect_ratio = cols / rows if rows > 0 else 1
-            num_frames = int(getattr(ds, 'NumberOfFrames', 1))
+            num_frames = header.number_of_frames or 1
             
             # DOCUMENT DETECTION - Focus on CLEAR indicators only
             # Real US images should NEVER be classified as documents!
@@ -3270,9 +3443,9 @@ if st.session_state.get('uploaded_dicom_files'):
             # 5. NEW: Scanned document detection - check BitsStored
             # Scanned documents are typically 1-bit (black/white) or 8-bit grayscale
             # Real US images are typically 8-12 bits with actual ultrasound data
-            bits_stored = int(getattr(ds, 'BitsStored', 8))
-            bits_allocated = int(getattr(ds, 'BitsAllocated', 16))
-            photometric = str(getattr(ds, 'PhotometricInterpretation', '')).upper()
+            bits_stored = header.bits_stored if header.bits_stored is not None else 8
+            bits_allocated = header.bits_allocated if header.bits_allocated is not None else 16
+            photometric = header.photometric_interpretation
             
             # Scanned document indicators:
             # - 1-bit: definitely a scanned document (black and white)
@@ -3313,20 +3486,19 @@ if st.session_state.get('uploaded_dicom_files'):
             
             file_info_cache[f.name] = {
                 'modality': modality,
-                'series_desc': getattr(ds, 'SeriesDescription', '') or f'{modality} - {cols}×{rows}px',
+                'series_desc': header.series_description or f'{modality} - {cols}×{rows}px',
                 'file_type': file_type,
                 'is_worksheet': is_document,  # Keep old name for compatibility
                 'is_pure_us': is_pure_us,
                 'dimensions': f'{cols}×{rows}',
                 'aspect_ratio': aspect_ratio,
                 'temp_path': temp_path,
-                'doc_score': doc_score,
                 # Phase 6: Additional fields for viewer series grouping
-                'sop_instance_uid': str(getattr(ds, 'SOPInstanceUID', 'UNKNOWN')),
-                'series_instance_uid': str(getattr(ds, 'SeriesInstanceUID', 'UNKNOWN')),
-                'instance_number': int(getattr(ds, 'InstanceNumber', 0)) if hasattr(ds, 'InstanceNumber') and ds.InstanceNumber is not None else None,
-                'series_number': int(getattr(ds, 'SeriesNumber', 0)) if hasattr(ds, 'SeriesNumber') and ds.SeriesNumber is not None else None,
-                'acquisition_time': str(getattr(ds, 'AcquisitionTime', '')) or str(getattr(ds, 'ContentTime', '')) or None,
+                'sop_instance_uid': header.sop_instance_uid or 'UNKNOWN',
+                'series_instance_uid': header.series_instance_uid or 'UNKNOWN',
+                'instance_number': header.instance_number,
+                'series_number': header.series_number,
+                'acquisition_time': header.acquisition_time or None,
             }
         except Exception as e:
             file_info_cache[f.name] = {
@@ -3354,11 +3526,9 @@ if st.session_state.get('uploaded_dicom_files'):
             # Create new session with first available file's SOP UID
             try:
                 first_file = preview_files[0]
-                info = file_info_cache.get(first_file.name, {})
-                temp_path = info.get('temp_path', '')
-                if temp_path and os.path.exists(temp_path):
-                    ds = pydicom.dcmread(temp_path, force=True, stop_before_pixels=True)
-                    sop_uid = str(getattr(ds, 'SOPInstanceUID', 'unknown'))
+                first_header = preview_headers.get(first_file.name)
+                if first_header is not None:
+                    sop_uid = first_header.sop_instance_uid or 'unknown'
                 else:
                     sop_uid = 'unknown'
                 st.session_state["phi_review_session"] = ReviewSession.create(sop_instance_uid=sop_uid)
@@ -3379,16 +3549,13 @@ if st.session_state.get('uploaded_dicom_files'):
                 )
             else:
                 for f in preview_files:
-                    finfo = file_info_cache.get(f.name, {})
-                    ftemp_path = finfo.get('temp_path', '')
-                    if ftemp_path and os.path.exists(ftemp_path):
+                    scan_header = preview_headers.get(f.name)
+                    if scan_header is not None:
                         sop_uid = "unknown"
                         try:
-                            scan_ds = pydicom.dcmread(ftemp_path, force=True, stop_before_pixels=True)
-
                             # Register deterministic file → UID mapping
-                            sop_uid = str(getattr(scan_ds, 'SOPInstanceUID', '')) or "unknown"
-                            sop_class = str(getattr(scan_ds, 'SOPClassUID', ''))
+                            sop_uid = scan_header.sop_instance_uid or "unknown"
+                            sop_class = scan_header.sop_class_uid
                             if sop_class and review_session:
                                 review_session.register_file_uid(
                                     filename=f.name,
@@ -3397,7 +3564,7 @@ if st.session_state.get('uploaded_dicom_files'):
                                 )
 
                             # Preflight scan for findings
-                            finding = preflight_scan_dataset(scan_ds)
+                            finding = preflight_scan_header(scan_header)
                             if finding is not None and review_session:
                                 review_session.add_finding(finding)
                         except Exception as e:
@@ -3615,8 +3782,7 @@ if st.session_state.get('uploaded_dicom_files'):
                                     
                                     # Audit log the decision
                                     try:
-                                        from audit_manager import AuditLogger
-                                        audit_logger = AuditLogger()
+                                        audit_logger = AuditLogger(writer=default_async_writer())
                                         audit_logger.log_scrub_event(
                                             operator_id=st.session_state.get('operator_id', 'OPERATOR'),
                                             original_filename=f"PDF_{info['sop_uid']}",
@@ -3626,8 +3792,9 @@ if st.session_state.get('uploaded_dicom_files'):
                                             modality=info['modality'] or "DOC",
                                             success=True
                                         )
-                                    except Exception:
-                                        pass  # Audit logging failure is non-fatal
+                                        audit_logger.flush()  # Report this event's failure here, not in a later run's flush
+                                    except Exception as e:
+                                        print(f"[AUDIT] Warning: PDF include/exclude decision not logged: {e}")  # Non-fatal
                                 return on_pdf_exclude_change
                             
                             # Initialize checkbox state if not present
@@ -4898,9 +5065,9 @@ if st.session_state.get('uploaded_dicom_files'):
                 
                 # Initialize into Session State
                 if 'audit_logger' not in st.session_state:
-                    st.session_state.audit_logger = AuditLogger()
+                    st.session_state.audit_logger = AuditLogger(writer=default_async_writer())
                 elif st.session_state.audit_logger is None:
-                    st.session_state.audit_logger = AuditLogger()
+                    st.session_state.audit_logger = AuditLogger(writer=default_async_writer())
                 
                 # Generate scrub_uuid ONCE per run (Phase 14 fix - prevents churn)
                 if not st.session_state.get('scrub_uuid'):
@@ -4973,6 +5140,7 @@ if st.session_state.get('uploaded_dicom_files'):
                 # ═══════════════════════════════════════════════════════════════
                 run_paths = _ensure_early_run_context()
                 run_id = run_paths.run_id
+                input_store = _get_input_store()
 
                 if st.session_state.get("run_id") != run_paths.run_id:
                     logger.error(
@@ -5063,198 +5231,248 @@ if st.session_state.get('uploaded_dicom_files'):
                 processing_start_time = time.time()
                 # Calculate total input bytes - handle both UploadedFile (.size) and BytesIO (len(getbuffer()))
                 total_input_bytes = sum(
-                    getattr(f, 'size', len(f.getbuffer()) if hasattr(f, 'getbuffer') else 0)
+                    f.size if hasattr(f, 'size') else (len(f.getbuffer()) if hasattr(f, 'getbuffer') else 0)
                     for f in all_files
                 )
                 total_output_bytes = 0
                 masking_failure_count = 0
                 failure_messages = []
                 st.session_state.masking_failures = []
+                pixel_scheduler = MemoryBudgetScheduler(budget_bytes=PIXEL_MEMORY_BUDGET_MB * 1024 * 1024)
+                # Shared across runs: preview, export and re-export skip repeat OCR
+                detection_cache = DetectionCache(build_cache_dir(DOWNLOADS_ROOT, "detection"))
+                # Known US devices reuse reviewer-accepted layouts (one-frame OCR check)
+                layout_templates = LayoutTemplateStore(build_cache_dir(DOWNLOADS_ROOT, "layouts"))
+                us_device_signatures = {}  # SOPInstanceUID -> DeviceSignature
+
+                # Phase 14: Outputs are spooled to the run's tmp dir and (DICOM export)
+                # appended to the on-disk ZIP as each file completes; the ZIP is
+                # opened when the first file names the export root folder
+                output_spool_dir = run_paths.tmp_dir / "outputs"
+                output_spool_dir.mkdir(parents=True, exist_ok=True)
+                export_names = None
+                export_zip = None
 
                 # Progress bar for multi-file processing
                 progress_bar = st.progress(0)
                 status_text = st.empty()
                 
-                for i, file_buffer in enumerate(all_files):
-                    # ═══════════════════════════════════════════════════════════════
-                    # STEP 1: SAFE DEFAULT INITIALIZATION (The "Waterfall" Pattern)
-                    # All variables defined here BEFORE any conditional logic
-                    # This prevents UnboundLocalError crashes
-                    # ═══════════════════════════════════════════════════════════════
+                # The ZIP opened mid-loop is only guarded by its with-block at packaging
+                # time; until then an interrupted run (stop, rerun, error) must discard
+                # it so a parallel writer does not leave its threads running
+                try:
+                    for i, file_buffer in enumerate(all_files):
+                        # ═══════════════════════════════════════════════════════════════
+                        # STEP 1: SAFE DEFAULT INITIALIZATION (The "Waterfall" Pattern)
+                        # All variables defined here BEFORE any conditional logic
+                        # This prevents UnboundLocalError crashes
+                        # ═══════════════════════════════════════════════════════════════
                     
-                    # Processing state defaults
-                    success = False
-                    apply_mask = False
-                    compliance_log_entry = f"Compliance: {pacs_operation_mode}"  # Safe default
-                    compliance_info = {'log': []}  # Safe default for compliance engine output
-                    audit_log = ""  # Will be populated later
+                        # Processing state defaults
+                        success = False
+                        apply_mask = False
+                        metadata_only_output = False  # Output PixelData is a verbatim copy of the input
+                        compliance_log_entry = f"Compliance: {pacs_operation_mode}"  # Safe default
+                        compliance_info = {'log': []}  # Safe default for compliance engine output
+                        audit_log = ""  # Will be populated later
                     
-                    # File path defaults (will be overwritten)
-                    input_path = None
-                    output_path = None
-
-                    # Metadata defaults - read from file or use safe fallbacks
-                    original_name = "UNKNOWN"
-                    verification_ds = None
-                    sop_uid_for_log = "UNKNOWN"
+                        # File path defaults (will be overwritten)
+                        input_entry = None
+                        input_path = None
+                        output_path = None
+
+                        # Metadata defaults - read from file or use safe fallbacks
+                        original_name = "UNKNOWN"
+                        verification_ds = None
+                        sop_uid_for_log = "UNKNOWN"
                     
-                    # --- UNIVERSAL LOGGER SETUP (Fixes NameError for CT/MR/XR) ---
-                    # Ensure local variable 'audit_logger' exists for this specific file iteration
-                    if 'audit_logger' in st.session_state and st.session_state.audit_logger:
-                        audit_logger = st.session_state.audit_logger
-                    else:
-                        audit_logger = AuditLogger()
-                        st.session_state.audit_logger = audit_logger
-                    # ═══════════════════════════════════════════════════════════════
+                        # --- UNIVERSAL LOGGER SETUP (Fixes NameError for CT/MR/XR) ---
+                        # Ensure local variable 'audit_logger' exists for this specific file iteration
+                        if 'audit_logger' in st.session_state and st.session_state.audit_logger:
+                            audit_logger = st.session_state.audit_logger
+                        else:
+                            audit_logger = AuditLogger(writer=default_async_writer())
+                            st.session_state.audit_logger = audit_logger
+                        # ═══════════════════════════════════════════════════════════════
                     
-                    try:
-                        # Update progress with percentage
-                        progress = (i) / len(all_files)
-                        percent = int(progress * 100)
-                        progress_bar.progress(progress)
-                        status_text.markdown(f"**{percent}%** — Processing file {i+1}/{len(all_files)}: `{file_buffer.name}`")
+                        try:
+                            # Update progress with percentage
+                            progress = (i) / len(all_files)
+                            percent = int(progress * 100)
+                            progress_bar.progress(progress)
+                            status_text.markdown(f"**{percent}%** — Processing file {i+1}/{len(all_files)}: `{file_buffer.name}`")
                         
-                        # Update loader text dynamically
-                        loader_placeholder.markdown(f"""
-                        <div class="voxelmask-loader">
-                            <div class="voxel-cube-container">
-                                <div class="voxel-cube"></div>
-                                <div class="voxel-ring"></div>
+                            # Update loader text dynamically
+                            loader_placeholder.markdown(f"""
+                            <div class="voxelmask-loader">
+                                <div class="voxel-cube-container">
+                                    <div class="voxel-cube"></div>
+                                    <div class="voxel-ring"></div>
+                                </div>
+                                <div class="voxel-progress-text">{percent}% Complete</div>
+                                <div class="voxel-progress-subtext">Processing file {i+1} of {len(all_files)}</div>
                             </div>
-                            <div class="voxel-progress-text">{percent}% Complete</div>
-                            <div class="voxel-progress-subtext">Processing file {i+1} of {len(all_files)}</div>
-                        </div>
-                        """, unsafe_allow_html=True)
+                            """, unsafe_allow_html=True)
                         
-                        # Create temp input file
-                        input_tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".dcm")
-                        input_tmp.write(file_buffer.getbuffer())
-                        input_path = input_tmp.name
-                        input_tmp.close()
+                            # Input file from the run's store (written at most once per upload)
+                            input_entry = input_store.acquire(file_buffer)
+                            input_path = input_entry.path
                         
-                        # ═══════════════════════════════════════════════════════════════
-                        # EXTRACT ORIGINAL METADATA (Before any processing!)
-                        # For FOI mode, we need the ORIGINAL StudyDate and AccessionNumber
-                        # ═══════════════════════════════════════════════════════════════
-                        original_ds = pydicom.dcmread(input_path, stop_before_pixels=True, force=True)
+                            # ═══════════════════════════════════════════════════════════════
+                            # EXTRACT ORIGINAL METADATA (Before any processing!)
+                            # For FOI mode, we need the ORIGINAL StudyDate and AccessionNumber
+                            # ═══════════════════════════════════════════════════════════════
+                            original_ds = pydicom.dcmread(input_path, stop_before_pixels=True, force=True)
 
-                        sop_uid_for_log = str(getattr(original_ds, 'SOPInstanceUID', 'UNKNOWN'))
+                            sop_uid_for_log = str(getattr(original_ds, 'SOPInstanceUID', 'UNKNOWN'))
                         
-                        # Extract StudyDate (0008,0020) - format nicely if possible
-                        orig_study_date = "Unknown"
-                        if hasattr(original_ds, 'StudyDate') and original_ds.StudyDate:
-                            try:
-                                sd_str = str(original_ds.StudyDate)
-                                if len(sd_str) == 8 and sd_str.isdigit():
-                                    orig_study_date = f"{sd_str[0:4]}-{sd_str[4:6]}-{sd_str[6:8]}"  # YYYY-MM-DD
-                                else:
-                                    orig_study_date = sd_str
-                            except Exception:
-                                orig_study_date = str(original_ds.StudyDate)
+                            # Extract StudyDate (0008,0020) - format nicely if possible
+                            orig_study_date = "Unknown"
+                            if hasattr(original_ds, 'StudyDate') and original_ds.StudyDate:
+                                try:
+                                    sd_str = str(original_ds.StudyDate)
+                                    if len(sd_str) == 8 and sd_str.isdigit():
+                                        orig_study_date = f"{sd_str[0:4]}-{sd_str[4:6]}-{sd_str[6:8]}"  # YYYY-MM-DD
+                                    else:
+                                        orig_study_date = sd_str
+                                except Exception:
+                                    orig_study_date = str(original_ds.StudyDate)
                         
-                        # Extract AccessionNumber (0008,0050)
-                        orig_accession = "Unknown"
-                        if hasattr(original_ds, 'AccessionNumber') and original_ds.AccessionNumber:
-                            orig_accession = str(original_ds.AccessionNumber).strip()
-                            if not orig_accession:
-                                orig_accession = "Unknown"
+                            # Extract AccessionNumber (0008,0050)
+                            orig_accession = "Unknown"
+                            if hasattr(original_ds, 'AccessionNumber') and original_ds.AccessionNumber:
+                                orig_accession = str(original_ds.AccessionNumber).strip()
+                                if not orig_accession:
+                                    orig_accession = "Unknown"
                         
-                        # Extract Modality for reference
-                        orig_modality = str(getattr(original_ds, 'Modality', 'Unknown')).upper()
+                            # Extract Modality for reference
+                            orig_modality = str(getattr(original_ds, 'Modality', 'Unknown')).upper()
                         
-                        # Create temp output file
-                        output_tmp = tempfile.NamedTemporaryFile(delete=False, suffix="_anonymized.dcm")
-                        output_path = output_tmp.name
-                        output_tmp.close()
+                            # Device signature: the reviewed file's applied mask is learned per device
+                            if file_buffer in bucket_us and manual_box is not None:
+                                us_signature = DeviceSignature.from_dataset(original_ds)
+                                if us_signature is not None:
+                                    us_device_signatures[str(getattr(original_ds, 'SOPInstanceUID', ''))] = us_signature
                         
-                        # Get original name for this file
-                        original_name = get_original_name(input_path)
+                            # Create temp output file
+                            output_tmp = tempfile.NamedTemporaryFile(delete=False, suffix="_anonymized.dcm")
+                            output_path = output_tmp.name
+                            output_tmp.close()
                         
-                        # Determine if masking should be applied (only for US files)
-                        apply_mask = file_buffer in bucket_us and manual_box is not None
+                            # Get original name for this file
+                            original_name = get_original_name(input_path)
                         
-                        # Process the file
-                        # CRITICAL: FOI mode must PRESERVE patient data - only redact staff names
-                        # So we bypass general anonymization and copy the original file
-                        success = False
-                        is_foi_mode = pacs_operation_mode in ["foi_legal", "foi_patient"]
+                            # Determine if masking should be applied (only for US files)
+                            apply_mask = file_buffer in bucket_us and manual_box is not None
                         
-                        if is_foi_mode:
-                            # FOI MODE: Copy original file as-is - FOI engine handles staff redaction
-                            # Patient data (name, ID, DOB, accession) MUST be preserved for legal compliance
-                            import shutil
-                            shutil.copy2(input_path, output_path)
-                            success = True
-                        elif mode == "Research De-ID":
-                            config = AnonymizationConfig(compliance_profile=compliance_profile)
-                            anonymizer = DicomAnonymizer(config)
-                            result = anonymizer.anonymize_file(input_path, output_path)
-                            success = result.success
-                        elif repair_context and repair_context.get('uid_only_mode', False):
-                            # ═══════════════════════════════════════════════════════════════════
-                            # UID-ONLY MODE: Metadata-only path (Phase 3 Pixel Invariant)
-                            # ═══════════════════════════════════════════════════════════════════
-                            # CRITICAL: This path ensures:
-                            #   - NO pixel decode
-                            #   - NO AI detection
-                            #   - NO overlay generation
-                            #   - NO black boxes
-                            #   - PixelData bytes are IDENTICAL to input
-                            #
-                            # Only UIDs (SOP/Series/Study Instance UIDs) are regenerated.
-                            # Patient data (name, ID, DOB, dates, accession) is PRESERVED.
-                            # ═══════════════════════════════════════════════════════════════════
-                            import pydicom
-                            from run_on_dicom import process_dataset
-                            from pixel_invariant import PixelAction, validate_uid_only_output, sha256_bytes
+                            # Process the file
+                            # CRITICAL: FOI mode must PRESERVE patient data - only redact staff names
+                            # So we bypass general anonymization and copy the original file
+                            success = False
+                            is_foi_mode = pacs_operation_mode in ["foi_legal", "foi_patient"]
+                        
+                            if is_foi_mode:
+                                # FOI MODE: Copy original file as-is - FOI engine handles staff redaction
+                                # Patient data (name, ID, DOB, accession) MUST be preserved for legal compliance
+                                import shutil
+                                shutil.copy2(input_path, output_path)
+                                success = True
+                            elif mode == "Research De-ID":
+                                config = AnonymizationConfig(compliance_profile=compliance_profile)
+                                anonymizer = DicomAnonymizer(config)
+                                result = anonymizer.anonymize_file(input_path, output_path)
+                                success = result.success
+                                metadata_only_output = success and not result.pixel_data_modified
+                            elif repair_context and repair_context.get('uid_only_mode', False):
+                                # ═══════════════════════════════════════════════════════════════════
+                                # UID-ONLY MODE: Metadata-only path (Phase 3 Pixel Invariant)
+                                # ═══════════════════════════════════════════════════════════════════
+                                # CRITICAL: This path ensures:
+                                #   - NO pixel decode
+                                #   - NO AI detection
+                                #   - NO overlay generation
+                                #   - NO black boxes
+                                #   - PixelData bytes are IDENTICAL to input
+                                #
+                                # Only UIDs (SOP/Series/Study Instance UIDs) are regenerated.
+                                # Patient data (name, ID, DOB, dates, accession) is PRESERVED.
+                                # ═══════════════════════════════════════════════════════════════════
+                                import pydicom
+                                from run_on_dicom import process_dataset
+                                from pixel_invariant import PixelAction, validate_uid_only_output, pixel_sha256
                             
-                            # Read original dataset
-                            ds = pydicom.dcmread(input_path)
+                                audit_dict = {}
+                                try:
+                                    # Fast path: parse the header only, stream-copy PixelData
+                                    # by offset with a streaming-hash invariant check
+                                    rewrite_result = rewrite_header(
+                                        input_path,
+                                        output_path,
+                                        lambda header_ds: process_dataset(
+                                            header_ds,
+                                            old_name_text=original_name,
+                                            new_name_text="PRESERVED",  # Marker - actual patient name preserved
+                                            clinical_context=repair_context,
+                                            audit_dict=audit_dict,
+                                        ),
+                                    )
+                                    audit_dict['pixel_invariant'] = rewrite_result.pixel_invariant.status
+                                    if rewrite_result.pixel_invariant.input_hash:
+                                        audit_dict['pixel_sha'] = rewrite_result.pixel_invariant.input_hash
+                                    metadata_only_output = True
+                                    success = True
+                                except HeaderRewriteUnsupported as e:
+                                    print(f"[UID-ONLY] Header fast path unavailable ({e}); using full read")
+                                    audit_dict = {}
                             
-                            # Capture baseline pixel hash for invariant check
-                            baseline_hash = None
-                            if hasattr(ds, 'PixelData') and ds.PixelData:
-                                baseline_hash = sha256_bytes(ds.PixelData)
+                                if not success:
+                                    # Read original dataset
+                                    ds = pydicom.dcmread(input_path)
                             
-                            # Keep a reference to original PixelData (defensive copy not needed
-                            # since process_dataset won't modify it in uid_only_mode)
-                            original_pixel_data = ds.PixelData if hasattr(ds, 'PixelData') else None
+                                    # Capture baseline pixel hash for invariant check
+                                    baseline_hash = None
+                                    if hasattr(ds, 'PixelData') and ds.PixelData:
+                                        baseline_hash = pixel_sha256(ds)
                             
-                            # Process metadata only (no pixel processing)
-                            audit_dict = {}
-                            process_dataset(
-                                ds,
-                                old_name_text=original_name,
-                                new_name_text="PRESERVED",  # Marker - actual patient name preserved
-                                clinical_context=repair_context,
-                                audit_dict=audit_dict,
-                            )
+                                    # Keep a reference to original PixelData (defensive copy not needed
+                                    # since process_dataset won't modify it in uid_only_mode)
+                                    original_pixel_data = ds.PixelData if hasattr(ds, 'PixelData') else None
                             
-                            # PHASE 3 INVARIANT CHECK: Verify PixelData unchanged
-                            if baseline_hash is not None and hasattr(ds, 'PixelData') and ds.PixelData:
-                                current_hash = sha256_bytes(ds.PixelData)
-                                if current_hash != baseline_hash:
-                                    raise RuntimeError(
-                                        f"FATAL: UID-only mode pixel invariant violated! "
-                                        f"PixelData hash changed from {baseline_hash[:16]}... to {current_hash[:16]}... "
-                                        f"This should never happen. Aborting export."
+                                    # Process metadata only (no pixel processing)
+                                    audit_dict = {}
+                                    process_dataset(
+                                        ds,
+                                        old_name_text=original_name,
+                                        new_name_text="PRESERVED",  # Marker - actual patient name preserved
+                                        clinical_context=repair_context,
+                                        audit_dict=audit_dict,
                                     )
                             
-                            # Save with original Transfer Syntax preserved
-                            ds.save_as(output_path, write_like_original=True)
-                            success = True
+                                    # PHASE 3 INVARIANT CHECK: Verify PixelData unchanged
+                                    if baseline_hash is not None and hasattr(ds, 'PixelData') and ds.PixelData:
+                                        current_hash = pixel_sha256(ds)
+                                        if current_hash != baseline_hash:
+                                            raise RuntimeError(
+                                                f"FATAL: UID-only mode pixel invariant violated! "
+                                                f"PixelData hash changed from {baseline_hash[:16]}... to {current_hash[:16]}... "
+                                                f"This should never happen. Aborting export."
+                                            )
                             
-                            # Log the UID-only processing
-                            print(f"[UID-ONLY] Metadata-only processing complete for {os.path.basename(input_path)}")
-                            print(f"[UID-ONLY] pixel_action={audit_dict.get('pixel_action', 'N/A')}, "
-                                  f"pixel_invariant={audit_dict.get('pixel_invariant', 'N/A')}")
-                        else:
-                            # Full pixel pipeline - ONLY when masking is actually requested
-                            if apply_mask and orig_modality == "US":
-                                should_skip, estimated_mb = evaluate_us_mask_memory_guard(
-                                    original_ds, US_PIXEL_MASK_MAX_MB
-                                )
-                                if should_skip:
+                                    # Save with original Transfer Syntax preserved
+                                    ds.save_as(output_path, write_like_original=True)
+                                    success = True
+                            
+                                # Log the UID-only processing
+                                print(f"[UID-ONLY] Metadata-only processing complete for {os.path.basename(input_path)}")
+                                print(f"[UID-ONLY] pixel_action={audit_dict.get('pixel_action', 'N/A')}, "
+                                      f"pixel_invariant={audit_dict.get('pixel_invariant', 'N/A')}")
+                            else:
+                                # Full pixel pipeline - ONLY when masking is actually requested
+                                # Memory-budgeted: over-budget cines are masked in frame chunks
+                                memory_admission = pixel_scheduler.plan(original_ds)
+                                estimated_mb = memory_admission.estimated_bytes / (1024 * 1024)
+                                if apply_mask and orig_modality == "US" and memory_admission.skipped:
+                                    # A single frame over budget cannot be chunked: never export it unmasked
                                     masking_failure_count += 1
                                     skip_message = (
                                         f"Masking skipped for {file_buffer.name} (SOP: {sop_uid_for_log}) due to memory safety guard "
@@ -5271,277 +5489,338 @@ if st.session_state.get('uploaded_dicom_files'):
                                     )
                                     combined_audit_logs.append(audit_log)
                                     continue
+                                if memory_admission.chunked:
+                                    compliance_log_entry = (
+                                        f"{compliance_log_entry} | Pixel masking chunked by memory budget "
+                                        f"({memory_admission.frames_per_chunk} frame(s) per chunk, estimated {estimated_mb:.1f} MB)"
+                                    )
 
-                                # US series processed sequentially to prevent memory exhaustion
-                                success = process_dicom(
-                                    input_path=input_path,
-                                    output_path=output_path,
-                                    old_name_text=original_name,
-                                    new_name_text=new_patient_name.strip(),
-                                    manual_box=manual_box,
-                                    research_context=research_context,
-                                    clinical_context=repair_context
-                                )
-                            else:
-                                success = process_dicom(
-                                    input_path=input_path,
-                                    output_path=output_path,
-                                    old_name_text=original_name,
-                                    new_name_text=new_patient_name.strip(),
-                                    manual_box=manual_box if apply_mask else None,
-                                    research_context=research_context,
-                                    clinical_context=repair_context
-                                )
+                                with pixel_scheduler.admit(memory_admission):
+                                    success = process_dicom(
+                                        input_path=input_path,
+                                        output_path=output_path,
+                                        old_name_text=original_name,
+                                        new_name_text=new_patient_name.strip(),
+                                        manual_box=manual_box if apply_mask else None,
+                                        research_context=research_context,
+                                        clinical_context=repair_context,
+                                        memory_admission=memory_admission,
+                                        detection_cache=detection_cache,
+                                        layout_templates=layout_templates,
+                                    )
 
-                        if success:
-                            # VERIFICATION STEP: Read the file we just wrote to disk
-                            # This guarantees the log matches the output file 100%
-                            # Force a sync to ensure the file is fully written
-                            import os
-                            if hasattr(os, 'sync'):
-                                os.sync()
+                            if success:
+                                # VERIFICATION STEP: Read the file we just wrote to disk
+                                # This guarantees the log matches the output file 100%
+                                # Force a sync to ensure the file is fully written
+                                import os
+                                if hasattr(os, 'sync'):
+                                    os.sync()
                             
-                            # Read back the saved file to get the final dataset
-                            verification_ds = pydicom.dcmread(output_path)
+                                # Read back the saved file to get the final dataset
+                                # (header only when PixelData was copied verbatim: the
+                                # compliance step below never touches pixels)
+                                if metadata_only_output:
+                                    verification_ds = pydicom.dcmread(output_path, stop_before_pixels=True)
+                                else:
+                                    verification_ds = pydicom.dcmread(output_path)
                             
-                            # ═══════════════════════════════════════════════════════════════
-                            # ROUTING: FOI vs COMPLIANCE ENGINE
-                            # ═══════════════════════════════════════════════════════════════
-                            if pacs_operation_mode.startswith("foi_"):
-                                # FOI MODE: Use FOI Engine (preserves patient data, redacts staff)
-                                foi_mode = "legal" if pacs_operation_mode == "foi_legal" else "patient"
-                                verification_ds, foi_result = process_foi_request(
-                                    dataset=verification_ds,
-                                    mode=foi_mode,
-                                    exclude_scanned=exclude_scanned_docs,
-                                    redact_referring=False  # Keep referring physician for legal
-                                )
+                                # ═══════════════════════════════════════════════════════════════
+                                # ROUTING: FOI vs COMPLIANCE ENGINE
+                                # ═══════════════════════════════════════════════════════════════
+                                if pacs_operation_mode.startswith("foi_"):
+                                    # FOI MODE: Use FOI Engine (preserves patient data, redacts staff)
+                                    foi_mode = "legal" if pacs_operation_mode == "foi_legal" else "patient"
+                                    verification_ds, foi_result = process_foi_request(
+                                        dataset=verification_ds,
+                                        mode=foi_mode,
+                                        exclude_scanned=exclude_scanned_docs,
+                                        redact_referring=False  # Keep referring physician for legal
+                                    )
                                 
-                                # Build compliance_info from FOI result
-                                compliance_info = {
-                                    'log': [f"FOI Mode: {foi_mode}"] + [f"{r['tag']}: {r['action']}" for r in foi_result.redactions],
-                                    'foi_result': foi_result,
-                                    'foi_mode': foi_mode
-                                }
+                                    # Build compliance_info from FOI result
+                                    compliance_info = {
+                                        'log': [f"FOI Mode: {foi_mode}"] + [f"{r['tag']}: {r['action']}" for r in foi_result.redactions],
+                                        'foi_result': foi_result,
+                                        'foi_mode': foi_mode
+                                    }
                                 
-                                if foi_result.excluded_files:
-                                    compliance_log_entry = f"Compliance: FOI ({foi_mode}) | EXCLUDED (Scanned Doc)"
+                                    if foi_result.excluded_files:
+                                        compliance_log_entry = f"Compliance: FOI ({foi_mode}) | EXCLUDED (Scanned Doc)"
+                                    else:
+                                        compliance_log_entry = f"Compliance: FOI ({foi_mode}) | {len(foi_result.redactions)} redactions"
                                 else:
-                                    compliance_log_entry = f"Compliance: FOI ({foi_mode}) | {len(foi_result.redactions)} redactions"
-                            else:
-                                # STANDARD: Use Compliance Engine
-                                compliance_manager = DicomComplianceManager()
-                                verification_ds, compliance_info = compliance_manager.process_dataset(
-                                    dataset=verification_ds,
-                                    profile_mode=pacs_operation_mode,
-                                    fix_uids=regenerate_uids
-                                )
+                                    # STANDARD: Use Compliance Engine
+                                    compliance_manager = DicomComplianceManager()
+                                    verification_ds, compliance_info = compliance_manager.process_dataset(
+                                        dataset=verification_ds,
+                                        profile_mode=pacs_operation_mode,
+                                        fix_uids=regenerate_uids
+                                    )
                                 
-                                # Log compliance processing info (only for non-FOI modes)
-                                compliance_log_entry = f"Compliance: {pacs_operation_mode}"
-                                if regenerate_uids:
-                                    compliance_log_entry += " | UIDs Regenerated"
-                                if compliance_info.get('date_shift_days'):
-                                    compliance_log_entry += f" | Date Shift: {compliance_info['date_shift_days']} days"
-                            # ═══════════════════════════════════════════════════════════════
-                            
-                            # Save the processed dataset back to disk
-                            verification_ds.save_as(output_path)
+                                    # Log compliance processing info (only for non-FOI modes)
+                                    compliance_log_entry = f"Compliance: {pacs_operation_mode}"
+                                    if regenerate_uids:
+                                        compliance_log_entry += " | UIDs Regenerated"
+                                    if compliance_info.get('date_shift_days'):
+                                        compliance_log_entry += f" | Date Shift: {compliance_info['date_shift_days']} days"
+                                # ═══════════════════════════════════════════════════════════════
                             
-                            # Read processed file for download (now includes compliance changes)
-                            with open(output_path, "rb") as f:
-                                processed_data = f.read()
+                                # Save the processed dataset back to disk
+                                if metadata_only_output:
+                                    try:
+                                        # New header + PixelData stream-copied from the previous output
+                                        rewrite_header_in_place(output_path, lambda _: verification_ds)
+                                    except HeaderRewriteUnsupported:
+                                        # Layout the fast path rejects: reattach PixelData (and any
+                                        # trailing elements) from disk and save normally
+                                        for elem in pydicom.dcmread(output_path):
+                                            if elem.tag >= 0x7FE00010:
+                                                verification_ds[elem.tag] = elem
+                                        verification_ds.save_as(output_path)
+                                else:
+                                    verification_ds.save_as(output_path)
                             
-                            # Generate filename for this file
-                            if mode == "Internal Repair":
-                                file_filename = generate_repair_filename(
-                                    file_buffer.name,
-                                    new_patient_name.strip(),
-                                    get_original_metadata(input_path).get('series_description', 'Scan')
-                                )
-                            elif is_foi_mode:
-                                # FOI MODE: Preserve original filename (legal chain of custody requirement)
-                                # Patient data is NOT anonymized in FOI mode
-                                file_filename = file_buffer.name
-                            else:
-                                file_filename = f"ANONYMIZED_{file_buffer.name}"
+                                # Generate filename for this file
+                                if mode == "Internal Repair":
+                                    file_filename = generate_repair_filename(
+                                        file_buffer.name,
+                                        new_patient_name.strip(),
+                                        get_original_metadata(input_path).get('series_description', 'Scan')
+                                    )
+                                elif is_foi_mode:
+                                    # FOI MODE: Preserve original filename (legal chain of custody requirement)
+                                    # Patient data is NOT anonymized in FOI mode
+                                    file_filename = file_buffer.name
+                                else:
+                                    file_filename = f"ANONYMIZED_{file_buffer.name}"
                             
-                            # === FOLDER STRUCTURE FOR AI TRAINING ===
-                            # Extract Study and Series info for proper hierarchy
-                            # Format: StudyDescription_Modality/SeriesNumber_SeriesDescription/filename.dcm
-                            try:
-                                study_desc = str(getattr(verification_ds, 'StudyDescription', '')).strip() or 'UnknownStudy'
-                                series_desc = str(getattr(verification_ds, 'SeriesDescription', '')).strip() or 'UnknownSeries'
-                                modality = str(getattr(verification_ds, 'Modality', '')).upper() or 'UNK'
-                                series_num = str(getattr(verification_ds, 'SeriesNumber', '0')).zfill(3)
-                                instance_num = str(getattr(verification_ds, 'InstanceNumber', '0')).zfill(4)
+                                # === FOLDER STRUCTURE FOR AI TRAINING ===
+                                # Extract Study and Series info for proper hierarchy
+                                # Format: StudyDescription_Modality/SeriesNumber_SeriesDescription/filename.dcm
+                                try:
+                                    study_desc = str(getattr(verification_ds, 'StudyDescription', '')).strip() or 'UnknownStudy'
+                                    series_desc = str(getattr(verification_ds, 'SeriesDescription', '')).strip() or 'UnknownSeries'
+                                    modality = str(getattr(verification_ds, 'Modality', '')).upper() or 'UNK'
+                                    series_num = str(getattr(verification_ds, 'SeriesNumber', '0')).zfill(3)
+                                    instance_num = str(getattr(verification_ds, 'InstanceNumber', '0')).zfill(4)
                                 
-                                # Sanitize folder names (remove special chars)
-                                import re
-                                study_folder = re.sub(r'[^\w\s-]', '', study_desc)[:50].strip() or 'Study'
-                                study_folder = f"{study_folder}_{modality}"
-                                series_folder = re.sub(r'[^\w\s-]', '', series_desc)[:40].strip() or 'Series'
-                                series_folder = f"S{series_num}_{series_folder}"
+                                    # Sanitize folder names (remove special chars)
+                                    import re
+                                    study_folder = re.sub(r'[^\w\s-]', '', study_desc)[:50].strip() or 'Study'
+                                    study_folder = f"{study_folder}_{modality}"
+                                    series_folder = re.sub(r'[^\w\s-]', '', series_desc)[:40].strip() or 'Series'
+                                    series_folder = f"S{series_num}_{series_folder}"
                                 
-                                # Create hierarchical path
-                                folder_path = f"{study_folder}/{series_folder}"
+                                    # Create hierarchical path
+                                    folder_path = f"{study_folder}/{series_folder}"
                                 
-                                # Add instance number to filename for proper sorting
-                                base_name = file_filename.rsplit('.', 1)[0] if '.' in file_filename else file_filename
-                                file_filename = f"IMG_{instance_num}_{base_name}.dcm"
+                                    # Add instance number to filename for proper sorting
+                                    base_name = file_filename.rsplit('.', 1)[0] if '.' in file_filename else file_filename
+                                    file_filename = f"IMG_{instance_num}_{base_name}.dcm"
                                 
-                            except Exception as e:
-                                # Fallback to flat structure if metadata extraction fails
-                                folder_path = "Processed"
+                                except Exception as e:
+                                    # Fallback to flat structure if metadata extraction fails
+                                    folder_path = "Processed"
                             
-                            # ═══════════════════════════════════════════════════════════════
-                            # CALCULATE SHA-256 HASHES FOR FORENSIC INTEGRITY (FOI Legal)
-                            # ═══════════════════════════════════════════════════════════════
-                            original_file_hash = hashlib.sha256(file_buffer.getbuffer()).hexdigest()
-                            processed_file_hash = hashlib.sha256(processed_data).hexdigest()
+                                # ═══════════════════════════════════════════════════════════════
+                                # CALCULATE SHA-256 HASHES FOR FORENSIC INTEGRITY (FOI Legal)
+                                # ═══════════════════════════════════════════════════════════════
+                                # One pass per buffer; BLAKE2b rides along as a fast dedupe key
+                                original_file_hash = input_entry.sha256
+                                processed_digests = hash_file(output_path, DEDUPE_ALGORITHMS)
+                                processed_file_hash = processed_digests['sha256']
                             
-                            # Store processed file data with folder path
-                            processed_files.append({
-                                'filename': file_filename,
-                                'folder_path': folder_path,
-                                'full_path': f"{folder_path}/{file_filename}",
-                                'data': processed_data,
-                                'original_name': file_buffer.name,
-                                'modality': modality if 'modality' in dir() else orig_modality,
-                                'series_number': series_num if 'series_num' in dir() else '000',
-                                # Original metadata for FOI PDF reports
-                                'study_date': orig_study_date,
-                                'accession': orig_accession,
-                                # SHA-256 hashes for Forensic Integrity Certificate (FOI Legal)
-                                'original_hash': original_file_hash,
-                                'processed_hash': processed_file_hash
-                            })
+                                # Phase 14: Spool the processed file (now includes compliance
+                                # changes) in the run's tmp dir; only metadata is kept in memory
+                                spooled_path = output_spool_dir / f"{i:06d}_{file_filename}"
+                                shutil.move(output_path, spooled_path)
+                                output_path = None  # Moved: nothing for the cleanup below
                             
-                            # Generate audit log with verified dataset
-                            scrub_uuid = audit_logger.generate_scrub_uuid()
+                                # Store processed file metadata with folder path
+                                file_record = {
+                                    'filename': file_filename,
+                                    'folder_path': folder_path,
+                                    'full_path': f"{folder_path}/{file_filename}",
+                                    'output_path': str(spooled_path),
+                                    'output_bytes': spooled_path.stat().st_size,
+                                    'original_name': file_buffer.name,
+                                    'modality': modality if 'modality' in dir() else orig_modality,
+                                    'series_number': series_num if 'series_num' in dir() else '000',
+                                    # Original metadata for FOI PDF reports
+                                    'study_date': orig_study_date,
+                                    'accession': orig_accession,
+                                    # SHA-256 hashes for Forensic Integrity Certificate (FOI Legal)
+                                    'original_hash': original_file_hash,
+                                    'processed_hash': processed_file_hash,
+                                    'processed_blake2b': processed_digests['blake2b'],
+                                }
                             
-                            # Format Study Date if present (handle both original and shifted dates)
-                            actual_study_date = ""
-                            if hasattr(verification_ds, 'StudyDate') and verification_ds.StudyDate:
-                                try:
-                                    sd_str = str(verification_ds.StudyDate)
-                                    if len(sd_str) == 8 and sd_str.isdigit():
-                                        actual_study_date = f"{sd_str[6:8]}/{sd_str[4:6]}/{sd_str[0:4]}"
-                                    else:
-                                        actual_study_date = sd_str
-                                except Exception:
-                                    actual_study_date = str(verification_ds.StudyDate)
+                                # Phase 14: Stream into the export ZIP now (NIfTI exports
+                                # are packaged after conversion, from the spooled files)
+                                if not output_as_nifti:
+                                    if export_zip is None:
+                                        export_names = _export_root_folder(
+                                            file_record, pacs_operation_mode, repair_context, research_context, run_paths.run_id
+                                        )
+                                        export_zip = StreamingZipBundle(
+                                            run_paths.bundle_dir / f"{export_names[1]}.zip", export_names[1]
+                                        )
+                                    _stream_export_file(export_zip, file_record, include_html_viewer)
+                                processed_files.append(file_record)
                             
-                            new_meta = {
-                                'patient_name': str(verification_ds.PatientName) if hasattr(verification_ds, 'PatientName') else 'ANONYMIZED',
-                                'patient_id': str(verification_ds.PatientID) if hasattr(verification_ds, 'PatientID') else 'ANONYMIZED',
-                                # FOI mode and Internal Repair preserve accession for chain of custody/workflow
-                                'accession': (str(verification_ds.AccessionNumber) if hasattr(verification_ds, 'AccessionNumber') and verification_ds.AccessionNumber else orig_accession) if (is_foi_mode or pacs_operation_mode == "internal_repair") else 'REMOVED',
-                                'study_date': actual_study_date or 'DATE_MISSING'
-                            }
-                            audit_log = generate_audit_receipt(
-                                original_meta=get_original_metadata(input_path),
-                                new_meta=new_meta,
-                                uuid_str=scrub_uuid,
-                                operator_id="WEBAPP_USER",
-                                mode=mode.split()[0],
-                                filename=file_buffer.name,
-                                mask_applied=apply_mask,
-                                original_file_hash=original_file_hash,  # Use pre-calculated hash
-                                anonymized_file_hash=processed_file_hash,  # Use pre-calculated hash
-                                safety_notification=None,
-                                compliance_profile=pacs_operation_mode,  # Use PACS operation mode
-                                pixel_action_reason=(f"Batch mask applied | {compliance_log_entry}" if apply_mask else compliance_log_entry),
-                                dataset=verification_ds,
-                                is_foi_mode=is_foi_mode,
-                                foi_redactions=compliance_info.get('foi_result', {}).redactions if is_foi_mode and compliance_info.get('foi_result') else None
-                            )
+                                # Generate audit log with verified dataset
+                                scrub_uuid = audit_logger.generate_scrub_uuid()
+                            
+                                # Format Study Date if present (handle both original and shifted dates)
+                                actual_study_date = ""
+                                if hasattr(verification_ds, 'StudyDate') and verification_ds.StudyDate:
+                                    try:
+                                        sd_str = str(verification_ds.StudyDate)
+                                        if len(sd_str) == 8 and sd_str.isdigit():
+                                            actual_study_date = f"{sd_str[6:8]}/{sd_str[4:6]}/{sd_str[0:4]}"
+                                        else:
+                                            actual_study_date = sd_str
+                                    except Exception:
+                                        actual_study_date = str(verification_ds.StudyDate)
+                            
+                                new_meta = {
+                                    'patient_name': str(verification_ds.PatientName) if hasattr(verification_ds, 'PatientName') else 'ANONYMIZED',
+                                    'patient_id': str(verification_ds.PatientID) if hasattr(verification_ds, 'PatientID') else 'ANONYMIZED',
+                                    # FOI mode and Internal Repair preserve accession for chain of custody/workflow
+                                    'accession': (str(verification_ds.AccessionNumber) if hasattr(verification_ds, 'AccessionNumber') and verification_ds.AccessionNumber else orig_accession) if (is_foi_mode or pacs_operation_mode == "internal_repair") else 'REMOVED',
+                                    'study_date': actual_study_date or 'DATE_MISSING'
+                                }
+                                audit_log = generate_audit_receipt(
+                                    original_meta=get_original_metadata(input_path),
+                                    new_meta=new_meta,
+                                    uuid_str=scrub_uuid,
+                                    operator_id="WEBAPP_USER",
+                                    mode=mode.split()[0],
+                                    filename=file_buffer.name,
+                                    mask_applied=apply_mask,
+                                    original_file_hash=original_file_hash,  # Use pre-calculated hash
+                                    anonymized_file_hash=processed_file_hash,  # Use pre-calculated hash
+                                    safety_notification=None,
+                                    compliance_profile=pacs_operation_mode,  # Use PACS operation mode
+                                    pixel_action_reason=(f"Batch mask applied | {compliance_log_entry}" if apply_mask else compliance_log_entry),
+                                    dataset=verification_ds,
+                                    is_foi_mode=is_foi_mode,
+                                    foi_redactions=compliance_info.get('foi_result', {}).redactions if is_foi_mode and compliance_info.get('foi_result') else None
+                                )
                         
-                        # Append compliance processing log to audit
-                        if 'compliance_info' in dir() and compliance_info.get('log'):
-                            audit_log += f"\n\n--- Compliance Engine Log ---\n" + "\n".join(compliance_info['log'])
+                            # Append compliance processing log to audit
+                            if 'compliance_info' in dir() and compliance_info.get('log'):
+                                audit_log += f"\n\n--- Compliance Engine Log ---\n" + "\n".join(compliance_info['log'])
                         
-                        if audit_log:
-                            combined_audit_logs.append(audit_log)
+                            if audit_log:
+                                combined_audit_logs.append(audit_log)
+
+                            if not success:
+                                if apply_mask:
+                                    masking_failure_count += 1
+                                    logger.warning(
+                                        "Masking skipped for %s (SOP: %s) due to processing failure",
+                                        file_buffer.name,
+                                        sop_uid_for_log,
+                                    )
+                                    failure_messages.append(
+                                        f"Masking skipped for {file_buffer.name} (SOP: {sop_uid_for_log}) due to processing failure"
+                                    )
+                                else:
+                                    logger.warning(
+                                        "Processing failed for %s (SOP: %s); mask not requested",
+                                        file_buffer.name,
+                                        sop_uid_for_log,
+                                    )
+                                continue
 
-                        if not success:
+                        except Exception as e:
                             if apply_mask:
                                 masking_failure_count += 1
-                                logger.warning(
-                                    "Masking skipped for %s (SOP: %s) due to processing failure",
-                                    file_buffer.name,
-                                    sop_uid_for_log,
-                                )
+                            logger.warning(
+                                "Could not process %s (SOP: %s): %s",
+                                file_buffer.name,
+                                sop_uid_for_log,
+                                e,
+                            )
+                            if apply_mask:
                                 failure_messages.append(
-                                    f"Masking skipped for {file_buffer.name} (SOP: {sop_uid_for_log}) due to processing failure"
-                                )
-                            else:
-                                logger.warning(
-                                    "Processing failed for %s (SOP: %s); mask not requested",
-                                    file_buffer.name,
-                                    sop_uid_for_log,
+                                    f"Could not process {file_buffer.name} (SOP: {sop_uid_for_log}): {e}"
                                 )
-                            continue
-
-                    except Exception as e:
-                        if apply_mask:
-                            masking_failure_count += 1
-                        logger.warning(
-                            "Could not process %s (SOP: %s): %s",
-                            file_buffer.name,
-                            sop_uid_for_log,
-                            e,
-                        )
-                        if apply_mask:
-                            failure_messages.append(
-                                f"Could not process {file_buffer.name} (SOP: {sop_uid_for_log}): {e}"
-                            )
-                    finally:
-                        # Explicit cleanup to reduce per-file peak memory
-                        if input_path:
-                            try:
-                                os.unlink(input_path)
-                            except Exception:
-                                pass
+                        finally:
+                            # Explicit cleanup to reduce per-file peak memory
+                            if input_entry is not None:
+                                try:
+                                    input_store.release(input_entry)
+                                except Exception:
+                                    pass
 
-                        if output_path:
-                            try:
-                                os.unlink(output_path)
-                            except Exception:
-                                pass
+                            if output_path:
+                                try:
+                                    os.unlink(output_path)
+                                except Exception:
+                                    pass
 
-                        if 'original_ds' in locals():
-                            del original_ds
-                        if 'verification_ds' in locals():
-                            del verification_ds
+                            if 'original_ds' in locals():
+                                del original_ds
+                            if 'verification_ds' in locals():
+                                del verification_ds
 
-                        gc.collect()
+                            gc.collect()
                 
-                # Complete progress
-                progress_bar.progress(1.0)
-                status_text.markdown("**100%** — Processing complete! ✅")
+                    # Complete progress
+                    progress_bar.progress(1.0)
+                    status_text.markdown("**100%** — Processing complete! ✅")
                 
-                # Clear the loader and show completion
-                loader_placeholder.markdown(f"""
-                <div class="voxelmask-loader" style="background: linear-gradient(135deg, rgba(35, 134, 54, 0.15) 0%, rgba(51, 145, 255, 0.05) 100%); border-color: rgba(35, 134, 54, 0.4);">
-                    <div class="voxel-cube-container">
-                        <div class="voxel-cube" style="background: linear-gradient(135deg, #238636 0%, #3391ff 100%);"></div>
+                    # Clear the loader and show completion
+                    loader_placeholder.markdown(f"""
+                    <div class="voxelmask-loader" style="background: linear-gradient(135deg, rgba(35, 134, 54, 0.15) 0%, rgba(51, 145, 255, 0.05) 100%); border-color: rgba(35, 134, 54, 0.4);">
+                        <div class="voxel-cube-container">
+                            <div class="voxel-cube" style="background: linear-gradient(135deg, #238636 0%, #3391ff 100%);"></div>
+                        </div>
+                        <div class="voxel-progress-text" style="color: #238636;">✅ Complete!</div>
+                        <div class="voxel-progress-subtext">All {len(all_files)} files processed successfully</div>
                     </div>
-                    <div class="voxel-progress-text" style="color: #238636;">✅ Complete!</div>
-                    <div class="voxel-progress-subtext">All {len(all_files)} files processed successfully</div>
-                </div>
-                """, unsafe_allow_html=True)
+                    """, unsafe_allow_html=True)
 
-                if failure_messages:
-                    st.warning(
-                        "⚠️ Some files could not be masked. See Processing Diagnostics panel."
-                    )
+                    if failure_messages:
+                        st.warning(
+                            "⚠️ Some files could not be masked. See Processing Diagnostics panel."
+                        )
+                except BaseException:
+                    if export_zip is not None and not export_zip.closed:
+                        export_zip.discard()
+                    raise
 
                 # Use ss_set for all writes to prevent storm (Phase 14)
                 ss_set('masking_failures', failure_messages)
                 
                 # Store results in session state (using ss_set to prevent storm)
                 if processed_files:
+                    # Run finalization: audit events queued during the run must be
+                    # committed before the run counts as complete
+                    if st.session_state.get('audit_logger') is not None:
+                        try:
+                            st.session_state.audit_logger.flush()
+                        except Exception as audit_err:
+                            print(f"[AUDIT] Run finalization failed: audit events not committed: {audit_err}")
+                            if export_zip is not None and not export_zip.closed:
+                                export_zip.discard()
+                            try:
+                                if run_paths:
+                                    update_run_status(
+                                        run_paths.root,
+                                        status="failed",
+                                        timestamp_field="failed_at",
+                                        failure_reason="audit_commit_failed",
+                                    )
+                                    print(f"[Phase8] Run status: failed (audit_commit_failed)")
+                            except Exception:
+                                pass  # Non-fatal
+                            st.error("🚫 Audit records for this run could not be saved, so no export was produced. Please process the files again.")
+                            st.stop()
+                    
                     ss_set('processed_files', processed_files)
                     ss_set('combined_audit_logs', "\n\n".join(combined_audit_logs))
                     ss_set('processing_complete', True)
@@ -5594,74 +5873,14 @@ if st.session_state.get('uploaded_dicom_files'):
                     gc.collect()
                     
                     # Create ZIP file for bulk download WITH FOLDER STRUCTURE
-                    # Phase 14: Skip if already created (prevents re-entry on rerun)
-                    _skip_zip_creation = st.session_state.get('output_zip_path') is not None
-                    
-                    import io
-                    import re
-                    zip_buffer = io.BytesIO() if not _skip_zip_creation else None
-                    
-                    # ═══════════════════════════════════════════════════════════════
-                    # SMART NAMING: Use meaningful identifiers for easy identification
-                    # Priority: StudyID > AccessionNumber > PatientName > Fallback
-                    # ═══════════════════════════════════════════════════════════════
-                    root_folder_raw = None
-                    
-                    # Try to get metadata from first processed file for naming
-                    first_file_meta = processed_files[0] if processed_files else {}
-                    
-                    if pacs_operation_mode and pacs_operation_mode.startswith('foi_'):
-                        # FOI MODE: Use AccessionNumber or StudyDate for legal traceability
-                        accession = first_file_meta.get('accession', '')
-                        study_date = first_file_meta.get('study_date', '')
-                        
-                        if accession and accession not in ['Unknown', 'N/A', '']:
-                            root_folder_raw = f"FOI_{accession}"
-                        elif study_date and study_date not in ['Unknown', 'N/A', '']:
-                            root_folder_raw = f"FOI_{study_date.replace('-', '')}"
-                        else:
-                            root_folder_raw = f"FOI_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                    
-                    elif repair_context:
-                        # REPAIR MODE: Use patient name (this is an internal repair)
-                        patient_name = repair_context.get('patient_name', '')
-                        uid_only = repair_context.get('uid_only_mode', False)
-                        
-                        if uid_only:
-                            # In UID-only mode, get original patient name from first file
-                            original_name = first_file_meta.get('patient_name', '')
-                            root_folder_raw = f"UID_Regen_{original_name}" if original_name else f"UID_Regen_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                        elif patient_name and patient_name != "PRESERVED":
-                            # TODO(RUNCTX): Patient names in export folders risk PHI leakage. Replace with governance-safe identifier.
-                            logger.warning("RUNCTX: patient name used in export folder naming; replace with PHI-neutral token")
-                            root_folder_raw = patient_name
-                        else:
-                            root_folder_raw = f"Repair_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                    
-                    elif research_context:
-                        # RESEARCH MODE: Use subject_id + trial_id (de-identified)
-                        subject_id = research_context.get('subject_id', 'SUB')
-                        trial_id = research_context.get('trial_id', 'TRIAL')
-                        root_folder_raw = f"{subject_id}_{trial_id}"
-                    
-                    else:
-                        # FALLBACK: Try to extract from first file's modality + study date
-                        modality = first_file_meta.get('modality', 'DICOM')
-                        study_date = first_file_meta.get('study_date', '')
-                        
-                        if study_date and study_date not in ['Unknown', 'N/A', '']:
-                            root_folder_raw = f"{modality}_{study_date.replace('-', '')}"
-                        else:
-                            root_folder_raw = f"{modality}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                    
-                    # Sanitize folder name (remove invalid chars, replace spaces with underscores)
-                    root_folder = re.sub(r'[<>:"/\\|?*]', '', root_folder_raw)
-                    root_folder = root_folder.replace(' ', '_').replace('^', '_').strip('_')
-                    if not root_folder:
-                        root_folder = f"VoxelMask_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-
-                    # Run-scoped ZIP root to prevent cross-run ambiguity
-                    root_folder = f"{run_paths.run_id}_{root_folder}"
+                    # Phase 14: DICOM exports were streamed to disk during processing;
+                    # the export root folder was named from the first processed file
+                    if export_names is None:
+                        export_names = _export_root_folder(
+                            processed_files[0], pacs_operation_mode, repair_context, research_context, run_paths.run_id
+                        )
+                    root_folder_raw, root_folder = export_names
+                    zip_disk_path = run_paths.bundle_dir / f"{root_folder}.zip"
 
                     # Store root_folder for download filename
                     st.session_state.output_folder_name = root_folder
@@ -5693,8 +5912,7 @@ if st.session_state.get('uploaded_dicom_files'):
                                 os.makedirs(full_folder, exist_ok=True)
                                 
                                 dcm_path = os.path.join(full_folder, file_info['filename'])
-                                with open(dcm_path, 'wb') as f:
-                                    f.write(file_info['data'])
+                                shutil.copyfile(file_info['output_path'], dcm_path)
                                 
                                 # Track for summary
                                 if '/' in folder_path:
@@ -5720,12 +5938,10 @@ if st.session_state.get('uploaded_dicom_files'):
                                 status_text.markdown(f"**NIfTI conversion successful!** {len(nifti_result.converted_files)} files ({mode_label})")
                                 
                                 # ZIP the NIfTI files
-                                with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                                export_zip = StreamingZipBundle(zip_disk_path, root_folder)
+                                with export_zip:
                                     for nifti_path in nifti_result.converted_files:
-                                        nifti_filename = os.path.basename(nifti_path)
-                                        zip_path = f"{root_folder}/{nifti_filename}"
-                                        with open(nifti_path, 'rb') as f:
-                                            zip_file.writestr(zip_path, f.read())
+                                        export_zip.add_file(nifti_path, os.path.basename(nifti_path))
                                     
                                     # Add NIfTI-specific README
                                     nifti_readme = generate_nifti_readme(
@@ -5733,7 +5949,7 @@ if st.session_state.get('uploaded_dicom_files'):
                                         original_mode=mode,
                                         compliance_profile=pacs_operation_mode
                                     )
-                                    zip_file.writestr(f"{root_folder}/README_NIfTI.txt", nifti_readme)
+                                    export_zip.add_bytes("README_NIfTI.txt", nifti_readme)
                                     
                                     # Add audit log (with NIfTI conversion details and quality audit)
                                     nifti_audit_note = f"\n\n--- NIfTI Conversion ---\nFormat: NIfTI (.nii.gz)\nConversion Mode: {nifti_result.mode}\nFiles Created: {len(nifti_result.converted_files)}\nDICOM Viewer: NOT INCLUDED (incompatible with NIfTI)\n"
@@ -5750,7 +5966,7 @@ if st.session_state.get('uploaded_dicom_files'):
                                     if nifti_result.warnings:
                                         nifti_audit_note += "\nConversion Log:\n" + "\n".join(f"  - {w}" for w in nifti_result.warnings) + "\n"
                                     full_audit = st.session_state.combined_audit_logs + nifti_audit_note
-                                    zip_file.writestr(f"{root_folder}/VoxelMask_AuditLog.txt", full_audit)
+                                    export_zip.add_bytes("VoxelMask_AuditLog.txt", full_audit)
                                     
                                     # NOTE: DICOM Viewer is NOT included for NIfTI output
                             else:
@@ -5760,6 +5976,7 @@ if st.session_state.get('uploaded_dicom_files'):
                                 
                         except Exception as nifti_error:
                             nifti_conversion_success = False
+                            export_zip = None  # Partial NIfTI ZIP already discarded
                             st.warning("NIfTI conversion unavailable. DICOM output used instead.")
                         
                         finally:
@@ -5774,30 +5991,14 @@ if st.session_state.get('uploaded_dicom_files'):
                     # STANDARD DICOM ZIP (if NIfTI not requested or failed)
                     # ═══════════════════════════════════════════════════════════════
                     if not output_as_nifti or not nifti_conversion_success:
-                        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                        # NIfTI fallback: the DICOMs were spooled but not streamed yet
+                        stream_now = export_zip is None
+                        if stream_now:
+                            export_zip = StreamingZipBundle(zip_disk_path, root_folder)
+                        with export_zip:
                             for file_info in processed_files:
-                                # Use full_path if available, otherwise fallback to filename
-                                original_path = file_info.get('full_path', file_info['filename'])
-                                # Wrap in root folder
-                                zip_path = f"{root_folder}/{original_path}"
-                                zip_file.writestr(zip_path, file_info['data'])
-                                
-                                # ═══════════════════════════════════════════════════════════════
-                                # PHASE 6: PNG PREVIEW FOR HTML VIEWER (Presentation only)
-                                # ═══════════════════════════════════════════════════════════════
-                                if include_html_viewer:
-                                    try:
-                                        # Only render PNG for image modalities
-                                        modality = file_info.get('modality', '')
-                                        if modality.upper() in ['US', 'CT', 'MR', 'DX', 'CR', 'MG', 'XA', 'RF', 'NM', 'PT']:
-                                            png_bytes = render_dicom_bytes_to_png(file_info['data'])
-                                            if png_bytes:
-                                                # Write PNG adjacent to DICOM (same path, .png extension)
-                                                png_zip_path = zip_path.rsplit('.', 1)[0] + '.png'
-                                                zip_file.writestr(png_zip_path, png_bytes)
-                                    except Exception:
-                                        # Silent skip - viewer.js will show "Image unavailable" if missing
-                                        pass
+                                if stream_now:
+                                    _stream_export_file(export_zip, file_info, include_html_viewer)
                                 
                                 # Track folder structure for summary
                                 folder_path = file_info.get('folder_path', 'Processed')
@@ -5817,7 +6018,7 @@ if st.session_state.get('uploaded_dicom_files'):
                                     error_message=nifti_result.error_message or "Unknown error",
                                     warnings=nifti_result.warnings
                                 )
-                                zip_file.writestr(f"{root_folder}/NIFTI_CONVERSION_FAILED.txt", fallback_warning)
+                                export_zip.add_bytes("NIFTI_CONVERSION_FAILED.txt", fallback_warning)
                                 audit_content += f"\n\n--- NIfTI Conversion Failed ---\n{nifti_result.error_message}\nOutput: DICOM (fallback)\n"
                             
                             # ═══════════════════════════════════════════════════════════════
@@ -5933,15 +6134,15 @@ if st.session_state.get('uploaded_dicom_files'):
                                 
                                 # Generate PDF
                                 pdf_bytes = create_report(report_type, pdf_data)
-                                zip_file.writestr(f"{root_folder}/{pdf_filename}", pdf_bytes)
+                                export_zip.add_bytes(pdf_filename, pdf_bytes)
                                 
                             except Exception as pdf_error:
                                 # Fallback to text if PDF fails
                                 st.warning("PDF report unavailable. Text log included instead.")
-                                zip_file.writestr(f"{root_folder}/VoxelMask_AuditLog.txt", audit_content)
+                                export_zip.add_bytes("VoxelMask_AuditLog.txt", audit_content)
                             
                             # Also include text log as backup (for machine parsing)
-                            zip_file.writestr(f"{root_folder}/VoxelMask_AuditLog.txt", audit_content)
+                            export_zip.add_bytes("VoxelMask_AuditLog.txt", audit_content)
                             
                             # Add a README with structure info inside root folder
                             readme_content = f"""VoxelMask Processing Summary
@@ -5966,7 +6167,7 @@ Simply drag the "{root_folder}" folder to your PACS import.
 Studies in this archive:
 {chr(10).join('  • ' + s for s in sorted(unique_studies))}
 """
-                            zip_file.writestr(f"{root_folder}/README.txt", readme_content)
+                            export_zip.add_bytes("README.txt", readme_content)
                             
                             # Add DICOM Viewer for easy verification inside root folder
                             # (Only for DICOM output, not NIfTI)
@@ -5974,7 +6175,7 @@ Studies in this archive:
                             if os.path.exists(viewer_path):
                                 with open(viewer_path, 'r', encoding='utf-8') as f:
                                     viewer_content = f.read()
-                                zip_file.writestr(f"{root_folder}/DICOM_Viewer.html", viewer_content)
+                                export_zip.add_bytes("DICOM_Viewer.html", viewer_content)
                             
                             # ═══════════════════════════════════════════════════════════════
                             # PHASE 6: HTML EXPORT VIEWER (Presentation only)
@@ -5995,11 +6196,11 @@ Studies in this archive:
                                     for asset_name in required_assets:
                                         asset_path = os.path.join(static_dir, asset_name)
                                         with open(asset_path, 'rb') as f:
-                                            zip_file.writestr(f"{root_folder}/viewer/{asset_name}", f.read())
+                                            export_zip.add_bytes(f"viewer/{asset_name}", f.read())
                                     
                                     # Add friendly redirect at root level
                                     redirect_html = b"<!doctype html><meta http-equiv='refresh' content='0; url=viewer/viewer.html'><title>VoxelMask Export Viewer</title>"
-                                    zip_file.writestr(f"{root_folder}/VIEWER.html", redirect_html)
+                                    export_zip.add_bytes("VIEWER.html", redirect_html)
                                     
                                     # ═══════════════════════════════════════════════════════════════
                                     # GOVERNANCE: Write viewer_index.json LAST
@@ -6023,11 +6224,11 @@ Studies in this archive:
                                     index_json = json_module.dumps(index_dict, indent=2)
                                     
                                     # Write standard JSON (for machine readability)
-                                    zip_file.writestr(f"{root_folder}/viewer/viewer_index.json", index_json.encode('utf-8'))
+                                    export_zip.add_bytes("viewer/viewer_index.json", index_json.encode('utf-8'))
                                     
                                     # Write JS Global (for file:// protocol support)
                                     index_js = viewer_index.to_js()
-                                    zip_file.writestr(f"{root_folder}/viewer/viewer_index.js", index_js.encode('utf-8'))
+                                    export_zip.add_bytes("viewer/viewer_index.js", index_js.encode('utf-8'))
                                     
                                     # ═══════════════════════════════════════════════════════════════
                                     # PHASE 12 FIX: WRITE VIEWER TO RUN-SCOPED DIRECTORY
@@ -6069,13 +6270,13 @@ Studies in this archive:
                                             folder_path = file_info.get('folder_path', 'Processed')
                                             dcm_dst = run_viewer_dir.parent / folder_path / file_info['filename']
                                             dcm_dst.parent.mkdir(parents=True, exist_ok=True)
-                                            dcm_dst.write_bytes(file_info['data'])
+                                            shutil.copyfile(file_info['output_path'], dcm_dst)
                                             
                                             # Render PNG if image modality
                                             modality = file_info.get('modality', '')
-                                            if modality.upper() in ['US', 'CT', 'MR', 'DX', 'CR', 'MG', 'XA', 'RF', 'NM', 'PT']:
+                                            if modality.upper() in PNG_PREVIEW_MODALITIES:
                                                 try:
-                                                    png_bytes = render_dicom_bytes_to_png(file_info['data'])
+                                                    png_bytes = render_dicom_bytes_to_png(dcm_dst.read_bytes())
                                                     if png_bytes:
                                                         png_dst = dcm_dst.with_suffix('.png')
                                                         png_dst.write_bytes(png_bytes)
@@ -6120,13 +6321,16 @@ Studies in this archive:
                             
                             # Commit to SQLite atomically
                             db_path = os.path.join(BASE_DIR, 'scrub_history.db')
-                            writer = DecisionTraceWriter(db_path)
+                            writer = DecisionTraceWriter(db_path, writer=default_async_writer())
                             
                             # Use cached scrub_uuid from processing start (Phase 14 fix)
                             scrub_uuid = st.session_state.get('scrub_uuid') or str(uuid.uuid4())
                             
                             writer.commit(scrub_uuid, collector)
                             
+                            # Run finalization: wait until the audit rows are committed
+                            writer.flush()
+                            
                             # Log success to combined audit
                             summary = review_session.get_summary()
                             decision_summary = (
@@ -6146,39 +6350,38 @@ Studies in this archive:
                         except Exception as e:
                             # Log warning but don't fail export
                             st.warning("Decision trace could not be saved. Export completed successfully.")
+                        
+                        # Learn the reviewed file's device layout from the mask it was
+                        # exported with (geometry only)
+                        us_signature = us_device_signatures.get(review_session.sop_instance_uid)
+                        if us_signature is not None:
+                            try:
+                                layout_templates.learn(us_signature, review_session, [manual_box])
+                            except Exception as e:
+                                print(f"[LAYOUT] Warning: could not learn layout template: {e}")
                     
-                    # Phase 14: Write ZIP to disk instead of keeping in RAM (Steam Deck OOM fix)
+                    # Phase 14: The ZIP was written to disk as it was built (Steam Deck OOM fix)
                     if st.session_state.get('output_zip_path') is None:
-                        import gc
-                        # Get run folder for disk-backed storage  
-                        run_paths = st.session_state.get('run_paths')
-                        if run_paths:
-                            # Use bundle_dir for ZIP output (RunPaths has no outputs_dir)
-                            zip_disk_path = run_paths.bundle_dir / f"{st.session_state.get('output_folder_name', 'export')}.zip"
-                        else:
-                            zip_disk_path = DOWNLOADS_ROOT / f"{st.session_state.get('output_folder_name', 'export')}.zip"
-                        
-                        # Write to disk
-                        zip_disk_path.parent.mkdir(parents=True, exist_ok=True)
-                        with open(zip_disk_path, 'wb') as f:
-                            f.write(zip_buffer.getvalue())
-                        
                         # Store path, not bytes
-                        st.session_state.output_zip_path = str(zip_disk_path)
+                        st.session_state.output_zip_path = str(export_zip.zip_path)
                         
                         # Marker for legacy check (not actual ZIP bytes)
                         st.session_state.output_zip_buffer = b"DISK_BACKED"
+                        print(f"[Phase14] ZIP written to disk: {export_zip.zip_path} ({export_zip.file_count} files, streamed)")
                         
-                        # Phase 14: Clear heavy 'data' field from processed_files (OOM fix)
-                        # Keep metadata only - data is already on disk in ZIP
-                        for pf in st.session_state.get('processed_files', []):
-                            if 'data' in pf:
-                                del pf['data']
-                        
-                        # Release memory explicitly
-                        del zip_buffer
-                        gc.collect()
-                        print(f"[Phase14] ZIP written to disk: {zip_disk_path} | Memory released, processed_files data cleared")
+                        # Per-member compression (adaptive store/deflate) for the export summary
+                        compression = export_zip.compression_summary()
+                        if st.session_state.get('processing_stats') is not None:
+                            st.session_state.processing_stats['compression'] = compression
+                        print(
+                            f"[EXPORT] ZIP compression: mode={compression['mode']} level={compression['level']} workers={compression['workers']} "
+                            f"stored={compression['stored']} deflated={compression['deflated']} ratio={compression['ratio']:.3f}"
+                        )
+                    
+                    # Spooled outputs are in the ZIP (and the run viewer): keep metadata only
+                    for pf in processed_files:
+                        pf.pop('output_path', None)
+                    shutil.rmtree(output_spool_dir, ignore_errors=True)
                     
                     # NOTE: Removed st.rerun() here - Streamlit auto-reruns after button handler
                     # (Phase 14 fix - prevents rerun storm)
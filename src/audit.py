@@ -12,6 +12,12 @@ try:
 except ImportError:
     pydicom = None
 
+try:
+    from voxelmask_core.hashing import file_sha256
+except ImportError:
+    # Loaded standalone (src not on sys.path): hash without the memo
+    file_sha256 = None
+
 def extract_sonographer_initials(original_meta: Dict) -> str:
     """
     Extract sonographer initials from DICOM tags.
@@ -57,19 +63,25 @@ def extract_sonographer_initials(original_meta: Dict) -> str:
     
     return "N/A"
 
-def calculate_file_hash(file_path: str) -> str:
+def calculate_file_hash(file_path: str, block_size: int = 1024 * 1024) -> str:
     """
-    Calculate SHA-256 hash of a file.
+    Calculate SHA-256 hash of a file, reading it in blocks.
     
     Args:
         file_path: Path to the file
+        block_size: Bytes per read
         
     Returns:
         SHA-256 hash as hex string
     """
     try:
+        if file_sha256 is not None:
+            return file_sha256(file_path, block_size)
+        digest = hashlib.sha256()
         with open(file_path, 'rb') as f:
-            return hashlib.sha256(f.read()).hexdigest()
+            for chunk in iter(lambda: f.read(block_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
     except Exception:
         return "HASH_ERROR"
 
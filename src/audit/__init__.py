@@ -6,17 +6,29 @@ Evidence bundle and audit utilities for VoxelMask.
 from .evidence_bundle import (
     EvidenceBundle,
     create_empty_bundle,
+    recover_bundle,
     SCHEMA_VERSION,
     ActionType,
     ActionResult,
     VerificationStatus,
 )
+from .bundle_reader import (
+    BundleContents,
+    read_bundle,
+    iter_records,
+    verify_bundle,
+)
 
 __all__ = [
     "EvidenceBundle",
     "create_empty_bundle",
+    "recover_bundle",
     "SCHEMA_VERSION",
     "ActionType",
     "ActionResult",
     "VerificationStatus",
+    "BundleContents",
+    "read_bundle",
+    "iter_records",
+    "verify_bundle",
 ]
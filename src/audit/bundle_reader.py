@@ -0,0 +1,161 @@
+"""
+VoxelMask Evidence Bundle Reader
+================================
+Loads a finalized evidence bundle (plain or compressed encoding) back into
+the evidence_bundle record dataclasses, for audit tooling, re-verification
+and tests.
+
+The record file layout is taken from MANIFEST.json: a compressed bundle
+names its encoding and codec there, a plain one has no "encoding" entry.
+With verify=True every file listed in the MANIFEST is re-hashed before
+anything is parsed, so a tampered or truncated bundle is rejected rather
+than partially loaded.
+
+Usage:
+    from audit.bundle_reader import read_bundle, iter_records
+
+    contents = read_bundle(bundle_dir)
+    contents.decision_log[0].decision_type
+
+    for detection in iter_records(bundle_dir, "detection_results"):
+        ...
+"""
+
+import csv
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from voxelmask_core.hashing import hash_file
+
+from .evidence_bundle import (
+    ENCODING_PLAIN,
+    RECORD_FILES,
+    DecisionLogEntry,
+    DetectionResult,
+    ExceptionRecord,
+    InstanceLinkage,
+    MaskedHash,
+    MaskingAction,
+    SourceHash,
+    iter_record_lines,
+    record_paths,
+    resolve_codec,
+)
+
+
+# Record collection -> dataclass
+RECORD_TYPES = {
+    "source_hashes": SourceHash,
+    "masked_hashes": MaskedHash,
+    "detection_results": DetectionResult,
+    "masking_actions": MaskingAction,
+    "decision_log": DecisionLogEntry,
+    "instance_linkages": InstanceLinkage,
+    "exceptions": ExceptionRecord,
+}
+
+
+@dataclass
+class BundleContents:
+    """All records of an evidence bundle, plus its MANIFEST."""
+    manifest: Dict[str, Any]
+    source_hashes: List[SourceHash] = field(default_factory=list)
+    masked_hashes: List[MaskedHash] = field(default_factory=list)
+    detection_results: List[DetectionResult] = field(default_factory=list)
+    masking_actions: List[MaskingAction] = field(default_factory=list)
+    decision_log: List[DecisionLogEntry] = field(default_factory=list)
+    instance_linkages: List[InstanceLinkage] = field(default_factory=list)
+    exceptions: List[ExceptionRecord] = field(default_factory=list)
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.manifest.get("partial"))
+
+
+def load_manifest(bundle_dir: Path) -> Dict[str, Any]:
+    """Read MANIFEST.json (ValueError if the bundle was never sealed)."""
+    manifest_path = Path(bundle_dir) / "MANIFEST.json"
+    if not manifest_path.exists():
+        raise ValueError(f"{bundle_dir} has no MANIFEST.json (unfinished bundle? see recover_bundle())")
+    return json.loads(manifest_path.read_text())
+
+
+def bundle_record_paths(manifest: Dict[str, Any]) -> Dict[str, str]:
+    """Bundle-relative record file paths for a MANIFEST's encoding."""
+    encoding = manifest.get("encoding")
+    if not encoding:
+        return record_paths(ENCODING_PLAIN)
+    return record_paths(encoding["name"], resolve_codec(encoding["codec"]))
+
+
+def verify_bundle(bundle_dir: Path, manifest: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Re-hash every file listed in the MANIFEST.
+
+    Raises:
+        ValueError: If a file is missing or its size or SHA-256 differs
+    """
+    bundle_dir = Path(bundle_dir)
+    manifest = manifest or load_manifest(bundle_dir)
+    for rec in manifest["files"]:
+        path = bundle_dir / rec["path"]
+        if not path.exists():
+            raise ValueError(f"Bundle file missing: {rec['path']}")
+        if path.stat().st_size != rec["bytes"] or hash_file(str(path))["sha256"] != rec["sha256"]:
+            raise ValueError(f"Bundle file does not match MANIFEST: {rec['path']}")
+
+
+def _from_csv_row(name: str, row: Dict[str, str]) -> Dict[str, Any]:
+    """Restore the types that CSV flattens to strings."""
+    if name == "source_hashes":
+        number = row.get("instance_number")
+        row["instance_number"] = int(number) if number else None
+    elif name == "instance_linkages":
+        row["deterministic_salt_id"] = row.get("deterministic_salt_id") or None
+    return row
+
+
+def _iter_path(path: Path, name: str) -> Iterator[Any]:
+    record_type = RECORD_TYPES[name]
+    lines = iter_record_lines(path)
+    if RECORD_FILES[name][1] is not None:
+        for row in csv.DictReader(lines):
+            yield record_type(**_from_csv_row(name, row))
+    else:
+        for line in lines:
+            yield record_type(**json.loads(line))
+
+
+def iter_records(bundle_dir: Path, name: str) -> Iterator[Any]:
+    """
+    Stream one record collection (e.g. "decision_log") as dataclasses,
+    without hash verification or loading the whole file.
+    """
+    if name not in RECORD_TYPES:
+        raise ValueError(f"Unknown record collection: {name}")
+    bundle_dir = Path(bundle_dir)
+    rel_path = bundle_record_paths(load_manifest(bundle_dir))[name]
+    yield from _iter_path(bundle_dir / rel_path, name)
+
+
+def read_bundle(bundle_dir: Path, verify: bool = True) -> BundleContents:
+    """
+    Load every record of a finalized bundle.
+
+    Args:
+        bundle_dir: EVIDENCE_<run>_<timestamp>/ directory
+        verify: Check MANIFEST hashes first (see verify_bundle())
+
+    Raises:
+        ValueError: Unsealed bundle, or a file that fails verification
+    """
+    bundle_dir = Path(bundle_dir)
+    manifest = load_manifest(bundle_dir)
+    if verify:
+        verify_bundle(bundle_dir, manifest)
+    contents = BundleContents(manifest=manifest)
+    for name, rel_path in bundle_record_paths(manifest).items():
+        getattr(contents, name).extend(_iter_path(bundle_dir / rel_path, name))
+    return contents
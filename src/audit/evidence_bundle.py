@@ -11,8 +11,28 @@ Design Constraints (Model B):
 - PACS remains authoritative
 - Verifiable linkage to source via hashes
 
+Streaming mode:
+    By default records are held in memory until finalize(). After
+    stream_to(output_dir) the bundle directory is created at once and every
+    record is appended to its CSV/JSONL file as it arrives, hashed in the
+    same pass; finalize() then writes only the small index, CONFIG, QA,
+    MANIFEST and SIGNATURE files. Memory stays flat however many instances
+    a run has. A streaming bundle carries IN_PROGRESS.json until it is
+    finalized; recover_bundle() seals one left behind by a crash as a
+    partial bundle.
+
+Compressed encoding:
+    EvidenceBundle(encoding="compressed") writes the DECISIONS, LINKAGE
+    and QA record files (the ones that grow to hundreds of MB on large
+    research exports) zstd-compressed (.zst) when the zstandard package is
+    installed, else gzip-compressed (.gz). Hashes, .sha256 files, MANIFEST
+    and SIGNATURE cover the compressed bytes on disk, and MANIFEST records
+    the encoding. audit.bundle_reader loads either encoding back into the
+    dataclasses below.
+
 Usage:
     bundle = EvidenceBundle(processing_run_id="uuid...")
+    bundle.stream_to(output_dir)  # optional
     bundle.add_source_instance(sop_uid, pixel_hash, series_uid, ...)
     bundle.add_detection(source_sop_uid, bbox, confidence, ...)
     bundle.add_masking_action(masked_sop_uid, action_type, ...)
@@ -20,20 +40,72 @@ Usage:
     bundle.finalize(output_dir)
 """
 
+import io
 import json
 import csv
-import hashlib
+import os
 import uuid
+import zlib
 from pathlib import Path
 from datetime import datetime, timezone
 from dataclasses import dataclass, field, asdict
 from typing import Optional, List, Dict, Any
 from enum import Enum
 
+from voxelmask_core.hashing import MultiHasher, hash_bytes, hash_file
+
+# Optional zstandard for compressed bundles (gzip is used without it)
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
 
 # Schema version constant
 SCHEMA_VERSION = "vm_evidence_schema:1.0"
 
+# Marker present in a streaming bundle until finalize() (or recover_bundle())
+IN_PROGRESS_FILENAME = "IN_PROGRESS.json"
+
+SOURCE_HASH_FIELDS = ["source_sop_instance_uid", "source_pixel_hash", "source_series_uid", "instance_number"]
+MASKED_HASH_FIELDS = ["masked_sop_instance_uid", "masked_pixel_hash", "masked_series_uid"]
+LINKAGE_FIELDS = [
+    "source_study_uid", "source_series_uid", "source_sop_uid",
+    "masked_study_uid", "masked_series_uid", "masked_sop_uid",
+    "uid_strategy", "deterministic_salt_id"
+]
+
+# Record collection -> (bundle-relative path, CSV fieldnames or None for JSONL)
+RECORD_FILES = {
+    "source_hashes": ("INPUT/source_hashes.csv", SOURCE_HASH_FIELDS),
+    "masked_hashes": ("OUTPUT/masked_hashes.csv", MASKED_HASH_FIELDS),
+    "detection_results": ("DECISIONS/detection_results.jsonl", None),
+    "masking_actions": ("DECISIONS/masking_actions.jsonl", None),
+    "decision_log": ("DECISIONS/decision_log.jsonl", None),
+    "instance_linkages": ("LINKAGE/instance_linkage.csv", LINKAGE_FIELDS),
+    "exceptions": ("QA/exceptions.jsonl", None),
+}
+
+BUNDLE_SUBDIRS = ("CONFIG", "INPUT", "OUTPUT", "DECISIONS", "LINKAGE", "QA", "SIGNATURE")
+
+# Bundle encodings: "plain" CSV/JSONL, or "compressed" record files in COMPRESSED_DIRS
+ENCODING_PLAIN = "plain"
+ENCODING_COMPRESSED = "compressed"
+BUNDLE_ENCODINGS = (ENCODING_PLAIN, ENCODING_COMPRESSED)
+COMPRESSED_DIRS = ("DECISIONS", "LINKAGE", "QA")
+
+# Version of the record layout inside compressed files (recorded in MANIFEST)
+RECORD_SCHEMA_VERSION = "vm_evidence_records:1"
+
+# Records between compressor block flushes: a crash loses at most this many
+COMPRESSED_FLUSH_RECORDS = 256
+
+_READ_BLOCK_SIZE = 1024 * 1024
+
+_DECOMPRESS_ERRORS = (zlib.error, ValueError) + ((zstandard.ZstdError,) if ZSTD_AVAILABLE else ())
+
 
 class ActionType(Enum):
     """Masking action types."""
@@ -135,11 +207,220 @@ class ExceptionRecord:
     severity: str  # ERROR / WARNING / INFO
 
 
+def _record_dict(record: Any) -> Dict[str, Any]:
+    return asdict(record) if hasattr(record, '__dict__') else record
+
+
+def _write_hash_file(path: Path, content_hash: str) -> None:
+    hash_path = path.with_suffix(path.suffix + ".sha256")
+    hash_path.write_text(f"{content_hash}  {path.name}\n")
+
+
+class _Compressor:
+    """Streaming compressor with block flushes (zlib or zstandard compressobj)."""
+    
+    def __init__(self, obj, block_mode, finish_mode):
+        self._obj = obj
+        self._block_mode = block_mode
+        self._finish_mode = finish_mode
+    
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+    
+    def flush_block(self) -> bytes:
+        return self._obj.flush(self._block_mode)
+    
+    def finish(self) -> bytes:
+        return self._obj.flush(self._finish_mode)
+
+
+class Codec:
+    """A compression codec for record files, named by its file suffix."""
+    
+    def __init__(self, name: str, suffix: str):
+        self.name = name
+        self.suffix = suffix
+    
+    def compressor(self) -> _Compressor:
+        if self.name == "zstd":
+            return _Compressor(
+                zstandard.ZstdCompressor(level=3).compressobj(),
+                zstandard.COMPRESSOBJ_FLUSH_BLOCK,
+                zstandard.COMPRESSOBJ_FLUSH_FINISH,
+            )
+        return _Compressor(
+            zlib.compressobj(6, zlib.DEFLATED, 31),  # wbits 31: gzip container
+            zlib.Z_SYNC_FLUSH,
+            zlib.Z_FINISH,
+        )
+    
+    def decompressor(self):
+        """Object whose decompress(data) tolerates a truncated stream."""
+        if self.name == "zstd":
+            return zstandard.ZstdDecompressor().decompressobj()
+        return zlib.decompressobj(31)
+
+
+CODECS = {
+    "zstd": Codec("zstd", ".zst"),
+    "gzip": Codec("gzip", ".gz"),
+}
+
+
+def resolve_codec(name: Optional[str] = None) -> Codec:
+    """
+    Codec for compressed bundles: the named one, else zstd if zstandard is
+    installed, else gzip.
+    
+    Raises:
+        ValueError: Unknown codec name
+        ImportError: zstd requested without the zstandard package
+    """
+    if name is None:
+        name = "zstd" if ZSTD_AVAILABLE else "gzip"
+    if name not in CODECS:
+        raise ValueError(f"Unknown bundle codec: {name}")
+    if name == "zstd" and not ZSTD_AVAILABLE:
+        raise ImportError("zstandard is required for zstd bundles. Install with: pip install zstandard")
+    return CODECS[name]
+
+
+def codec_for_path(path: Path) -> Optional[Codec]:
+    """Codec implied by a record file's suffix (None for plain files)."""
+    for name, codec in CODECS.items():
+        if str(path).endswith(codec.suffix):
+            return resolve_codec(name)
+    return None
+
+
+def record_paths(encoding: str = ENCODING_PLAIN, codec: Optional[Codec] = None) -> Dict[str, str]:
+    """Bundle-relative path of each record file under an encoding."""
+    if encoding not in BUNDLE_ENCODINGS:
+        raise ValueError(f"Unknown bundle encoding: {encoding}")
+    paths = {}
+    for name, (rel_path, _) in RECORD_FILES.items():
+        if encoding == ENCODING_COMPRESSED and rel_path.split("/")[0] in COMPRESSED_DIRS:
+            rel_path += codec.suffix
+        paths[name] = rel_path
+    return paths
+
+
+def iter_record_lines(path: Path, strict: bool = True):
+    """
+    Yield the complete text lines of a record file, decompressing by suffix.
+    
+    Args:
+        path: Record file (plain, .gz or .zst)
+        strict: Raise ValueError on a trailing incomplete line (else drop it)
+    """
+    codec = codec_for_path(path)
+    decompressor = codec.decompressor() if codec else None
+    pending = b""
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(_READ_BLOCK_SIZE)
+            if not block:
+                break
+            if decompressor is not None:
+                block = decompressor.decompress(block)
+            pending += block
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                yield line.decode("utf-8") + "\n"
+    if pending and strict:
+        raise ValueError(f"{path.name}: incomplete last record")
+
+
+class _RecordStream:
+    """
+    Append-only CSV or JSONL record file, hashed as it is written.
+    
+    The bytes are identical to writing the whole file at once (CSV header
+    first, "\r\n" row endings; one JSON object per "\n"-terminated line),
+    and each record is flushed to the OS so a crash loses at most the line
+    being written. With a codec the compressed stream is flushed every
+    COMPRESSED_FLUSH_RECORDS records instead (the CSV header on open), and
+    the hash covers the compressed bytes.
+    """
+    
+    def __init__(
+        self,
+        path: Path,
+        fieldnames: Optional[List[str]] = None,
+        codec: Optional[Codec] = None
+    ):
+        self.path = path
+        self.fieldnames = fieldnames
+        self.count = 0
+        self._hasher = MultiHasher(("sha256",))
+        self._compressor = codec.compressor() if codec else None
+        self._file = open(path, "wb")
+        if fieldnames is not None:
+            self._buffer = io.StringIO()
+            self._writer = csv.DictWriter(self._buffer, fieldnames=fieldnames)
+            self._writer.writeheader()
+            self._emit(self._take_buffer())
+            if self._compressor is not None:
+                # Header as its own block: a crash before the first record
+                # block still leaves a recoverable, parseable CSV
+                self._write(self._compressor.flush_block())
+    
+    def _take_buffer(self) -> str:
+        text = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return text
+    
+    def _emit(self, text: str) -> None:
+        data = text.encode("utf-8")
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+        self._write(data)
+    
+    def _write(self, data: bytes) -> None:
+        if not data:
+            return
+        self._file.write(data)
+        self._file.flush()
+        self._hasher.update(data)
+    
+    def write_line(self, line: str) -> None:
+        """Append an already-encoded record line (used by recover_bundle())."""
+        self._emit(line)
+        self.count += 1
+    
+    def append(self, record: Any) -> None:
+        if self.fieldnames is not None:
+            self._writer.writerow(_record_dict(record))
+            self._emit(self._take_buffer())
+        else:
+            self._emit(json.dumps(_record_dict(record), sort_keys=True) + "\n")
+        self.count += 1
+        if self._compressor is not None and self.count % COMPRESSED_FLUSH_RECORDS == 0:
+            self._write(self._compressor.flush_block())
+    
+    def close(self) -> Dict[str, Any]:
+        """Close the file, write its .sha256 and return its manifest record."""
+        if not self._file.closed:
+            if self._compressor is not None:
+                self._write(self._compressor.finish())
+            self._file.close()
+        content_hash = self._hasher.hexdigests()["sha256"]
+        _write_hash_file(self.path, content_hash)
+        return {
+            "path": str(self.path.name),
+            "sha256": content_hash,
+            "bytes": self._hasher.nbytes
+        }
+
+
 class EvidenceBundle:
     """
     Evidence bundle generator implementing Model B schema.
     
     Generates a complete, hash-chained evidence bundle for audit purposes.
+    Records are kept in memory until finalize(), or appended to the bundle
+    files as they arrive after stream_to().
     """
     
     def __init__(
@@ -147,14 +428,28 @@ class EvidenceBundle:
         processing_run_id: Optional[str] = None,
         voxelmask_version: str = "0.5.0",
         compliance_profile: str = "FOI",
-        uid_strategy: str = "REGENERATE_DETERMINISTIC"
+        uid_strategy: str = "REGENERATE_DETERMINISTIC",
+        encoding: str = ENCODING_PLAIN,
+        codec: Optional[str] = None
     ):
-        """Initialize evidence bundle."""
+        """
+        Initialize evidence bundle.
+        
+        Args:
+            encoding: "plain" or "compressed" (see module docstring)
+            codec: Codec name for compressed bundles ("zstd" or "gzip";
+                None = zstd if installed, else gzip)
+        """
         self.processing_run_id = processing_run_id or str(uuid.uuid4())
         self.voxelmask_version = voxelmask_version
         self.compliance_profile = compliance_profile
         self.uid_strategy = uid_strategy
         
+        # Record file layout
+        self.encoding = encoding
+        self.codec = resolve_codec(codec) if encoding == ENCODING_COMPRESSED else None
+        self.record_paths = record_paths(encoding, self.codec)
+        
         self.processing_start: Optional[str] = None
         self.processing_end: Optional[str] = None
         
@@ -180,6 +475,76 @@ class EvidenceBundle:
         self.profile_config: Dict[str, Any] = {}
         self.app_build: Dict[str, Any] = {}
         self.runtime_env: Dict[str, Any] = {}
+
+        # Processing cache counters (name -> counters, no PHI)
+        self.cache_stats: Dict[str, Dict[str, int]] = {}
+        
+        # Manifest counts, kept as records arrive (the collections above
+        # stay empty in streaming mode)
+        self._counts: Dict[str, int] = {name: 0 for name in RECORD_FILES}
+        self._skipped = 0
+        self._failures = 0
+        self._masked_uids: set = set()
+        
+        # Streaming mode state (see stream_to())
+        self.bundle_dir: Optional[Path] = None
+        self._streams: Optional[Dict[str, _RecordStream]] = None
+    
+    @property
+    def streaming(self) -> bool:
+        """True once stream_to() has opened the bundle directory."""
+        return self._streams is not None
+    
+    @property
+    def detection_count(self) -> int:
+        """Detections recorded so far (in either mode)."""
+        return self._counts["detection_results"]
+    
+    def _record_stream(self, bundle_dir: Path, name: str) -> _RecordStream:
+        rel_path = self.record_paths[name]
+        codec = self.codec if rel_path.split("/")[0] in COMPRESSED_DIRS else None
+        return _RecordStream(bundle_dir / rel_path, RECORD_FILES[name][1], codec)
+    
+    def stream_to(self, output_dir: Path) -> Path:
+        """
+        Switch to streaming mode: create the bundle directory now and append
+        every record to its file as it is added.
+        
+        Records added before the call are written out first.
+        
+        Returns: Path to the bundle directory
+        """
+        if self._streams is not None:
+            return self.bundle_dir
+        bundle_dir = self._create_bundle_dir(Path(output_dir))
+        (bundle_dir / IN_PROGRESS_FILENAME).write_text(json.dumps({
+            "schema_version": SCHEMA_VERSION,
+            "processing_run_id": self.processing_run_id,
+            "voxelmask_version": self.voxelmask_version,
+            "compliance_profile": self.compliance_profile,
+            "uid_strategy": self.uid_strategy,
+            "processing_start": self.processing_start,
+            "encoding": self.encoding,
+            "codec": self.codec.name if self.codec else None,
+        }, indent=2, sort_keys=True))
+        
+        streams = {}
+        for name in RECORD_FILES:
+            stream = self._record_stream(bundle_dir, name)
+            for record in getattr(self, name):
+                stream.append(record)
+            getattr(self, name).clear()
+            streams[name] = stream
+        self.bundle_dir = bundle_dir
+        self._streams = streams
+        return bundle_dir
+    
+    def _add_record(self, name: str, record: Any) -> None:
+        if self._streams is not None:
+            self._streams[name].append(record)
+        else:
+            getattr(self, name).append(record)
+        self._counts[name] += 1
     
     def start_processing(self) -> None:
         """Record processing start time."""
@@ -221,7 +586,7 @@ class EvidenceBundle:
         instance_number: Optional[int] = None
     ) -> None:
         """Add source instance hash (Model B backbone)."""
-        self.source_hashes.append(SourceHash(
+        self._add_record("source_hashes", SourceHash(
             source_sop_instance_uid=sop_instance_uid,
             source_pixel_hash=pixel_hash,
             source_series_uid=series_uid,
@@ -235,7 +600,7 @@ class EvidenceBundle:
         series_uid: str
     ) -> None:
         """Add masked output instance hash."""
-        self.masked_hashes.append(MaskedHash(
+        self._add_record("masked_hashes", MaskedHash(
             masked_sop_instance_uid=sop_instance_uid,
             masked_pixel_hash=pixel_hash,
             masked_series_uid=series_uid
@@ -258,7 +623,7 @@ class EvidenceBundle:
         
         NOTE: No OCR text is stored - only location and confidence.
         """
-        self.detection_results.append(DetectionResult(
+        self._add_record("detection_results", DetectionResult(
             source_sop_uid=source_sop_uid,
             frame_index=frame_index,
             region=region,
@@ -281,7 +646,8 @@ class EvidenceBundle:
         frame_index: Optional[int] = None
     ) -> None:
         """Add masking action record."""
-        self.masking_actions.append(MaskingAction(
+        self._masked_uids.add(masked_sop_uid)
+        self._add_record("masking_actions", MaskingAction(
             masked_sop_uid=masked_sop_uid,
             frame_index=frame_index,
             action_type=action_type,
@@ -301,7 +667,9 @@ class EvidenceBundle:
         status: str
     ) -> None:
         """Add decision log entry."""
-        self.decision_log.append(DecisionLogEntry(
+        if decision_type == "SKIP":
+            self._skipped += 1
+        self._add_record("decision_log", DecisionLogEntry(
             timestamp=datetime.now(timezone.utc).isoformat(),
             decision_type=decision_type,
             source_sop_uid=source_sop_uid,
@@ -323,7 +691,7 @@ class EvidenceBundle:
         deterministic_salt_id: Optional[str] = None
     ) -> None:
         """Add instance linkage record."""
-        self.instance_linkages.append(InstanceLinkage(
+        self._add_record("instance_linkages", InstanceLinkage(
             source_study_uid=source_study_uid,
             source_series_uid=source_series_uid,
             source_sop_uid=source_sop_uid,
@@ -342,7 +710,9 @@ class EvidenceBundle:
         source_sop_uid: Optional[str] = None
     ) -> None:
         """Add exception/error record."""
-        self.exceptions.append(ExceptionRecord(
+        if severity == "ERROR":
+            self._failures += 1
+        self._add_record("exceptions", ExceptionRecord(
             timestamp=datetime.now(timezone.utc).isoformat(),
             exception_type=exception_type,
             source_sop_uid=source_sop_uid,
@@ -350,6 +720,10 @@ class EvidenceBundle:
             severity=severity
         ))
     
+    def set_cache_stats(self, cache_name: str, stats: Dict[str, int]) -> None:
+        """Record a cache's hit/miss counters (latest snapshot wins)."""
+        self.cache_stats[cache_name] = dict(stats)
+    
     def set_profile_config(self, config: Dict[str, Any]) -> None:
         """Set profile configuration."""
         self.profile_config = config
@@ -386,24 +760,54 @@ class EvidenceBundle:
             "operator_id": operator_id
         }
     
-    def finalize(self, output_dir: Path) -> Path:
+    def finalize(self, output_dir: Optional[Path] = None) -> Path:
         """
         Finalize and write the complete evidence bundle.
         
+        In streaming mode the record files are already on disk: they are
+        closed, and only the index, CONFIG, QA, MANIFEST and SIGNATURE
+        files are written (output_dir is not needed).
+        
         Returns: Path to the bundle directory
         """
+        if self._streams is None:
+            if output_dir is None:
+                raise ValueError("output_dir is required unless the bundle is streaming")
+            bundle_dir = self._create_bundle_dir(Path(output_dir))
+            streamed = {
+                name: self._write_records_with_hash(self._record_stream(bundle_dir, name), getattr(self, name))
+                for name in RECORD_FILES
+            }
+        else:
+            bundle_dir = self.bundle_dir
+            streamed = {name: stream.close() for name, stream in self._streams.items()}
+        
+        self._seal(bundle_dir, streamed)
+        (bundle_dir / IN_PROGRESS_FILENAME).unlink(missing_ok=True)
+        return bundle_dir
+    
+    def _create_bundle_dir(self, output_dir: Path) -> Path:
+        """Create EVIDENCE_<run>_<timestamp>/ and its subdirectories."""
         timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
         bundle_name = f"EVIDENCE_{self.processing_run_id}_{timestamp}"
         bundle_dir = output_dir / bundle_name
         
         # Create directory structure
-        (bundle_dir / "CONFIG").mkdir(parents=True, exist_ok=True)
-        (bundle_dir / "INPUT").mkdir(exist_ok=True)
-        (bundle_dir / "OUTPUT").mkdir(exist_ok=True)
-        (bundle_dir / "DECISIONS").mkdir(exist_ok=True)
-        (bundle_dir / "LINKAGE").mkdir(exist_ok=True)
-        (bundle_dir / "QA").mkdir(exist_ok=True)
-        (bundle_dir / "SIGNATURE").mkdir(exist_ok=True)
+        for subdir in BUNDLE_SUBDIRS:
+            (bundle_dir / subdir).mkdir(parents=True, exist_ok=True)
+        return bundle_dir
+    
+    def _seal(
+        self,
+        bundle_dir: Path,
+        streamed: Dict[str, Dict[str, Any]],
+        verification_status: str = VerificationStatus.VERIFIED.value
+    ) -> None:
+        """Write the non-record files, MANIFEST and SIGNATURE around the record files."""
+        def placed(name: str) -> Dict[str, Any]:
+            rec = dict(streamed[name])
+            rec["path"] = self.record_paths[name]
+            return rec
         
         # Track all files for manifest
         file_records: List[Dict[str, Any]] = []
@@ -413,98 +817,55 @@ class EvidenceBundle:
         
         # Write INPUT files
         file_records.extend(self._write_input(bundle_dir))
+        file_records.append(placed("source_hashes"))
         
         # Write OUTPUT files
         file_records.extend(self._write_output(bundle_dir))
+        file_records.append(placed("masked_hashes"))
         
-        # Write DECISIONS files
-        file_records.extend(self._write_decisions(bundle_dir))
+        # DECISIONS files
+        file_records.extend(placed(name) for name in ("detection_results", "masking_actions", "decision_log"))
         
-        # Write LINKAGE files
-        file_records.extend(self._write_linkage(bundle_dir))
+        # LINKAGE files
+        file_records.append(placed("instance_linkages"))
         
         # Write QA files
-        file_records.extend(self._write_qa(bundle_dir))
+        file_records.append(placed("exceptions"))
+        file_records.extend(self._write_qa(bundle_dir, verification_status))
         
         # Write MANIFEST
         manifest = self._build_manifest(file_records)
+        if verification_status != VerificationStatus.VERIFIED.value:
+            manifest["partial"] = True
         manifest_path = bundle_dir / "MANIFEST.json"
         self._write_json_with_hash(manifest_path, manifest)
         
         # Write bundle tree (SIGNATURE)
         self._write_bundle_tree(bundle_dir, file_records)
-        
-        return bundle_dir
     
     def _write_json_with_hash(self, path: Path, data: Any) -> Dict[str, Any]:
         """Write JSON file and its hash file."""
         content = json.dumps(data, indent=2, sort_keys=True)
         path.write_text(content)
         
-        content_hash = hashlib.sha256(content.encode()).hexdigest()
-        hash_path = path.with_suffix(path.suffix + ".sha256")
-        hash_path.write_text(f"{content_hash}  {path.name}\n")
+        encoded = content.encode()
+        content_hash = hash_bytes(encoded)["sha256"]
+        _write_hash_file(path, content_hash)
         
         return {
             "path": str(path.name),
             "sha256": content_hash,
-            "bytes": len(content.encode())
+            "bytes": len(encoded)
         }
     
-    def _write_csv_with_hash(
-        self,
-        path: Path,
-        rows: List[Any],
-        fieldnames: List[str]
-    ) -> Dict[str, Any]:
-        """Write CSV file and its hash file."""
-        with open(path, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for row in rows:
-                if hasattr(row, '__dict__'):
-                    writer.writerow(asdict(row))
-                else:
-                    writer.writerow(row)
-        
-        content = path.read_bytes()
-        content_hash = hashlib.sha256(content).hexdigest()
-        hash_path = path.with_suffix(path.suffix + ".sha256")
-        hash_path.write_text(f"{content_hash}  {path.name}\n")
-        
-        return {
-            "path": str(path.name),
-            "sha256": content_hash,
-            "bytes": len(content)
-        }
-    
-    def _write_jsonl_with_hash(
-        self,
-        path: Path,
-        records: List[Any]
-    ) -> Dict[str, Any]:
-        """Write JSONL file and its hash file."""
-        lines = []
-        for record in records:
-            if hasattr(record, '__dict__'):
-                lines.append(json.dumps(asdict(record), sort_keys=True))
-            else:
-                lines.append(json.dumps(record, sort_keys=True))
-        
-        content = "\n".join(lines)
-        if content:
-            content += "\n"
-        path.write_text(content)
-        
-        content_hash = hashlib.sha256(content.encode()).hexdigest()
-        hash_path = path.with_suffix(path.suffix + ".sha256")
-        hash_path.write_text(f"{content_hash}  {path.name}\n")
-        
-        return {
-            "path": str(path.name),
-            "sha256": content_hash,
-            "bytes": len(content.encode())
-        }
+    def _write_records_with_hash(self, stream: _RecordStream, records: List[Any]) -> Dict[str, Any]:
+        """Write a record file and its hash file in one pass."""
+        try:
+            for record in records:
+                stream.append(record)
+        finally:
+            rec = stream.close()
+        return rec
     
     def _write_config(self, bundle_dir: Path) -> List[Dict[str, Any]]:
         """Write CONFIG directory files."""
@@ -546,18 +907,12 @@ class EvidenceBundle:
             "study_instance_uid": self.source_study_uid,
             "study_description": self.source_study_description,
             "series": self.source_series,
-            "total_instances": len(self.source_hashes)
+            "total_instances": self._counts["source_hashes"]
         }
         rec = self._write_json_with_hash(input_dir / "source_index.json", source_index)
         rec["path"] = f"INPUT/{rec['path']}"
         records.append(rec)
         
-        # source_hashes.csv
-        fieldnames = ["source_sop_instance_uid", "source_pixel_hash", "source_series_uid", "instance_number"]
-        rec = self._write_csv_with_hash(input_dir / "source_hashes.csv", self.source_hashes, fieldnames)
-        rec["path"] = f"INPUT/{rec['path']}"
-        records.append(rec)
-        
         return records
     
     def _write_output(self, bundle_dir: Path) -> List[Dict[str, Any]]:
@@ -569,78 +924,39 @@ class EvidenceBundle:
         masked_index = {
             "study_instance_uid": self.masked_study_uid,
             "series": self.masked_series,
-            "total_instances": len(self.masked_hashes)
+            "total_instances": self._counts["masked_hashes"]
         }
         rec = self._write_json_with_hash(output_dir / "masked_index.json", masked_index)
         rec["path"] = f"OUTPUT/{rec['path']}"
         records.append(rec)
         
-        # masked_hashes.csv
-        fieldnames = ["masked_sop_instance_uid", "masked_pixel_hash", "masked_series_uid"]
-        rec = self._write_csv_with_hash(output_dir / "masked_hashes.csv", self.masked_hashes, fieldnames)
-        rec["path"] = f"OUTPUT/{rec['path']}"
-        records.append(rec)
-        
         return records
     
-    def _write_decisions(self, bundle_dir: Path) -> List[Dict[str, Any]]:
-        """Write DECISIONS directory files."""
-        records = []
-        decisions_dir = bundle_dir / "DECISIONS"
-        
-        # detection_results.jsonl
-        rec = self._write_jsonl_with_hash(decisions_dir / "detection_results.jsonl", self.detection_results)
-        rec["path"] = f"DECISIONS/{rec['path']}"
-        records.append(rec)
-        
-        # masking_actions.jsonl
-        rec = self._write_jsonl_with_hash(decisions_dir / "masking_actions.jsonl", self.masking_actions)
-        rec["path"] = f"DECISIONS/{rec['path']}"
-        records.append(rec)
-        
-        # decision_log.jsonl
-        rec = self._write_jsonl_with_hash(decisions_dir / "decision_log.jsonl", self.decision_log)
-        rec["path"] = f"DECISIONS/{rec['path']}"
-        records.append(rec)
-        
-        return records
-    
-    def _write_linkage(self, bundle_dir: Path) -> List[Dict[str, Any]]:
-        """Write LINKAGE directory files."""
-        records = []
-        linkage_dir = bundle_dir / "LINKAGE"
-        
-        fieldnames = [
-            "source_study_uid", "source_series_uid", "source_sop_uid",
-            "masked_study_uid", "masked_series_uid", "masked_sop_uid",
-            "uid_strategy", "deterministic_salt_id"
-        ]
-        rec = self._write_csv_with_hash(linkage_dir / "instance_linkage.csv", self.instance_linkages, fieldnames)
-        rec["path"] = f"LINKAGE/{rec['path']}"
-        records.append(rec)
-        
-        return records
-    
-    def _write_qa(self, bundle_dir: Path) -> List[Dict[str, Any]]:
-        """Write QA directory files."""
+    def _write_qa(
+        self,
+        bundle_dir: Path,
+        verification_status: str = VerificationStatus.VERIFIED.value
+    ) -> List[Dict[str, Any]]:
+        """Write QA directory files (exceptions.jsonl is a record file)."""
         records = []
         qa_dir = bundle_dir / "QA"
         
-        # exceptions.jsonl
-        rec = self._write_jsonl_with_hash(qa_dir / "exceptions.jsonl", self.exceptions)
+        # cache_stats.json
+        rec = self._write_json_with_hash(qa_dir / "cache_stats.json", {"caches": self.cache_stats})
         rec["path"] = f"QA/{rec['path']}"
         records.append(rec)
         
         # verification_report.json
+        complete = "PASS" if verification_status == VerificationStatus.VERIFIED.value else "INCOMPLETE"
         verification = {
             "verification_id": str(uuid.uuid4()),
             "verification_timestamp": datetime.now(timezone.utc).isoformat(),
-            "verification_status": "verified",
+            "verification_status": verification_status,
             "checks": {
                 "manifest_integrity": "PASS",
                 "file_hashes_valid": "PASS",
-                "linkage_complete": "PASS",
-                "decision_coverage": "PASS"
+                "linkage_complete": complete,
+                "decision_coverage": complete
             },
             "mismatches": [],
             "tool_version": self.voxelmask_version
@@ -653,7 +969,7 @@ class EvidenceBundle:
     
     def _build_manifest(self, file_records: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Build the MANIFEST.json content."""
-        return {
+        manifest = {
             "schema_version": SCHEMA_VERSION,
             "processing_run_id": self.processing_run_id,
             "timestamps": {
@@ -664,12 +980,12 @@ class EvidenceBundle:
             "counts": {
                 "studies_in": 1 if self.source_study_uid else 0,
                 "series_in": len(self.source_series),
-                "instances_in": len(self.source_hashes),
-                "instances_out": len(self.masked_hashes),
-                "detections_total": len(self.detection_results),
-                "instances_masked": len(set(a.masked_sop_uid for a in self.masking_actions)),
-                "instances_skipped": len([d for d in self.decision_log if d.decision_type == "SKIP"]),
-                "failures": len([e for e in self.exceptions if e.severity == "ERROR"])
+                "instances_in": self._counts["source_hashes"],
+                "instances_out": self._counts["masked_hashes"],
+                "detections_total": self._counts["detection_results"],
+                "instances_masked": len(self._masked_uids),
+                "instances_skipped": self._skipped,
+                "failures": self._failures
             },
             "files": file_records,
             "constraints": {
@@ -679,6 +995,14 @@ class EvidenceBundle:
                 "escrow_ref": None
             }
         }
+        if self.codec is not None:
+            manifest["encoding"] = {
+                "name": self.encoding,
+                "codec": self.codec.name,
+                "record_schema_version": RECORD_SCHEMA_VERSION,
+                "compressed_dirs": list(COMPRESSED_DIRS),
+            }
+        return manifest
     
     def _write_bundle_tree(
         self,
@@ -700,7 +1024,7 @@ class EvidenceBundle:
         tree_path.write_text(content)
         
         # Hash the tree
-        tree_hash = hashlib.sha256(content.encode()).hexdigest()
+        tree_hash = hash_bytes(content.encode())["sha256"]
         hash_path = sig_dir / "bundle_tree.sha256"
         hash_path.write_text(f"{tree_hash}  bundle_tree.txt\n")
 
@@ -727,6 +1051,128 @@ def create_empty_bundle(
     return bundle.finalize(output_dir)
 
 
+def _rewrite_complete_lines(path: Path, codec: Codec, extra_lines: List[str]) -> None:
+    """
+    Recompress the complete lines of a compressed record file whose stream
+    was never finished, followed by extra_lines.
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    stream = _RecordStream(tmp_path, codec=codec)
+    try:
+        try:
+            for line in iter_record_lines(path, strict=False):
+                stream.write_line(line)
+        except _DECOMPRESS_ERRORS:
+            pass  # Corrupt tail block: keep what decompressed cleanly
+        for line in extra_lines:
+            stream.write_line(line)
+    finally:
+        stream.close()
+    tmp_path.with_name(tmp_path.name + ".sha256").unlink(missing_ok=True)
+    os.replace(tmp_path, path)
+
+
+def _truncate_partial_line(path: Path) -> None:
+    """Drop bytes after the last newline (a record cut short by a crash)."""
+    size = path.stat().st_size
+    with open(path, "r+b") as f:
+        end = size
+        while end > 0:
+            start = max(0, end - 65536)
+            f.seek(start)
+            block = f.read(end - start)
+            newline = block.rfind(b"\n")
+            if newline >= 0:
+                f.truncate(start + newline + 1)
+                return
+            end = start
+        f.truncate(0)
+
+
+def recover_bundle(bundle_dir: Path) -> Path:
+    """
+    Seal a streaming bundle whose run never reached finalize().
+    
+    Record files are cut back to their last complete record (compressed
+    files are recompressed from their last intact block), re-hashed,
+    and counted; a BUNDLE_RECOVERED warning is appended to exceptions.jsonl;
+    then the index, CONFIG, QA, MANIFEST ("partial": true) and SIGNATURE
+    files are written with verification status "unverifiable". Source and
+    output series metadata and CONFIG details held only in memory by the
+    crashed run are not recoverable.
+    
+    Returns: Path to the bundle directory
+    
+    Raises:
+        ValueError: If bundle_dir is not an unfinished streaming bundle
+    """
+    bundle_dir = Path(bundle_dir)
+    marker = bundle_dir / IN_PROGRESS_FILENAME
+    if not marker.exists():
+        raise ValueError(f"{bundle_dir} is not an unfinished streaming bundle")
+    meta = json.loads(marker.read_text())
+    
+    bundle = EvidenceBundle(
+        processing_run_id=meta.get("processing_run_id"),
+        voxelmask_version=meta.get("voxelmask_version", "0.5.0"),
+        compliance_profile=meta.get("compliance_profile", "FOI"),
+        uid_strategy=meta.get("uid_strategy", "REGENERATE_DETERMINISTIC"),
+        encoding=meta.get("encoding", ENCODING_PLAIN),
+        codec=meta.get("codec")
+    )
+    bundle.processing_start = meta.get("processing_start")
+    
+    streamed = {}
+    for name, (_, fieldnames) in RECORD_FILES.items():
+        rel_path = bundle.record_paths[name]
+        path = bundle_dir / rel_path
+        codec = codec_for_path(path)
+        extra_lines = []
+        if name == "exceptions":
+            extra_lines.append(json.dumps(asdict(ExceptionRecord(
+                timestamp=datetime.now(timezone.utc).isoformat(),
+                exception_type="BUNDLE_RECOVERED",
+                source_sop_uid=None,
+                message="Run ended before the bundle was finalized; sealed as partial",
+                severity="WARNING"
+            )), sort_keys=True) + "\n")
+        
+        if not path.exists() or path.stat().st_size == 0:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            bundle._record_stream(bundle_dir, name).close()  # Empty (CSV: header only)
+        if codec is not None:
+            _rewrite_complete_lines(path, codec, extra_lines)
+        else:
+            _truncate_partial_line(path)
+            with open(path, "ab") as f:
+                for line in extra_lines:
+                    f.write(line.encode("utf-8"))
+        
+        lines = iter_record_lines(path)
+        if fieldnames is not None:
+            count = sum(1 for _ in csv.reader(lines)) - 1
+        else:
+            count = 0
+            for line in lines:
+                record = json.loads(line)
+                count += 1
+                if name == "masking_actions":
+                    bundle._masked_uids.add(record.get("masked_sop_uid"))
+                elif name == "decision_log" and record.get("decision_type") == "SKIP":
+                    bundle._skipped += 1
+                elif name == "exceptions" and record.get("severity") == "ERROR":
+                    bundle._failures += 1
+        bundle._counts[name] = count
+        
+        content_hash = hash_file(str(path))["sha256"]
+        _write_hash_file(path, content_hash)
+        streamed[name] = {"path": path.name, "sha256": content_hash, "bytes": path.stat().st_size}
+    
+    bundle._seal(bundle_dir, streamed, VerificationStatus.UNVERIFIABLE.value)
+    marker.unlink()
+    return bundle_dir
+
+
 if __name__ == "__main__":
     # Demo: create an empty bundle
     import tempfile
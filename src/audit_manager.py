@@ -8,19 +8,22 @@ Features:
 - DICOM header compliance tags
 - Atomic save operations (log + file must both succeed)
 - CSV export for compliance reports
+- Pooled WAL connection and group commits (see audit_sink.py)
 """
 
 import sqlite3
 import uuid
 import os
 from datetime import datetime, timezone
-from typing import Optional, Tuple
+from typing import Iterable, Optional, Tuple
 from contextlib import contextmanager
 
 import pydicom
 from pydicom.sequence import Sequence
 from pydicom.dataset import Dataset
 
+from audit_sink import AsyncAuditWriter, AuditSink
+
 # Optional pandas import for CSV export
 try:
     import pandas as pd
@@ -33,29 +36,45 @@ APP_VERSION = "0.3.0"
 MANUFACTURER = "SAMI_Support_Dev"
 DB_FILENAME = "scrub_history.db"
 
+_INSERT_EVENT_SQL = """
+    INSERT INTO scrub_events (
+        timestamp, operator_id, original_filename, output_filename,
+        scrub_uuid, reason_code, app_version,
+        patient_id_original, patient_name_original,
+        study_date, modality, institution,
+        success, error_message
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
 
 class AuditLogger:
     """
     Manages the local SQLite audit database ("Manager's Log").
     
     Tracks every scrub event for compliance reporting and accountability.
+    Connections come from the process-wide pool in audit_sink; wrap a run
+    in batch() to commit its events together, or pass an AsyncAuditWriter
+    to take the writes off the calling thread.
     """
     
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, writer: Optional[AsyncAuditWriter] = None):
         """
         Initialize the audit logger.
         
         Args:
             db_path: Path to SQLite database. Defaults to scrub_history.db in current directory.
+            writer: Optional background writer; events are then queued to it
+                    and made durable by flush()
         """
         self.db_path = db_path or DB_FILENAME
+        self.writer = writer
+        self._sink = AuditSink(self.db_path, writer=writer)
         self._init_database()
     
     def _init_database(self):
-        """Create the database and tables if they don't exist."""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
+        """Create the database and tables if they don't exist (once per pooled connection)."""
+        self._sink.ensure_schema("scrub_events", [
+            """
                 CREATE TABLE IF NOT EXISTS scrub_events (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     timestamp TEXT NOT NULL,
@@ -73,29 +92,43 @@ class AuditLogger:
                     success INTEGER DEFAULT 1,
                     error_message TEXT
                 )
-            """)
-            
+            """,
             # Create index for faster lookups
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_timestamp ON scrub_events(timestamp)
-            """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_scrub_uuid ON scrub_events(scrub_uuid)
-            """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_operator ON scrub_events(operator_id)
-            """)
-            
-            conn.commit()
+            "CREATE INDEX IF NOT EXISTS idx_timestamp ON scrub_events(timestamp)",
+            "CREATE INDEX IF NOT EXISTS idx_scrub_uuid ON scrub_events(scrub_uuid)",
+            "CREATE INDEX IF NOT EXISTS idx_operator ON scrub_events(operator_id)",
+        ])
     
     @contextmanager
     def _get_connection(self):
-        """Context manager for database connections."""
-        conn = sqlite3.connect(self.db_path)
-        try:
+        """Context manager for the pooled database connection (held under its lock)."""
+        with self._sink.connection() as conn:
             yield conn
-        finally:
-            conn.close()
+    
+    @contextmanager
+    def batch(self):
+        """
+        Group-commit every event logged in the block.
+        
+        Events passed to log_scrub_event() / log_scrub_events() are queued
+        and written with one executemany and one commit when the outermost
+        batch exits (also if the block raises). Use for a whole run.
+        """
+        with self._sink.group():
+            yield self
+    
+    def flush(self) -> int:
+        """
+        Durability barrier: write events queued by batch() and wait for the
+        async writer, if any, to commit everything logged so far.
+        
+        Returns:
+            Number of events flushed from the batch() queue
+            
+        Raises:
+            sqlite3.Error: If queued events could not be written
+        """
+        return self._sink.sync()
     
     def generate_scrub_uuid(self) -> str:
         """Generate a unique UUID4 for a scrub event."""
@@ -140,8 +173,9 @@ class AuditLogger:
         modality: Optional[str] = None,
         institution: Optional[str] = None,
         success: bool = True,
-        error_message: Optional[str] = None
-    ) -> int:
+        error_message: Optional[str] = None,
+        defer: bool = True
+    ) -> Optional[int]:
         """
         Log a scrub event to the database.
         
@@ -158,35 +192,74 @@ class AuditLogger:
             institution: Institution name
             success: Whether the scrub was successful
             error_message: Error message if failed
+            defer: Inside batch() or with an async writer, queue the event.
+                   False writes and commits it now, on this thread
             
         Returns:
-            The row ID of the inserted record
+            The row ID of the inserted record, or None if the event was
+            queued
             
         Raises:
             sqlite3.Error: If database write fails
         """
-        timestamp = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        row = self._event_row(
+            operator_id, original_filename, scrub_uuid, reason_code,
+            output_filename, patient_id_original, patient_name_original,
+            study_date, modality, institution, success, error_message
+        )
+        
+        if defer and (self._sink.grouped or self.writer is not None):
+            self._sink.insert_many(_INSERT_EVENT_SQL, [row])
+            return None
         
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO scrub_events (
-                    timestamp, operator_id, original_filename, output_filename,
-                    scrub_uuid, reason_code, app_version,
-                    patient_id_original, patient_name_original,
-                    study_date, modality, institution,
-                    success, error_message
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                timestamp, operator_id, original_filename, output_filename,
-                scrub_uuid, reason_code, APP_VERSION,
-                patient_id_original, patient_name_original,
-                study_date, modality, institution,
-                1 if success else 0, error_message
-            ))
+            cursor.execute(_INSERT_EVENT_SQL, row)
             conn.commit()
             return cursor.lastrowid
     
+    def log_scrub_events(self, events: Iterable[dict]) -> int:
+        """
+        Log many scrub events with one executemany.
+        
+        Args:
+            events: Dicts of log_scrub_event() keyword arguments
+            
+        Returns:
+            Number of events written (or queued inside batch() or with an
+            async writer)
+            
+        Raises:
+            sqlite3.Error: If database write fails (no event is written)
+        """
+        rows = [self._event_row(**event) for event in events]
+        return self._sink.insert_many(_INSERT_EVENT_SQL, rows)
+    
+    @staticmethod
+    def _event_row(
+        operator_id: str,
+        original_filename: str,
+        scrub_uuid: str,
+        reason_code: str,
+        output_filename: Optional[str] = None,
+        patient_id_original: Optional[str] = None,
+        patient_name_original: Optional[str] = None,
+        study_date: Optional[str] = None,
+        modality: Optional[str] = None,
+        institution: Optional[str] = None,
+        success: bool = True,
+        error_message: Optional[str] = None
+    ) -> tuple:
+        """Build a scrub_events row, timestamped now."""
+        timestamp = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        return (
+            timestamp, operator_id, original_filename, output_filename,
+            scrub_uuid, reason_code, APP_VERSION,
+            patient_id_original, patient_name_original,
+            study_date, modality, institution,
+            1 if success else 0, error_message
+        )
+    
     def get_event_by_uuid(self, scrub_uuid: str) -> Optional[dict]:
         """
         Retrieve a scrub event by its UUID.
@@ -198,8 +271,8 @@ class AuditLogger:
             Dictionary of event data or None if not found
         """
         with self._get_connection() as conn:
-            conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
             cursor.execute(
                 "SELECT * FROM scrub_events WHERE scrub_uuid = ?",
                 (scrub_uuid,)
@@ -223,8 +296,8 @@ class AuditLogger:
             List of event dictionaries
         """
         with self._get_connection() as conn:
-            conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
             cursor.execute("""
                 SELECT * FROM scrub_events 
                 WHERE timestamp >= ? AND timestamp < ?
@@ -403,7 +476,10 @@ class AtomicScrubOperation:
     """
     Ensures atomic save operations - both database log and file save must succeed.
     
-    If either operation fails, neither is committed.
+    If either operation fails, neither is committed. With an async audit
+    writer the log row is queued and the file is saved only after the
+    logger's flush() barrier confirms that logger's rows are committed
+    (other writers' failures on the shared thread are not reported here).
     """
     
     def __init__(self, audit_logger: AuditLogger):
@@ -455,8 +531,9 @@ class AtomicScrubOperation:
         embed_compliance_tags(dataset, operator_id, reason_code, scrub_uuid)
         
         # Step 2: Log to database FIRST (this must succeed)
+        barrier = self.audit_logger.writer is not None
         try:
-            log_id = self.audit_logger.log_scrub_event(
+            self.audit_logger.log_scrub_event(
                 operator_id=operator_id,
                 original_filename=original_filename,
                 scrub_uuid=scrub_uuid,
@@ -467,8 +544,11 @@ class AtomicScrubOperation:
                 study_date=study_date,
                 modality=modality,
                 institution=institution,
-                success=True  # Optimistically set to true
+                success=True,  # Optimistically set to true
+                defer=barrier  # Must be committed before the file is written
             )
+            if barrier:
+                self.audit_logger.flush()
         except sqlite3.Error as e:
             # Database failed - DO NOT save the file
             raise RuntimeError(
@@ -487,8 +567,8 @@ class AtomicScrubOperation:
                     cursor.execute("""
                         UPDATE scrub_events 
                         SET success = 0, error_message = ?
-                        WHERE id = ?
-                    """, (str(e), log_id))
+                        WHERE scrub_uuid = ?
+                    """, (str(e), scrub_uuid))
                     conn.commit()
             except:
                 pass  # Best effort to update log
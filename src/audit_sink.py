@@ -0,0 +1,539 @@
+"""
+Batched Audit Sink
+==================
+
+Shared SQLite plumbing for the audit writers (AuditLogger in
+audit_manager.py and DecisionTraceWriter in decision_trace.py).
+
+Both writers used to open a fresh sqlite3 connection for every call and
+commit every row on its own, so a run that logged N events paid for N
+connections and N fsyncs. This module keeps one pooled connection per
+database file for the whole process, opens it in WAL mode with a tuned
+synchronous level, writes rows with executemany, and lets a run group its
+writes into a single commit.
+
+With an AsyncAuditWriter attached, inserts do not touch the database on
+the caller's thread at all: a dedicated thread drains a bounded queue
+and writes whatever has accumulated in one transaction per database.
+Callers that need their rows on disk (AtomicScrubOperation before it
+saves a file, the app when it finalises a run) wait on flush(), the
+writer's durability barrier. Every submission gets its own ticket (a
+Future), and a sink's barrier waits on and reports only the tickets of
+the rows it submitted, so writers sharing the process-wide thread never
+see each other's failures.
+
+Key components:
+- pooled_connection(): the process-wide connection for a database file
+- AuditSink: per-writer view of the pooled connection with bulk inserts
+  and a group-commit context
+- AsyncAuditWriter: background writer thread with a bounded queue,
+  per-submission tickets and a flush() durability barrier
+- default_async_writer(): the process-wide AsyncAuditWriter
+- resolve_audit_synchronous(): PRAGMA synchronous from argument, environment or default
+- close_pool(): close every pooled connection (shutdown and tests)
+
+Design Principles:
+1. One connection per database file: connections are reopened only when
+   the file is removed or replaced on disk
+2. Short lock holds: grouped rows are queued in memory and flushed in one
+   transaction, so a long run never holds the SQLite write lock
+3. Durable by default: WAL with synchronous=NORMAL survives application
+   crashes; a power loss can drop only the last committed transactions
+4. Audit rows are never dropped: a group flushes on exit even when the
+   run raised, and async writers are drained at interpreter exit
+5. Backpressure, not loss: a full writer queue blocks the producer
+
+Usage:
+    from audit_sink import AuditSink
+
+    sink = AuditSink("scrub_history.db")
+    with sink.group():
+        for rows in per_file_rows:
+            sink.insert_many(INSERT_SQL, rows)   # queued
+    # one transaction committed here
+
+    writer = default_async_writer()
+    sink = AuditSink("scrub_history.db", writer=writer)
+    sink.insert_many(INSERT_SQL, rows)   # returns immediately
+    sink.sync()                          # this sink's rows are committed
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import weakref
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+# Environment override for PRAGMA synchronous
+AUDIT_SYNCHRONOUS_ENV_VAR = "VOXELMASK_AUDIT_SYNCHRONOUS"
+
+DEFAULT_SYNCHRONOUS = "NORMAL"
+_SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+# Queued rows that force a flush inside a group (bounds memory and loss on a crash)
+GROUP_COMMIT_MAX_ROWS = 1000
+
+# Seconds a writer waits for another process's write lock
+BUSY_TIMEOUT_SECONDS = 30
+
+# Submissions an AsyncAuditWriter queue holds before producers block
+AUDIT_QUEUE_MAX_ITEMS = 1024
+
+# (sql, rows) pairs written together in one transaction
+Statements = List[Tuple[str, List[Sequence]]]
+
+
+def resolve_audit_synchronous(level: Optional[str] = None) -> str:
+    """
+    Resolve the PRAGMA synchronous level for audit databases.
+
+    Precedence: explicit argument > VOXELMASK_AUDIT_SYNCHRONOUS >
+    DEFAULT_SYNCHRONOUS. Unknown values fall back to the default.
+    """
+    if level is None:
+        level = os.environ.get(AUDIT_SYNCHRONOUS_ENV_VAR, "")
+    level = str(level).strip().upper()
+    return level if level in _SYNCHRONOUS_LEVELS else DEFAULT_SYNCHRONOUS
+
+
+class PooledConnection:
+    """One process-wide connection to a database file, guarded by a lock."""
+
+    def __init__(self, path: str, synchronous: str):
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA synchronous={synchronous}")
+        self.stamp = _file_stamp(path)  # The WAL pragma has created the file
+        self.schemas = set()  # Schema keys already ensured on this connection
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+_POOL: Dict[str, PooledConnection] = {}
+_POOL_LOCK = threading.Lock()
+
+
+def _file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+def pooled_connection(db_path: str) -> PooledConnection:
+    """
+    Return the pooled connection for a database file, opening it if needed.
+
+    A connection whose file has been removed or replaced since it was
+    opened is closed and reopened, so a new database at the same path is
+    never written through a stale handle.
+    """
+    path = os.path.abspath(db_path)
+    with _POOL_LOCK:
+        pooled = _POOL.get(path)
+        if pooled is not None and pooled.stamp != _file_stamp(path):
+            try:
+                pooled.close()
+            except sqlite3.Error:
+                pass
+            pooled = None
+        if pooled is None:
+            pooled = PooledConnection(path, resolve_audit_synchronous())
+            _POOL[path] = pooled
+        return pooled
+
+
+def close_pool() -> None:
+    """Close and forget every pooled connection."""
+    with _POOL_LOCK:
+        pooled = list(_POOL.values())
+        _POOL.clear()
+    for entry in pooled:
+        try:
+            entry.close()
+        except sqlite3.Error:
+            pass
+
+
+class AuditSink:
+    """
+    A writer's handle on the pooled connection for its database.
+
+    Writes outside group() are committed before the call returns, or
+    handed to the async writer if the sink has one. Inside group(),
+    insert_many() queues rows and the outermost group exit writes them all
+    with executemany in one transaction. Queues are per sink, so
+    concurrent writers sharing a connection never commit each other's
+    rows early or late.
+    """
+
+    def __init__(self, db_path: str, writer: Optional["AsyncAuditWriter"] = None):
+        """
+        Args:
+            db_path: Database file
+            writer: Hand inserts to this background writer instead of
+                    committing them on the calling thread
+        """
+        self.db_path = db_path
+        self.writer = writer
+        self._depth = 0
+        self._pending: Statements = []
+        self._pending_rows = 0
+        self._tickets: List[Future] = []
+        self._state_lock = threading.RLock()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Yield the pooled connection, holding its lock.
+
+        Uncommitted changes are rolled back if the block raises, so a
+        failed statement never rides along with another writer's commit.
+        """
+        with self._locked() as pooled:
+            yield pooled.conn
+
+    @contextmanager
+    def _locked(self) -> Iterator[PooledConnection]:
+        pooled = pooled_connection(self.db_path)
+        with pooled.lock:
+            try:
+                yield pooled
+            except BaseException:
+                pooled.conn.rollback()
+                raise
+
+    def ensure_schema(self, key: str, statements: Iterable[str]) -> None:
+        """Run schema statements once per pooled connection."""
+        with self._locked() as pooled:
+            if key in pooled.schemas:
+                return
+            cursor = pooled.conn.cursor()
+            for statement in statements:
+                cursor.execute(statement)
+            pooled.conn.commit()
+            pooled.schemas.add(key)
+
+    @property
+    def grouped(self) -> bool:
+        """True inside group()."""
+        return self._depth > 0
+
+    @property
+    def pending(self) -> int:
+        """Rows queued for the next group flush."""
+        return self._pending_rows
+
+    def insert(self, sql: str, row: Sequence) -> int:
+        """Write one row now (even inside a group) and return its rowid."""
+        with self.connection() as conn:
+            cursor = conn.execute(sql, row)
+            conn.commit()
+            return cursor.lastrowid
+
+    def insert_many(self, sql: str, rows: Iterable[Sequence]) -> int:
+        """
+        Write rows with executemany.
+
+        Outside a group the rows are committed before returning (or
+        submitted to the async writer); inside one they are queued until
+        the group exits or GROUP_COMMIT_MAX_ROWS rows are pending.
+
+        Returns:
+            Number of rows written or queued
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+        with self._state_lock:
+            if self._depth > 0:
+                if self._pending and self._pending[-1][0] == sql:
+                    self._pending[-1][1].extend(rows)
+                else:
+                    self._pending.append((sql, rows))
+                self._pending_rows += len(rows)
+                if self._pending_rows >= GROUP_COMMIT_MAX_ROWS:
+                    self.flush()
+                return len(rows)
+        self._write([(sql, rows)])
+        return len(rows)
+
+    def _write(self, statements: Statements) -> None:
+        if self.writer is not None:
+            ticket = self.writer.submit(self.db_path, statements)
+            with self._state_lock:
+                # Keep failed and unfinished tickets for sync(); drop the rest
+                self._tickets = [t for t in self._tickets if not t.done() or t.exception() is not None]
+                self._tickets.append(ticket)
+            return
+        with self.connection() as conn:
+            for sql, rows in statements:
+                conn.executemany(sql, rows)
+            conn.commit()
+
+    def flush(self) -> int:
+        """
+        Write every queued row in one transaction (submitted as one unit
+        to the async writer, if any).
+
+        Returns:
+            Number of rows written
+
+        Raises:
+            sqlite3.Error: On database failure (the queue is kept for a retry)
+        """
+        with self._state_lock:
+            if not self._pending:
+                return 0
+            self._write(self._pending)
+            written = self._pending_rows
+            self._pending = []
+            self._pending_rows = 0
+            return written
+
+    @contextmanager
+    def group(self) -> Iterator["AuditSink"]:
+        """
+        Group this sink's writes into one commit.
+
+        Re-entrant: nested groups flush with the outermost one. The queue
+        is flushed on exit even if the block raised, since the rows record
+        what already happened; the block's exception is then re-raised
+        unchanged, and a flush failure is logged (and added as a note on
+        Python 3.11+) rather than replacing it.
+        """
+        with self._state_lock:
+            self._depth += 1
+        try:
+            yield self
+        except BaseException as error:
+            try:
+                self._exit_group()
+            except Exception as flush_error:
+                print(f"[AUDIT] Warning: grouped audit rows not written: {flush_error}")
+                if hasattr(error, "add_note"):  # Python 3.11+
+                    error.add_note(f"Audit group flush also failed: {flush_error!r}")
+            raise
+        else:
+            self._exit_group()
+
+    def _exit_group(self) -> None:
+        with self._state_lock:
+            self._depth -= 1
+            if self._depth == 0:
+                self.flush()
+
+    def sync(self) -> int:
+        """
+        Durability barrier: flush the group queue and wait for the async
+        writer, so every row given to this sink so far is committed.
+
+        Only this sink's submissions are waited on and reported; failures
+        of other sinks sharing the writer are theirs to report.
+
+        Returns:
+            Number of rows flushed from the group queue
+
+        Raises:
+            sqlite3.Error: If the async writer failed to write this sink's rows
+        """
+        written = self.flush()
+        if self.writer is not None:
+            with self._state_lock:
+                tickets, self._tickets = self._tickets, []
+            self.writer.flush(tickets)
+        return written
+
+
+class _Barrier:
+    """Queue marker released once everything queued before it is written."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+class AsyncAuditWriter:
+    """
+    Background thread that writes audit rows handed over by AuditSinks.
+
+    submit() puts a unit of (sql, rows) statements on a bounded queue and
+    returns its ticket, a Future resolved with the unit's row count once
+    committed; it blocks only while the queue is full. The thread takes
+    everything that has accumulated (up to GROUP_COMMIT_MAX_ROWS rows) and
+    writes it with executemany in one transaction per database. If that
+    transaction fails, each unit is retried in its own transaction so one
+    bad unit cannot take other producers' rows down with it; a unit that
+    still fails carries the error on its own ticket.
+    """
+
+    def __init__(self, max_queue: int = AUDIT_QUEUE_MAX_ITEMS, name: str = "audit-writer"):
+        """
+        Args:
+            max_queue: Submissions held before submit() blocks
+            name: Writer thread name
+        """
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._rows_written = 0
+        self._transactions = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        _WRITERS.add(self)
+
+    def submit(self, db_path: str, statements: Statements) -> Future:
+        """
+        Queue statements to be written together in one transaction.
+
+        Returns:
+            Ticket resolved with the row count, or with the sqlite3.Error
+            that kept the unit from being committed
+
+        Raises:
+            RuntimeError: If the writer has been closed
+        """
+        if self._closed:
+            raise RuntimeError("AsyncAuditWriter is closed")
+        ticket: Future = Future()
+        self._queue.put((db_path, [(sql, list(rows)) for sql, rows in statements], ticket))
+        return ticket
+
+    def flush(self, tickets: Optional[Iterable[Future]] = None, timeout: Optional[float] = None) -> None:
+        """
+        Durability barrier.
+
+        With tickets, wait for those submissions and raise the first of
+        their failures. Without, return once everything submitted before
+        the call has been attempted; failures stay on their tickets.
+
+        Raises:
+            sqlite3.Error: The first failure among the given tickets
+            TimeoutError: If the submissions were not written within timeout
+        """
+        if tickets is None:
+            if self._thread.is_alive():
+                barrier = _Barrier()
+                self._queue.put(barrier)
+                if not barrier.done.wait(timeout):
+                    raise TimeoutError("audit writer did not reach the flush barrier")
+            return
+        errors = []
+        for ticket in tickets:
+            try:
+                ticket.result(timeout)
+            except FutureTimeoutError:
+                raise TimeoutError("audit writer did not write the submitted rows in time")
+            except sqlite3.Error as e:
+                errors.append(e)
+        if errors:
+            raise errors[0]
+
+    def close(self) -> None:
+        """Write everything still queued and stop the thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for logging (no PHI)."""
+        return {
+            "queued": self._queue.qsize(),
+            "rows_written": self._rows_written,
+            "transactions": self._transactions,
+        }
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            rows = 0
+            while item is not _STOP and not isinstance(item, _Barrier) and rows < GROUP_COMMIT_MAX_ROWS:
+                rows += sum(len(r) for _, r in item[1])
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            units = [entry for entry in batch if entry is not _STOP and not isinstance(entry, _Barrier)]
+            self._write_units(units)
+            for entry in batch:
+                if isinstance(entry, _Barrier):
+                    entry.done.set()
+            if batch[-1] is _STOP:
+                return
+
+    def _write_units(self, units: List[Tuple[str, Statements, Future]]) -> None:
+        by_path: Dict[str, List[Tuple[Statements, Future]]] = {}
+        for db_path, statements, ticket in units:
+            by_path.setdefault(db_path, []).append((statements, ticket))
+
+        for db_path, path_units in by_path.items():
+            try:
+                self._commit(db_path, [s for unit, _ in path_units for s in unit])
+            except Exception:
+                for unit, ticket in path_units:
+                    try:
+                        self._commit(db_path, unit)
+                    except Exception as e:  # Never let the thread die with barriers pending
+                        print(f"[AUDIT] Warning: async audit write failed: {e}")
+                        if not isinstance(e, sqlite3.Error):
+                            e = sqlite3.DatabaseError(str(e))
+                        ticket.set_exception(e)
+                    else:
+                        ticket.set_result(sum(len(rows) for _, rows in unit))
+            else:
+                for unit, ticket in path_units:
+                    ticket.set_result(sum(len(rows) for _, rows in unit))
+
+    def _commit(self, db_path: str, statements: Statements) -> None:
+        pooled = pooled_connection(db_path)
+        with pooled.lock:
+            try:
+                for sql, rows in statements:
+                    pooled.conn.executemany(sql, rows)
+                pooled.conn.commit()
+            except Exception:
+                pooled.conn.rollback()
+                raise
+        self._rows_written += sum(len(rows) for _, rows in statements)
+        self._transactions += 1
+
+
+_WRITERS: "weakref.WeakSet[AsyncAuditWriter]" = weakref.WeakSet()
+_DEFAULT_WRITER: Optional[AsyncAuditWriter] = None
+_DEFAULT_WRITER_LOCK = threading.Lock()
+
+
+def default_async_writer() -> AsyncAuditWriter:
+    """Return the process-wide AsyncAuditWriter, starting it on first use."""
+    global _DEFAULT_WRITER
+    with _DEFAULT_WRITER_LOCK:
+        if _DEFAULT_WRITER is None or _DEFAULT_WRITER._closed:
+            _DEFAULT_WRITER = AsyncAuditWriter()
+        return _DEFAULT_WRITER
+
+
+@atexit.register
+def _drain_writers() -> None:
+    for writer in list(_WRITERS):
+        try:
+            writer.close()
+        except Exception as e:
+            print(f"[AUDIT] Warning: could not drain audit writer: {e}")
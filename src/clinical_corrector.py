@@ -25,25 +25,42 @@ import os
 from typing import Optional, Tuple, List, Dict
 
 
+def create_ocr_engine() -> PaddleOCR:
+    """
+    Build a PaddleOCR engine with VoxelMask's detection settings.
+
+    CPU-only mode for Steam Deck compatibility, English language model.
+    This is the expensive step (model load); prefer borrowing a warmed
+    engine from ocr_pool.get_ocr_pool() over calling this per file.
+    """
+    # Force CPU mode for efficiency on Steam Deck (Arch Linux)
+    # Newer PaddleOCR versions use different parameter names
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""  # Force CPU by hiding GPUs
+
+    # Initialize with aggressive detection settings for medical images
+    # det_db_thresh=0.1 means "even 10% confidence counts as text"
+    return PaddleOCR(lang='en', det_db_thresh=0.1)
+
+
 class ClinicalCorrector:
     """
     A class for de-identifying medical ultrasound videos by detecting
     and replacing burned-in patient information with new text overlays.
     """
 
-    def __init__(self):
+    def __init__(self, ocr_engine=None, load_ocr: bool = True):
         """
-        Initialize PaddleOCR with CPU-only mode for Steam Deck compatibility.
-        Uses English language model for medical text detection.
+        Initialize the corrector and its OCR engine.
+
+        Args:
+            ocr_engine: Optional pre-warmed OCR engine (e.g. borrowed from
+                        ocr_pool.OCREnginePool). Used as-is when provided.
+            load_ocr: If False and no engine is given, skip loading OCR
+                      entirely (overlay-only use; self.ocr is None).
         """
-        # Force CPU mode for efficiency on Steam Deck (Arch Linux)
-        # Newer PaddleOCR versions use different parameter names
-        import os
-        os.environ["CUDA_VISIBLE_DEVICES"] = ""  # Force CPU by hiding GPUs
-        
-        # Initialize with aggressive detection settings for medical images
-        # det_db_thresh=0.1 means "even 10% confidence counts as text"
-        self.ocr = PaddleOCR(lang='en', det_db_thresh=0.1)
+        if ocr_engine is None and load_ocr:
+            ocr_engine = create_ocr_engine()
+        self.ocr = ocr_engine
 
     def detect_static_text(self, video_path: str) -> Optional[Tuple[int, int, int, int]]:
         """
@@ -10,6 +10,7 @@ Features:
 - Enumerated reason codes (no heuristic/AI judgement claims)
 - Immutable decision records
 - SQLite storage with foreign key to scrub_events
+- Bulk inserts over the pooled audit connection (see audit_sink.py)
 - PHI-free logging (reasons, not values)
 
 Author: VoxelMask Engineering
@@ -22,6 +23,8 @@ from datetime import datetime, timezone
 import sqlite3
 from contextlib import contextmanager
 
+from audit_sink import AsyncAuditWriter, AuditSink
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # ENUMERATIONS
@@ -325,6 +328,9 @@ class DecisionTraceWriter:
     
     Ensures atomicity with parent scrub_events record.
     Records are append-only and immutable after commit.
+    Each commit() is one executemany; wrap a run in batch() to write every
+    collector's records in a single transaction, or pass an
+    AsyncAuditWriter and call flush() when the run is finalised.
     """
     
     # SQL for table creation
@@ -360,33 +366,60 @@ class DecisionTraceWriter:
         "CREATE INDEX IF NOT EXISTS idx_dt_action_type ON decision_trace(action_type)",
     ]
     
-    def __init__(self, db_path: str):
+    INSERT_SQL = """
+        INSERT INTO decision_trace (
+            scrub_uuid, scope_level, scope_uid,
+            region_x, region_y, region_w, region_h,
+            action_type, target_type, target_name,
+            reason_code, rule_source,
+            checksum_before, checksum_after, timestamp
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
+    def __init__(self, db_path: str, writer: Optional[AsyncAuditWriter] = None):
         """
         Initialize the decision trace writer.
         
         Args:
             db_path: Path to SQLite database
+            writer: Optional background writer; commit() then queues the
+                    records and flush() makes them durable
         """
         self.db_path = db_path
+        self.writer = writer
+        self._sink = AuditSink(db_path, writer=writer)
         self._ensure_table()
     
     @contextmanager
     def _get_connection(self):
-        """Context manager for database connections."""
-        conn = sqlite3.connect(self.db_path)
-        try:
+        """Context manager for the pooled database connection (held under its lock)."""
+        with self._sink.connection() as conn:
             yield conn
-        finally:
-            conn.close()
     
     def _ensure_table(self) -> None:
-        """Create decision_trace table if not exists."""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(self.CREATE_TABLE_SQL)
-            for index_sql in self.CREATE_INDEX_SQL:
-                cursor.execute(index_sql)
-            conn.commit()
+        """Create decision_trace table if not exists (once per pooled connection)."""
+        self._sink.ensure_schema("decision_trace", [self.CREATE_TABLE_SQL] + self.CREATE_INDEX_SQL)
+    
+    @contextmanager
+    def batch(self):
+        """
+        Group-commit every commit() in the block into one transaction.
+        
+        Records are queued and written when the outermost batch exits
+        (also if the block raises).
+        """
+        with self._sink.group():
+            yield self
+    
+    def flush(self) -> None:
+        """
+        Durability barrier: return once every record committed through this
+        writer so far is on disk (waits for the async writer, if any).
+        
+        Raises:
+            sqlite3.Error: If queued records could not be written
+        """
+        self._sink.sync()
     
     def commit(
         self,
@@ -401,7 +434,8 @@ class DecisionTraceWriter:
             collector: DecisionTraceCollector with buffered decisions
             
         Returns:
-            Number of records inserted
+            Number of records inserted (queued inside batch() or with an
+            async writer)
             
         Raises:
             sqlite3.Error: On database failure
@@ -412,26 +446,16 @@ class DecisionTraceWriter:
         if not decisions:
             return 0
         
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            for d in decisions:
-                cursor.execute("""
-                    INSERT INTO decision_trace (
-                        scrub_uuid, scope_level, scope_uid,
-                        region_x, region_y, region_w, region_h,
-                        action_type, target_type, target_name,
-                        reason_code, rule_source,
-                        checksum_before, checksum_after, timestamp
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    scrub_uuid, d.scope_level, d.scope_uid,
-                    d.region_x, d.region_y, d.region_w, d.region_h,
-                    d.action_type, d.target_type, d.target_name,
-                    d.reason_code, d.rule_source,
-                    d.checksum_before, d.checksum_after, d.timestamp
-                ))
-            conn.commit()
-        
+        return self._sink.insert_many(self.INSERT_SQL, (
+            (
+                scrub_uuid, d.scope_level, d.scope_uid,
+                d.region_x, d.region_y, d.region_w, d.region_h,
+                d.action_type, d.target_type, d.target_name,
+                d.reason_code, d.rule_source,
+                d.checksum_before, d.checksum_after, d.timestamp
+            )
+            for d in decisions
+        ))
         return len(decisions)
     
     def get_decisions_for_scrub(self, scrub_uuid: str) -> List[dict]:
@@ -445,8 +469,8 @@ class DecisionTraceWriter:
             List of decision dictionaries
         """
         with self._get_connection() as conn:
-            conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
             cursor.execute(
                 "SELECT * FROM decision_trace WHERE scrub_uuid = ? ORDER BY id",
                 (scrub_uuid,)
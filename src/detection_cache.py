@@ -0,0 +1,245 @@
+"""
+Persistent Detection Cache
+==========================
+
+The same study is often processed several times (preview, export, then a
+re-export under another profile), and every pass used to re-run OCR from
+scratch. This cache stores detection results on disk so a repeat pass over
+identical pixels skips OCR entirely.
+
+Entries are keyed by everything that determines the OCR output:
+- source pixel SHA-256 (the Model B source hash)
+- sampled frame indices
+- preprocessing parameters
+- OCR engine name/version and settings
+
+Entries hold geometry only: boxes, confidence scores, zones and
+detection strength. Recovered text is never stored, so an entry carries
+no more PHI than the evidence bundle's detection_results.jsonl.
+
+Key components:
+- detection_cache_key(): canonical cache key
+- ocr_engine_version(): installed OCR engine version for keys
+- DetectionCache: size-bounded LRU store of JSON entries
+- DetectionCacheStats: hit/miss counters for the evidence bundle
+
+Design Principles:
+1. Correctness first: any change to pixels, sampling, preprocessing or
+   engine produces a different key; OCR failures are never cached
+2. Bounded: least recently used entries are evicted past max_bytes
+3. Crash-safe: entries are written atomically; unreadable entries are
+   treated as misses and removed
+
+Usage:
+    from detection_cache import DetectionCache, detection_cache_key
+
+    cache = DetectionCache(build_cache_dir(DOWNLOADS_ROOT, "detection"))
+    key = detection_cache_key(pixel_hash, indices, params, ocr_engine_version())
+    payload = cache.get(key)
+    if payload is None:
+        payload = run_ocr(...)
+        cache.put(key, payload)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from dataclasses import asdict, dataclass
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Union
+
+
+# Bump when the entry layout or detection semantics change
+DETECTION_CACHE_VERSION = 1
+
+# Entries are a few hundred bytes; 32 MB holds ~100k detections
+DEFAULT_MAX_CACHE_BYTES = 32 * 1024 * 1024
+
+_ENTRY_SUFFIX = ".json"
+
+
+def ocr_engine_version(engine: str = "paddleocr") -> str:
+    """Installed version of the OCR engine distribution, or 'unavailable'."""
+    try:
+        return f"{engine}=={metadata.version(engine)}"
+    except metadata.PackageNotFoundError:
+        return f"{engine}==unavailable"
+
+
+def detection_cache_key(
+    pixel_sha256: str,
+    sample_indices: Sequence[int],
+    preprocess_params: Dict[str, Any],
+    engine_version: str,
+) -> str:
+    """
+    Build the cache key for one detection run.
+
+    Args:
+        pixel_sha256: Source pixel hash (hex, optionally "sha256:" prefixed)
+        sample_indices: Frame indices that were OCR'd
+        preprocess_params: Preprocessing/engine settings (JSON-serialisable)
+        engine_version: e.g. ocr_engine_version()
+
+    Returns:
+        Hex SHA-256 of the canonical key material
+    """
+    material = json.dumps(
+        {
+            "version": DETECTION_CACHE_VERSION,
+            "pixel_sha256": pixel_sha256.split(":", 1)[-1],
+            "sample_indices": [int(i) for i in sample_indices],
+            "preprocess": preprocess_params,
+            "engine": engine_version,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class DetectionCacheStats:
+    """Cache counters for logging and the evidence bundle (no PHI)."""
+    hits: int
+    misses: int
+    stores: int
+    evictions: int
+    entries: int
+    bytes: int
+    max_bytes: int
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class DetectionCache:
+    """
+    On-disk LRU cache of detection payloads, one JSON file per key.
+
+    Recency is the entry file's modification time, refreshed on every hit,
+    so it survives restarts and is shared by processes using the same
+    directory. Counters are per instance.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], max_bytes: int = DEFAULT_MAX_CACHE_BYTES):
+        """
+        Args:
+            cache_dir: Directory for entries (created if missing)
+            max_bytes: Total entry size above which LRU entries are evicted
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+        self._bytes = sum(size for _, size, _ in self._entries())
+
+    def _path(self, key: str) -> Path:
+        if len(key) != 64 or not all(c in "0123456789abcdef" for c in key):
+            raise ValueError(f"Invalid detection cache key: {key!r}")
+        return self.cache_dir / f"{key}{_ENTRY_SUFFIX}"
+
+    def _entries(self) -> list:
+        """(mtime, size, path) for every entry, oldest first."""
+        entries = []
+        for path in self.cache_dir.glob(f"*{_ENTRY_SUFFIX}"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue  # Evicted by another process
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+        return entries
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached payload for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                entry = json.load(fh)
+            if entry.get("key") != key:
+                raise ValueError("key mismatch")
+            payload = entry["payload"]
+        except FileNotFoundError:
+            payload = None
+        except (OSError, ValueError, KeyError, TypeError):
+            # Corrupt or foreign entry: drop it and treat as a miss
+            payload = None
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        with self._lock:
+            if payload is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        return payload
+
+    def put(self, key: str, payload: Dict[str, Any]) -> None:
+        """Store a payload atomically; evicts once the size estimate passes max_bytes."""
+        path = self._path(key)
+        data = json.dumps({"key": key, "payload": payload}, sort_keys=True)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, prefix=".tmp-", suffix=".part")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        with self._lock:
+            self._stores += 1
+            self._bytes += len(data)
+            over_budget = self._bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def evict(self) -> int:
+        """Remove least recently used entries until within max_bytes."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                pass
+            total -= size
+        with self._lock:
+            self._evictions += removed
+            self._bytes = total
+        return removed
+
+    def stats(self) -> DetectionCacheStats:
+        """Return a snapshot of counters and current cache size."""
+        entries = self._entries()
+        with self._lock:
+            return DetectionCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                stores=self._stores,
+                evictions=self._evictions,
+                entries=len(entries),
+                bytes=sum(size for _, size, _ in entries),
+                max_bytes=self.max_bytes,
+            )
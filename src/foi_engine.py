@@ -13,7 +13,6 @@ Author: VoxelMask Team
 """
 
 import os
-import hashlib
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
@@ -21,6 +20,8 @@ from dataclasses import dataclass, field
 import pydicom
 from pydicom.dataset import Dataset
 
+from pixel_invariant import pixel_sha256
+
 
 @dataclass
 class FOIProcessingResult:
@@ -151,7 +152,7 @@ class FOIEngine:
             
             # Calculate original hash
             if hasattr(dataset, 'PixelData') and dataset.PixelData:
-                original_hash = hashlib.sha256(dataset.PixelData).hexdigest()
+                original_hash = pixel_sha256(dataset)
             else:
                 original_hash = "NO_PIXEL_DATA"
             
@@ -173,7 +174,7 @@ class FOIEngine:
             
             # Calculate processed hash
             if hasattr(dataset, 'PixelData') and dataset.PixelData:
-                processed_hash = hashlib.sha256(dataset.PixelData).hexdigest()
+                processed_hash = pixel_sha256(dataset)
             else:
                 processed_hash = "NO_PIXEL_DATA"
             
@@ -0,0 +1,236 @@
+"""
+Persistent Header Cache
+=======================
+
+Operators often upload the same study several times (FOI legal, then
+research, then a re-export), and every upload used to parse every header
+again. This cache keeps each file's HeaderRecord in SQLite, keyed by the
+file's content SHA-256, so a re-upload fills the header index without
+parsing: classification, preflight findings and viewer ordering are all
+derived from the record.
+
+Entries expire a fixed time after they were stored (TTL) and are purged
+on open and as new entries are written.
+
+PHI-free mode (the default, since the cache lives in the shared cache
+directory beside the runs) stores only non-identifying fields: modality,
+SOP Class, series/instance numbers, geometry, pixel format and transfer
+syntax. UIDs, series description and acquisition time are not stored; on
+a hit the header index reads back just those few tags. Entries stored
+with identifying fields while PHI-free mode was off are misses in
+PHI-free mode and are deleted (on lookup and on open).
+
+Key components:
+- HeaderCache: SQLite store of HeaderRecords by content hash
+- resolve_header_cache_ttl(): TTL from argument, environment or default
+- resolve_header_cache_phi_free(): PHI-free flag from argument, environment or default
+
+Design Principles:
+1. Content-addressed: identical bytes always map to the same record
+2. PHI-free by default: identifying fields are stored only when opted in
+3. Best-effort: unreadable or foreign entries are misses, never errors
+
+Usage:
+    from header_cache import HeaderCache
+
+    cache = HeaderCache(build_cache_dir(DOWNLOADS_ROOT, "headers") / "headers.db")
+    index = HeaderIndex(cache=cache)
+    records = index.build(paths, digests=digests)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, fields
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from voxelmask_core.header_index import HeaderRecord, strip_identifying
+
+
+# Bump when HeaderRecord fields or their meaning change; older entries are misses
+HEADER_CACHE_VERSION = 1
+
+# Environment overrides
+HEADER_CACHE_TTL_ENV_VAR = "VOXELMASK_HEADER_CACHE_TTL_DAYS"
+HEADER_CACHE_PHI_FREE_ENV_VAR = "VOXELMASK_HEADER_CACHE_PHI_FREE"
+
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+
+# Writes between purges of expired entries
+_PURGE_EVERY = 256
+
+_RECORD_FIELDS = {f.name for f in fields(HeaderRecord)}
+
+
+def resolve_header_cache_ttl(ttl_seconds: Optional[float] = None) -> float:
+    """
+    Resolve the entry TTL in seconds.
+
+    Precedence: explicit argument > VOXELMASK_HEADER_CACHE_TTL_DAYS >
+    DEFAULT_TTL_SECONDS. Invalid or non-positive values fall back to the
+    default.
+    """
+    if ttl_seconds is None:
+        raw = os.environ.get(HEADER_CACHE_TTL_ENV_VAR, "")
+        try:
+            ttl_seconds = float(raw) * 24 * 3600 if raw.strip() else DEFAULT_TTL_SECONDS
+        except ValueError:
+            ttl_seconds = DEFAULT_TTL_SECONDS
+    return ttl_seconds if ttl_seconds > 0 else DEFAULT_TTL_SECONDS
+
+
+def resolve_header_cache_phi_free(phi_free: Optional[bool] = None) -> bool:
+    """
+    Resolve PHI-free mode.
+
+    Precedence: explicit argument > VOXELMASK_HEADER_CACHE_PHI_FREE
+    ("0", "false", "no" or "off" disable it) > enabled.
+    """
+    if phi_free is None:
+        raw = os.environ.get(HEADER_CACHE_PHI_FREE_ENV_VAR, "").strip().lower()
+        phi_free = raw not in ("0", "false", "no", "off")
+    return bool(phi_free)
+
+
+class HeaderCache:
+    """
+    HeaderRecords by file content SHA-256, in one SQLite database.
+
+    Satisfies the cache interface of voxelmask_core.HeaderIndex. One
+    connection is shared by the instance's threads; other processes using
+    the same file are serialised by SQLite. Counters are per instance.
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        ttl_seconds: Optional[float] = None,
+        phi_free: Optional[bool] = None,
+    ):
+        """
+        Args:
+            db_path: Database file (parent directory created if missing)
+            ttl_seconds: Entry lifetime (None = resolve_header_cache_ttl())
+            phi_free: Store only non-identifying fields (None = resolve_header_cache_phi_free())
+
+        Raises:
+            sqlite3.Error: If the database cannot be opened
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = resolve_header_cache_ttl(ttl_seconds)
+        self.phi_free = resolve_header_cache_phi_free(phi_free)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS header_records (
+                content_sha256 TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                phi_free INTEGER NOT NULL,
+                record TEXT NOT NULL,
+                stored_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_header_records_stored_at ON header_records(stored_at)
+        """)
+        self._conn.commit()
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._expired = 0
+        self._writes_since_purge = 0
+        self.purge_expired()
+
+    def get(self, sha256: str) -> Optional[Tuple[HeaderRecord, bool]]:
+        """
+        Look up a file's record.
+
+        Returns:
+            (record, phi_free) on a hit, where phi_free means the identifying
+            fields are empty; None on a miss or expired entry. In PHI-free
+            mode an entry with identifying fields is deleted and is a miss
+        """
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, phi_free, record, stored_at FROM header_records WHERE content_sha256 = ?",
+                (sha256,),
+            ).fetchone()
+            result = None
+            if row is not None and self.phi_free and not row[1]:
+                self._conn.execute("DELETE FROM header_records WHERE content_sha256 = ?", (sha256,))
+                self._conn.commit()
+                row = None
+            if row is not None and row[0] == HEADER_CACHE_VERSION and row[3] >= cutoff:
+                try:
+                    data = json.loads(row[2])
+                    if set(data) != _RECORD_FIELDS:
+                        raise ValueError("field mismatch")
+                    result = (HeaderRecord(**data), bool(row[1]))
+                except (ValueError, TypeError):
+                    result = None  # Corrupt or foreign entry: treated as a miss
+            if result is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return result
+
+    def put(self, sha256: str, record: HeaderRecord) -> None:
+        """Store (or refresh) a file's record; error records are not stored."""
+        if not record.ok:
+            return
+        stored = strip_identifying(record) if self.phi_free else record
+        stored = asdict(stored)
+        stored["path"] = ""  # Paths are per run
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO header_records (content_sha256, version, phi_free, record, stored_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (sha256, HEADER_CACHE_VERSION, int(self.phi_free), json.dumps(stored, sort_keys=True), time.time()),
+            )
+            self._conn.commit()
+            self._stores += 1
+            self._writes_since_purge += 1
+            purge = self._writes_since_purge >= _PURGE_EVERY
+        if purge:
+            self.purge_expired()
+
+    def purge_expired(self) -> int:
+        """
+        Delete entries older than the TTL, from other cache versions and,
+        in PHI-free mode, entries holding identifying fields.
+        """
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM header_records WHERE stored_at < ? OR version != ? OR (phi_free = 0 AND ?)",
+                (cutoff, HEADER_CACHE_VERSION, int(self.phi_free)),
+            )
+            self._conn.commit()
+            self._expired += cursor.rowcount
+            self._writes_since_purge = 0
+            return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """Counters and entry count for logging (no PHI)."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM header_records").fetchone()[0]
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "stores": self._stores,
+                "expired": self._expired,
+                "entries": entries,
+                "phi_free": int(self.phi_free),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,360 @@
+"""
+Header Rewrite Engine (Metadata-Only Fast Path)
+===============================================
+
+UID-only correction and research de-identification of pixel-clean
+modalities (CT, MR, ...) never change a pixel, yet they used to read the
+whole file with pydicom (loading PixelData), hash the pixel bytes several
+times and write every byte back out through pydicom.
+
+This engine parses only the header, up to the (7FE0,0010) PixelData
+element, lets the caller rewrite it, writes the new header, and then
+stream-copies the PixelData element's raw bytes from input to output by
+file offset. The pixel invariant is checked with streaming SHA-256: the
+input value bytes are hashed as they are copied, and the output's pixel
+element is located and hashed again from disk before the result is
+returned.
+
+Key components:
+- rewrite_header(): header-only read -> rewrite -> header write + pixel copy
+- rewrite_header_in_place(): the same onto one file, replaced atomically
+- locate_pixel_element(): byte span of the PixelData element in a file
+- HeaderRewriteResult: rewritten header, pixel invariant result, byte counts
+- HeaderRewriteUnsupported: file layout the fast path does not handle;
+  callers fall back to a full read
+
+Design Principles:
+1. Zero-decode: PixelData is never parsed, decoded or held in memory whole
+2. Byte-exact: the pixel element (tag, VR, length, value, delimiters) is
+   copied verbatim; the transfer syntax must not change
+3. Conservative: anything unusual (deflated syntax, elements after
+   PixelData, truncated items) raises HeaderRewriteUnsupported before
+   the output is touched
+
+Usage:
+    from header_rewrite import HeaderRewriteUnsupported, rewrite_header
+
+    try:
+        result = rewrite_header(input_path, output_path, lambda ds: anonymize(ds))
+    except HeaderRewriteUnsupported:
+        ...  # full pydicom read/write
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Optional, Tuple
+
+import pydicom
+from pydicom.dataset import Dataset
+
+from pixel_invariant import PixelInvariantResult, enforce_streamed_passthrough_invariant
+
+
+# Bytes per read/write while copying the pixel element
+COPY_CHUNK_SIZE = 4 * 1024 * 1024
+
+PIXEL_DATA_TAG = (0x7FE0, 0x0010)
+_ITEM_TAG = (0xFFFE, 0xE000)
+_SEQUENCE_DELIMITER_TAG = (0xFFFE, 0xE0DD)
+_UNDEFINED_LENGTH = 0xFFFFFFFF
+
+# Explicit VRs PixelData may be encoded with (all use a 4-byte length)
+_PIXEL_VRS = {b"OB", b"OW", b"UN"}
+
+# pydicom 3 replaced dcmwrite(write_like_original=) and the dataset's
+# is_implicit_VR/is_little_endian with enforce_file_format= and original_encoding
+_PYDICOM_3 = int(pydicom.__version__.split(".")[0]) >= 3
+
+
+class HeaderRewriteUnsupported(ValueError):
+    """The file cannot take the metadata-only fast path; use a full read."""
+
+
+@dataclass(frozen=True)
+class PixelElementSpan:
+    """
+    Location of the PixelData element in a file.
+
+    Attributes:
+        element_offset: Offset of the element's tag
+        value_offset: Offset of the element's value
+        value_length: Length of the value as pydicom reads it (for
+                      encapsulated data: all items, without the delimiter)
+        end_offset: Offset just past the element (past the delimiter)
+    """
+    element_offset: int
+    value_offset: int
+    value_length: int
+    end_offset: int
+
+    @property
+    def element_length(self) -> int:
+        return self.end_offset - self.element_offset
+
+
+@dataclass
+class HeaderRewriteResult:
+    """Outcome of a metadata-only rewrite."""
+    dataset: Dataset  # Rewritten header (no PixelData element)
+    pixel_invariant: PixelInvariantResult
+    header_bytes: int
+    pixel_bytes: int  # Bytes of the PixelData element copied verbatim
+
+
+def _encoding(ds: Dataset) -> Tuple[bool, bool]:
+    """(is_implicit_vr, is_little_endian) the dataset was read with."""
+    tsuid = getattr(getattr(ds, "file_meta", None), "TransferSyntaxUID", None)
+    if tsuid is not None and tsuid.is_transfer_syntax:
+        if tsuid.is_deflated:
+            raise HeaderRewriteUnsupported("Deflated transfer syntax")
+        return tsuid.is_implicit_VR, tsuid.is_little_endian
+    if _PYDICOM_3:
+        implicit_vr, little_endian = ds.original_encoding
+    else:
+        implicit_vr, little_endian = ds.is_implicit_VR, ds.is_little_endian
+    if implicit_vr is None or little_endian is None:
+        raise HeaderRewriteUnsupported("Unknown dataset encoding")
+    return implicit_vr, little_endian
+
+
+def _write_header(fp: BinaryIO, ds: Dataset) -> None:
+    """Write the header as read: same preamble/meta presence and encoding."""
+    try:
+        if _PYDICOM_3:
+            pydicom.dcmwrite(fp, ds, enforce_file_format=False)
+        else:
+            pydicom.dcmwrite(fp, ds, write_like_original=True)
+    except (TypeError, AttributeError) as e:
+        raise HeaderRewriteUnsupported(f"Header cannot be written as read: {e}") from e
+
+
+def locate_pixel_element(fp: BinaryIO, offset: int, implicit_vr: bool, little_endian: bool) -> Optional[PixelElementSpan]:
+    """
+    Parse the PixelData element header at offset and find its extent.
+
+    Args:
+        fp: Binary file positioned anywhere (seeks are absolute)
+        offset: Where the element's tag is expected (end of the header)
+        implicit_vr: Dataset encoding
+        little_endian: Dataset encoding
+
+    Returns:
+        The element's span, or None if the file ends at offset (no PixelData)
+
+    Raises:
+        HeaderRewriteUnsupported: Anything other than a well-formed
+            PixelData element running to the end of the file
+    """
+    endian = "<" if little_endian else ">"
+    file_size = fp.seek(0, os.SEEK_END)
+    if offset == file_size:
+        return None
+
+    fp.seek(offset)
+    head = fp.read(8)
+    if len(head) < 8:
+        raise HeaderRewriteUnsupported("Truncated element after header")
+    tag = struct.unpack(endian + "HH", head[:4])
+    if tag != PIXEL_DATA_TAG:
+        raise HeaderRewriteUnsupported(f"Expected PixelData after header, found ({tag[0]:04X},{tag[1]:04X})")
+
+    if implicit_vr:
+        (length,) = struct.unpack(endian + "L", head[4:8])
+        value_offset = offset + 8
+    else:
+        if head[4:6] not in _PIXEL_VRS:
+            raise HeaderRewriteUnsupported(f"Unexpected PixelData VR {head[4:6]!r}")
+        raw = fp.read(4)
+        if len(raw) < 4:
+            raise HeaderRewriteUnsupported("Truncated PixelData length")
+        (length,) = struct.unpack(endian + "L", raw)
+        value_offset = offset + 12
+
+    if length != _UNDEFINED_LENGTH:
+        value_length = length
+        end_offset = value_offset + length
+    else:
+        # Encapsulated: walk the item headers up to the sequence delimiter
+        item_offset = value_offset
+        while True:
+            fp.seek(item_offset)
+            item = fp.read(8)
+            if len(item) < 8:
+                raise HeaderRewriteUnsupported("Encapsulated PixelData missing sequence delimiter")
+            group, elem, item_length = struct.unpack(endian + "HHL", item)
+            if (group, elem) == _SEQUENCE_DELIMITER_TAG:
+                value_length = item_offset - value_offset
+                end_offset = item_offset + 8
+                break
+            if (group, elem) != _ITEM_TAG or item_length == _UNDEFINED_LENGTH:
+                raise HeaderRewriteUnsupported(f"Unexpected ({group:04X},{elem:04X}) in encapsulated PixelData")
+            item_offset += 8 + item_length
+
+    if end_offset > file_size:
+        raise HeaderRewriteUnsupported("PixelData runs past end of file")
+    if end_offset != file_size:
+        # Trailing elements would be copied unreviewed: let the full path handle them
+        raise HeaderRewriteUnsupported("Elements follow PixelData")
+    return PixelElementSpan(offset, value_offset, value_length, end_offset)
+
+
+def _copy_span(src: BinaryIO, dst: BinaryIO, span: PixelElementSpan, chunk_size: int) -> str:
+    """Copy the element bytes verbatim; returns the SHA-256 of its value bytes."""
+    hasher = hashlib.sha256()
+    src.seek(span.element_offset)
+    position = span.element_offset
+    value_end = span.value_offset + span.value_length
+    while position < span.end_offset:
+        chunk = src.read(min(chunk_size, span.end_offset - position))
+        if not chunk:
+            raise OSError("Input truncated while copying PixelData")
+        dst.write(chunk)
+        # Hash only the value bytes (what pydicom exposes as ds.PixelData)
+        lo = max(position, span.value_offset) - position
+        hi = min(position + len(chunk), value_end) - position
+        if hi > lo:
+            hasher.update(memoryview(chunk)[lo:hi])
+        position += len(chunk)
+    return hasher.hexdigest()
+
+
+def _hash_span(fp: BinaryIO, span: PixelElementSpan, chunk_size: int) -> str:
+    """Streaming SHA-256 of an element's value bytes."""
+    hasher = hashlib.sha256()
+    fp.seek(span.value_offset)
+    remaining = span.value_length
+    while remaining:
+        chunk = fp.read(min(chunk_size, remaining))
+        if not chunk:
+            raise OSError("Output truncated while verifying PixelData")
+        hasher.update(chunk)
+        remaining -= len(chunk)
+    return hasher.hexdigest()
+
+
+def read_header(fp: BinaryIO, force: bool = False) -> Tuple[Dataset, Optional[PixelElementSpan]]:
+    """
+    Read a file's header (everything before PixelData) and locate PixelData.
+
+    Args:
+        fp: Binary file at its start
+        force: Passed to pydicom.dcmread (read files without a preamble)
+
+    Returns:
+        (header dataset without PixelData, pixel element span or None)
+    """
+    ds = pydicom.dcmread(fp, stop_before_pixels=True, force=force)
+    implicit_vr, little_endian = _encoding(ds)
+    # dcmread leaves the file at the PixelData tag when it stops before it
+    span = locate_pixel_element(fp, fp.tell(), implicit_vr, little_endian)
+    return ds, span
+
+
+def rewrite_header(
+    input_path: str,
+    output_path: str,
+    rewrite: Callable[[Dataset], Optional[Dataset]],
+    chunk_size: int = COPY_CHUNK_SIZE,
+    force: bool = False,
+) -> HeaderRewriteResult:
+    """
+    Rewrite a DICOM file's header and copy its PixelData element verbatim.
+
+    Args:
+        input_path: Source DICOM file
+        output_path: Destination (must differ from input_path)
+        rewrite: Called with the header dataset (no PixelData); modifies it
+                 in place or returns a replacement Dataset
+        chunk_size: Copy/hash chunk size in bytes
+        force: Passed to pydicom.dcmread, as for a full read
+
+    Returns:
+        HeaderRewriteResult; pixel_invariant is PASS (or N/A without PixelData)
+
+    Raises:
+        HeaderRewriteUnsupported: Layout not handled (nothing written) or the
+            rewrite changed the transfer syntax / added elements at or after
+            PixelData / produced a header pydicom cannot write as read
+            (partial output removed)
+        RuntimeError: Pixel invariant violated (partial output removed)
+    """
+    if os.path.abspath(input_path) == os.path.abspath(output_path):
+        raise ValueError("rewrite_header cannot write over its input")
+
+    with open(input_path, "rb") as src:
+        ds, span = read_header(src, force=force)
+        original_encoding = _encoding(ds)
+
+        replacement = rewrite(ds)
+        if isinstance(replacement, Dataset):
+            ds = replacement
+        if _encoding(ds) != original_encoding:
+            raise HeaderRewriteUnsupported("Rewrite changed the transfer syntax")
+        if any(elem.tag >= 0x7FE00010 for elem in ds):
+            raise HeaderRewriteUnsupported("Rewrite added elements at or after PixelData")
+
+        try:
+            with open(output_path, "wb") as dst:
+                _write_header(dst, ds)
+                header_bytes = dst.tell()
+                input_hash = _copy_span(src, dst, span, chunk_size) if span is not None else None
+        except BaseException:
+            _remove_quietly(output_path)
+            raise
+
+    # Verify against what actually landed on disk
+    try:
+        with open(output_path, "rb") as out:
+            _, out_span = read_header(out, force=True)
+            output_hash = _hash_span(out, out_span, chunk_size) if out_span is not None else None
+        invariant = enforce_streamed_passthrough_invariant(
+            input_hash=input_hash,
+            input_length=span.value_length if span is not None else None,
+            output_hash=output_hash,
+            output_length=out_span.value_length if out_span is not None else None,
+            why="metadata-only header rewrite",
+        )
+    except BaseException:
+        _remove_quietly(output_path)
+        raise
+
+    return HeaderRewriteResult(
+        dataset=ds,
+        pixel_invariant=invariant,
+        header_bytes=header_bytes,
+        pixel_bytes=span.element_length if span is not None else 0,
+    )
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def rewrite_header_in_place(
+    path: str,
+    rewrite: Callable[[Dataset], Optional[Dataset]],
+    chunk_size: int = COPY_CHUNK_SIZE,
+    force: bool = False,
+) -> HeaderRewriteResult:
+    """
+    rewrite_header() onto the same file, via a temp file in its directory.
+
+    The original is replaced atomically only after the pixel invariant
+    passed; on any error it is left untouched.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".part")
+    os.close(fd)
+    try:
+        result = rewrite_header(path, tmp_path, rewrite, chunk_size=chunk_size, force=force)
+        os.replace(tmp_path, path)
+    finally:
+        _remove_quietly(tmp_path)
+    return result
@@ -0,0 +1,318 @@
+"""
+Device Layout Templates
+=======================
+
+Burned-in annotation layouts are fixed per ultrasound machine: the same
+(Manufacturer, ManufacturerModelName, Rows, Columns, SoftwareVersions)
+always puts patient name, date and facility in the same boxes. Full OCR
+detection used to be paid for every file; this store learns the masked
+regions once, from a reviewer-accepted ReviewSession, and later files
+from the same device reuse them directly.
+
+A template is only trusted after a cheap verification: OCR on one frame
+must find no text outside the template regions. Anything unexpected
+(new firmware layout, extra annotation) falls back to full detection.
+
+Templates hold geometry only (x, y, w, h per region) plus the device
+signature; no text and no patient identifiers are stored.
+
+Key components:
+- DeviceSignature: device/geometry identity read from a DICOM header
+- LayoutTemplate: learned mask regions for one device signature
+- LayoutTemplateStore: on-disk store, one JSON file per signature
+- verify_template(): do detected boxes fall inside template regions?
+
+Design Principles:
+1. Reviewer-sourced: templates are learned only from accepted sessions
+2. Verified on use: one-frame OCR must agree before OCR is skipped
+3. Fail-safe: missing, unreadable or rejected templates mean full OCR
+
+Usage:
+    from layout_templates import DeviceSignature, LayoutTemplateStore
+
+    store = LayoutTemplateStore(build_cache_dir(DOWNLOADS_ROOT, "layouts"))
+    store.learn(DeviceSignature.from_dataset(ds), review_session)
+    template = store.get(DeviceSignature.from_dataset(other_ds))
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+
+# Bump when the template layout changes; older files are ignored
+LAYOUT_TEMPLATE_VERSION = 1
+
+# Pixels a verification box may stick out of a template region (OCR box
+# jitter between frames, same as the padding added around detections)
+VERIFY_TOLERANCE = 5
+
+Box = Tuple[int, int, int, int]
+
+
+@dataclass(frozen=True)
+class DeviceSignature:
+    """Identity of an acquisition device and its frame geometry."""
+    manufacturer: str
+    model: str
+    rows: int
+    columns: int
+    software_versions: str
+
+    @classmethod
+    def from_dataset(cls, ds: Any) -> Optional["DeviceSignature"]:
+        """
+        Read the signature from a DICOM header.
+
+        Returns None when Manufacturer or ManufacturerModelName is missing:
+        an anonymous device cannot be told apart from any other.
+        """
+        manufacturer = str(getattr(ds, "Manufacturer", "") or "").strip()
+        model = str(getattr(ds, "ManufacturerModelName", "") or "").strip()
+        if not manufacturer or not model:
+            return None
+        software = getattr(ds, "SoftwareVersions", "") or ""
+        if not isinstance(software, str):
+            software = "\\".join(str(v) for v in software)  # Multi-valued LO
+        return cls(
+            manufacturer=manufacturer,
+            model=model,
+            rows=int(getattr(ds, "Rows", 0) or 0),
+            columns=int(getattr(ds, "Columns", 0) or 0),
+            software_versions=software.strip(),
+        )
+
+    def key(self) -> str:
+        """Stable hex key for file naming."""
+        material = json.dumps(asdict(self), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def label(self) -> str:
+        """Short human-readable form for logs."""
+        return f"{self.manufacturer} {self.model} {self.columns}x{self.rows} sw={self.software_versions or '-'}"
+
+
+@dataclass
+class LayoutTemplate:
+    """Mask regions learned for one device signature."""
+    signature: DeviceSignature
+    regions: List[Box]
+    session_id: str
+    learned_at: str
+    accept_count: int = 1
+    verified_uses: int = 0
+    rejected_uses: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["version"] = LAYOUT_TEMPLATE_VERSION
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LayoutTemplate":
+        if data.get("version") != LAYOUT_TEMPLATE_VERSION:
+            raise ValueError(f"Unsupported layout template version: {data.get('version')}")
+        return cls(
+            signature=DeviceSignature(**data["signature"]),
+            regions=[tuple(int(v) for v in r) for r in data["regions"]],
+            session_id=data["session_id"],
+            learned_at=data["learned_at"],
+            accept_count=int(data.get("accept_count", 1)),
+            verified_uses=int(data.get("verified_uses", 0)),
+            rejected_uses=int(data.get("rejected_uses", 0)),
+        )
+
+
+def verify_template(
+    regions: Iterable[Box],
+    detected_boxes: Iterable[Box],
+    tolerance: int = VERIFY_TOLERANCE,
+) -> bool:
+    """
+    Check that every detected box lies inside some template region.
+
+    Args:
+        regions: Template regions as (x, y, w, h)
+        detected_boxes: Boxes found by verification OCR as (x, y, w, h)
+        tolerance: Pixels a box may extend past a region on each side
+
+    Returns:
+        True if all boxes are covered (also when nothing was detected)
+    """
+    regions = list(regions)
+    for bx, by, bw, bh in detected_boxes:
+        covered = any(
+            bx >= rx - tolerance and by >= ry - tolerance
+            and bx + bw <= rx + rw + tolerance and by + bh <= ry + rh + tolerance
+            for rx, ry, rw, rh in regions
+        )
+        if not covered:
+            return False
+    return True
+
+
+@dataclass
+class _StoreCounters:
+    hits: int = 0
+    misses: int = 0
+    learned: int = 0
+    verified: int = 0
+    rejected: int = 0
+
+
+class LayoutTemplateStore:
+    """
+    On-disk layout templates, one JSON file per device signature.
+
+    Learning again for a known device replaces its regions (the latest
+    accepted review wins). Counters are per instance.
+    """
+
+    def __init__(self, store_dir: Union[str, Path]):
+        """
+        Args:
+            store_dir: Directory for template files (created if missing)
+        """
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._counters = _StoreCounters()
+
+    def _path(self, signature: DeviceSignature) -> Path:
+        return self.store_dir / f"{signature.key()}.json"
+
+    def _load(self, signature: DeviceSignature) -> Optional[LayoutTemplate]:
+        try:
+            with open(self._path(signature), "r", encoding="utf-8") as fh:
+                template = LayoutTemplate.from_dict(json.load(fh))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"[LAYOUT] Warning: ignoring unreadable template for {signature.label()}: {e}")
+            return None
+        return template if template.signature == signature else None
+
+    def _save(self, template: LayoutTemplate) -> None:
+        path = self._path(template.signature)
+        fd, tmp = tempfile.mkstemp(dir=self.store_dir, prefix=".tmp-", suffix=".part")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(template.to_dict(), fh, indent=2, sort_keys=True)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def get(self, signature: Optional[DeviceSignature]) -> Optional[LayoutTemplate]:
+        """Return the template for a device, or None."""
+        template = self._load(signature) if signature is not None else None
+        with self._lock:
+            if template is None:
+                self._counters.misses += 1
+            else:
+                self._counters.hits += 1
+        return template
+
+    def learn(
+        self,
+        signature: Optional[DeviceSignature],
+        session: Any,
+        regions: Optional[Iterable[Box]] = None,
+    ) -> Optional[LayoutTemplate]:
+        """
+        Learn a device's template from an accepted ReviewSession.
+
+        Only regions the reviewer left masked on all frames are learned;
+        frame-specific regions describe one clip, not the device layout.
+
+        Args:
+            signature: Device of the reviewed file
+            session: Accepted ReviewSession
+            regions: Masks actually applied to the reviewed file, when the
+                export masked with those rather than the session's regions
+
+        Returns:
+            The stored template, or None if there was nothing to learn
+
+        Raises:
+            RuntimeError: If the session has not been accepted
+        """
+        if not session.review_accepted:
+            raise RuntimeError("Cannot learn layout: review not accepted")
+        if signature is None:
+            return None
+        if regions is None:
+            regions = [
+                (r.x, r.y, r.w, r.h)
+                for r in session.get_masked_regions()
+                if r.applies_to_all_frames()
+            ]
+        regions = sorted({
+            (int(x), int(y), int(w), int(h))
+            for x, y, w, h in regions
+            if w > 0 and h > 0
+        })
+        if not regions:
+            return None
+
+        with self._lock:
+            previous = self._load(signature)
+            template = LayoutTemplate(
+                signature=signature,
+                regions=regions,
+                session_id=session.session_id,
+                learned_at=datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                accept_count=(previous.accept_count + 1) if previous else 1,
+            )
+            self._save(template)
+            self._counters.learned += 1
+        print(f"[LAYOUT] Learned {len(regions)} region(s) for {signature.label()}")
+        return template
+
+    def record_verification(self, template: LayoutTemplate, verified: bool) -> None:
+        """Count a verification outcome (in memory and on the template file)."""
+        with self._lock:
+            if verified:
+                self._counters.verified += 1
+            else:
+                self._counters.rejected += 1
+            current = self._load(template.signature)
+            if current is None or current.regions != template.regions:
+                return  # Relearned meanwhile: outcome applies to the old regions
+            if verified:
+                current.verified_uses += 1
+            else:
+                current.rejected_uses += 1
+            try:
+                self._save(current)
+            except OSError as e:
+                print(f"[LAYOUT] Warning: could not update template usage: {e}")
+
+    def templates(self) -> List[LayoutTemplate]:
+        """All readable templates in the store."""
+        result = []
+        for path in sorted(self.store_dir.glob("*.json")):
+            try:
+                with open(path, "r", encoding="utf-8") as fh:
+                    result.append(LayoutTemplate.from_dict(json.load(fh)))
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for logging and the evidence bundle (no PHI)."""
+        with self._lock:
+            data = asdict(self._counters)
+        data["templates"] = len(list(self.store_dir.glob("*.json")))
+        return data
@@ -0,0 +1,352 @@
+"""
+Memory-Budgeted Pixel Scheduler
+===============================
+
+Replaces the hard per-file cutoff of utils.should_render_pixels (75 MB raw)
+and evaluate_us_mask_memory_guard, which skipped pixel masking outright for
+large files and left big cine loops unmasked.
+
+Every file is planned from its header via utils.estimate_pixel_memory and
+admitted against one global RAM budget:
+
+- FULL:    estimated peak fits the budget; many such files run concurrently
+- CHUNKED: multi-frame file whose peak exceeds the budget; it runs alone
+           (reserves the whole budget) and process_dicom streams it from
+           disk in frame chunks instead of skipping it
+- SKIP:    a single frame alone exceeds the budget; pixels cannot be split
+           further, so only metadata is processed (recorded as a skip)
+
+Key components:
+- plan_pixel_memory(): pure header-only planning
+- MemoryAdmission: the plan handed to process_dicom (picklable)
+- MemoryBudgetScheduler: thread-safe FIFO admission against the budget,
+  recording queueing in the evidence bundle
+
+Design Principles:
+1. Never skip what can be chunked: oversize multi-frame files get a
+   frames_per_chunk instead of a skip
+2. Fair: admission is first-in first-out, so a huge file is not starved
+   by a stream of small ones
+3. Deadlock-free: every admission reserves at most the full budget, so
+   it always fits once nothing else is running
+
+Usage:
+    from memory_scheduler import MemoryBudgetScheduler
+
+    scheduler = MemoryBudgetScheduler(evidence_bundle=bundle)
+    admission = scheduler.plan_path(input_path)
+    with scheduler.admit(admission):
+        process_dicom(..., memory_admission=admission)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+from utils import estimate_pixel_memory
+
+
+# Environment override for the global budget (megabytes)
+MEMORY_BUDGET_ENV_VAR = "VOXELMASK_PIXEL_MEMORY_BUDGET_MB"
+
+# process_dicom peaks at roughly 6-8x the raw pixel bytes (decoded copy,
+# RGB expansion, original-depth copy, output buffer)
+PEAK_MEMORY_FACTOR = 8
+
+# Matches the legacy should_render_pixels cutoff: 75 MB raw x 8
+DEFAULT_MEMORY_BUDGET_BYTES = 75_000_000 * PEAK_MEMORY_FACTOR
+
+PLAN_FULL = "FULL"
+PLAN_CHUNKED = "CHUNKED"
+PLAN_SKIP = "SKIP"
+
+
+def resolve_memory_budget(budget_bytes: Optional[int] = None) -> int:
+    """
+    Resolve the global pixel memory budget in bytes.
+
+    Precedence: explicit argument > VOXELMASK_PIXEL_MEMORY_BUDGET_MB >
+    DEFAULT_MEMORY_BUDGET_BYTES. Invalid or non-positive values fall back
+    to the default.
+    """
+    if budget_bytes is None:
+        raw = os.environ.get(MEMORY_BUDGET_ENV_VAR, "")
+        try:
+            budget_bytes = int(float(raw) * 1024 * 1024) if raw.strip() else DEFAULT_MEMORY_BUDGET_BYTES
+        except ValueError:
+            budget_bytes = DEFAULT_MEMORY_BUDGET_BYTES
+    return budget_bytes if budget_bytes > 0 else DEFAULT_MEMORY_BUDGET_BYTES
+
+
+@dataclass(frozen=True)
+class MemoryAdmission:
+    """
+    Memory plan for one file (no PHI).
+
+    Attributes:
+        plan: PLAN_FULL, PLAN_CHUNKED or PLAN_SKIP
+        estimated_bytes: Raw pixel bytes from estimate_pixel_memory
+        reserved_bytes: Bytes held against the budget while admitted
+        num_frames: Frame count from the header
+        frames_per_chunk: Frames per scrub chunk (None unless CHUNKED)
+        sop_instance_uid: Source SOP Instance UID for evidence records
+    """
+    plan: str
+    estimated_bytes: int
+    reserved_bytes: int
+    num_frames: int
+    frames_per_chunk: Optional[int] = None
+    sop_instance_uid: Optional[str] = None
+
+    @property
+    def chunked(self) -> bool:
+        return self.plan == PLAN_CHUNKED
+
+    @property
+    def skipped(self) -> bool:
+        return self.plan == PLAN_SKIP
+
+
+def plan_pixel_memory(
+    ds: Any,
+    budget_bytes: Optional[int] = None,
+    peak_factor: int = PEAK_MEMORY_FACTOR,
+) -> MemoryAdmission:
+    """
+    Plan pixel processing for a dataset from its header alone.
+
+    Args:
+        ds: pydicom Dataset (a stop_before_pixels read is sufficient)
+        budget_bytes: Global budget (see resolve_memory_budget)
+        peak_factor: Peak-to-raw memory multiplier
+
+    Returns:
+        MemoryAdmission describing the plan
+    """
+    budget = resolve_memory_budget(budget_bytes)
+    estimated = estimate_pixel_memory(ds)
+    try:
+        num_frames = max(1, int(getattr(ds, "NumberOfFrames", 1) or 1))
+    except (TypeError, ValueError):
+        num_frames = 1
+    sop_uid = getattr(ds, "SOPInstanceUID", None)
+    sop_uid = str(sop_uid) if sop_uid is not None else None
+
+    peak = estimated * peak_factor
+    if peak <= budget:
+        return MemoryAdmission(
+            plan=PLAN_FULL,
+            estimated_bytes=estimated,
+            reserved_bytes=peak,
+            num_frames=num_frames,
+            sop_instance_uid=sop_uid,
+        )
+
+    frame_peak = max(1, peak // num_frames)
+    if num_frames == 1 or frame_peak > budget:
+        return MemoryAdmission(
+            plan=PLAN_SKIP,
+            estimated_bytes=estimated,
+            reserved_bytes=0,
+            num_frames=num_frames,
+            sop_instance_uid=sop_uid,
+        )
+
+    return MemoryAdmission(
+        plan=PLAN_CHUNKED,
+        estimated_bytes=estimated,
+        reserved_bytes=budget,  # Exclusive: runs alone
+        num_frames=num_frames,
+        frames_per_chunk=max(1, min(num_frames, budget // frame_peak)),
+        sop_instance_uid=sop_uid,
+    )
+
+
+@dataclass(frozen=True)
+class MemorySchedulerStats:
+    """Snapshot of scheduler counters for logging and audit (no PHI)."""
+    budget_bytes: int
+    in_use_bytes: int
+    peak_in_use_bytes: int
+    active: int
+    admitted: int
+    queued: int
+    chunked: int
+    skipped: int
+
+
+class MemoryBudgetScheduler:
+    """
+    Admits files against a global pixel memory budget.
+
+    acquire() blocks until the admission fits the remaining budget and it
+    is at the head of the wait queue. CHUNKED admissions reserve the whole
+    budget and therefore run alone; SKIP admissions reserve nothing.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: Optional[int] = None,
+        peak_factor: int = PEAK_MEMORY_FACTOR,
+        evidence_bundle: Any = None,
+    ):
+        """
+        Args:
+            budget_bytes: Global budget in bytes (see resolve_memory_budget)
+            peak_factor: Peak-to-raw memory multiplier used for planning
+            evidence_bundle: Optional EvidenceBundle; queueing is recorded
+                             as PIXEL_PROCESSING_QUEUED exceptions
+        """
+        self.budget_bytes = resolve_memory_budget(budget_bytes)
+        self.peak_factor = peak_factor
+        self.evidence_bundle = evidence_bundle
+        self._cond = threading.Condition()
+        self._waiters: "deque[object]" = deque()
+        self._in_use = 0
+        self._peak_in_use = 0
+        self._active = 0
+        self._admitted = 0
+        self._queued = 0
+        self._chunked = 0
+        self._skipped = 0
+
+    # ───────────────────────────────────────────────────────────────────────
+    # Planning
+    # ───────────────────────────────────────────────────────────────────────
+
+    def plan(self, ds: Any) -> MemoryAdmission:
+        """Plan a dataset against this scheduler's budget."""
+        return plan_pixel_memory(ds, self.budget_bytes, self.peak_factor)
+
+    def plan_path(self, path: str) -> MemoryAdmission:
+        """
+        Plan a file from a header-only read.
+
+        Unreadable files get an empty FULL plan so the processor reports
+        the real read error.
+        """
+        import pydicom
+        try:
+            ds = pydicom.dcmread(path, stop_before_pixels=True, force=True)
+        except Exception:
+            return MemoryAdmission(plan=PLAN_FULL, estimated_bytes=0, reserved_bytes=0, num_frames=1)
+        return self.plan(ds)
+
+    # ───────────────────────────────────────────────────────────────────────
+    # Admission
+    # ───────────────────────────────────────────────────────────────────────
+
+    def _fits(self, admission: MemoryAdmission) -> bool:
+        return self._in_use + admission.reserved_bytes <= self.budget_bytes
+
+    def _grant(self, admission: MemoryAdmission) -> None:
+        self._in_use += admission.reserved_bytes
+        self._peak_in_use = max(self._peak_in_use, self._in_use)
+        self._active += 1
+        self._admitted += 1
+        if admission.chunked:
+            self._chunked += 1
+        elif admission.skipped:
+            self._skipped += 1
+
+    def try_acquire(self, admission: MemoryAdmission) -> bool:
+        """Admit without waiting. Returns False if it does not fit now."""
+        with self._cond:
+            if self._waiters or not self._fits(admission):
+                return False
+            self._grant(admission)
+            return True
+
+    def acquire(self, admission: MemoryAdmission, timeout: Optional[float] = None) -> float:
+        """
+        Block until the admission fits the budget (FIFO order).
+
+        Args:
+            admission: Plan from plan()/plan_path()
+            timeout: Seconds to wait (None = wait forever)
+
+        Returns:
+            Seconds spent queued (0.0 if admitted immediately)
+
+        Raises:
+            TimeoutError: If not admitted in time
+        """
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        ticket = object()
+        with self._cond:
+            if not self._waiters and self._fits(admission):
+                self._grant(admission)
+                return 0.0
+            self._waiters.append(ticket)
+            self._queued += 1
+            try:
+                while self._waiters[0] is not ticket or not self._fits(admission):
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(
+                            f"Not admitted within {timeout}s "
+                            f"({admission.reserved_bytes} of {self.budget_bytes} bytes requested)"
+                        )
+                    self._cond.wait(remaining)
+                self._grant(admission)
+            finally:
+                self._waiters.remove(ticket)
+                self._cond.notify_all()
+        waited = time.monotonic() - start
+        self.record_queued(admission, waited)
+        return waited
+
+    def release(self, admission: MemoryAdmission) -> None:
+        """Return an admission's reservation to the budget."""
+        with self._cond:
+            self._in_use = max(0, self._in_use - admission.reserved_bytes)
+            self._active = max(0, self._active - 1)
+            self._cond.notify_all()
+
+    @contextmanager
+    def admit(self, admission: MemoryAdmission, timeout: Optional[float] = None) -> Iterator[MemoryAdmission]:
+        """Hold an admission for the duration of the block."""
+        self.acquire(admission, timeout=timeout)
+        try:
+            yield admission
+        finally:
+            self.release(admission)
+
+    def record_queued(self, admission: MemoryAdmission, waited_seconds: float) -> None:
+        """Record a queue wait in the evidence bundle (best effort)."""
+        if self.evidence_bundle is None or waited_seconds <= 0:
+            return
+        try:
+            self.evidence_bundle.add_exception(
+                exception_type="PIXEL_PROCESSING_QUEUED",
+                message=(
+                    f"Waited {waited_seconds:.2f}s for memory budget "
+                    f"(plan {admission.plan}, reserved {admission.reserved_bytes} "
+                    f"of {self.budget_bytes} bytes)"
+                ),
+                severity="INFO",
+                source_sop_uid=admission.sop_instance_uid,
+            )
+        except Exception:
+            pass
+
+    def stats(self) -> MemorySchedulerStats:
+        """Return a snapshot of scheduler counters."""
+        with self._cond:
+            return MemorySchedulerStats(
+                budget_bytes=self.budget_bytes,
+                in_use_bytes=self._in_use,
+                peak_in_use_bytes=self._peak_in_use,
+                active=self._active,
+                admitted=self._admitted,
+                queued=self._queued,
+                chunked=self._chunked,
+                skipped=self._skipped,
+            )
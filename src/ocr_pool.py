@@ -0,0 +1,256 @@
+"""
+OCR Engine Pool — Process-Wide PaddleOCR Reuse
+
+Loading PaddleOCR takes seconds, and it used to happen once per DICOM
+because every file built a fresh ClinicalCorrector. This module keeps a
+small pool of warmed OCR engines for the lifetime of the process.
+
+Key components:
+- OCREnginePool: thread-safe pool with exclusive borrow/return semantics
+- get_ocr_pool(): process-wide singleton shared by process_dicom,
+  detect_text_box_from_array and ClinicalCorrector.detect_static_text
+- configure_ocr_pool(): replace the singleton (pool size, engine factory)
+
+Design Principles:
+1. One engine per in-flight caller: PaddleOCR predictors are not safe to
+   call concurrently, so an engine is never shared between two borrowers
+2. Lazy: engines are created on first demand unless warm() is called
+3. Observable: warm-up time and borrow counts are exposed via stats()
+
+Usage:
+    from ocr_pool import get_ocr_pool
+
+    pool = get_ocr_pool()
+    pool.warm()
+    with pool.corrector() as corrector:
+        result = detect_text_box_from_array(corrector, arr)
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+# Environment override for the process-wide pool size
+POOL_SIZE_ENV_VAR = "VOXELMASK_OCR_POOL_SIZE"
+DEFAULT_POOL_SIZE = 1
+
+
+def _default_engine_factory() -> Any:
+    # Imported lazily: clinical_corrector pulls in PaddleOCR/OpenCV
+    from clinical_corrector import create_ocr_engine
+    return create_ocr_engine()
+
+
+def resolve_pool_size(size: Optional[int] = None) -> int:
+    """
+    Resolve the effective pool size.
+
+    Precedence: explicit argument > VOXELMASK_OCR_POOL_SIZE > DEFAULT_POOL_SIZE.
+    Invalid or non-positive values fall back to the default.
+    """
+    if size is None:
+        raw = os.environ.get(POOL_SIZE_ENV_VAR, "")
+        try:
+            size = int(raw) if raw.strip() else DEFAULT_POOL_SIZE
+        except ValueError:
+            size = DEFAULT_POOL_SIZE
+    return size if size >= 1 else DEFAULT_POOL_SIZE
+
+
+@dataclass(frozen=True)
+class OCRPoolStats:
+    """Snapshot of pool state for logging and audit (no PHI)."""
+    size: int
+    engines_created: int
+    engines_idle: int
+    warmup_seconds: float
+    borrows: int
+
+
+class OCREnginePool:
+    """
+    Bounded pool of OCR engines with exclusive borrow semantics.
+
+    At most `size` engines are ever created. A borrower blocks until an
+    engine is returned when all engines are checked out.
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        engine_factory: Optional[Callable[[], Any]] = None,
+    ):
+        """
+        Args:
+            size: Maximum number of engines (see resolve_pool_size)
+            engine_factory: Zero-arg callable returning a new OCR engine.
+                            Defaults to clinical_corrector.create_ocr_engine.
+        """
+        self.size = resolve_pool_size(size)
+        self._factory = engine_factory or _default_engine_factory
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._warmup_seconds = 0.0
+        self._borrows = 0
+
+    def _create_engine(self) -> Any:
+        """Create one engine, accounting its load time as warm-up."""
+        start = time.perf_counter()
+        try:
+            engine = self._factory()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        with self._lock:
+            self._warmup_seconds += time.perf_counter() - start
+        return engine
+
+    def _reserve_slot(self) -> bool:
+        """Reserve capacity for a new engine. Returns False if the pool is full."""
+        with self._lock:
+            if self._created >= self.size:
+                return False
+            self._created += 1
+            return True
+
+    def warm(self) -> float:
+        """
+        Create all remaining engines up front.
+
+        Safe to call repeatedly; only missing engines are created.
+
+        Returns:
+            Seconds spent loading engines during this call
+        """
+        start = time.perf_counter()
+        while self._reserve_slot():
+            self._idle.put(self._create_engine())
+        elapsed = time.perf_counter() - start
+        if elapsed > 0.001:
+            print(f"[OCR POOL] Warmed {self._created} engine(s) in {elapsed:.2f}s")
+        return elapsed
+
+    def _acquire(self, timeout: Optional[float]) -> Any:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        if self._reserve_slot():
+            return self._create_engine()
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"No OCR engine available within {timeout}s (pool size {self.size})"
+            ) from None
+
+    @contextmanager
+    def borrow(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        Borrow an engine for exclusive use; it is returned on exit.
+
+        Args:
+            timeout: Seconds to wait for a free engine (None = wait forever)
+
+        Raises:
+            TimeoutError: If no engine became available in time
+        """
+        engine = self._acquire(timeout)
+        with self._lock:
+            self._borrows += 1
+        try:
+            yield engine
+        finally:
+            self._idle.put(engine)
+
+    @contextmanager
+    def corrector(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Borrow an engine wrapped in a ClinicalCorrector."""
+        from clinical_corrector import ClinicalCorrector
+        with self.borrow(timeout=timeout) as engine:
+            yield ClinicalCorrector(ocr_engine=engine)
+
+    def stats(self) -> OCRPoolStats:
+        """Return a snapshot of pool counters."""
+        with self._lock:
+            return OCRPoolStats(
+                size=self.size,
+                engines_created=self._created,
+                engines_idle=self._idle.qsize(),
+                warmup_seconds=self._warmup_seconds,
+                borrows=self._borrows,
+            )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PROCESS-WIDE SINGLETON
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_POOL: Optional[OCREnginePool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_ocr_pool() -> OCREnginePool:
+    """Return the process-wide pool, creating it on first use."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = OCREnginePool()
+        return _POOL
+
+
+def configure_ocr_pool(
+    size: Optional[int] = None,
+    engine_factory: Optional[Callable[[], Any]] = None,
+) -> OCREnginePool:
+    """
+    Replace the process-wide pool.
+
+    Engines held by the previous pool are released once their borrowers
+    return them. Call this at startup (or in a fresh worker process)
+    before any OCR work.
+    """
+    global _POOL
+    with _POOL_LOCK:
+        _POOL = OCREnginePool(size=size, engine_factory=engine_factory)
+        return _POOL
+
+
+def reset_ocr_pool() -> None:
+    """Drop the process-wide pool (next get_ocr_pool() builds a new one)."""
+    global _POOL
+    with _POOL_LOCK:
+        _POOL = None
+
+
+def init_worker_ocr_pool(size: int = 1) -> Dict[str, Any]:
+    """
+    Worker initializer for run_pipeline().
+
+    Builds and warms a pool of its own, so its engines are loaded once per
+    worker (or once per run in serial/thread mode), not once per file. In
+    a worker process the pool also becomes the process-wide one; in the
+    app's own process the shared pool is left untouched, so concurrent
+    runs never replace each other's engines. Use functools.partial to
+    pass a size (the initializer must stay picklable).
+
+    Returns:
+        Worker state dict: {'ocr_pool': OCREnginePool}
+    """
+    global _POOL
+    pool = OCREnginePool(size=size)
+    pool.warm()
+    if multiprocessing.parent_process() is not None:
+        with _POOL_LOCK:
+            _POOL = pool
+    return {'ocr_pool': pool}
@@ -9,7 +9,9 @@ the PixelData bytes in the output MUST equal the input bytes exactly.
 Key components:
 - PixelAction enum: Single source of truth for pixel modification decision
 - sha256_bytes(): Cryptographic hash for pixel data comparison
+- pixel_sha256(): PixelData hash memoized on its element (computed once per value)
 - enforce_pixel_passthrough_invariant(): Hard-fail guard if pixels mutate
+- enforce_streamed_passthrough_invariant(): Same guard from streamed hashes
 
 Design Principles:
 1. Boring + Deterministic: Simple hash comparison, no magic
@@ -27,8 +29,9 @@ Usage:
 
 import hashlib
 from enum import Enum
-from typing import Optional, NamedTuple
+from typing import Any, Optional, NamedTuple
 import pydicom
+from pydicom.dataelem import DataElement
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -76,6 +79,35 @@ class PixelInvariantResult(NamedTuple):
 # HASH UTILITIES
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# Bytes fed to the hash per update for large buffers and files
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
+# PixelData tag (7FE0,0010)
+_PIXEL_DATA_TAG = 0x7FE00010
+
+
+class _HashedPixelElement(DataElement):
+    """
+    PixelData element carrying the digest of its current value.
+    
+    pixel_sha256() switches an element to this class when it memoizes a
+    digest. The memo holds the value's id() and length, never the bytes,
+    and assigning a new value (ds.PixelData = ..., elem.value = ...)
+    drops it, so a replaced buffer is freed as soon as nothing else
+    references it and its digest is never reused for a later value.
+    """
+    
+    _sha256_memo: Optional[tuple] = None
+    
+    @property
+    def value(self) -> Any:
+        return DataElement.value.fget(self)
+    
+    @value.setter
+    def value(self, val: Any) -> None:
+        self._sha256_memo = None
+        DataElement.value.fset(self, val)
+
 def sha256_bytes(data: bytes) -> str:
     """
     Compute SHA-256 hash of raw bytes.
@@ -89,6 +121,74 @@ def sha256_bytes(data: bytes) -> str:
     return hashlib.sha256(data).hexdigest()
 
 
+def sha256_stream(data: Any, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """
+    Compute SHA-256 incrementally, chunk by chunk.
+    
+    Args:
+        data: Bytes-like object, or a binary file object (hashed from its
+              start; its position is restored afterwards)
+        chunk_size: Bytes per hash update
+        
+    Returns:
+        Hexadecimal string representation of SHA-256 hash
+    """
+    digest = hashlib.sha256()
+    if hasattr(data, 'read'):
+        position = data.tell()
+        data.seek(0)
+        try:
+            for chunk in iter(lambda: data.read(chunk_size), b''):
+                digest.update(chunk)
+        finally:
+            data.seek(position)
+        return digest.hexdigest()
+    
+    view = memoryview(data).cast('B')
+    for start in range(0, len(view), chunk_size):
+        digest.update(view[start:start + chunk_size])
+    return digest.hexdigest()
+
+
+def pixel_sha256(ds: pydicom.Dataset) -> Optional[str]:
+    """
+    SHA-256 of a dataset's PixelData, computed once per PixelData value.
+    
+    The digest is memoized on the PixelData element (see
+    _HashedPixelElement), keyed by the value's id() and length without
+    keeping the value alive. Reassigning PixelData drops the memo, and
+    replacing the element starts without one, so the next call hashes the
+    new value. Only immutable bytes are memoized; bytearray, arrays and
+    buffers are hashed on every call, since they can change without being
+    reassigned.
+    
+    Args:
+        ds: pydicom Dataset
+        
+    Returns:
+        Hex digest, or None if the dataset has no PixelData
+    """
+    pixel_data = getattr(ds, 'PixelData', None)
+    if pixel_data is None:
+        return None
+    if hasattr(pixel_data, 'read'):
+        return sha256_stream(pixel_data)  # Buffered PixelData (pydicom >= 3)
+    if not isinstance(pixel_data, bytes):
+        return sha256_stream(get_pixel_data_safe(ds))
+    
+    elem = ds[_PIXEL_DATA_TAG]
+    key = (id(pixel_data), len(pixel_data))
+    memo = getattr(elem, '_sha256_memo', None)
+    if memo is not None and memo[0] == key:
+        return memo[1]
+    digest = sha256_stream(pixel_data)
+    if type(elem) is DataElement:
+        elem.__class__ = _HashedPixelElement
+    if isinstance(elem, _HashedPixelElement):
+        elem._sha256_memo = (key, digest)
+    return digest
+
+
 def get_pixel_data_safe(ds: pydicom.Dataset) -> Optional[bytes]:
     """
     Safely extract PixelData bytes without triggering decode.
@@ -205,8 +305,44 @@ def enforce_pixel_passthrough_invariant(
     in_pd = get_pixel_data_safe(input_ds)
     out_pd = get_pixel_data_safe(output_ds)
     
+    return enforce_streamed_passthrough_invariant(
+        input_hash=pixel_sha256(input_ds) if in_pd is not None else None,
+        input_length=len(in_pd) if in_pd is not None else None,
+        output_hash=pixel_sha256(output_ds) if out_pd is not None else None,
+        output_length=len(out_pd) if out_pd is not None else None,
+        why=why,
+    )
+
+
+def enforce_streamed_passthrough_invariant(
+    input_hash: Optional[str],
+    input_length: Optional[int],
+    output_hash: Optional[str],
+    output_length: Optional[int],
+    why: str
+) -> PixelInvariantResult:
+    """
+    Enforce the pixel passthrough invariant from precomputed hashes.
+    
+    Used when PixelData is never loaded: the metadata-only fast path
+    (header_rewrite) hashes input and output pixel bytes while streaming
+    them. None means the file has no PixelData.
+    
+    Args:
+        input_hash: SHA-256 (hex) of input PixelData, or None
+        input_length: Length of input PixelData, or None
+        output_hash: SHA-256 (hex) of output PixelData, or None
+        output_length: Length of output PixelData, or None
+        why: Human-readable reason for this check (for error messages)
+        
+    Returns:
+        PixelInvariantResult with check details for audit logging
+        
+    Raises:
+        RuntimeError: If PixelData was added, removed or differs
+    """
     # Handle missing PixelData cases
-    if in_pd is None and out_pd is None:
+    if input_hash is None and output_hash is None:
         # Both missing - invariant not applicable (e.g., structured report)
         return PixelInvariantResult(
             passed=True,
@@ -214,36 +350,30 @@ def enforce_pixel_passthrough_invariant(
             error_message="No PixelData in input or output"
         )
     
-    if in_pd is None and out_pd is not None:
+    if input_hash is None and output_hash is not None:
         # PixelData was added - this is a violation in NOT_APPLIED mode
         raise RuntimeError(
             f"Pixel invariant violated ({why}): PixelData was added to output "
             f"when input had none. This is forbidden in UID-only mode."
         )
     
-    if in_pd is not None and out_pd is None:
+    if input_hash is not None and output_hash is None:
         # PixelData was removed - this is a violation in NOT_APPLIED mode
         raise RuntimeError(
             f"Pixel invariant violated ({why}): PixelData was removed from output "
-            f"when input had {len(in_pd)} bytes. This is forbidden in UID-only mode."
+            f"when input had {input_length} bytes. This is forbidden in UID-only mode."
         )
     
-    # Both present - compute hashes and compare
-    in_hash = sha256_bytes(in_pd)
-    out_hash = sha256_bytes(out_pd)
-    in_len = len(in_pd)
-    out_len = len(out_pd)
-    
-    if in_len != out_len:
+    if input_length != output_length:
         raise RuntimeError(
             f"Pixel invariant violated ({why}): PixelData length changed from "
-            f"{in_len} to {out_len} bytes. This is forbidden in UID-only mode."
+            f"{input_length} to {output_length} bytes. This is forbidden in UID-only mode."
         )
     
-    if in_hash != out_hash:
+    if input_hash != output_hash:
         raise RuntimeError(
             f"Pixel invariant violated ({why}): PixelData content differs. "
-            f"Input hash: {in_hash[:16]}..., Output hash: {out_hash[:16]}... "
+            f"Input hash: {input_hash[:16]}..., Output hash: {output_hash[:16]}... "
             f"This is forbidden in UID-only mode."
         )
     
@@ -251,10 +381,10 @@ def enforce_pixel_passthrough_invariant(
     return PixelInvariantResult(
         passed=True,
         status="PASS",
-        input_hash=in_hash,
-        output_hash=out_hash,
-        input_length=in_len,
-        output_length=out_len
+        input_hash=input_hash,
+        output_hash=output_hash,
+        input_length=input_length,
+        output_length=output_length
     )
 
 
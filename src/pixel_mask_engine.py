@@ -0,0 +1,144 @@
+"""
+Vectorized Pixel Mask Engine
+============================
+
+Applies the black-box eraser and the text overlay to a whole stack of
+frames at once, instead of looping over frames in Python.
+
+Masks in process_dicom are static: the same boxes are applied to every
+frame of a clip. The geometry is therefore resolved once per file
+(clamped, empty boxes dropped, overlapping boxes combined into a set of
+disjoint rectangles covering their union) and each rectangle is written
+with a single broadcast slice assignment over the (Frames, H, W[, C])
+array, so no pixel is written twice however much the boxes overlap.
+
+A combined boolean (H, W) mask was measured and rejected: boolean
+indexing over a frame stack is several times slower than slice writes.
+
+Key components:
+- PixelMaskEngine: precomputed mask/overlay plan for one frame geometry
+- clamp_box(): (x, y, w, h) -> clamped (x0, y0, x1, y1)
+- combine_regions(): union of clamped boxes as disjoint rectangles
+
+Design Principles:
+1. Identical output: same pixels as the per-frame loop it replaces
+2. Dtype-agnostic: works on original bit-depth and uint8 RGB stacks alike
+3. Chunk-safe: applying the engine per chunk equals applying it to the
+   whole clip, so it composes with memory-budgeted chunked scrubbing
+
+Usage:
+    from pixel_mask_engine import PixelMaskEngine
+
+    engine = PixelMaskEngine(all_masks, frame_w, frame_h,
+                             overlay=overlay, overlay_box=all_masks[0])
+    engine.apply(frames)          # erase + overlay, in place
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+Rect = Tuple[int, int, int, int]
+
+
+def clamp_box(box: Iterable[int], frame_w: int, frame_h: int) -> Rect:
+    """Clamp (x, y, w, h) to the frame; returns (x_start, y_start, x_end, y_end)."""
+    x, y, w, h = (int(v) for v in box)
+    return max(0, x), max(0, y), min(x + w, frame_w), min(y + h, frame_h)
+
+
+def _merge_intervals(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def combine_regions(rects: List[Rect]) -> List[Rect]:
+    """
+    Cover the union of clamped (x0, y0, x1, y1) regions with disjoint rectangles.
+
+    Rows are split at every region edge; each horizontal band gets the
+    merged x-intervals of the regions spanning it, and vertically adjacent
+    bands with identical intervals are fused back together.
+    """
+    rects = [r for r in set(rects) if r[2] > r[0] and r[3] > r[1]]
+    if len(rects) <= 1:
+        return rects
+
+    edges = sorted({y for r in rects for y in (r[1], r[3])})
+    combined: List[Rect] = []
+    open_runs: dict = {}  # (x0, x1) -> y0 of the run still growing
+    for band_top, band_bottom in zip(edges, edges[1:]):
+        intervals = set(_merge_intervals(
+            [(r[0], r[2]) for r in rects if r[1] <= band_top and r[3] >= band_bottom]
+        ))
+        for interval in list(open_runs):
+            if interval not in intervals:
+                combined.append((interval[0], open_runs.pop(interval), interval[1], band_top))
+        for interval in intervals:
+            open_runs.setdefault(interval, band_top)
+    for interval, y0 in open_runs.items():
+        combined.append((interval[0], y0, interval[1], edges[-1]))
+    return sorted(combined, key=lambda r: (r[1], r[0]))
+
+
+class PixelMaskEngine:
+    """
+    Static mask and overlay plan for frames of one geometry.
+
+    Frame stacks may be (Frames, H, W) or (Frames, H, W, C) of any dtype;
+    all writes are in place and broadcast across every frame.
+    """
+
+    def __init__(
+        self,
+        masks: Iterable[Iterable[int]],
+        frame_w: int,
+        frame_h: int,
+        overlay: Optional[np.ndarray] = None,
+        overlay_box: Optional[Iterable[int]] = None,
+    ):
+        """
+        Args:
+            masks: Boxes to erase as (x, y, w, h)
+            frame_w: Frame width (Columns)
+            frame_h: Frame height (Rows)
+            overlay: Optional (h, w, C) overlay image stamped after erasing
+            overlay_box: (x, y, w, h) where the overlay is placed
+        """
+        self.frame_w = frame_w
+        self.frame_h = frame_h
+        self.regions = combine_regions([clamp_box(b, frame_w, frame_h) for b in masks])
+
+        self.overlay: Optional[np.ndarray] = None
+        self.overlay_origin: Tuple[int, int] = (0, 0)
+        if overlay is not None and overlay_box is not None:
+            x0, y0, x1, y1 = clamp_box(overlay_box, frame_w, frame_h)
+            if x1 > x0 and y1 > y0:
+                self.overlay = overlay[:y1 - y0, :x1 - x0]
+                self.overlay_origin = (x0, y0)
+
+    def erase(self, frames: np.ndarray) -> np.ndarray:
+        """Black out every region on every frame (in place)."""
+        for x0, y0, x1, y1 in self.regions:
+            frames[:, y0:y1, x0:x1] = 0
+        return frames
+
+    def stamp(self, frames: np.ndarray) -> np.ndarray:
+        """Write the overlay onto every frame (in place)."""
+        if self.overlay is not None:
+            x0, y0 = self.overlay_origin
+            h, w = self.overlay.shape[:2]
+            frames[:, y0:y0 + h, x0:x0 + w] = self.overlay
+        return frames
+
+    def apply(self, frames: np.ndarray) -> np.ndarray:
+        """Erase then stamp (in place); returns frames for chaining."""
+        return self.stamp(self.erase(frames))
@@ -14,8 +14,10 @@ Key Features:
 
 import hashlib
 import hmac
+import os
 import re
 import secrets
+import tempfile
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -29,6 +31,8 @@ import pydicom
 from PIL import Image
 
 from utils import apply_deterministic_sanitization
+from header_rewrite import HeaderRewriteUnsupported, rewrite_header
+from pixel_invariant import pixel_sha256
 
 from .whitelist import (
     SAFE_TAGS,
@@ -237,7 +241,7 @@ class DicomAnonymizer:
         if not hasattr(ds, 'PixelData') or ds.PixelData is None:
             return None
         
-        return hashlib.sha256(ds.PixelData).hexdigest()
+        return pixel_sha256(ds)
     
     def _generate_stable_uid(self, original_uid: str) -> str:
         """
@@ -927,6 +931,11 @@ class DicomAnonymizer:
         output_path = Path(output_path) if output_path else input_path
         
         try:
+            # Pixel-clean modalities: rewrite the header, stream-copy PixelData
+            result = self._anonymize_file_metadata_only(input_path, output_path)
+            if result is not None:
+                return result
+            
             # Read DICOM file
             ds = pydicom.dcmread(str(input_path))
             
@@ -945,6 +954,53 @@ class DicomAnonymizer:
                 error_message=str(e)
             )
     
+    def _anonymize_file_metadata_only(
+        self,
+        input_path: Path,
+        output_path: Path
+    ) -> Optional[AnonymizationResult]:
+        """
+        Anonymize a file without loading its pixel data.
+        
+        Only for files that need no pixel masking: the header is
+        anonymized and PixelData is copied byte for byte (see
+        header_rewrite). Pixel hashes come from the streamed copy.
+        
+        Returns:
+            AnonymizationResult, or None if the file needs the full path
+            (pixel masking required, or a layout the fast path rejects)
+        """
+        with open(input_path, "rb") as fp:
+            header = pydicom.dcmread(fp, stop_before_pixels=True, force=True)
+        should_mask, _ = self._should_mask_pixels(header)
+        if should_mask:
+            return None
+        
+        anonymized = {}
+        
+        def _anonymize(ds: pydicom.Dataset) -> None:
+            _, anonymized["result"] = self.anonymize_dataset(ds, input_path)
+        
+        # Temp file in the output directory: output_path may be input_path
+        fd, tmp_path = tempfile.mkstemp(dir=str(output_path.parent), suffix=".part")
+        os.close(fd)
+        try:
+            rewrite = rewrite_header(str(input_path), tmp_path, _anonymize)
+            os.replace(tmp_path, str(output_path))
+        except HeaderRewriteUnsupported:
+            return None
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        
+        result = anonymized["result"]
+        result.original_pixel_hash = rewrite.pixel_invariant.input_hash
+        result.anonymized_pixel_hash = rewrite.pixel_invariant.output_hash
+        result.pixel_data_preserved = (
+            result.original_pixel_hash == result.anonymized_pixel_hash
+        )
+        return result
+    
     def anonymize_batch(
         self,
         input_paths: List[Union[str, Path]],
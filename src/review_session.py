@@ -877,6 +877,33 @@ def preflight_scan_dataset(
     )
 
 
+def preflight_scan_header(
+    record,  # voxelmask_core.header_index.HeaderRecord - not typed to avoid import dependency
+) -> Optional[ReviewFinding]:
+    """
+    Perform preflight scan from a header-index record.
+    
+    Same result as preflight_scan_dataset() on the file's dataset, without
+    reading the file again.
+    
+    Args:
+        record: HeaderRecord (sop_class_uid, sop_instance_uid,
+                series_instance_uid, modality)
+        
+    Returns:
+        ReviewFinding if the file is a reviewable type, None otherwise
+    """
+    if not record.sop_class_uid:
+        return None
+    
+    return ReviewFinding.from_sop_class(
+        sop_instance_uid=record.sop_instance_uid or "UNKNOWN",
+        sop_class_uid=record.sop_class_uid,
+        series_instance_uid=record.series_instance_uid or "UNKNOWN",
+        modality=record.modality or None,
+    )
+
+
 def preflight_scan_datasets(
     datasets: list,  # List of pydicom.Dataset
 ) -> List[ReviewFinding]:
@@ -6,6 +6,7 @@ Phase 8 Operational Hardening (4.2)
 This module provides:
 - Unique run ID generation (UUIDv4)
 - Canonical directory layout for run artefacts
+- Shared cache directories beside the runs
 - Directory creation helpers
 
 No de-identification logic. No semantic changes.
@@ -82,6 +83,27 @@ def build_run_paths(output_root: Path, run_id: str) -> RunPaths:
     )
 
 
+def build_cache_dir(output_root: Path, cache_name: str) -> Path:
+    """
+    Directory for a processing cache shared by all runs under output_root.
+    
+    Layout:
+        <output_root>/voxelmask_runs/.cache/<cache_name>/
+    
+    Caches live beside the run directories rather than inside one, so a
+    preview run, the export run and any re-export can reuse each other's
+    results. Callers create the directory; only PHI-free data belongs here.
+    
+    Args:
+        output_root: Base output directory (as for build_run_paths)
+        cache_name: Cache identifier, e.g. "detection"
+        
+    Returns:
+        Cache directory path
+    """
+    return output_root / "voxelmask_runs" / ".cache" / cache_name
+
+
 def ensure_run_dirs(run_paths: RunPaths) -> None:
     """
     Create all directories in the run layout.
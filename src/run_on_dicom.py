@@ -13,23 +13,42 @@ Usage:
 import argparse
 import gc
 import hashlib
+import os
 import sys
+import tempfile
 import uuid
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 
 import cv2
 import numpy as np
 import pydicom
+from pydicom.dataelem import DataElement
 from pydicom.uid import ExplicitVRLittleEndian, UID
 
+# Frame-level decoding for the streaming scrub (pydicom >= 3)
+try:
+    from pydicom.pixels import iter_pixels, pixel_array as decode_frame
+    PIXEL_STREAMING_AVAILABLE = True
+except ImportError:
+    PIXEL_STREAMING_AVAILABLE = False
+    iter_pixels = None
+    decode_frame = None
+
 from clinical_corrector import ClinicalCorrector
+from ocr_pool import OCREnginePool, get_ocr_pool
+from ocr_batch import OCR_SCALE_FACTOR, OCR_WHITE_THRESHOLD, predict_batch, preprocess_frames_for_ocr
+from detection_cache import DetectionCache, detection_cache_key, ocr_engine_version
+from layout_templates import DeviceSignature, LayoutTemplateStore, verify_template
+from memory_scheduler import MemoryAdmission, plan_pixel_memory
+from pixel_mask_engine import PixelMaskEngine
+from frame_fingerprint import MAX_OCR_SAMPLES, frame_grids, select_diverse_frames, zone_fingerprints
 from compliance import enforce_dicom_compliance
-from utils import apply_deterministic_sanitization, should_render_pixels, estimate_pixel_memory
+from utils import apply_deterministic_sanitization
 from pixel_invariant import (
     PixelAction,
     decide_pixel_action,
     validate_uid_only_output,
-    sha256_bytes,
+    pixel_sha256,
 )
 
 # Evidence bundle import (Gate 2/3 Model B compliance)
@@ -42,6 +61,10 @@ except ImportError:
     SCHEMA_VERSION = None
 
 
+# Elements at least this large are read lazily by process_dicom
+DEFERRED_READ_SIZE = 1024 * 1024
+PIXEL_DATA_TAG = 0x7FE00010
+
 # Namespace UUID for deterministic UID generation (random but fixed)
 DEID_NAMESPACE = uuid.UUID('a1b2c3d4-e5f6-7890-abcd-ef1234567890')
 
@@ -345,7 +368,7 @@ def process_dataset(
     # Store baseline hash for UID-only mode invariant check
     baseline_hash = None
     if pixel_action == PixelAction.NOT_APPLIED and hasattr(ds, 'PixelData') and ds.PixelData:
-        baseline_hash = sha256_bytes(ds.PixelData)
+        baseline_hash = pixel_sha256(ds)
     
     # Always anonymize metadata first
     anonymize_metadata(ds, new_name_text, research_context, clinical_context)
@@ -364,7 +387,7 @@ def process_dataset(
     if pixel_action == PixelAction.NOT_APPLIED:
         # Verify pixel data was not mutated by metadata anonymization
         if baseline_hash is not None:
-            current_hash = sha256_bytes(ds.PixelData)
+            current_hash = pixel_sha256(ds)
             if current_hash != baseline_hash:
                 raise RuntimeError(
                     f"Pixel invariant violated during metadata anonymization: "
@@ -410,6 +433,8 @@ class DetectionResult:
         confidence_scores: Raw confidence scores for audit (may be empty)
         region_zones: Zone classification for each box ("HEADER", "FOOTER", "BODY")
         image_height: Image height used for zone calculation
+        transient_boxes: Header/footer boxes seen on later sampled frames but
+            not on the first (text shown only mid-clip); masked with static_box
     """
     static_box: tuple  # (x, y, w, h) or None
     all_detected_boxes: list  # List of (x, y, w, h)
@@ -419,6 +444,52 @@ class DetectionResult:
     # Phase 4 Option B: Zone classification
     region_zones: list = None  # List of zone strings for each box
     image_height: int = None  # Image height for zone calculations
+    transient_boxes: list = None  # List of (x, y, w, h) shown only mid-clip
+
+
+# AI detection OCRs the header/footer bands first (ROI mode); the full
+# frame is OCR'd only when the bands give no confident detection
+OCR_ROI_MODE = True
+
+# Rows added below the header band and above the footer band (fraction of
+# the image height) so text lines straddling a zone threshold are OCR'd whole
+ROI_BAND_MARGIN = 0.04
+
+# Minimum (aggregated) confidence for an ROI pass to stand on its own
+ROI_MIN_CONFIDENCE = 0.80
+
+# Everything other than the pixels and the sampled frames that determines
+# detect_text_box_from_array output; part of every detection cache key
+OCR_DETECTION_PARAMS = {
+    "display": "uint8_rgb_clip_max_scaled",
+    "scale_factor": OCR_SCALE_FACTOR,
+    "interpolation": "INTER_CUBIC",
+    "white_threshold": OCR_WHITE_THRESHOLD,
+    "engine_settings": {"lang": "en", "det_db_thresh": 0.1},
+    "static_box_tolerance": 20,
+    "transient_boxes": "header_footer",
+    "roi": {"enabled": OCR_ROI_MODE, "band_margin": ROI_BAND_MARGIN, "min_confidence": ROI_MIN_CONFIDENCE},
+}
+
+
+def _detection_to_cache(result: DetectionResult) -> dict:
+    """DetectionResult as a cache payload (geometry and scores only, no text)."""
+    return asdict(result)
+
+
+def _detection_from_cache(payload: dict) -> DetectionResult:
+    """Rebuild a DetectionResult from a cache payload (JSON lists -> tuples)."""
+    static_box = payload.get("static_box")
+    return DetectionResult(
+        static_box=tuple(static_box) if static_box is not None else None,
+        all_detected_boxes=[tuple(box) for box in payload.get("all_detected_boxes", [])],
+        detection_strength=payload.get("detection_strength"),
+        ocr_failure=bool(payload.get("ocr_failure", False)),
+        confidence_scores=[float(c) for c in payload.get("confidence_scores", [])],
+        region_zones=payload.get("region_zones"),
+        image_height=payload.get("image_height"),
+        transient_boxes=[tuple(box) for box in payload.get("transient_boxes") or []],
+    )
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -438,6 +509,14 @@ MODALITY_ZONE_THRESHOLDS = {
 }
 
 
+def _zone_thresholds(modality: str = None) -> tuple:
+    """(header, footer) fractions of image height, modality-specific or default."""
+    if modality and modality.upper() in MODALITY_ZONE_THRESHOLDS:
+        thresholds = MODALITY_ZONE_THRESHOLDS[modality.upper()]
+        return thresholds["header"], thresholds["footer"]
+    return ZONE_HEADER_THRESHOLD, ZONE_FOOTER_THRESHOLD
+
+
 def _classify_zone(y: int, h: int, image_height: int, modality: str = None) -> str:
     """
     Classify a detected region's zone based on vertical position.
@@ -461,14 +540,7 @@ def _classify_zone(y: int, h: int, image_height: int, modality: str = None) -> s
     if image_height <= 0:
         return "BODY"  # Defensive
     
-    # Get thresholds (modality-specific or default)
-    if modality and modality.upper() in MODALITY_ZONE_THRESHOLDS:
-        thresholds = MODALITY_ZONE_THRESHOLDS[modality.upper()]
-        header_threshold = thresholds["header"]
-        footer_threshold = thresholds["footer"]
-    else:
-        header_threshold = ZONE_HEADER_THRESHOLD
-        footer_threshold = ZONE_FOOTER_THRESHOLD
+    header_threshold, footer_threshold = _zone_thresholds(modality)
     
     # Use center of box for classification
     box_center_y = y + (h / 2)
@@ -550,10 +622,185 @@ def _aggregate_confidence(scores: list) -> float:
     return min(scores)
 
 
+def _sample_frame_indices(num_frames: int) -> list:
+    """Frames sampled for OCR: all of a short clip, else the first and last 5."""
+    if num_frames < 2:
+        return [0]
+    if num_frames < 10:
+        return list(range(num_frames))
+    return list(range(5)) + list(range(num_frames - 5, num_frames))
+
+
+def _ocr_sample_indices(source, modality: str = None, max_value=None) -> list:
+    """
+    Frames to OCR: a small, diverse set chosen by annotation-zone fingerprint.
+
+    Runs of near-identical frames are collapsed so static cines are not
+    OCR'd ten times, and text that appears only mid-clip gets sampled.
+    Falls back to _sample_frame_indices if fingerprinting fails.
+    """
+    if source.num_frames <= 2:
+        return _sample_frame_indices(source.num_frames)
+    try:
+        header, footer = _zone_thresholds(modality)
+        fingerprints = zone_fingerprints(source.frame_grids(), header, footer, max_value)
+        return select_diverse_frames(fingerprints, max_samples=MAX_OCR_SAMPLES)
+    except Exception as e:
+        print(f"[OCR SAMPLE] Fingerprinting failed ({e}); using first/last frames")
+        return _sample_frame_indices(source.num_frames)
+
+
+def _parse_ocr_result(result, scale_factor: float, y_offset: int = 0) -> tuple:
+    """
+    Boxes and confidence scores from one raw OCR engine result.
+
+    Coordinates are scaled back from the upscaled OCR image and shifted
+    down by y_offset (the top row of the crop that was OCR'd).
+
+    Returns:
+        (boxes as (x, y, w, h), confidence scores)
+    """
+    boxes = []
+    scores = []
+    if result and isinstance(result, list) and len(result) > 0:
+        res = result[0]
+        if isinstance(res, dict) and 'det_boxes' in res:
+            # Dict format: {'det_boxes': [...], 'det_scores': [...]}
+            det_scores = res.get('det_scores', [])
+            for i, box_points in enumerate(res['det_boxes']):
+                boxes.append(_scaled_box(box_points, scale_factor, y_offset))
+                # Extract confidence if available
+                if i < len(det_scores):
+                    scores.append(float(det_scores[i]))
+        elif isinstance(res, list):
+            # List format: [[[box_points], (text, confidence)], ...]
+            for line in res:
+                boxes.append(_scaled_box(line[0], scale_factor, y_offset))
+                # Extract confidence from (text, confidence) tuple
+                if len(line) > 1 and isinstance(line[1], (tuple, list)) and len(line[1]) > 1:
+                    scores.append(float(line[1][1]))
+    return boxes, scores
+
+
+def _scaled_box(box_points, scale_factor: float, y_offset: int = 0) -> tuple:
+    """OCR box corner points -> (x, y, w, h) in original frame pixels."""
+    x_coords = [p[0] for p in box_points]
+    y_coords = [p[1] for p in box_points]
+    x = int(min(x_coords) / scale_factor)
+    y = int(min(y_coords) / scale_factor) + y_offset
+    w = int((max(x_coords) - min(x_coords)) / scale_factor)
+    h = int((max(y_coords) - min(y_coords)) / scale_factor)
+    return (x, y, w, h)
+
+
+def _run_ocr_pass(corrector: ClinicalCorrector, crops: list, sample_indices: list) -> tuple:
+    """
+    OCR preprocessed images and collect boxes per sampled frame.
+
+    Args:
+        corrector: ClinicalCorrector with a loaded OCR engine
+        crops: (frame position, preprocessed image, y offset) in frame order;
+               a frame may contribute several crops (ROI bands)
+        sample_indices: Frame index of each position (for error messages)
+
+    Returns:
+        (per-frame box lists, all boxes, confidence scores, OCR failure)
+    """
+    # One engine call for all images; engines that cannot batch are called per image
+    batch_results = None
+    if len(crops) > 1:
+        batch_results = predict_batch(corrector.ocr, [image for _, image, _ in crops])
+
+    all_boxes = [[] for _ in sample_indices]
+    all_detected_boxes = []  # For debug output
+    all_confidence_scores = []  # Phase 4: collect confidence
+    ocr_failure_occurred = False  # Phase 4: track failures
+    for crop_idx, (pos, image, y_offset) in enumerate(crops):
+        try:
+            if batch_results is not None:
+                result = [batch_results[crop_idx]]
+            else:
+                result = corrector.ocr.predict(image)
+            boxes, scores = _parse_ocr_result(result, OCR_SCALE_FACTOR, y_offset)
+            all_boxes[pos].extend(boxes)
+            all_detected_boxes.extend(boxes)
+            all_confidence_scores.extend(scores)
+        except Exception as e:
+            print(f"OCR error on frame {sample_indices[pos]}: {e}")
+            ocr_failure_occurred = True  # Phase 4: explicit failure tracking
+    return all_boxes, all_detected_boxes, all_confidence_scores, ocr_failure_occurred
+
+
+def _ocr_full_pass(corrector: ClinicalCorrector, frames: np.ndarray, sample_indices: list) -> tuple:
+    """OCR whole frames, pre-processed in one pass ("The Glasses")."""
+    processed = preprocess_frames_for_ocr(frames)
+    return _run_ocr_pass(corrector, [(pos, processed[pos], 0) for pos in range(len(frames))], sample_indices)
+
+
+def _roi_bands(image_height: int, modality: str = None) -> list:
+    """
+    Row ranges (y0, y1) of the header and footer OCR bands.
+
+    Bands follow the modality's zone thresholds plus ROI_BAND_MARGIN;
+    bands that would overlap are merged into one full-height band.
+    """
+    header, footer = _zone_thresholds(modality)
+    margin = int(np.ceil(ROI_BAND_MARGIN * image_height))
+    header_end = min(image_height, int(np.ceil(header * image_height)) + margin)
+    footer_start = max(0, int(footer * image_height) - margin)
+    if footer_start <= header_end:
+        return [(0, image_height)]
+    return [(0, header_end), (footer_start, image_height)]
+
+
+def _ocr_roi_pass(corrector: ClinicalCorrector, frames: np.ndarray, sample_indices: list,
+                  modality: str = None) -> tuple:
+    """OCR only the header/footer bands of each frame; boxes in frame coordinates."""
+    bands = _roi_bands(frames.shape[1], modality)
+    processed = [preprocess_frames_for_ocr(frames[:, y0:y1]) for y0, y1 in bands]
+    crops = [
+        (pos, band_frames[pos], y0)
+        for pos in range(len(frames))
+        for (y0, _), band_frames in zip(bands, processed)
+    ]
+    return _run_ocr_pass(corrector, crops, sample_indices)
+
+
+def _roi_pass_confident(ocr_pass: tuple) -> bool:
+    """An ROI pass is trusted only if OCR ran cleanly and found text with high scores."""
+    _, detected_boxes, scores, failure = ocr_pass
+    if failure or not detected_boxes or len(scores) < len(detected_boxes):
+        return False
+    return _aggregate_confidence(scores) >= ROI_MIN_CONFIDENCE
+
+
+def _transient_annotation_boxes(corrector: ClinicalCorrector, all_boxes: list, image_height: int,
+                                modality: str = None) -> list:
+    """
+    Header/footer boxes on later sampled frames that the first frame lacks.
+
+    Text burned in for part of a clip cannot match the first frame, so it is
+    never the static box; these boxes are masked alongside it. Body boxes
+    are left out so one OCR hit never blacks out anatomy.
+    """
+    reference = all_boxes[0] if all_boxes else []
+    transient = []
+    for frame_boxes in all_boxes[1:]:
+        for box in frame_boxes:
+            if _classify_zone(box[1], box[3], image_height, modality) == "BODY":
+                continue
+            if any(corrector._boxes_overlap(box, seen, tolerance=20) for seen in reference + transient):
+                continue
+            transient.append(tuple(box))
+    return transient
+
+
 def detect_text_box_from_array(
     corrector: ClinicalCorrector,
     arr: np.ndarray,
-    debug_frame: np.ndarray = None
+    debug_frame: np.ndarray = None,
+    roi: bool = False,
+    modality: str = None,
 ) -> DetectionResult:
     """
     Detect static text region from a numpy array (first frame).
@@ -562,9 +809,13 @@ def detect_text_box_from_array(
     and failure state. Detection-only — no masking behavior changes.
 
     Args:
-        corrector: ClinicalCorrector instance
+        corrector: ClinicalCorrector instance (typically borrowed from the
+                   OCR engine pool via ocr_pool.get_ocr_pool().corrector())
         arr: 4D numpy array (Frames, H, W, C)
         debug_frame: If provided, will be modified with red detection boxes
+        roi: If True, OCR only the header/footer bands (see _roi_bands) and
+             fall back to the full frame when the bands are not confident
+        modality: Modality for the ROI band thresholds
 
     Returns:
         DetectionResult containing:
@@ -573,84 +824,28 @@ def detect_text_box_from_array(
         - detection_strength: LOW/MEDIUM/HIGH or None if OCR failed
         - ocr_failure: True if OCR engine threw exception
         - confidence_scores: raw scores for audit
+        - transient_boxes: header/footer boxes shown only after the first frame
     """
     # Sample first and last frames for detection
-    num_frames = arr.shape[0]
-    if num_frames < 2:
-        sample_indices = [0]
-    elif num_frames < 10:
-        sample_indices = list(range(num_frames))
-    else:
-        sample_indices = list(range(5)) + list(range(num_frames - 5, num_frames))
+    sample_indices = _sample_frame_indices(arr.shape[0])
 
-    all_boxes = []
-    all_detected_boxes = []  # For debug output
-    all_confidence_scores = []  # Phase 4: collect confidence
-    ocr_failure_occurred = False  # Phase 4: track failures
-    
     # Phase 4 Option B: Get image dimensions for zone classification
     image_height = arr.shape[1] if len(arr.shape) >= 2 else 0
 
-    for idx in sample_indices:
-        frame = arr[idx]
-        # Ensure frame is BGR for OCR (convert if grayscale)
-        if frame.ndim == 2:
-            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
-        elif frame.shape[2] == 4:
-            frame = cv2.cvtColor(frame, cv2.COLOR_RGBA2BGR)
-
-        # Pre-process frame for better OCR detection ("The Glasses")
-        frame_processed = corrector._preprocess_for_ocr(frame)
-
-        # Scale factor for converting back from upscaled coordinates
-        scale_factor = 2
-
-        try:
-            result = corrector.ocr.predict(frame_processed)
-            frame_boxes = []
-
-            if result and isinstance(result, list) and len(result) > 0:
-                res = result[0]
-                if isinstance(res, dict) and 'det_boxes' in res:
-                    # Dict format: {'det_boxes': [...], 'det_scores': [...]}
-                    det_scores = res.get('det_scores', [])
-                    for i, box_points in enumerate(res['det_boxes']):
-                        x_coords = [p[0] for p in box_points]
-                        y_coords = [p[1] for p in box_points]
-                        # Scale back to original size
-                        x = int(min(x_coords) / scale_factor)
-                        y = int(min(y_coords) / scale_factor)
-                        w = int((max(x_coords) - min(x_coords)) / scale_factor)
-                        h = int((max(y_coords) - min(y_coords)) / scale_factor)
-                        frame_boxes.append((x, y, w, h))
-                        all_detected_boxes.append((x, y, w, h))
-                        # Extract confidence if available
-                        if i < len(det_scores):
-                            all_confidence_scores.append(float(det_scores[i]))
-                elif isinstance(res, list):
-                    # List format: [[[box_points], (text, confidence)], ...]
-                    for line in res:
-                        box_points = line[0]
-                        x_coords = [p[0] for p in box_points]
-                        y_coords = [p[1] for p in box_points]
-                        # Scale back to original size
-                        x = int(min(x_coords) / scale_factor)
-                        y = int(min(y_coords) / scale_factor)
-                        w = int((max(x_coords) - min(x_coords)) / scale_factor)
-                        h = int((max(y_coords) - min(y_coords)) / scale_factor)
-                        frame_boxes.append((x, y, w, h))
-                        all_detected_boxes.append((x, y, w, h))
-                        # Extract confidence from (text, confidence) tuple
-                        if len(line) > 1 and isinstance(line[1], (tuple, list)) and len(line[1]) > 1:
-                            all_confidence_scores.append(float(line[1][1]))
-
-            all_boxes.append(frame_boxes)
-        except Exception as e:
-            print(f"OCR error on frame {idx}: {e}")
-            all_boxes.append([])
-            ocr_failure_occurred = True  # Phase 4: explicit failure tracking
+    # ROI mode: OCR only the header/footer bands; the full frame is OCR'd
+    # only when the bands give no confident detection
+    ocr_pass = None
+    if roi:
+        ocr_pass = _ocr_roi_pass(corrector, arr[sample_indices], sample_indices, modality)
+        if not _roi_pass_confident(ocr_pass):
+            print("[OCR ROI] Header/footer bands not confident - running full-frame OCR")
+            ocr_pass = None
+    if ocr_pass is None:
+        ocr_pass = _ocr_full_pass(corrector, arr[sample_indices], sample_indices)
+    all_boxes, all_detected_boxes, all_confidence_scores, ocr_failure_occurred = ocr_pass
 
     print(f"Total boxes detected across all frames: {len(all_detected_boxes)}")
+    transient_boxes = _transient_annotation_boxes(corrector, all_boxes, image_height, modality)
 
     # Phase 4: Compute detection strength from confidence
     if ocr_failure_occurred:
@@ -684,6 +879,7 @@ def detect_text_box_from_array(
             confidence_scores=all_confidence_scores,
             region_zones=region_zones,
             image_height=image_height,
+            transient_boxes=transient_boxes,
         )
 
     reference_boxes = all_boxes[0]
@@ -713,6 +909,7 @@ def detect_text_box_from_array(
             confidence_scores=all_confidence_scores,
             region_zones=region_zones,
             image_height=image_height,
+            transient_boxes=transient_boxes,
         )
 
     # Phase 4 Option B: Classify zones for fallback path
@@ -725,9 +922,354 @@ def detect_text_box_from_array(
         confidence_scores=all_confidence_scores,
         region_zones=region_zones,
         image_height=image_height,
+        transient_boxes=transient_boxes,
     )
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# PIXEL SCRUB HELPERS
+# Operate on frame stacks (Frames, H, W, C) so process_dicom can scrub the
+# whole clip at once or in frame chunks under a memory budget.
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _as_frame_stack(arr: np.ndarray) -> np.ndarray:
+    """
+    View a decoded pixel array as (Frames, H, W, C) without copying.
+
+    Grayscale data keeps C == 1; RGB expansion happens per chunk.
+    """
+    if arr.ndim == 2:
+        # Grayscale single frame: (H, W) -> (1, H, W, 1)
+        return arr[np.newaxis, :, :, np.newaxis]
+    if arr.ndim == 3:
+        if arr.shape[2] in (3, 4):
+            # Single frame with channels: (H, W, C) -> (1, H, W, C)
+            return arr[np.newaxis, :, :, :]
+        # Grayscale video: (Frames, H, W) -> (Frames, H, W, 1)
+        return arr[:, :, :, np.newaxis]
+    return arr
+
+
+def _to_display_rgb(frames: np.ndarray, max_value) -> np.ndarray:
+    """
+    Convert a frame stack to a new writable uint8 RGB(A) array.
+
+    Higher bit depths are scaled by the clip-wide max_value so every
+    chunk maps to the same 8-bit range.
+    """
+    rgb = np.repeat(frames, 3, axis=3) if frames.shape[3] == 1 else frames
+    if rgb.dtype != np.uint8:
+        if max_value > 255:
+            return ((rgb.astype(np.float32) / max_value) * 255).astype(np.uint8)
+        return rgb.astype(np.uint8)
+    return rgb.copy() if rgb is frames else rgb
+
+
+def _stack_frames(frames: list) -> np.ndarray:
+    """Stack individually decoded frames into (Frames, H, W, C)."""
+    stack = np.stack(frames)
+    return stack[..., np.newaxis] if stack.ndim == 3 else stack
+
+
+class _InMemoryFrames:
+    """Frame source over the whole decoded clip (ds.pixel_array), never copied."""
+
+    streaming = False
+
+    def __init__(self, ds: pydicom.Dataset):
+        self._ds = ds
+        self._frames = _as_frame_stack(ds.pixel_array)
+        self.shape = self._frames.shape
+        self.num_frames, self.frame_h, self.frame_w = self.shape[:3]
+        self.dtype = self._frames.dtype
+
+    def source_hash(self) -> str:
+        return pixel_sha256(self._ds)
+
+    def max_value(self):
+        return self._frames.max()
+
+    def take(self, indices: list) -> np.ndarray:
+        return self._frames[indices]
+
+    def frame_grids(self) -> np.ndarray:
+        return frame_grids(self._frames)
+
+    def chunks(self, chunk_size: int):
+        for start in range(0, self.num_frames, chunk_size):
+            stop = min(start + chunk_size, self.num_frames)
+            yield start, stop, self._frames[start:stop]
+
+
+class _StreamedFrames:
+    """
+    Frame source that decodes from the file on demand (pydicom >= 3).
+
+    PixelData is never loaded whole: each pass decodes frame by frame, so
+    memory is bounded by the chunk size rather than the frame count.
+    """
+
+    streaming = True
+
+    def __init__(self, path: str, ds: pydicom.Dataset):
+        self._path = path
+        self._ds = ds
+        first = _stack_frames([decode_frame(path, index=0)])
+        self.num_frames = max(1, int(getattr(ds, 'NumberOfFrames', 1) or 1))
+        self.shape = (self.num_frames,) + first.shape[1:]
+        self.frame_h, self.frame_w = first.shape[1:3]
+        self.dtype = first.dtype
+        self._scan = None
+
+    def _scan_frames(self) -> tuple:
+        """
+        One decode pass: (clip max, sha256 of the decoded native bytes,
+        fingerprint grids).
+        """
+        if self._scan is None:
+            digest = hashlib.sha256()
+            max_value = None
+            total = 0
+            grids = []
+            for frame in iter_pixels(self._path):
+                frame = np.ascontiguousarray(frame)
+                digest.update(frame)
+                total += frame.nbytes
+                frame_max = frame.max()
+                max_value = frame_max if max_value is None else max(max_value, frame_max)
+                grids.append(frame_grids(_stack_frames([frame])))
+            if total % 2:
+                digest.update(b'\x00')  # Matches the even-length padding of ds.decompress()
+            self._scan = (max_value, digest.hexdigest(), np.concatenate(grids))
+        return self._scan
+
+    def source_hash(self) -> str:
+        # Native data: hash the stored bytes straight from the file
+        raw = self._ds.get_item('PixelData', keep_deferred=True)
+        transfer_syntax = getattr(getattr(self._ds, 'file_meta', None), 'TransferSyntaxUID', None)
+        if (
+            raw is not None and getattr(raw, 'value', None) is None
+            and transfer_syntax is not None and not transfer_syntax.is_compressed
+            and not transfer_syntax.is_deflated
+        ):
+            digest = hashlib.sha256()
+            remaining = raw.length
+            with open(self._path, 'rb') as fh:
+                fh.seek(raw.value_tell)
+                while remaining > 0:
+                    block = fh.read(min(remaining, 1024 * 1024))
+                    if not block:
+                        break
+                    digest.update(block)
+                    remaining -= len(block)
+            return digest.hexdigest()
+        return self._scan_frames()[1]
+
+    def max_value(self):
+        return self._scan_frames()[0]
+
+    def take(self, indices: list) -> np.ndarray:
+        return _stack_frames(list(iter_pixels(self._path, indices=indices)))
+
+    def frame_grids(self) -> np.ndarray:
+        return self._scan_frames()[2]
+
+    def chunks(self, chunk_size: int):
+        batch = []
+        start = 0
+        for frame in iter_pixels(self._path):
+            batch.append(frame)
+            if len(batch) == chunk_size:
+                yield start, start + len(batch), _stack_frames(batch)
+                start += len(batch)
+                batch = []
+        if batch:
+            yield start, start + len(batch), _stack_frames(batch)
+
+
+class _ArrayFrameSink:
+    """Collects scrubbed chunks into one output array."""
+
+    def __init__(self, shape: tuple, dtype):
+        self._arr = np.empty(shape, dtype=dtype)
+
+    def write(self, start: int, stop: int, chunk: np.ndarray) -> None:
+        self._arr[start:stop] = chunk
+
+    def finish(self) -> np.ndarray:
+        # For single frame, remove the frame dimension
+        return self._arr[0] if self._arr.shape[0] == 1 else self._arr
+
+
+class _SpoolFrameSink:
+    """
+    Re-encodes scrubbed chunks straight into a temporary file next to the
+    output, hashing as it goes. The file becomes a buffered PixelData value
+    that pydicom streams on save, so the output is never held in memory.
+    """
+
+    def __init__(self, directory: str):
+        self._fh = tempfile.TemporaryFile(dir=directory or None)
+        self._digest = hashlib.sha256()
+        self.nbytes = 0
+
+    def write(self, start: int, stop: int, chunk: np.ndarray) -> None:
+        chunk = np.ascontiguousarray(chunk)
+        self._fh.write(chunk)
+        self._digest.update(chunk)
+        self.nbytes += chunk.nbytes
+
+    def finish(self):
+        if self.nbytes % 2:
+            self._fh.write(b'\x00')  # PixelData must have even length
+        self._fh.seek(0)
+        return self._fh
+
+    @property
+    def sha256(self) -> str:
+        """Hash of the pixel bytes (before even-length padding)."""
+        return self._digest.hexdigest()
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+def _build_overlay_text(research_context: dict, clinical_context: dict, new_name_text: str, scan_datetime: str) -> str:
+    """Build the burned-in overlay label for research or clinical correction mode."""
+    if research_context:
+        # Research mode - construct comprehensive research label (Clinical Trial format)
+        trial_id = research_context.get('trial_id', research_context.get('study_id', 'TRIAL'))
+        site_id = research_context.get('site_id', 'SITE-01')
+        subject_id = research_context.get('subject_id', 'SUB-001')
+        time_point = research_context.get('time_point', 'Baseline')
+        
+        # Build standard Clinical Trial header: "{TrialID} | Site: {SiteID} | Sub: {SubjectID} | {Timepoint} | {ScanDate}"
+        overlay_text = f"{trial_id} | Site: {site_id} | Sub: {subject_id} | {time_point} | {scan_datetime}"
+        print(f"[MODE] Research De-ID: Overlaying '{overlay_text}'")
+    elif clinical_context and clinical_context.get('patient_name'):
+        # Clinical mode with full context - build Toshiba/Aplio style header
+        # Line 1: [Accession]:PATIENT NAME | [Sex] [Age] | [Date]
+        # Line 2: [Location] | [Study Type] | [GA] | [Sonographer] | [Time]
+        
+        patient_name = clinical_context.get('patient_name', new_name_text)
+        accession = clinical_context.get('accession_number', '')
+        patient_sex = clinical_context.get('patient_sex', '')
+        patient_dob = clinical_context.get('patient_dob', '')
+        study_date_str = clinical_context.get('study_date', '')
+        study_time_str = clinical_context.get('study_time', '')
+        location = clinical_context.get('location', '')
+        study_type = clinical_context.get('study_type', '')
+        gestational_age = clinical_context.get('gestational_age', '')
+        sonographer = clinical_context.get('sonographer', '')
+        
+        # Calculate age if DOB provided
+        age_str = ''
+        if patient_dob:
+            try:
+                from datetime import datetime, date
+                dob = datetime.strptime(patient_dob, '%Y-%m-%d').date()
+                today = date.today()
+                age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+                age_str = str(age)
+            except:
+                pass
+        
+        # Format date for display (YYYY-MM-DD -> DD/MM/YYYY)
+        display_date = ''
+        if study_date_str:
+            try:
+                parts = study_date_str.split('-')
+                if len(parts) == 3:
+                    display_date = f"{parts[2]}/{parts[1]}/{parts[0]}"
+            except:
+                display_date = study_date_str
+        
+        # Format time for display (HH:MM:SS -> H:MM:SS PM)
+        display_time = ''
+        if study_time_str:
+            try:
+                from datetime import datetime
+                t = datetime.strptime(study_time_str, '%H:%M:%S')
+                display_time = t.strftime('%I:%M:%S %p').lstrip('0')
+            except:
+                display_time = study_time_str
+        
+        # Build Line 1: Accession:NAME | Sex Age | Date
+        line1_parts = []
+        if accession:
+            line1_parts.append(f"{accession}:{patient_name}")
+        else:
+            line1_parts.append(patient_name)
+        
+        if patient_sex or age_str:
+            sex_age = f"{patient_sex} {age_str}".strip()
+            line1_parts.append(sex_age)
+        
+        if display_date:
+            line1_parts.append(display_date)
+        
+        line1 = "  |  ".join(line1_parts) if len(line1_parts) > 1 else line1_parts[0] if line1_parts else patient_name
+        
+        # Build Line 2: Location | Type | GA | Sonographer | Time
+        line2_parts = []
+        if location:
+            line2_parts.append(location)
+        if study_type:
+            line2_parts.append(study_type)
+        if gestational_age:
+            line2_parts.append(gestational_age)
+        if sonographer:
+            line2_parts.append(sonographer)
+        if display_time:
+            line2_parts.append(display_time)
+        
+        line2 = "  |  ".join(line2_parts) if line2_parts else ''
+        
+        # Combine lines
+        if line2:
+            overlay_text = f"{line1}\n{line2}"
+        else:
+            overlay_text = line1
+        
+        print(f"[MODE] Clinical Correction (Full): Overlaying '{overlay_text}'")
+    else:
+        # Clinical mode - basic, just display new patient name
+        overlay_text = new_name_text
+        print(f"[MODE] Clinical Correction (Basic): Overlaying '{overlay_text}'")
+    
+    return overlay_text
+
+
+def _layout_template_masks(ds, source, layout_templates: LayoutTemplateStore, ocr_pool: OCREnginePool, max_value) -> list:
+    """
+    Mask regions from the device's layout template, verified by one-frame OCR.
+
+    Returns the template regions if OCR on the first frame finds no text
+    outside them, otherwise None (caller runs full AI detection).
+    """
+    signature = DeviceSignature.from_dataset(ds)
+    template = layout_templates.get(signature)
+    if template is None:
+        return None
+
+    print(f"[LAYOUT] Template for {signature.label()}: {len(template.regions)} region(s), verifying on 1 frame")
+    sample = _to_display_rgb(source.take([0]), max_value)
+    if ocr_pool is None:
+        ocr_pool = get_ocr_pool()
+    with ocr_pool.corrector() as ocr_corrector:
+        check = detect_text_box_from_array(ocr_corrector, sample)
+    del sample
+
+    verified = not check.ocr_failure and verify_template(template.regions, check.all_detected_boxes)
+    layout_templates.record_verification(template, verified)
+    if not verified:
+        print(f"[LAYOUT] Verification failed ({len(check.all_detected_boxes)} box(es), "
+              f"OCR failure: {check.ocr_failure}) - falling back to full detection")
+        return None
+    print("[LAYOUT] Verified - using template regions, full OCR skipped")
+    return [tuple(r) for r in template.regions]
+
+
 # NOTE: process_dicom is integration-heavy (I/O + pixel pipeline)
 # and is intentionally excluded from unit-level coverage.
 def process_dicom(  # pragma: no cover
@@ -740,6 +1282,10 @@ def process_dicom(  # pragma: no cover
     mask_list: list = None,
     clinical_context: dict = None,
     evidence_bundle: 'EvidenceBundle' = None,
+    ocr_pool: OCREnginePool = None,
+    memory_admission: MemoryAdmission = None,
+    detection_cache: DetectionCache = None,
+    layout_templates: LayoutTemplateStore = None,
 ) -> bool:
     """
     Process a DICOM file to de-identify patient information.
@@ -756,6 +1302,16 @@ def process_dicom(  # pragma: no cover
                    Used for interactive redaction mode. Takes precedence over manual_box.
         clinical_context: Optional dict with clinical correction fields (patient demographics,
                          study info, personnel, audit trail)
+        evidence_bundle: Optional EvidenceBundle to record hashes, detections and decisions
+        ocr_pool: OCR engine pool to borrow from for AI detection.
+                  Defaults to the process-wide pool (ocr_pool.get_ocr_pool()).
+        memory_admission: Memory plan from a MemoryBudgetScheduler. Defaults to
+                          plan_pixel_memory(ds) with the default budget; CHUNKED
+                          plans scrub frames in chunks instead of skipping pixels.
+        detection_cache: Optional DetectionCache; AI detection results are reused
+                         for identical pixels and sampling, skipping OCR.
+        layout_templates: Optional LayoutTemplateStore; files from a device with a
+                          learned layout use its regions after a one-frame OCR check.
 
     Returns:
         True if processing succeeded, False otherwise
@@ -767,10 +1323,13 @@ def process_dicom(  # pragma: no cover
     # ═══════════════════════════════════════════════════════════════════════════
     source_sop_uid = None
     source_pixel_hash = None
+    masked_pixel_hash = None
 
     # Load the DICOM file (force=True handles files without standard header)
     try:
-        ds = pydicom.dcmread(input_path, force=True)
+        # Large values (PixelData) are read on demand, so a streamed scrub
+        # never loads the whole clip
+        ds = pydicom.dcmread(input_path, force=True, defer_size=DEFERRED_READ_SIZE)
         # EVIDENCE: Extract source UIDs immediately
         source_sop_uid = str(getattr(ds, 'SOPInstanceUID', 'UNKNOWN'))
         source_series_uid = str(getattr(ds, 'SeriesInstanceUID', 'UNKNOWN'))
@@ -814,10 +1373,14 @@ def process_dicom(  # pragma: no cover
     print(f"Input format: {original_photometric}")
 
     # ═══════════════════════════════════════════════════════════════════════════
-    # MEMORY GUARD: SKIP PIXELS IF TOO LARGE
+    # MEMORY BUDGET: FULL, CHUNKED or SKIP (see memory_scheduler)
     # ═══════════════════════════════════════════════════════════════════════════
-    if not should_render_pixels(ds):
-        est_bytes = estimate_pixel_memory(ds)
+    if memory_admission is None:
+        memory_admission = plan_pixel_memory(ds)
+    all_masks = []  # List of (x, y, w, h) tuples
+
+    if memory_admission.skipped:
+        est_bytes = memory_admission.estimated_bytes
         print(f"⚠️ [MEMORY GUARD] Skipping pixel processing. Estimate: {est_bytes / (1024*1024):.1f} MB (Uncompressed)")
         
         # Log to evidence bundle
@@ -825,28 +1388,40 @@ def process_dicom(  # pragma: no cover
             try:
                 evidence_bundle.add_exception(
                     exception_type="PIXEL_PROCESSING_SKIPPED",
-                    message=f"Dataset too large for pixel processing (Estimate: {est_bytes} bytes). Metadata anonymization only.",
+                    message=f"Single frame exceeds pixel memory budget (Estimate: {est_bytes} bytes). Metadata anonymization only.",
                     severity="WARNING",
                     source_sop_uid=source_sop_uid
                 )
             except:
                 pass
-        
-        # Skip pixel processing blocks, jump to metadata
-        # We need to set arr_out to None or similar to signal "no new pixels"
-        # But wait, the code below expects arr_out.
-        # We should probably restructure the flow or wrap the HUGE block in "if render_pixels:"
-        
-        # Better strategy: Wrap the entire pixel pipeline in an else block or return early if I can refactor.
-        # Given the linear structure, let's use a flag.
         pixel_processing_enabled = False
-        all_masks = []  # Initialize to empty when pixel processing is skipped
     else:
+        if memory_admission.chunked:
+            print(f"[MEMORY GUARD] Chunked pixel processing: {memory_admission.frames_per_chunk} "
+                  f"of {memory_admission.num_frames} frame(s) per chunk "
+                  f"(Estimate: {memory_admission.estimated_bytes / (1024*1024):.1f} MB)")
+            if evidence_bundle:
+                try:
+                    evidence_bundle.add_exception(
+                        exception_type="PIXEL_PROCESSING_CHUNKED",
+                        message=(
+                            f"Dataset exceeds pixel memory budget (Estimate: {memory_admission.estimated_bytes} bytes). "
+                            f"Masked in chunks of {memory_admission.frames_per_chunk} frame(s)."
+                        ),
+                        severity="INFO",
+                        source_sop_uid=source_sop_uid
+                    )
+                except:
+                    pass
         pixel_processing_enabled = True
 
+    # Streaming: CHUNKED plans decode and re-encode frame chunks straight from/to
+    # disk, so neither the decoded clip nor the output is ever held whole
+    stream_pixels = pixel_processing_enabled and memory_admission.chunked and PIXEL_STREAMING_AVAILABLE
+
     # Decompress pixels (required for OpenCV editing)
     # Note: pydicom usually converts YBR* to RGB automatically on decompress
-    if pixel_processing_enabled:
+    if pixel_processing_enabled and not stream_pixels:
         print("Decompressing pixel data...")
         try:
             ds.decompress()
@@ -854,14 +1429,19 @@ def process_dicom(  # pragma: no cover
             print(f"Warning: Decompression failed or not needed: {e}")
 
 
-    # Get pixel array
+    # Get pixel source
     if pixel_processing_enabled:
         try:
-            arr = ds.pixel_array.copy()  # Copy to ensure writability
+            if stream_pixels:
+                print("[STREAM] Decoding pixel data frame by frame from disk")
+                source = _StreamedFrames(input_path, ds)
+            else:
+                # Read-only source: every chunk is converted into a fresh array
+                source = _InMemoryFrames(ds)
             # EVIDENCE: Compute source pixel hash BEFORE any modification (Model B backbone)
             if evidence_bundle:
                 try:
-                    source_pixel_hash = sha256_bytes(ds.PixelData)
+                    source_pixel_hash = source.source_hash()
                     evidence_bundle.add_source_hash(
                         sop_instance_uid=source_sop_uid,
                         pixel_hash=f"sha256:{source_pixel_hash}",
@@ -883,64 +1463,53 @@ def process_dicom(  # pragma: no cover
                     pass
             raise RuntimeError(f"Failed to extract pixel array: {e}")
     
-        print(f"Original array shape: {arr.shape}, dtype: {arr.dtype}")
-    
-        # Handle dimensions: ensure 4D (Frames, H, W, C)
-        original_ndim = arr.ndim
-        if arr.ndim == 2:
-            # Grayscale single frame: (H, W) -> (1, H, W, 1)
-            arr = arr[np.newaxis, :, :, np.newaxis]
-            arr = np.repeat(arr, 3, axis=3)  # Convert to RGB
-        elif arr.ndim == 3:
-            # Could be (H, W, C) single frame or (Frames, H, W) grayscale video
-            if arr.shape[2] in (3, 4):
-                # Single frame with channels: (H, W, C) -> (1, H, W, C)
-                arr = arr[np.newaxis, :, :, :]
-            else:
-                # Grayscale video: (Frames, H, W) -> (Frames, H, W, 3)
-                arr = arr[:, :, :, np.newaxis]
-                arr = np.repeat(arr, 3, axis=3)
-        elif arr.ndim == 4:
-            # Already 4D: (Frames, H, W, C)
-            if arr.shape[3] == 1:
-                # Grayscale video with channel dim
-                arr = np.repeat(arr, 3, axis=3)
+        # Dimensions as 4D (Frames, H, W, C) without copying
+        num_frames, frame_h, frame_w = source.num_frames, source.frame_h, source.frame_w
+        chunk_size = memory_admission.frames_per_chunk or num_frames
     
-        print(f"Normalized array shape: {arr.shape}")
+        print(f"Normalized array shape: {source.shape}, dtype: {source.dtype}")
     
         # ═══════════════════════════════════════════════════════════════════════════
         # ZERO-LOSS BIT-DEPTH HANDLING
         # ═══════════════════════════════════════════════════════════════════════════
         # Store original dtype for later restoration (e.g., uint16 for X-Ray)
-        original_dtype = arr.dtype
-        original_max_value = arr.max()
-        
-        # For display/OpenCV processing, we may need uint8, but we'll restore later
-        # Key insight: Mask application uses simple = 0, which works at any bit depth
-        if arr.dtype != np.uint8:
-            # Scale to uint8 ONLY for display purposes (OCR detection)
-            # Keep original array separate for final save
-            arr_original_depth = arr.copy()  # Preserve original bit-depth data
-            
-            if original_max_value > 255:
-                # Scale to 8-bit for processing
-                arr = ((arr.astype(np.float32) / original_max_value) * 255).astype(np.uint8)
-                print(f"[BIT-DEPTH] Scaled from {original_dtype} (max={original_max_value}) to uint8 for processing")
-            else:
-                arr = arr.astype(np.uint8)
-        else:
-            arr_original_depth = None  # Already uint8, no need for separate array
+        # Key insight: Mask application uses simple = 0, which works at any bit depth,
+        # so the original-depth data is masked directly; 8-bit RGB is only for OCR/overlay
+        original_dtype = source.dtype
+        original_max_value = source.max_value() if original_dtype != np.uint8 else None
+        if original_max_value is not None and original_max_value > 255:
+            print(f"[BIT-DEPTH] Scaling from {original_dtype} (max={original_max_value}) to uint8 for processing")
     
-        # Initialize corrector
-        print("Initializing ClinicalCorrector...")
-        corrector = ClinicalCorrector()
+        # Get modality for output format decision
+        modality = getattr(ds, 'Modality', 'US').upper()
+        
+        # Decide output format based on modality
+        # XR, CR, DX = Radiography (preserve grayscale, original bit-depth)
+        # US, XA = Ultrasound/Angio (RGB overlay acceptable)
+        # CT, MR = Cross-sectional (usually grayscale)
+        preserve_grayscale = modality in ['XR', 'CR', 'DX', 'CT', 'MR', 'PT', 'NM']
+        zero_loss = preserve_grayscale and original_dtype != np.uint8
     
-        frame_h, frame_w = arr.shape[1:3]
+        # Overlay-only corrector; OCR engines are borrowed from the
+        # process-wide pool below, only when AI detection actually runs
+        corrector = ClinicalCorrector(load_ocr=False)
     
         # ═══════════════════════════════════════════════════════════════════════════
-        # STEP 1: DETERMINE MASK COORDINATES (mask_list > manual_box > AI Detection)
+        # STEP 1: DETERMINE MASK COORDINATES
+        # (mask_list > manual_box > device layout template > AI Detection)
         # ═══════════════════════════════════════════════════════════════════════════
-        all_masks = []  # List of (x, y, w, h) tuples
+        template_masks = None
+        if not mask_list and manual_box is None and layout_templates is not None:
+            try:
+                template_masks = _layout_template_masks(ds, source, layout_templates, ocr_pool, original_max_value)
+            except Exception as le:
+                print(f"[LAYOUT] Warning: template lookup failed: {le}")
+            # EVIDENCE: Template hit/verification counters (no PHI)
+            if evidence_bundle:
+                try:
+                    evidence_bundle.set_cache_stats("layout_templates", layout_templates.stats())
+                except Exception as le:
+                    print(f"[EVIDENCE] Warning: Could not record layout template stats: {le}")
         
         if mask_list is not None and len(mask_list) > 0:
             # Interactive redaction mode - multiple masks provided
@@ -950,13 +1519,64 @@ def process_dicom(  # pragma: no cover
             # Single manual mask provided - convert to list
             print(f"[MASK] Using MANUAL mask override: {manual_box}")
             all_masks = [manual_box]
+        elif template_masks is not None:
+            # Known device: reviewer-accepted layout, verified on one frame
+            print(f"[MASK] Using DEVICE LAYOUT template: {len(template_masks)} region(s)")
+            all_masks = template_masks
         else:
-            # AI Detection fallback
+            # AI Detection fallback - only the sampled frames are converted to 8-bit RGB
             print("[MASK] No manual mask - running AI detection...")
-            detection_result = detect_text_box_from_array(corrector, arr)
+            sample_indices = _ocr_sample_indices(source, modality, original_max_value)
+            print(f"[OCR SAMPLE] OCR on {len(sample_indices)} of {num_frames} frame(s): {sample_indices}")
+            
+            # Repeat runs over identical pixels reuse the cached detection
+            detection_result = None
+            cache_key = None
+            if detection_cache is not None:
+                try:
+                    if source_pixel_hash is None:
+                        source_pixel_hash = source.source_hash()
+                    cache_key = detection_cache_key(
+                        source_pixel_hash, sample_indices, OCR_DETECTION_PARAMS, ocr_engine_version()
+                    )
+                    cached = detection_cache.get(cache_key)
+                    if cached is not None:
+                        detection_result = _detection_from_cache(cached)
+                        print("[DETECTION CACHE] Hit - reusing cached detection, OCR skipped")
+                except Exception as ce:
+                    print(f"[DETECTION CACHE] Warning: lookup failed: {ce}")
+                    cache_key = None
+            
+            if detection_result is None:
+                sample = _to_display_rgb(source.take(sample_indices), original_max_value)
+                if ocr_pool is None:
+                    ocr_pool = get_ocr_pool()
+                with ocr_pool.corrector() as ocr_corrector:
+                    detection_result = detect_text_box_from_array(
+                        ocr_corrector, sample, roi=OCR_ROI_MODE, modality=modality
+                    )
+                pool_stats = ocr_pool.stats()
+                print(f"[OCR POOL] size={pool_stats.size} warmup={pool_stats.warmup_seconds:.2f}s borrows={pool_stats.borrows}")
+                # OCR failures are transient: never cache them
+                if cache_key is not None and not detection_result.ocr_failure:
+                    try:
+                        detection_cache.put(cache_key, _detection_to_cache(detection_result))
+                    except Exception as ce:
+                        print(f"[DETECTION CACHE] Warning: could not store detection: {ce}")
+            else:
+                # Cache hit: only the first sampled frame is needed (debug image)
+                sample = _to_display_rgb(source.take(sample_indices[:1]), original_max_value)
+            
+            # EVIDENCE: Detection cache hit/miss counters (no PHI)
+            if evidence_bundle and detection_cache is not None:
+                try:
+                    evidence_bundle.set_cache_stats("detection_cache", detection_cache.stats().as_dict())
+                except Exception as ce:
+                    print(f"[EVIDENCE] Warning: Could not record detection cache stats: {ce}")
     
             # Save debug image with RED rectangles around all detections
-            debug_frame = arr[0].copy()
+            debug_frame = sample[0].copy()
+            del sample
             for box in detection_result.all_detected_boxes:
                 bx, by, bw, bh = box
                 cv2.rectangle(debug_frame, (bx, by), (bx + bw, by + bh), (0, 0, 255), 2)  # RED
@@ -1006,40 +1626,69 @@ def process_dicom(  # pragma: no cover
             h = min(frame_h - y, h + 2 * padding)
     
             all_masks = [(x, y, w, h)]
+            
+            # Annotation text shown only mid-clip never matches frame 0
+            for tx, ty, tw, th in detection_result.transient_boxes or []:
+                tx, ty = max(0, tx - padding), max(0, ty - padding)
+                all_masks.append((tx, ty, min(frame_w - tx, tw + 2 * padding), min(frame_h - ty, th + 2 * padding)))
+            if len(all_masks) > 1:
+                print(f"[MASK] Masking {len(all_masks) - 1} mid-clip annotation box(es) as well")
+        
+        # Use first mask for text overlay positioning (if any masks exist)
+        if all_masks:
+            overlay_box = all_masks[0]
+        else:
+            overlay_box = (10, 10, 200, 30)  # Default fallback
         
         # ═══════════════════════════════════════════════════════════════════════════
-        # STEP 2: THE UNIVERSAL ERASER - Draw black boxes for ALL masks
-        # Apply to BOTH 8-bit display array AND original bit-depth array (zero-loss)
+        # THE CONDITIONAL PEN - Build text overlay for BOTH modes
+        # (auto-scaling for long text; zero-loss output keeps original pixels only)
         # ═══════════════════════════════════════════════════════════════════════════
-        num_frames = arr.shape[0]
-        print(f"[PIXEL SCRUB] Drawing {len(all_masks)} BLACK BOX(es) on {num_frames} frame(s)...")
+        overlay = None
+        if not zero_loss:
+            overlay_text = _build_overlay_text(research_context, clinical_context, new_name_text, scan_datetime)
+            overlay = corrector.generate_medical_overlay(overlay_text, overlay_box[2], overlay_box[3], auto_scale=True)
         
-        for i in range(num_frames):
-            frame = arr[i]
-            # Also get original depth frame if available
-            frame_orig = arr_original_depth[i] if arr_original_depth is not None else None
-            
-            for mask_idx, (x, y, w, h) in enumerate(all_masks):
-                # Clamp coordinates to frame boundaries
-                x_end = min(x + w, frame_w)
-                y_end = min(y + h, frame_h)
-                x_start = max(0, x)
-                y_start = max(0, y)
-                
-                # DRAW THE BLACK BOX - This is the universal eraser
-                # Apply to 8-bit display array
-                frame[y_start:y_end, x_start:x_end] = 0
-                
-                # ZERO-LOSS: Also apply to original bit-depth array
-                if frame_orig is not None:
-                    frame_orig[y_start:y_end, x_start:x_end] = 0
-            
-            if (i + 1) % 10 == 0 or i == num_frames - 1:
-                print(f"  [PIXEL SCRUB] Erased frame {i + 1}/{num_frames}")
+        # ═══════════════════════════════════════════════════════════════════════════
+        # STEP 2: THE UNIVERSAL ERASER + PEN, chunk by chunk
+        # Each chunk is converted, masked and handed to the output sink, so
+        # peak working memory is bounded by the chunk size, not the frame count
+        # ═══════════════════════════════════════════════════════════════════════════
+        print(f"[PIXEL SCRUB] Drawing {len(all_masks)} BLACK BOX(es) on {num_frames} frame(s) "
+              f"in chunks of {chunk_size}...")
+        
+        if zero_loss:
+            # ZERO-LOSS PATH: mask the original bit-depth data (16-bit for X-Ray etc)
+            print(f"[ZERO-LOSS] Using original {original_dtype} data for {modality} modality")
+            out_shape = (num_frames, frame_h, frame_w)
+            out_dtype = original_dtype
+        else:
+            # STANDARD PATH: RGB output (for US, XA with overlay)
+            print(f"[STANDARD] Using RGB output for {modality} modality")
+            out_shape = (num_frames, frame_h, frame_w, 3)
+            out_dtype = np.uint8
+        if stream_pixels:
+            sink = _SpoolFrameSink(os.path.dirname(os.path.abspath(output_path)))
+        else:
+            sink = _ArrayFrameSink(out_shape, out_dtype)
+        
+        # Mask geometry is static across frames: resolve it once, then each
+        # chunk is erased/stamped with broadcast writes over all its frames
+        mask_engine = PixelMaskEngine(all_masks, frame_w, frame_h, overlay=overlay, overlay_box=overlay_box)
+        
+        for start, stop, chunk in source.chunks(chunk_size):
+            if zero_loss:
+                # Grayscale: first channel of the original-depth data
+                out_chunk = mask_engine.erase(np.array(chunk[:, :, :, 0]))
+            else:
+                out_chunk = mask_engine.apply(_to_display_rgb(chunk, original_max_value))
+                # Remove alpha channel if present
+                out_chunk = out_chunk[:, :, :, :3]
+            sink.write(start, stop, out_chunk)
+            del chunk, out_chunk
+            print(f"  [PIXEL SCRUB] Scrubbed frames {start + 1}-{stop}/{num_frames}")
         
         print(f"[PIXEL SCRUB] {len(all_masks)} BLACK BOX(es) applied to all frames")
-        if arr_original_depth is not None:
-            print(f"[ZERO-LOSS] Masks also applied to original {original_dtype} data")
         
         # EVIDENCE: Log masking actions (what was done, not what was found)
         if evidence_bundle and all_masks:
@@ -1056,171 +1705,20 @@ def process_dicom(  # pragma: no cover
                     )
             except Exception as me:
                 print(f"[EVIDENCE] Warning: Could not log masking action: {me}")
-        
-        # Use first mask for text overlay positioning (if any masks exist)
-        if all_masks:
-            x, y, w, h = all_masks[0]
-        else:
-            x, y, w, h = 10, 10, 200, 30  # Default fallback
-        
-        # ═══════════════════════════════════════════════════════════════════════════
-        # STEP 3: THE CONDITIONAL PEN - Write text overlay for BOTH modes
-        # ═══════════════════════════════════════════════════════════════════════════
-        if research_context:
-            # Research mode - construct comprehensive research label (Clinical Trial format)
-            trial_id = research_context.get('trial_id', research_context.get('study_id', 'TRIAL'))
-            site_id = research_context.get('site_id', 'SITE-01')
-            subject_id = research_context.get('subject_id', 'SUB-001')
-            time_point = research_context.get('time_point', 'Baseline')
-            
-            # Build standard Clinical Trial header: "{TrialID} | Site: {SiteID} | Sub: {SubjectID} | {Timepoint} | {ScanDate}"
-            overlay_text = f"{trial_id} | Site: {site_id} | Sub: {subject_id} | {time_point} | {scan_datetime}"
-            print(f"[MODE] Research De-ID: Overlaying '{overlay_text}'")
-        elif clinical_context and clinical_context.get('patient_name'):
-            # Clinical mode with full context - build Toshiba/Aplio style header
-            # Line 1: [Accession]:PATIENT NAME | [Sex] [Age] | [Date]
-            # Line 2: [Location] | [Study Type] | [GA] | [Sonographer] | [Time]
-            
-            patient_name = clinical_context.get('patient_name', new_name_text)
-            accession = clinical_context.get('accession_number', '')
-            patient_sex = clinical_context.get('patient_sex', '')
-            patient_dob = clinical_context.get('patient_dob', '')
-            study_date_str = clinical_context.get('study_date', '')
-            study_time_str = clinical_context.get('study_time', '')
-            location = clinical_context.get('location', '')
-            study_type = clinical_context.get('study_type', '')
-            gestational_age = clinical_context.get('gestational_age', '')
-            sonographer = clinical_context.get('sonographer', '')
-            
-            # Calculate age if DOB provided
-            age_str = ''
-            if patient_dob:
-                try:
-                    from datetime import datetime, date
-                    dob = datetime.strptime(patient_dob, '%Y-%m-%d').date()
-                    today = date.today()
-                    age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-                    age_str = str(age)
-                except:
-                    pass
-            
-            # Format date for display (YYYY-MM-DD -> DD/MM/YYYY)
-            display_date = ''
-            if study_date_str:
-                try:
-                    parts = study_date_str.split('-')
-                    if len(parts) == 3:
-                        display_date = f"{parts[2]}/{parts[1]}/{parts[0]}"
-                except:
-                    display_date = study_date_str
-            
-            # Format time for display (HH:MM:SS -> H:MM:SS PM)
-            display_time = ''
-            if study_time_str:
-                try:
-                    from datetime import datetime
-                    t = datetime.strptime(study_time_str, '%H:%M:%S')
-                    display_time = t.strftime('%I:%M:%S %p').lstrip('0')
-                except:
-                    display_time = study_time_str
-            
-            # Build Line 1: Accession:NAME | Sex Age | Date
-            line1_parts = []
-            if accession:
-                line1_parts.append(f"{accession}:{patient_name}")
-            else:
-                line1_parts.append(patient_name)
-            
-            if patient_sex or age_str:
-                sex_age = f"{patient_sex} {age_str}".strip()
-                line1_parts.append(sex_age)
-            
-            if display_date:
-                line1_parts.append(display_date)
-            
-            line1 = "  |  ".join(line1_parts) if len(line1_parts) > 1 else line1_parts[0] if line1_parts else patient_name
-            
-            # Build Line 2: Location | Type | GA | Sonographer | Time
-            line2_parts = []
-            if location:
-                line2_parts.append(location)
-            if study_type:
-                line2_parts.append(study_type)
-            if gestational_age:
-                line2_parts.append(gestational_age)
-            if sonographer:
-                line2_parts.append(sonographer)
-            if display_time:
-                line2_parts.append(display_time)
-            
-            line2 = "  |  ".join(line2_parts) if line2_parts else ''
-            
-            # Combine lines
-            if line2:
-                overlay_text = f"{line1}\n{line2}"
-            else:
-                overlay_text = line1
-            
-            print(f"[MODE] Clinical Correction (Full): Overlaying '{overlay_text}'")
-        else:
-            # Clinical mode - basic, just display new patient name
-            overlay_text = new_name_text
-            print(f"[MODE] Clinical Correction (Basic): Overlaying '{overlay_text}'")
-        
-        # Generate and apply overlay for both modes (with auto-scaling for long text)
-        # For multi-line text, we need to handle it specially
-        overlay = corrector.generate_medical_overlay(overlay_text, w, h, auto_scale=True)
-        
-        for i in range(num_frames):
-            frame = arr[i]
-            # Apply overlay on top of the black box
-            x_end = min(x + w, frame_w)
-            y_end = min(y + h, frame_h)
-            x_start = max(0, x)
-            y_start = max(0, y)
-            actual_w = x_end - x_start
-            actual_h = y_end - y_start
-            
-            if actual_w > 0 and actual_h > 0:
-                overlay_resized = overlay[:actual_h, :actual_w]
-                frame[y_start:y_start + actual_h, x_start:x_start + actual_w] = overlay_resized
-            
-            if (i + 1) % 10 == 0 or i == num_frames - 1:
-                print(f"  [OVERLAY] Applied to frame {i + 1}/{num_frames}")
     
         # ═══════════════════════════════════════════════════════════════════════════
         # PREPARE PIXEL DATA FOR DICOM - MODALITY-AWARE OUTPUT
         # ═══════════════════════════════════════════════════════════════════════════
         print("Preparing pixel data for DICOM...")
         
-        # Get modality for output format decision
-        modality = getattr(ds, 'Modality', 'US').upper()
-        
-        # Decide output format based on modality
-        # XR, CR, DX = Radiography (preserve grayscale, original bit-depth)
-        # US, XA = Ultrasound/Angio (RGB overlay acceptable)
-        # CT, MR = Cross-sectional (usually grayscale)
-        preserve_grayscale = modality in ['XR', 'CR', 'DX', 'CT', 'MR', 'PT', 'NM']
-        
-        if preserve_grayscale and arr_original_depth is not None:
-            # ═══════════════════════════════════════════════════════════════════════
-            # ZERO-LOSS PATH: Use original bit-depth data (16-bit for X-Ray etc)
-            # ═══════════════════════════════════════════════════════════════════════
-            print(f"[ZERO-LOSS] Using original {original_dtype} data for {modality} modality")
-            
-            # Use the masked original depth array (grayscale)
-            if arr_original_depth.shape[3] == 3:
-                # Convert RGB back to grayscale (take first channel or average)
-                arr_out = arr_original_depth[:, :, :, 0]  # Shape: (Frames, H, W)
-            else:
-                arr_out = arr_original_depth[:, :, :, 0] if arr_original_depth.shape[3] == 1 else arr_original_depth
-            
-            # For single frame, remove frame dimension
-            if arr_out.shape[0] == 1:
-                arr_out = arr_out[0]  # Shape: (H, W)
-            
+        # Single frame output drops the frame dimension: (H, W) or (H, W, 3)
+        arr_out = sink.finish()
+        if stream_pixels:
+            print(f"[STREAM] Output pixel data spooled to disk: {sink.nbytes} bytes")
+        else:
             print(f"Output array shape: {arr_out.shape}, dtype: {arr_out.dtype}")
-            
+        
+        if zero_loss:
             # Update DICOM header for grayscale
             ds.PhotometricInterpretation = original_photometric if 'MONOCHROME' in original_photometric else 'MONOCHROME2'
             ds.SamplesPerPixel = 1
@@ -1239,27 +1737,6 @@ def process_dicom(  # pragma: no cover
             ds.PixelRepresentation = 0  # Unsigned
             
         else:
-            # ═══════════════════════════════════════════════════════════════════════
-            # STANDARD PATH: RGB output (for US, XA with overlay)
-            # ═══════════════════════════════════════════════════════════════════════
-            print(f"[STANDARD] Using RGB output for {modality} modality")
-            
-            # Keep as 4D RGB array (Frames, H, W, 3) - ensure 3 channels
-            if arr.shape[3] == 4:
-                # Remove alpha channel if present
-                arr = arr[:, :, :, :3]
-            
-            # Safety cast: ensure uint8 (0-255)
-            arr = arr.astype(np.uint8)
-            
-            # For single frame, remove the frame dimension
-            if arr.shape[0] == 1:
-                arr_out = arr[0]  # Shape: (H, W, 3)
-            else:
-                arr_out = arr  # Shape: (Frames, H, W, 3)
-            
-            print(f"Output array shape: {arr_out.shape}, dtype: {arr_out.dtype}")
-            
             # Update DICOM header for RGB
             ds.PhotometricInterpretation = "RGB"
             ds.SamplesPerPixel = 3
@@ -1268,6 +1745,15 @@ def process_dicom(  # pragma: no cover
             ds.BitsStored = 8
             ds.HighBit = 7
             ds.PixelRepresentation = 0
+        
+        if stream_pixels:
+            # Buffered PixelData: pydicom streams the spool file on save.
+            # Replaced before metadata anonymization (and deleted first, as
+            # plain assignment reads the old value) so the deferred source
+            # PixelData is never loaded.
+            del ds[PIXEL_DATA_TAG]
+            ds[PIXEL_DATA_TAG] = DataElement(PIXEL_DATA_TAG, 'OW' if ds.BitsAllocated > 8 else 'OB', arr_out)
+            masked_pixel_hash = sink.sha256
     else:
         # Pixel processing disabled (Memory Guard)
         # We perform NO pixel operations. We just keep the original PixelData as is.
@@ -1292,18 +1778,16 @@ def process_dicom(  # pragma: no cover
 
     # Update frame count if multi-frame (only when pixels were processed)
     if pixel_processing_enabled and arr_out is not None:
-        if arr_out.ndim == 4:
-            ds.NumberOfFrames = arr_out.shape[0]
-        elif arr_out.ndim == 3 and arr.shape[0] > 1:
-            # Grayscale multi-frame: (Frames, H, W)
-            ds.NumberOfFrames = arr_out.shape[0]
+        if num_frames > 1:
+            ds.NumberOfFrames = num_frames
         elif hasattr(ds, 'NumberOfFrames'):
             del ds.NumberOfFrames
     # When pixel_processing_enabled is False, preserve original NumberOfFrames
 
     # Update pixel data (ONLY if we processed it)
     if pixel_processing_enabled and arr_out is not None:
-        ds.PixelData = arr_out.tobytes()
+        if not stream_pixels:
+            ds.PixelData = arr_out.tobytes()
 
         # Reset compression to Explicit VR Little Endian (uncompressed) only if we changed pixels
         ds.file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
@@ -1349,7 +1833,7 @@ def process_dicom(  # pragma: no cover
                 decision_type="MASK" if all_masks else "SKIP",
                 source_sop_uid=source_sop_uid,
                 masked_sop_uid=masked_sop_uid,
-                detections_count=len(evidence_bundle.detection_results),
+                detections_count=evidence_bundle.detection_count,
                 actions_count=len(all_masks),
                 status="complete"
             )
@@ -1357,19 +1841,16 @@ def process_dicom(  # pragma: no cover
             # Record masked output hash
             evidence_bundle.add_masked_hash(
                 sop_instance_uid=masked_sop_uid,
-                pixel_hash=f"sha256:{sha256_bytes(ds.PixelData)}",
+                pixel_hash=f"sha256:{masked_pixel_hash or pixel_sha256(ds)}",
                 series_uid=masked_series_uid
             )
         except Exception as le:
             print(f"[EVIDENCE] Warning: Could not log linkage/decision: {le}")
 
     if pixel_processing_enabled:
-        if 'arr' in locals():
-            del arr
-        if 'arr_original_depth' in locals():
-            del arr_original_depth
-        if 'arr_out' in locals():
-            del arr_out
+        if stream_pixels:
+            sink.close()
+        del source, sink, arr_out
         gc.collect()
 
     print("Processing complete!")
@@ -1416,9 +1897,28 @@ Examples:
         default=None,
         help="Optional: Directory to write evidence bundle (Gate 2/3 Model B compliance)"
     )
+    parser.add_argument(
+        "--evidence-encoding",
+        choices=["plain", "compressed"],
+        default="plain",
+        help="Evidence bundle record encoding (compressed: zstd/gzip DECISIONS, LINKAGE and QA files)"
+    )
+    parser.add_argument(
+        "--detection-cache-dir",
+        default=None,
+        help="Optional: Directory of the persistent detection cache (repeat runs skip OCR)"
+    )
+    parser.add_argument(
+        "--layout-template-dir",
+        default=None,
+        help="Optional: Directory of learned device layout templates (known devices skip full OCR)"
+    )
 
     args = parser.parse_args()
     
+    detection_cache = DetectionCache(args.detection_cache_dir) if args.detection_cache_dir else None
+    layout_templates = LayoutTemplateStore(args.layout_template_dir) if args.layout_template_dir else None
+    
     # ═══════════════════════════════════════════════════════════════════════════
     # EVIDENCE BUNDLE LIFECYCLE
     # ═══════════════════════════════════════════════════════════════════════════
@@ -1431,7 +1931,8 @@ Examples:
         print(f"[EVIDENCE] Creating evidence bundle in: {args.evidence_bundle_dir}")
         evidence_bundle = EvidenceBundle(
             voxelmask_version="0.5.0",
-            compliance_profile="FOI"
+            compliance_profile="FOI",
+            encoding=args.evidence_encoding
         )
         evidence_bundle.start_processing()
         
@@ -1446,6 +1947,13 @@ Examples:
             python_version=f"{_sys.version_info.major}.{_sys.version_info.minor}.{_sys.version_info.micro}",
             platform=platform.platform()
         )
+        
+        # Stream records to disk as they arrive (flat memory, partial bundle on a crash)
+        try:
+            bundle_path = evidence_bundle.stream_to(Path(args.evidence_bundle_dir))
+            print(f"[EVIDENCE] Streaming records to: {bundle_path}")
+        except Exception as se:
+            print(f"[EVIDENCE] Warning: Could not stream bundle, keeping records in memory: {se}")
     elif args.evidence_bundle_dir and not EVIDENCE_BUNDLE_AVAILABLE:
         print("[EVIDENCE] Warning: Evidence bundle requested but audit module not available")
 
@@ -1455,16 +1963,28 @@ Examples:
             output_path=args.output,
             old_name_text=args.old,
             new_name_text=args.new,
-            evidence_bundle=evidence_bundle
+            evidence_bundle=evidence_bundle,
+            detection_cache=detection_cache,
+            layout_templates=layout_templates,
         )
         
-        # Finalize evidence bundle on success
-        if evidence_bundle and success:
+        # Finalize evidence bundle (a failed run is sealed with its failure
+        # record, so the streamed bundle is not left looking like a crash)
+        if evidence_bundle:
             try:
                 from pathlib import Path
+                if not success:
+                    evidence_bundle.add_exception(
+                        exception_type="PROCESSING_FAILURE",
+                        message="process_dicom reported failure",
+                        severity="ERROR"
+                    )
                 evidence_bundle.end_processing()
                 bundle_path = evidence_bundle.finalize(Path(args.evidence_bundle_dir))
-                print(f"[EVIDENCE] Bundle written to: {bundle_path}")
+                if success:
+                    print(f"[EVIDENCE] Bundle written to: {bundle_path}")
+                else:
+                    print(f"[EVIDENCE] Failure bundle written to: {bundle_path}")
             except Exception as fe:
                 print(f"[EVIDENCE] Warning: Failed to finalize bundle: {fe}")
         
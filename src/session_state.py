@@ -17,6 +17,8 @@ RUN_SCOPED_KEYS = {
     # Run identity and paths
     'run_id',
     'run_paths',
+    'input_store',  # Content-addressed inputs under run_paths.tmp_dir
+    'header_index',  # Header records of the run's inputs
     
     # Processing state
     'processing_complete',
@@ -88,6 +90,14 @@ def reset_run_state(ss: MutableMapping[str, Any], *, reason: str | None = None)
     """
     previous_run_id = ss.get(RUN_ID_KEY)
     
+    # Stored inputs belong to the old run: delete them before dropping the store
+    store = ss.get("input_store")
+    if store is not None:
+        try:
+            store.close()
+        except Exception as e:
+            logger.warning("PHASE14: input store cleanup failed: %s", e)
+
     # Identify which keys exist before we clear them
     for k in list(ss.keys()):
         if k in RUN_SCOPED_KEYS:
@@ -13,6 +13,10 @@ Architecture:
 - selection.py: File/study selection and filtering
 - classify.py: Object classification helpers (image vs document vs unsupported)
 - export.py: ZIP/bundle construction helpers
+- parallel_zip.py: ZIP writer that deflates members on a thread pool
+- hashing.py: Streaming multi-algorithm file hashing
+- input_store.py: Content-addressed, refcounted store of run inputs
+- header_index.py: Shared header records, read once per file in a thread pool
 - audit.py: Audit event structures (no PHI)
 
 HARD RULE: Import of `streamlit` is FORBIDDEN in this package.
@@ -37,6 +41,7 @@ from .actions import (
 # Classification
 from .classify import (
     classify_dicom_file,
+    classify_header,
     FileClassification,
     FileCategory,
     RiskLevel,
@@ -63,6 +68,10 @@ from .pipeline import (
     prepare_pipeline_inputs,
     run_pipeline,
     cleanup_temp_files,
+    EXECUTOR_SERIAL,
+    EXECUTOR_THREAD,
+    EXECUTOR_PROCESS,
+    EXECUTOR_MODES,
 )
 
 # Export
@@ -71,12 +80,36 @@ from .export import (
     ExportResult,
     generate_export_folder_name,
     build_zip_bundle,
+    StreamingZipBundle,
+    CompressionPolicy,
+    COMPRESSION_MODES,
+    resolve_zip_compression,
+    resolve_zip_level,
     compute_file_hash,
     build_viewer_ordered_entries,
     sanitize_filename,
     generate_repair_filename,
 )
 
+# Parallel ZIP compression
+from .parallel_zip import ParallelZipWriter, resolve_zip_workers
+
+# Hashing
+from .hashing import (
+    DEDUPE_ALGORITHMS,
+    MultiHasher,
+    hash_bytes,
+    hash_file,
+    hash_fileobj,
+    file_sha256,
+)
+
+# Input store
+from .input_store import InputStore, StoredInput
+
+# Header index
+from .header_index import CLASSIFY_TAGS, HEADER_RECORD_TAGS, HeaderIndex, HeaderRecord, read_header_record
+
 # Audit
 from .audit import (
     AuditEvent,
@@ -106,6 +139,7 @@ __all__ = [
     
     # Classification
     'classify_dicom_file',
+    'classify_header',
     'FileClassification',
     'FileCategory',
     'RiskLevel',
@@ -128,17 +162,47 @@ __all__ = [
     'prepare_pipeline_inputs',
     'run_pipeline',
     'cleanup_temp_files',
+    'EXECUTOR_SERIAL',
+    'EXECUTOR_THREAD',
+    'EXECUTOR_PROCESS',
+    'EXECUTOR_MODES',
     
     # Export
     'ExportConfig',
     'ExportResult',
     'generate_export_folder_name',
     'build_zip_bundle',
+    'StreamingZipBundle',
+    'CompressionPolicy',
+    'COMPRESSION_MODES',
+    'resolve_zip_compression',
+    'resolve_zip_level',
+    'resolve_zip_workers',
+    'ParallelZipWriter',
     'compute_file_hash',
     'build_viewer_ordered_entries',
     'sanitize_filename',
     'generate_repair_filename',
     
+    # Hashing
+    'DEDUPE_ALGORITHMS',
+    'MultiHasher',
+    'hash_bytes',
+    'hash_file',
+    'hash_fileobj',
+    'file_sha256',
+    
+    # Input store
+    'InputStore',
+    'StoredInput',
+    
+    # Header index
+    'CLASSIFY_TAGS',
+    'HEADER_RECORD_TAGS',
+    'HeaderIndex',
+    'HeaderRecord',
+    'read_header_record',
+    
     # Audit
     'AuditEvent',
     'AuditEventType',
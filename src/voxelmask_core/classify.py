@@ -21,6 +21,8 @@ from enum import Enum
 from typing import Optional
 import os
 
+from .header_index import CLASSIFY_TAGS, HeaderRecord, read_header_record
+
 
 class FileCategory(Enum):
     """Category of a DICOM file based on content type."""
@@ -106,8 +108,9 @@ def classify_dicom_file(filepath: str) -> FileClassification:
     """
     Classify a DICOM file by type and risk level.
     
-    This is the main classification entry point. It reads only metadata
-    (stop_before_pixels=True) for efficiency.
+    This is the main classification entry point. It reads only the tags
+    classification needs (CLASSIFY_TAGS), falling back to a full header
+    parse when they cannot be found.
     
     Args:
         filepath: Path to the DICOM file
@@ -118,22 +121,25 @@ def classify_dicom_file(filepath: str) -> FileClassification:
     Raises:
         ValueError: If file cannot be read as DICOM
     """
-    import pydicom
+    record = read_header_record(filepath, tags=CLASSIFY_TAGS)
+    if not record.ok:
+        raise ValueError(f"Cannot read DICOM file {filepath}: {record.error}")
+    return classify_header(record)
+
+
+def classify_header(record: HeaderRecord) -> FileClassification:
+    """
+    Classify a file from its header-index record (no file access).
     
-    try:
-        ds = pydicom.dcmread(filepath, stop_before_pixels=True, force=True)
+    Args:
+        record: HeaderRecord from read_header_record() or a HeaderIndex
         
-        # Add fallback for missing TransferSyntaxUID
-        if not hasattr(ds, 'file_meta') or not hasattr(ds.file_meta, 'TransferSyntaxUID'):
-            if not hasattr(ds, 'file_meta'):
-                ds.file_meta = pydicom.dataset.FileMetaDataset()
-            ds.file_meta.TransferSyntaxUID = pydicom.uid.ImplicitVRLittleEndian
-    except Exception as e:
-        raise ValueError(f"Cannot read DICOM file {filepath}: {e}")
-    
-    modality = str(getattr(ds, 'Modality', '')).upper()
-    sop_class_uid = str(getattr(ds, 'SOPClassUID', ''))
-    series_description = str(getattr(ds, 'SeriesDescription', ''))
+    Returns:
+        FileClassification with all classification results
+    """
+    modality = record.modality
+    sop_class_uid = record.sop_class_uid
+    series_description = record.series_description
     
     # Determine category and risk
     category, risk_level, include_by_default = _classify_by_modality_and_sop(
@@ -148,8 +154,8 @@ def classify_dicom_file(filepath: str) -> FileClassification:
     is_pdf = 'ENCAPSULATED PDF' in sop_class_uid.upper()
     
     return FileClassification(
-        filepath=filepath,
-        filename=os.path.basename(filepath),
+        filepath=record.path,
+        filename=os.path.basename(record.path),
         modality=modality,
         sop_class_uid=sop_class_uid,
         category=category,
@@ -5,19 +5,24 @@ Export and packaging logic for VoxelMask.
 NO STREAMLIT IMPORTS ALLOWED IN THIS MODULE.
 
 This module handles:
-- ZIP bundle construction
+- ZIP bundle construction (at once, or streamed entry by entry to disk)
+- Adaptive ZIP compression (store already-compressed members, deflate the rest)
+- Parallel member compression (see parallel_zip.py)
 - Output path generation
 - Viewer index building helpers
 """
 from __future__ import annotations
 
-import hashlib
 import os
 import zipfile
-from dataclasses import dataclass
+import zlib
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .hashing import DEFAULT_BLOCK_SIZE, hash_file
+from .parallel_zip import ParallelZipWriter, resolve_zip_workers
 
 
 @dataclass
@@ -40,6 +45,135 @@ class ExportResult:
     total_bytes: int = 0
     success: bool = True
     error: Optional[str] = None
+    compression: Dict[str, Any] = field(default_factory=dict)
+
+
+# Environment overrides for ZIP compression
+ZIP_COMPRESSION_ENV_VAR = "VOXELMASK_ZIP_COMPRESSION"
+ZIP_LEVEL_ENV_VAR = "VOXELMASK_ZIP_LEVEL"
+
+# Compression modes: adaptive (per member), or the same method for every member
+COMPRESSION_ADAPTIVE = "adaptive"
+COMPRESSION_DEFLATE = "deflate"
+COMPRESSION_STORE = "store"
+COMPRESSION_MODES = (COMPRESSION_ADAPTIVE, COMPRESSION_DEFLATE, COMPRESSION_STORE)
+
+DEFAULT_DEFLATE_LEVEL = 6
+
+# Members whose content is already compressed by their format
+COMPRESSED_SUFFIXES = (
+    '.gz', '.zip', '.zst', '.bz2', '.xz',
+    '.png', '.jpg', '.jpeg', '.jp2', '.j2k', '.mp4', '.pdf',
+)
+
+
+def resolve_zip_compression(mode: Optional[str] = None) -> str:
+    """
+    Resolve the ZIP compression mode.
+    
+    Precedence: explicit argument > VOXELMASK_ZIP_COMPRESSION > adaptive.
+    Unknown values fall back to adaptive.
+    """
+    if mode is None:
+        mode = os.environ.get(ZIP_COMPRESSION_ENV_VAR, "")
+    mode = mode.strip().lower()
+    return mode if mode in COMPRESSION_MODES else COMPRESSION_ADAPTIVE
+
+
+def resolve_zip_level(level: Optional[int] = None) -> int:
+    """
+    Resolve the deflate level (1 fastest .. 9 smallest).
+    
+    Precedence: explicit argument > VOXELMASK_ZIP_LEVEL > DEFAULT_DEFLATE_LEVEL.
+    Invalid or out-of-range values fall back to the default.
+    """
+    if level is None:
+        try:
+            level = int(os.environ.get(ZIP_LEVEL_ENV_VAR, "").strip() or DEFAULT_DEFLATE_LEVEL)
+        except ValueError:
+            level = DEFAULT_DEFLATE_LEVEL
+    return level if 1 <= level <= 9 else DEFAULT_DEFLATE_LEVEL
+
+
+def _dicom_pixels_compressed(path: Union[str, Path]) -> bool:
+    """True if a Part 10 file declares a compressed (encapsulated) transfer syntax."""
+    from pydicom.filereader import read_file_meta_info
+    from pydicom.uid import UID
+    
+    try:
+        meta = read_file_meta_info(str(path))
+        syntax = getattr(meta, "TransferSyntaxUID", None)
+        return bool(syntax) and UID(str(syntax)).is_compressed
+    except Exception:
+        return False  # Not Part 10: decided by the sample
+
+
+def _sample_file(path: Union[str, Path], sample_bytes: int) -> bytes:
+    """Up to sample_bytes from the start, middle and end of a file."""
+    size = os.path.getsize(path)
+    if size <= sample_bytes:
+        with open(path, 'rb') as f:
+            return f.read()
+    chunk = sample_bytes // 3
+    parts = []
+    with open(path, 'rb') as f:
+        for offset in (0, (size - chunk) // 2, size - chunk):
+            f.seek(offset)
+            parts.append(f.read(chunk))
+    return b"".join(parts)
+
+
+@dataclass
+class CompressionPolicy:
+    """
+    Per-member ZIP compression choice.
+    
+    In adaptive mode a member is stored when its format is already
+    compressed (COMPRESSED_SUFFIXES, or a DICOM file with a compressed
+    transfer syntax such as JPEG or JPEG 2000), or when deflating a sample
+    of it saves less than min_savings. Everything else is deflated at level.
+    """
+    mode: str = COMPRESSION_ADAPTIVE
+    level: int = DEFAULT_DEFLATE_LEVEL
+    min_savings: float = 0.10
+    sample_bytes: int = 192 * 1024
+    
+    @classmethod
+    def from_env(cls, mode: Optional[str] = None, level: Optional[int] = None) -> "CompressionPolicy":
+        return cls(mode=resolve_zip_compression(mode), level=resolve_zip_level(level))
+    
+    def _sample_saves_enough(self, sample: bytes) -> bool:
+        if len(sample) < 64:
+            return False  # Too small to gain anything
+        return 1 - len(zlib.compress(sample, 1)) / len(sample) >= self.min_savings
+    
+    def choose(
+        self,
+        name: str,
+        path: Optional[Union[str, Path]] = None,
+        data: Optional[Union[str, bytes]] = None,
+    ) -> Tuple[int, str]:
+        """
+        Compression for one member, from its file (path) or content (data).
+        
+        Returns:
+            (zipfile.ZIP_STORED or zipfile.ZIP_DEFLATED, reason)
+        """
+        if self.mode == COMPRESSION_STORE:
+            return zipfile.ZIP_STORED, "policy"
+        if self.mode == COMPRESSION_DEFLATE:
+            return zipfile.ZIP_DEFLATED, "policy"
+        if name.lower().endswith(COMPRESSED_SUFFIXES):
+            return zipfile.ZIP_STORED, "compressed_format"
+        if path is not None:
+            if name.lower().endswith('.dcm') and _dicom_pixels_compressed(path):
+                return zipfile.ZIP_STORED, "compressed_transfer_syntax"
+            sample = _sample_file(path, self.sample_bytes)
+        else:
+            sample = data.encode('utf-8') if isinstance(data, str) else bytes(data[:self.sample_bytes])
+        if not self._sample_saves_enough(sample):
+            return zipfile.ZIP_STORED, "incompressible_sample"
+        return zipfile.ZIP_DEFLATED, "compressible"
 
 
 def generate_export_folder_name(
@@ -74,6 +208,155 @@ def generate_export_folder_name(
     return f"VoxelMask_{profile_name}_{date_str}"
 
 
+class StreamingZipBundle:
+    """
+    ZIP export written to disk entry by entry.
+    
+    Each output file is appended as soon as it is produced, so a run never
+    holds its outputs in memory: only the open archive's central directory
+    (one small record per entry) grows. Entries are stored under
+    "<folder_name>/". The archive is complete once close() returns.
+    
+    Each member's method comes from the CompressionPolicy; its sizes and
+    ratio are recorded for compression_summary().
+    
+    With more than one worker, deflated members are compressed on a
+    ParallelZipWriter thread pool: add_*() returns once the input has been
+    read, and members (and compression_summary()) are complete after close().
+    """
+    
+    def __init__(
+        self,
+        zip_path: Union[str, Path],
+        folder_name: str,
+        policy: Optional[CompressionPolicy] = None,
+        workers: Optional[int] = None,
+    ):
+        """
+        Args:
+            zip_path: Archive to create (parent directory created if missing)
+            folder_name: Root folder inside the ZIP
+            policy: Member compression (None = CompressionPolicy.from_env())
+            workers: Compression threads (None = resolve_zip_workers(); 1 = zipfile)
+        """
+        self.zip_path = Path(zip_path)
+        self.folder_name = folder_name
+        self.policy = policy or CompressionPolicy.from_env()
+        self.workers = resolve_zip_workers(workers)
+        self.file_count = 0
+        self.total_bytes = 0
+        self.members: List[Dict[str, Any]] = []
+        self.zip_path.parent.mkdir(parents=True, exist_ok=True)
+        self._zf: Optional[Union[zipfile.ZipFile, ParallelZipWriter]]
+        if self.workers > 1:
+            self._zf = ParallelZipWriter(self.zip_path, self.workers)
+        else:
+            self._zf = zipfile.ZipFile(self.zip_path, 'w', zipfile.ZIP_DEFLATED)
+    
+    @property
+    def closed(self) -> bool:
+        return self._zf is None
+    
+    @property
+    def parallel(self) -> bool:
+        return self.workers > 1
+    
+    def arcname(self, rel_path: str) -> str:
+        return f"{self.folder_name}/{rel_path}"
+    
+    def _recorder(self, rel_path: str, method: int, reason: str):
+        return lambda info: self._record(rel_path, method, reason, info)
+    
+    def _record(self, rel_path: str, method: int, reason: str, info: zipfile.ZipInfo) -> None:
+        self.members.append({
+            'name': rel_path,
+            'method': 'deflate' if method == zipfile.ZIP_DEFLATED else 'store',
+            'reason': reason,
+            'bytes': info.file_size,
+            'compressed_bytes': info.compress_size,
+            'ratio': round(info.compress_size / info.file_size, 4) if info.file_size else 1.0,
+        })
+    
+    def add_file(self, path: Union[str, Path], rel_path: str) -> str:
+        """Copy a file into the archive in blocks; counted as an output file."""
+        arcname = self.arcname(rel_path)
+        method, reason = self.policy.choose(rel_path, path=path)
+        if self.parallel:
+            self._zf.add_file(path, arcname, method, self.policy.level, self._recorder(rel_path, method, reason))
+        else:
+            self._zf.write(path, arcname, compress_type=method, compresslevel=self.policy.level)
+            self._record(rel_path, method, reason, self._zf.infolist()[-1])
+        self.total_bytes += os.path.getsize(path)
+        self.file_count += 1
+        return arcname
+    
+    def add_bytes(self, rel_path: str, content: Union[str, bytes]) -> str:
+        """Write a small generated entry (audit log, README, viewer asset)."""
+        arcname = self.arcname(rel_path)
+        method, reason = self.policy.choose(rel_path, data=content)
+        if self.parallel:
+            self._zf.add_bytes(arcname, content, method, self.policy.level, self._recorder(rel_path, method, reason))
+        else:
+            self._zf.writestr(arcname, content, compress_type=method, compresslevel=self.policy.level)
+            self._record(rel_path, method, reason, self._zf.infolist()[-1])
+        return arcname
+    
+    def compression_summary(self) -> Dict[str, Any]:
+        """Totals and per-member sizes/ratios (ratio = compressed / original)."""
+        total = sum(m['bytes'] for m in self.members)
+        compressed = sum(m['compressed_bytes'] for m in self.members)
+        return {
+            'mode': self.policy.mode,
+            'level': self.policy.level,
+            'workers': self.workers,
+            'stored': sum(1 for m in self.members if m['method'] == 'store'),
+            'deflated': sum(1 for m in self.members if m['method'] == 'deflate'),
+            'bytes': total,
+            'compressed_bytes': compressed,
+            'ratio': round(compressed / total, 4) if total else 1.0,
+            'members': list(self.members),
+        }
+    
+    def close(self) -> ExportResult:
+        """Write the central directory and return the export result."""
+        if self._zf is not None:
+            self._zf.close()
+            self._zf = None
+        return ExportResult(
+            zip_path=str(self.zip_path),
+            folder_name=self.folder_name,
+            file_count=self.file_count,
+            total_bytes=self.total_bytes,
+            success=True,
+            compression=self.compression_summary(),
+        )
+    
+    def discard(self) -> None:
+        """Close and delete an archive that will not be completed."""
+        if self._zf is not None:
+            try:
+                if self.parallel:
+                    self._zf.abort()
+                else:
+                    self._zf.close()
+            except Exception:
+                pass
+            self._zf = None
+        try:
+            self.zip_path.unlink()
+        except OSError:
+            pass
+    
+    def __enter__(self) -> "StreamingZipBundle":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
 def build_zip_bundle(
     processed_files: List[Dict[str, Any]],
     output_dir: Path,
@@ -82,6 +365,8 @@ def build_zip_bundle(
     audit_logs: Optional[List[str]] = None,
     viewer_files: Optional[Dict[str, bytes]] = None,
     additional_files: Optional[Dict[str, bytes]] = None,
+    policy: Optional[CompressionPolicy] = None,
+    workers: Optional[int] = None,
 ) -> ExportResult:
     """
     Build a ZIP bundle from processed files.
@@ -93,6 +378,8 @@ def build_zip_bundle(
         audit_logs: Optional list of audit log strings
         viewer_files: Optional dict of {path: content} for viewer files
         additional_files: Optional dict of {path: content} for extra files
+        policy: Member compression (None = CompressionPolicy.from_env())
+        workers: Compression threads (None = resolve_zip_workers(); 1 = zipfile)
         
     Returns:
         ExportResult with zip_path and metadata
@@ -102,52 +389,28 @@ def build_zip_bundle(
         zip_filename = f"{folder_name}.zip"
         zip_path = output_dir / zip_filename
         
-        total_bytes = 0
-        file_count = 0
-        
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        with StreamingZipBundle(zip_path, folder_name, policy, workers) as bundle:
             # Add processed DICOM files
             for pf in processed_files:
                 output_path = pf.get('output_path')
                 filename = pf.get('filename', os.path.basename(output_path))
                 
                 if output_path and os.path.exists(output_path):
-                    arcname = f"{folder_name}/DICOM/{filename}"
-                    zf.write(output_path, arcname)
-                    total_bytes += os.path.getsize(output_path)
-                    file_count += 1
+                    bundle.add_file(output_path, f"DICOM/{filename}")
             
             # Add audit logs
             if audit_logs:
-                combined_log = '\n\n'.join(audit_logs)
-                arcname = f"{folder_name}/audit_log.txt"
-                zf.writestr(arcname, combined_log)
+                bundle.add_bytes("audit_log.txt", '\n\n'.join(audit_logs))
             
             # Add viewer files
-            if viewer_files:
-                for rel_path, content in viewer_files.items():
-                    arcname = f"{folder_name}/{rel_path}"
-                    if isinstance(content, str):
-                        zf.writestr(arcname, content)
-                    else:
-                        zf.writestr(arcname, content)
+            for rel_path, content in (viewer_files or {}).items():
+                bundle.add_bytes(rel_path, content)
             
             # Add additional files
-            if additional_files:
-                for rel_path, content in additional_files.items():
-                    arcname = f"{folder_name}/{rel_path}"
-                    if isinstance(content, str):
-                        zf.writestr(arcname, content)
-                    else:
-                        zf.writestr(arcname, content)
+            for rel_path, content in (additional_files or {}).items():
+                bundle.add_bytes(rel_path, content)
         
-        return ExportResult(
-            zip_path=str(zip_path),
-            folder_name=folder_name,
-            file_count=file_count,
-            total_bytes=total_bytes,
-            success=True,
-        )
+        return bundle.close()
         
     except Exception as e:
         return ExportResult(
@@ -156,22 +419,25 @@ def build_zip_bundle(
         )
 
 
-def compute_file_hash(filepath: str, algorithm: str = 'sha256') -> str:
+def compute_file_hash(
+    filepath: str,
+    algorithm: str = 'sha256',
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    use_mmap: bool = False,
+) -> str:
     """
     Compute hash of a file for integrity verification.
     
     Args:
         filepath: Path to the file
-        algorithm: Hash algorithm ('sha256', 'md5')
+        algorithm: Hash algorithm ('sha256', 'blake2b', 'md5', ...)
+        block_size: Bytes per read
+        use_mmap: Hash through a memory map instead of reads
         
     Returns:
         Hex digest of the file hash
     """
-    h = hashlib.new(algorithm)
-    with open(filepath, 'rb') as f:
-        while chunk := f.read(8192):
-            h.update(chunk)
-    return h.hexdigest()
+    return hash_file(filepath, (algorithm,), block_size=block_size, use_mmap=use_mmap)[algorithm]
 
 
 def build_viewer_ordered_entries(
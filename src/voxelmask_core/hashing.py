@@ -0,0 +1,200 @@
+# src/voxelmask_core/hashing.py
+"""
+Streaming file hashing for VoxelMask.
+
+NO STREAMLIT IMPORTS ALLOWED IN THIS MODULE.
+
+Output files, audit receipts and evidence bundles all need file digests.
+Hashing used to read whole files into memory (hashlib.sha256(f.read())),
+so a 2 GB cine cost 2 GB of RAM just to be hashed. Everything here reads
+in fixed-size blocks, and several algorithms are fed from the same block
+so SHA-256 (integrity) and BLAKE2b (fast dedupe) cost one pass over the
+file.
+
+This module handles:
+- MultiHasher: several hashlib algorithms updated together
+- hash_bytes(): digests of an in-memory buffer
+- hash_fileobj(): digests of a binary file object, read in blocks
+- hash_file(): digests of a file on disk (buffered reads or mmap)
+- file_sha256(): SHA-256 of a file, memoized by path, inode, size and mtime
+"""
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from typing import BinaryIO, Dict, Optional, Sequence
+
+# Default algorithm set: integrity only
+DEFAULT_ALGORITHMS = ("sha256",)
+
+# Integrity plus a fast content key for dedupe
+DEDUPE_ALGORITHMS = ("sha256", "blake2b")
+
+# Bytes per read/update; large enough that per-call overhead is noise
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+# Digests kept by file_sha256(), least recently used dropped first
+_FILE_HASH_MEMO_SIZE = 1024
+_file_hash_memo: "OrderedDict[tuple, str]" = OrderedDict()
+_file_hash_lock = threading.Lock()
+
+
+class MultiHasher:
+    """
+    Feed the same bytes to several hashlib algorithms.
+
+    Raises:
+        ValueError: If an algorithm is not available in hashlib
+    """
+
+    def __init__(self, algorithms: Sequence[str] = DEFAULT_ALGORITHMS):
+        if not algorithms:
+            raise ValueError("At least one hash algorithm is required")
+        self._hashers = {name: hashlib.new(name) for name in dict.fromkeys(algorithms)}
+        self.nbytes = 0
+
+    @property
+    def algorithms(self) -> tuple:
+        return tuple(self._hashers)
+
+    def update(self, data) -> None:
+        for hasher in self._hashers.values():
+            hasher.update(data)
+        self.nbytes += memoryview(data).nbytes
+
+    def hexdigests(self) -> Dict[str, str]:
+        """Hex digest per algorithm name."""
+        return {name: hasher.hexdigest() for name, hasher in self._hashers.items()}
+
+
+def hash_bytes(
+    data,
+    algorithms: Sequence[str] = DEFAULT_ALGORITHMS,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Dict[str, str]:
+    """
+    Digests of an in-memory bytes-like object.
+
+    Args:
+        data: bytes, bytearray, memoryview or any C-contiguous buffer
+        algorithms: hashlib algorithm names
+        block_size: Bytes per update
+
+    Returns:
+        Dict of algorithm name -> hex digest
+    """
+    hasher = MultiHasher(algorithms)
+    view = memoryview(data).cast("B")
+    for start in range(0, view.nbytes, block_size):
+        hasher.update(view[start:start + block_size])
+    return hasher.hexdigests()
+
+
+def hash_fileobj(
+    fp: BinaryIO,
+    algorithms: Sequence[str] = DEFAULT_ALGORITHMS,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Dict[str, str]:
+    """
+    Digests of a binary file object from its current position to EOF.
+
+    Reads into one reusable buffer, so memory use is block_size no matter
+    how large the file is.
+    """
+    hasher = MultiHasher(algorithms)
+    buffer = bytearray(block_size)
+    view = memoryview(buffer)
+    readinto = getattr(fp, "readinto", None)
+    while True:
+        if readinto is not None:
+            n = readinto(buffer)
+            if not n:
+                break
+            hasher.update(view[:n])
+        else:
+            chunk = fp.read(block_size)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher.hexdigests()
+
+
+def hash_file(
+    path: str,
+    algorithms: Sequence[str] = DEFAULT_ALGORITHMS,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    use_mmap: bool = False,
+) -> Dict[str, str]:
+    """
+    Digests of a file on disk in one pass.
+
+    Args:
+        path: File to hash
+        algorithms: hashlib algorithm names, e.g. DEDUPE_ALGORITHMS
+        block_size: Bytes per read/update
+        use_mmap: Map the file instead of reading it (saves a copy per block
+                  from the page cache; falls back to reads where mmap fails)
+
+    Returns:
+        Dict of algorithm name -> hex digest
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    with open(path, "rb") as fp:
+        if use_mmap:
+            digests = _hash_mapped(fp, algorithms, block_size)
+            if digests is not None:
+                return digests
+        return hash_fileobj(fp, algorithms, block_size)
+
+
+def _hash_mapped(fp: BinaryIO, algorithms: Sequence[str], block_size: int) -> Optional[Dict[str, str]]:
+    """hash_file() through mmap; None if the file cannot be mapped."""
+    size = os.fstat(fp.fileno()).st_size
+    if size == 0:
+        return MultiHasher(algorithms).hexdigests()  # mmap rejects empty files
+    try:
+        mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    with mapped:
+        if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        hasher = MultiHasher(algorithms)
+        view = memoryview(mapped)
+        try:
+            for start in range(0, size, block_size):
+                hasher.update(view[start:start + block_size])
+        finally:
+            view.release()  # The map cannot close while a view is exported
+        return hasher.hexdigests()
+
+
+def file_sha256(path: str, block_size: int = DEFAULT_BLOCK_SIZE) -> str:
+    """
+    SHA-256 of a file, memoized by (path, inode, size, mtime).
+
+    Any rewrite of the file through the filesystem changes its size or
+    modification time, so a stale digest is never returned for it.
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    st = os.stat(path)
+    key = (os.path.realpath(path), st.st_ino, st.st_size, st.st_mtime_ns)
+    with _file_hash_lock:
+        digest = _file_hash_memo.get(key)
+        if digest is not None:
+            _file_hash_memo.move_to_end(key)
+            return digest
+
+    digest = hash_file(path, ("sha256",), block_size)["sha256"]
+    with _file_hash_lock:
+        _file_hash_memo[key] = digest
+        while len(_file_hash_memo) > _FILE_HASH_MEMO_SIZE:
+            _file_hash_memo.popitem(last=False)
+    return digest
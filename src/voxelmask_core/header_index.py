@@ -0,0 +1,365 @@
+# src/voxelmask_core/header_index.py
+"""
+Shared DICOM header index for VoxelMask.
+
+NO STREAMLIT IMPORTS ALLOWED IN THIS MODULE.
+
+Manifest analysis, bucket classification, the viewer's file info and the
+preflight scan each used to dcmread() every upload's header again, one
+file after another. The index reads each header once, in a thread pool,
+into a small immutable record that all of those stages consume.
+
+Reads are tag-targeted: each consumer declares the tags it needs
+(HEADER_RECORD_TAGS for the index, CLASSIFY_TAGS for classification) and
+only those are decoded. Parsing stops after the highest declared tag, so
+SR content trees, vendor private blocks and anything else past group 0028
+are never read; elements skipped before that point are seeked over. A
+read that fails, or finds neither SOP Class nor Modality, falls back to a
+full header parse with large values deferred.
+
+An optional persistent cache (e.g. header_cache.HeaderCache) keyed by
+file content hash lets a re-uploaded study skip header parsing entirely.
+Caches that keep no identifying fields get them back through a short
+targeted read of IDENTIFYING_TAGS.
+
+This module handles:
+- HeaderRecord: the header fields the pre-processing stages need
+- read_header_record(): read one file's header (or a declared tag set) into a record
+- strip_identifying(): a record without its identifying fields
+- HeaderIndex: per-run cache of records, filled concurrently by build()
+"""
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .pipeline import resolve_max_workers
+
+# Header reads are I/O bound (pydicom parses only up to PixelData), so the
+# pool may be wider than the CPU count
+HEADER_READ_WORKERS = 8
+
+_DICOM_MAGIC_OFFSET = 128
+_DICOM_MAGIC = b"DICM"
+
+# Tags behind every HeaderRecord field (the index reads these)
+HEADER_RECORD_TAGS = (
+    "ImageType",
+    "SOPClassUID",
+    "SOPInstanceUID",
+    "AcquisitionTime",
+    "ContentTime",
+    "Modality",
+    "SeriesDescription",
+    "SeriesInstanceUID",
+    "SeriesNumber",
+    "InstanceNumber",
+    "PhotometricInterpretation",
+    "NumberOfFrames",
+    "Rows",
+    "Columns",
+    "BitsAllocated",
+    "BitsStored",
+)
+
+# Tags classification needs (classify_dicom_file, manifest analysis)
+CLASSIFY_TAGS = ("SOPClassUID", "Modality", "SeriesDescription")
+
+# Record fields that identify a patient, study or acquisition (UIDs,
+# free text, times) and the tags a record needs to restore them
+IDENTIFYING_FIELDS = ("sop_instance_uid", "series_instance_uid", "series_description", "acquisition_time")
+IDENTIFYING_TAGS = (
+    "SOPClassUID",
+    "SOPInstanceUID",
+    "AcquisitionTime",
+    "ContentTime",
+    "Modality",
+    "SeriesDescription",
+    "SeriesInstanceUID",
+)
+
+# Fallback full parse: values above this size are left unread
+FULL_PARSE_DEFER_SIZE = "64 KB"
+
+
+@dataclass(frozen=True)
+class HeaderRecord:
+    """
+    Header fields of one DICOM file, read once.
+
+    String fields are "" and numeric fields None when the element is
+    absent; callers apply their own display defaults. error is set when
+    the header could not be parsed at all.
+    """
+    path: str
+    file_size: int
+    part10: bool = False                   # DICM prefix present (strict pydicom read would succeed)
+    modality: str = ""                     # Upper-cased
+    sop_class_uid: str = ""
+    sop_instance_uid: str = ""
+    series_instance_uid: str = ""
+    series_number: Optional[int] = None
+    instance_number: Optional[int] = None
+    acquisition_time: str = ""             # AcquisitionTime, else ContentTime
+    rows: Optional[int] = None
+    columns: Optional[int] = None
+    number_of_frames: Optional[int] = None
+    transfer_syntax_uid: str = ""
+    series_description: str = ""
+    image_type: str = ""                   # str() of the ImageType value
+    bits_stored: Optional[int] = None
+    bits_allocated: Optional[int] = None
+    photometric_interpretation: str = ""
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _int_or_none(value) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _has_dicom_magic(path: str) -> bool:
+    try:
+        with open(path, "rb") as fh:
+            fh.seek(_DICOM_MAGIC_OFFSET)
+            return fh.read(len(_DICOM_MAGIC)) == _DICOM_MAGIC
+    except OSError:
+        return False
+
+
+@lru_cache(maxsize=None)
+def _tag_numbers(keywords: Tuple[str, ...]) -> Tuple[int, ...]:
+    from pydicom.datadict import tag_for_keyword
+    return tuple(sorted(tag_for_keyword(k) for k in keywords))
+
+
+def _read_targeted(path: str, tags: Tuple[str, ...]):
+    """Decode only the declared tags, stopping after the highest one."""
+    from pydicom.filereader import read_partial
+
+    numbers = _tag_numbers(tags)
+    last = numbers[-1]
+
+    def past_last_tag(tag, vr, length) -> bool:
+        return tag > last
+
+    with open(path, "rb") as fp:
+        return read_partial(fp, stop_when=past_last_tag, force=True, specific_tags=list(numbers))
+
+
+def _read_full(path: str):
+    """Full header parse (no pixel data, large values deferred)."""
+    import pydicom
+    return pydicom.dcmread(path, stop_before_pixels=True, force=True, defer_size=FULL_PARSE_DEFER_SIZE)
+
+
+def read_header_record(path: str, tags: Optional[Tuple[str, ...]] = HEADER_RECORD_TAGS) -> HeaderRecord:
+    """
+    Read one file's header (no pixel data) into a HeaderRecord.
+
+    Args:
+        path: DICOM file
+        tags: Keywords the caller needs (fields outside them stay empty);
+              None parses the full header
+
+    Never raises for unreadable files: the record comes back with error set.
+    """
+    try:
+        file_size = os.path.getsize(path)
+    except OSError as e:
+        return HeaderRecord(path=path, file_size=0, error=f"{type(e).__name__}: {e}")
+    ds = None
+    if tags:
+        try:
+            ds = _read_targeted(path, tags)
+        except Exception:
+            ds = None
+        if ds is not None and "SOPClassUID" not in ds and "Modality" not in ds:
+            ds = None  # Nothing identifying found (e.g. out-of-order elements): parse it all
+    try:
+        if ds is None:
+            ds = _read_full(path)
+    except Exception as e:
+        return HeaderRecord(path=path, file_size=file_size, part10=_has_dicom_magic(path),
+                            error=f"{type(e).__name__}: {e}")
+
+    def text(keyword: str) -> str:
+        value = getattr(ds, keyword, None)
+        return "" if value is None else str(value)
+
+    file_meta = getattr(ds, "file_meta", None)
+    return HeaderRecord(
+        path=path,
+        file_size=file_size,
+        part10=getattr(ds, "preamble", None) is not None,
+        modality=text("Modality").upper(),
+        sop_class_uid=text("SOPClassUID"),
+        sop_instance_uid=text("SOPInstanceUID"),
+        series_instance_uid=text("SeriesInstanceUID"),
+        series_number=_int_or_none(getattr(ds, "SeriesNumber", None)),
+        instance_number=_int_or_none(getattr(ds, "InstanceNumber", None)),
+        acquisition_time=text("AcquisitionTime") or text("ContentTime"),
+        rows=_int_or_none(getattr(ds, "Rows", None)),
+        columns=_int_or_none(getattr(ds, "Columns", None)),
+        number_of_frames=_int_or_none(getattr(ds, "NumberOfFrames", None)),
+        transfer_syntax_uid=str(getattr(file_meta, "TransferSyntaxUID", "") or ""),
+        series_description=text("SeriesDescription"),
+        image_type=str(getattr(ds, "ImageType", [])),
+        bits_stored=_int_or_none(getattr(ds, "BitsStored", None)),
+        bits_allocated=_int_or_none(getattr(ds, "BitsAllocated", None)),
+        photometric_interpretation=text("PhotometricInterpretation").upper(),
+    )
+
+
+def strip_identifying(record: HeaderRecord) -> HeaderRecord:
+    """Copy of record with IDENTIFYING_FIELDS emptied (and no path)."""
+    return replace(record, path="", **{name: "" for name in IDENTIFYING_FIELDS})
+
+
+def _stamp(path: str) -> Optional[Tuple[int, int, int]]:
+    """(inode, size, mtime) of a file; None if it is gone."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class HeaderIndex:
+    """
+    Header records of a run's input files, keyed by path.
+
+    A record is served from the index only while the file's inode, size
+    and mtime are unchanged, so a rewritten file is read again. Thread-safe.
+
+    With a persistent cache, files whose content hash is known are looked
+    up there before their header is read. The cache needs:
+        get(sha256) -> (HeaderRecord, phi_free) or None
+        put(sha256, HeaderRecord) -> None
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, cache: Any = None):
+        """
+        Args:
+            max_workers: Concurrent header reads in build() (None = HEADER_READ_WORKERS)
+            cache: Optional persistent cache keyed by content SHA-256
+        """
+        self.max_workers = max_workers or HEADER_READ_WORKERS
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._records: Dict[str, Tuple[Optional[Tuple[int, int, int]], HeaderRecord]] = {}
+        self.reads = 0
+        self.hits = 0
+        self.cache_hits = 0
+
+    def get(self, path: str) -> Optional[HeaderRecord]:
+        """The indexed record for path, or None if absent or stale."""
+        path = os.fspath(path)
+        with self._lock:
+            cached = self._records.get(path)
+        if cached is None or cached[0] != _stamp(path):
+            return None
+        with self._lock:
+            self.hits += 1
+        return cached[1]
+
+    def read(self, path: str, sha256: Optional[str] = None) -> HeaderRecord:
+        """
+        Record for path: from the index, the persistent cache, or read now.
+
+        Args:
+            path: DICOM file
+            sha256: Content hash of the file (enables the persistent cache)
+        """
+        path = os.fspath(path)
+        record = self.get(path)
+        if record is not None:
+            return record
+        stamp = _stamp(path)
+        record = self._from_cache(path, stamp, sha256)
+        if record is None:
+            record = read_header_record(path)
+            with self._lock:
+                self.reads += 1
+            if self.cache is not None and sha256 and record.ok:
+                try:
+                    self.cache.put(sha256, record)
+                except Exception as e:
+                    print(f"[HEADERS] Warning: header cache write failed: {type(e).__name__}")
+        with self._lock:
+            self._records[path] = (stamp, record)
+        return record
+
+    def _from_cache(self, path: str, stamp, sha256: Optional[str]) -> Optional[HeaderRecord]:
+        """Record rebuilt from the persistent cache, or None on a miss."""
+        if self.cache is None or not sha256 or stamp is None:
+            return None
+        try:
+            cached = self.cache.get(sha256)
+        except Exception as e:
+            print(f"[HEADERS] Warning: header cache read failed: {type(e).__name__}")
+            return None
+        if cached is None:
+            return None
+        record, phi_free = cached
+        record = replace(record, path=path, file_size=stamp[1])
+        if phi_free:
+            # Identifying fields were not stored: read just those tags
+            identifying = read_header_record(path, tags=IDENTIFYING_TAGS)
+            if not identifying.ok:
+                return None
+            record = replace(record, **{name: getattr(identifying, name) for name in IDENTIFYING_FIELDS})
+        with self._lock:
+            self.cache_hits += 1
+        return record
+
+    def build(
+        self,
+        paths: Iterable[str],
+        max_workers: Optional[int] = None,
+        digests: Optional[Iterable[Optional[str]]] = None,
+    ) -> List[HeaderRecord]:
+        """
+        Index many files, reading the missing headers concurrently.
+
+        Args:
+            paths: Files to index (duplicates are read once)
+            max_workers: Override for this call
+            digests: Content SHA-256 per path (for the persistent cache)
+
+        Returns:
+            Records in the order of paths
+        """
+        paths = [os.fspath(p) for p in paths]
+        digest_of = dict(zip(paths, digests)) if digests is not None else {}
+        missing = [p for p in dict.fromkeys(paths) if self.get(p) is None]
+        workers = resolve_max_workers(max_workers or self.max_workers, len(missing))
+        if workers > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="header-index") as pool:
+                list(pool.map(lambda p: self.read(p, digest_of.get(p)), missing))
+        else:
+            for path in missing:
+                self.read(path, digest_of.get(path))
+        return [self.read(p, digest_of.get(p)) for p in paths]
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for logging (no PHI)."""
+        with self._lock:
+            return {
+                "records": len(self._records),
+                "reads": self.reads,
+                "hits": self.hits,
+                "cache_hits": self.cache_hits,
+            }
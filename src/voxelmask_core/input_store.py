@@ -0,0 +1,243 @@
+# src/voxelmask_core/input_store.py
+"""
+Content-addressed input store for VoxelMask.
+
+NO STREAMLIT IMPORTS ALLOWED IN THIS MODULE.
+
+The manifest analysis, the viewer cache, the processing loop and
+prepare_pipeline_inputs() each used to call getbuffer() on an upload and
+write it to a fresh NamedTemporaryFile, so one upload landed on disk 3-4
+times per run. The store writes each upload once, under RunPaths.tmp_dir,
+named by its SHA-256, and every stage reuses that file.
+
+This module handles:
+- InputStore: write-once store with per-file reference counts
+- StoredInput: path/mmap-backed buffer for one stored upload, usable
+  wherever an uploaded file is (name, size, getbuffer())
+
+Lifetime:
+- put() stores a buffer (once per buffer object, deduplicated by content)
+  and pins it for the store's lifetime: every stage of the run reuses it
+- acquire() adds a reference for a holder that releases it explicitly
+  (pipeline inputs, released by cleanup_temp_files())
+- release() drops a reference; the file is deleted when none remain
+- close() drops everything (run boundary)
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Tuple, Union
+
+from .hashing import DEFAULT_BLOCK_SIZE, MultiHasher
+
+_STORED_SUFFIX = ".dcm"
+
+
+class StoredInput:
+    """
+    One stored upload: a file in the input store plus its original name.
+
+    Drop-in for uploaded files and ZIP member handles: name, size and
+    getbuffer() (a read-only memoryview over an mmap of the stored file).
+    Stages that need a path use .path directly.
+    """
+
+    def __init__(self, name: str, path: str, sha256: str, size: int):
+        self.name = name
+        self.path = path
+        self.sha256 = sha256
+        self.size = size
+        self._map: Optional[mmap.mmap] = None
+
+    def open(self) -> BinaryIO:
+        """Binary handle on the stored file."""
+        return open(self.path, "rb")
+
+    def getbuffer(self):
+        """Read-only view of the stored bytes, backed by an mmap (no copy)."""
+        if self.size == 0:
+            return memoryview(b"")
+        if self._map is None:
+            with open(self.path, "rb") as fh:
+                self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._map)
+
+    def copy_to(self, dst: BinaryIO, chunk_size: int = DEFAULT_BLOCK_SIZE) -> int:
+        """Stream the stored bytes into dst; returns bytes written."""
+        with self.open() as fh:
+            shutil.copyfileobj(fh, dst, chunk_size)
+        return self.size
+
+    def close(self) -> None:
+        """Unmap the file (views handed out by getbuffer() keep it alive until released)."""
+        mapped, self._map = self._map, None
+        if mapped is not None:
+            try:
+                mapped.close()
+            except BufferError:
+                pass  # A caller still holds a view; the map goes when it does
+
+    def __repr__(self) -> str:
+        return f"StoredInput({self.name!r}, sha256={self.sha256[:12]}, size={self.size})"
+
+
+def _write_buffer(file_buffer: Any, dst: BinaryIO, hasher: MultiHasher) -> None:
+    """Stream a buffer into dst, hashing what is written."""
+    class _HashingWriter:
+        def write(self, data):
+            hasher.update(data)
+            return dst.write(data)
+
+    copy_to = getattr(file_buffer, "copy_to", None)
+    if copy_to is not None:
+        copy_to(_HashingWriter())
+    else:
+        _HashingWriter().write(file_buffer.getbuffer())
+
+
+class InputStore:
+    """
+    Write-once, content-addressed store of run inputs.
+
+    Files are named <sha256>.dcm; identical uploads share one file. Each
+    file carries a reference count and is deleted when it drops to zero.
+    Thread-safe.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        """
+        Args:
+            root: Store directory (e.g. RunPaths.tmp_dir / "inputs"), created if missing
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._refs: Dict[str, int] = {}               # sha256 -> references
+        self._sizes: Dict[str, int] = {}              # sha256 -> bytes
+        self._buffers: Dict[int, Tuple[Any, StoredInput]] = {}  # id(buffer) -> (buffer, entry)
+        self.bytes_written = 0
+
+    def _path(self, sha256: str) -> str:
+        return str(self.root / f"{sha256}{_STORED_SUFFIX}")
+
+    def _ingest(self, file_buffer: Any) -> Tuple[str, int]:
+        """Write a buffer into the store (once per content); returns (sha256, size)."""
+        if isinstance(file_buffer, StoredInput) and file_buffer.sha256 in self._refs:
+            return file_buffer.sha256, file_buffer.size
+
+        hasher = MultiHasher(("sha256",))
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as dst:
+                _write_buffer(file_buffer, dst, hasher)
+            sha256 = hasher.hexdigests()["sha256"]
+            final = self._path(sha256)
+            with self._lock:
+                if sha256 in self._refs and os.path.exists(final):
+                    os.unlink(tmp)  # Same content already stored
+                else:
+                    os.replace(tmp, final)
+                    self.bytes_written += hasher.nbytes
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        return sha256, hasher.nbytes
+
+    def put(self, file_buffer: Any) -> StoredInput:
+        """
+        Store a buffer for the rest of the run and return its entry.
+
+        Idempotent per buffer object: stages calling put() on the same
+        upload get the same entry without another write.
+        """
+        with self._lock:
+            known = self._buffers.get(id(file_buffer))
+            if known is not None:
+                return known[1]
+
+        sha256, size = self._ingest(file_buffer)
+        with self._lock:
+            known = self._buffers.get(id(file_buffer))
+            if known is not None:
+                return known[1]  # Another thread stored it meanwhile
+            self._refs[sha256] = self._refs.get(sha256, 0) + 1
+            self._sizes[sha256] = size
+            entry = StoredInput(getattr(file_buffer, "name", sha256), self._path(sha256), sha256, size)
+            # Holding the buffer keeps its id from being reused while the entry lives
+            self._buffers[id(file_buffer)] = (file_buffer, entry)
+        return entry
+
+    def acquire(self, file_buffer: Any) -> StoredInput:
+        """put(), plus one reference the caller must release()."""
+        entry = self.put(file_buffer)
+        with self._lock:
+            self._refs[entry.sha256] += 1
+        return entry
+
+    def release(self, entry: Union[StoredInput, str]) -> bool:
+        """
+        Drop one reference to an entry (or to a stored file path).
+
+        Returns:
+            True if the path belongs to the store (whether or not it was deleted)
+        """
+        sha256 = entry.sha256 if isinstance(entry, StoredInput) else self.digest_for_path(entry)
+        if sha256 is None:
+            return False
+        with self._lock:
+            remaining = self._refs.get(sha256, 0) - 1
+            if remaining > 0:
+                self._refs[sha256] = remaining
+                return True
+            self._forget(sha256)
+        return True
+
+    def digest_for_path(self, path: Union[str, os.PathLike]) -> Optional[str]:
+        """The sha256 of a stored file path, or None if the path is not in the store."""
+        path = Path(path)
+        if path.parent.resolve() != self.root.resolve() or path.suffix != _STORED_SUFFIX:
+            return None
+        with self._lock:
+            return path.stem if path.stem in self._refs else None
+
+    def _forget(self, sha256: str) -> None:
+        """Delete a stored file and its entries (lock held)."""
+        self._refs.pop(sha256, None)
+        self._sizes.pop(sha256, None)
+        for key, (_, entry) in list(self._buffers.items()):
+            if entry.sha256 == sha256:
+                entry.close()
+                del self._buffers[key]
+        try:
+            os.unlink(self._path(sha256))
+        except OSError:
+            pass
+
+    def refcount(self, entry: Union[StoredInput, str]) -> int:
+        sha256 = entry.sha256 if isinstance(entry, StoredInput) else entry
+        with self._lock:
+            return self._refs.get(sha256, 0)
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for logging (no PHI)."""
+        with self._lock:
+            return {
+                "files": len(self._refs),
+                "bytes": sum(self._sizes.values()),
+                "bytes_written": self.bytes_written,
+                "buffers": len(self._buffers),
+            }
+
+    def close(self) -> None:
+        """Delete every stored file (run boundary)."""
+        with self._lock:
+            for sha256 in list(self._refs):
+                self._forget(sha256)
@@ -0,0 +1,397 @@
+# src/voxelmask_core/parallel_zip.py
+"""
+Parallel ZIP writer for VoxelMask exports.
+
+NO STREAMLIT IMPORTS ALLOWED IN THIS MODULE.
+
+zipfile deflates every member on the calling thread, which makes it the
+long pole of large exports once the pixel work is done. ParallelZipWriter
+splits each deflated member into fixed-size chunks and compresses them on
+a thread pool (zlib releases the GIL), pigz style:
+
+- every chunk is a raw deflate stream primed with the previous chunk's
+  last 32 KiB as its dictionary, and ends on a byte boundary
+  (Z_SYNC_FLUSH); the member's last chunk ends with Z_FINISH. The chunks
+  concatenate into one valid deflate stream, so members are ordinary
+  ZIP_DEFLATED entries;
+- the caller's thread reads the input and computes the CRC-32;
+- one writer thread writes the local headers and compressed chunks in
+  submission order, then the central directory (Zip64 records when
+  sizes, offsets or the entry count need them).
+
+The archive is readable by zipfile, unzip and every standard tool. Chunks
+in flight are bounded, so memory stays at a few chunks per worker however
+large the members are.
+"""
+from __future__ import annotations
+
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+
+
+# Environment override for the worker count
+ZIP_WORKERS_ENV_VAR = "VOXELMASK_ZIP_WORKERS"
+
+# Uncompressed bytes per compression job
+ZIP_CHUNK_BYTES = 1024 * 1024
+
+# Deflate history window (dictionary carried between chunks)
+_WINDOW_BYTES = 32 * 1024
+
+# Chunks in flight (read, compressing or waiting to be written) per worker
+_INFLIGHT_PER_WORKER = 4
+
+# Sizes/offsets (and entry count) beyond which Zip64 records are written
+ZIP64_LIMIT = (1 << 31) - 1
+ZIP_FILECOUNT_LIMIT = (1 << 16) - 1
+
+_MAX32 = 0xFFFFFFFF
+_MAX16 = 0xFFFF
+
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_CENTRAL_DIR = struct.Struct("<4s4B4HL2L5H2L")
+_END_ARCHIVE = struct.Struct("<4s4H2LH")
+_END_ARCHIVE64 = struct.Struct("<4sQ2H2L4Q")
+_END_ARCHIVE64_LOCATOR = struct.Struct("<4sLQL")
+
+_STOP = object()
+_ABORT = object()
+
+
+def resolve_zip_workers(workers: Optional[int] = None) -> int:
+    """
+    Resolve the number of compression workers.
+
+    Precedence: explicit argument > VOXELMASK_ZIP_WORKERS > CPU count
+    (at most 8). 1 means serial zipfile compression.
+    """
+    if workers is None:
+        raw = os.environ.get(ZIP_WORKERS_ENV_VAR, "").strip()
+        try:
+            workers = int(raw) if raw else min(8, os.cpu_count() or 1)
+        except ValueError:
+            workers = min(8, os.cpu_count() or 1)
+    return max(1, workers)
+
+
+def _dos_datetime(date_time: Tuple[int, ...]) -> Tuple[int, int]:
+    """(time, date) DOS fields; years before 1980 are clamped like zipfile does."""
+    year, month, day, hour, minute, second = date_time[:6]
+    if year < 1980:
+        year, month, day, hour, minute, second = 1980, 1, 1, 0, 0, 0
+    return (hour << 11) | (minute << 5) | (second // 2), ((year - 1980) << 9) | (month << 5) | day
+
+
+def _compress_chunk(data: bytes, level: int, zdict: bytes, last: bool) -> bytes:
+    if zdict:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, 8, zlib.Z_DEFAULT_STRATEGY, zdict)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+def _done(data: bytes) -> Future:
+    future: Future = Future()
+    future.set_result(data)
+    return future
+
+
+@dataclass
+class _Member:
+    """One entry on its way to the writer thread."""
+    name: str
+    method: int
+    date_time: Tuple[int, ...]
+    external_attr: int
+    size_hint: int
+    on_written: Optional[Callable[[zipfile.ZipInfo], None]] = None
+    chunks: "queue.Queue" = field(default_factory=queue.Queue)
+    crc: int = 0
+    file_size: int = 0
+    ended: bool = False
+
+
+class ParallelZipWriter:
+    """
+    Write a ZIP whose deflated members are compressed on a thread pool.
+
+    add_file()/add_bytes() read the input and queue its chunks, returning
+    before the member is written; close() waits for the writer thread and
+    writes the central directory. Writer errors are raised by the next
+    add_*() call or by close().
+    """
+
+    def __init__(self, path: Union[str, Path], workers: Optional[int] = None, chunk_bytes: int = ZIP_CHUNK_BYTES):
+        """
+        Args:
+            path: Archive to create
+            workers: Compression threads (None = resolve_zip_workers())
+            chunk_bytes: Uncompressed bytes per compression job
+        """
+        self.path = Path(path)
+        self.workers = resolve_zip_workers(workers)
+        self.chunk_bytes = max(_WINDOW_BYTES, chunk_bytes)
+        self.infolist: List[zipfile.ZipInfo] = []
+        self._file = open(self.path, "wb")
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="zip-deflate")
+        self._inflight = threading.BoundedSemaphore(self.workers * _INFLIGHT_PER_WORKER)
+        self._members: "queue.Queue" = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="zip-writer", daemon=True)
+        self._writer.start()
+
+    # -- producer side (caller thread) ---------------------------------------
+
+    def _check(self) -> None:
+        if self._closed:
+            raise ValueError("Attempt to write to a closed ZIP archive")
+        if self._error is not None:
+            raise self._error
+
+    def _submit(self, member: _Member, read: Callable[[int], bytes], level: int) -> None:
+        self._members.put(member)
+        try:
+            crc, size, tail = 0, 0, b""
+            chunk = read(self.chunk_bytes)
+            while True:
+                following = read(self.chunk_bytes) if chunk else b""
+                last = not following
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+                self._inflight.acquire()
+                if self._error is not None:
+                    self._inflight.release()
+                    raise self._error
+                if member.method == zipfile.ZIP_DEFLATED:
+                    member.chunks.put(self._pool.submit(_compress_chunk, chunk, level, tail, last))
+                    tail = chunk[-_WINDOW_BYTES:]
+                else:
+                    member.chunks.put(_done(chunk))
+                if last:
+                    break
+                chunk = following
+            member.crc, member.file_size = crc, size
+            member.chunks.put(_STOP)
+        except BaseException:
+            member.chunks.put(_ABORT)
+            raise
+
+    def add_file(
+        self,
+        path: Union[str, Path],
+        arcname: str,
+        method: int = zipfile.ZIP_DEFLATED,
+        level: int = 6,
+        on_written: Optional[Callable[[zipfile.ZipInfo], None]] = None,
+    ) -> None:
+        """Queue a file (read in chunks, never whole)."""
+        self._check()
+        st = os.stat(path)
+        member = _Member(
+            name=arcname,
+            method=method,
+            date_time=time.localtime(st.st_mtime)[:6],
+            external_attr=(st.st_mode & 0xFFFF) << 16,
+            size_hint=st.st_size,
+            on_written=on_written,
+        )
+        with open(path, "rb") as f:
+            self._submit(member, f.read, level)
+
+    def add_bytes(
+        self,
+        arcname: str,
+        data: Union[str, bytes],
+        method: int = zipfile.ZIP_DEFLATED,
+        level: int = 6,
+        on_written: Optional[Callable[[zipfile.ZipInfo], None]] = None,
+    ) -> None:
+        """Queue an in-memory entry."""
+        self._check()
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        view = memoryview(data)
+        position = [0]
+
+        def read(n: int) -> bytes:
+            start = position[0]
+            position[0] = min(len(view), start + n)
+            return bytes(view[start:position[0]])
+
+        member = _Member(
+            name=arcname,
+            method=method,
+            date_time=time.localtime(time.time())[:6],
+            external_attr=0o600 << 16,
+            size_hint=len(data),
+            on_written=on_written,
+        )
+        self._submit(member, read, level)
+
+    # -- writer thread ---------------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            member = self._members.get()
+            if member is _STOP:
+                return
+            try:
+                if self._error is None:
+                    self._write_member(member)
+                else:
+                    self._drain(member)
+            except BaseException as e:
+                if self._error is None:
+                    self._error = e
+                self._drain(member)
+
+    def _drain(self, member: _Member) -> None:
+        """Release a member's chunks without writing them (after an error)."""
+        while not member.ended:
+            item = member.chunks.get()
+            if item is _STOP or item is _ABORT:
+                member.ended = True
+                return
+            item.cancel()
+            self._inflight.release()
+
+    def _write_member(self, member: _Member) -> None:
+        info = zipfile.ZipInfo(member.name, member.date_time)
+        info.compress_type = member.method
+        info.external_attr = member.external_attr
+        info.header_offset = self._file.tell()
+        info.flag_bits = 0x800 if not member.name.isascii() else 0
+        name = member.name.encode("utf-8")
+        zip64 = member.size_hint * 1.05 > ZIP64_LIMIT
+        extract_version = 45 if zip64 else 20
+        extra = struct.pack("<HHQQ", 1, 16, 0, 0) if zip64 else b""
+        dos_time, dos_date = _dos_datetime(member.date_time)
+
+        self._file.write(_LOCAL_HEADER.pack(
+            b"PK\x03\x04", extract_version, 0, info.flag_bits, member.method,
+            dos_time, dos_date, 0, 0, 0, len(name), len(extra),
+        ) + name + extra)
+
+        compress_size = 0
+        while True:
+            item = member.chunks.get()
+            if item is _STOP or item is _ABORT:
+                member.ended = True
+            if item is _STOP:
+                break
+            if item is _ABORT:
+                raise RuntimeError(f"Reading {member.name} failed; archive incomplete")
+            try:
+                data = item.result()
+            finally:
+                self._inflight.release()
+            self._file.write(data)
+            compress_size += len(data)
+
+        if not zip64 and (member.file_size > ZIP64_LIMIT or compress_size > ZIP64_LIMIT):
+            raise zipfile.LargeZipFile(f"{member.name}: member too large for its ZIP header")
+        end = self._file.tell()
+        self._file.seek(info.header_offset + 14)
+        if zip64:
+            self._file.write(struct.pack("<LLL", member.crc, _MAX32, _MAX32))
+            self._file.seek(info.header_offset + _LOCAL_HEADER.size + len(name) + 4)
+            self._file.write(struct.pack("<QQ", member.file_size, compress_size))
+        else:
+            self._file.write(struct.pack("<LLL", member.crc, compress_size, member.file_size))
+        self._file.seek(end)
+
+        info.CRC = member.crc
+        info.file_size = member.file_size
+        info.compress_size = compress_size
+        info.extract_version = extract_version
+        self.infolist.append(info)
+        if member.on_written is not None:
+            member.on_written(info)
+
+    # -- central directory -----------------------------------------------------
+
+    def _write_central_directory(self) -> None:
+        start = self._file.tell()
+        for info in self.infolist:
+            name = info.filename.encode("utf-8")
+            zip64_fields = []
+            file_size, compress_size, offset = info.file_size, info.compress_size, info.header_offset
+            if file_size > ZIP64_LIMIT:
+                zip64_fields.append(file_size)
+                file_size = _MAX32
+            if compress_size > ZIP64_LIMIT:
+                zip64_fields.append(compress_size)
+                compress_size = _MAX32
+            if offset > ZIP64_LIMIT:
+                zip64_fields.append(offset)
+                offset = _MAX32
+            extra = b""
+            extract_version = info.extract_version
+            if zip64_fields:
+                extra = struct.pack(f"<HH{len(zip64_fields)}Q", 1, 8 * len(zip64_fields), *zip64_fields)
+                extract_version = 45
+            dos_time, dos_date = _dos_datetime(info.date_time)
+            self._file.write(_CENTRAL_DIR.pack(
+                b"PK\x01\x02", extract_version, 3, extract_version, 0, info.flag_bits,
+                info.compress_type, dos_time, dos_date, info.CRC, compress_size, file_size,
+                len(name), len(extra), 0, 0, 0, info.external_attr, offset,
+            ) + name + extra)
+
+        end = self._file.tell()
+        count, size = len(self.infolist), end - start
+        if count > ZIP_FILECOUNT_LIMIT or size > ZIP64_LIMIT or start > ZIP64_LIMIT:
+            self._file.write(_END_ARCHIVE64.pack(b"PK\x06\x06", 44, 45, 45, 0, 0, count, count, size, start))
+            self._file.write(_END_ARCHIVE64_LOCATOR.pack(b"PK\x06\x07", 0, end, 1))
+            count = min(count, _MAX16)
+            size = min(size, _MAX32)
+            start = min(start, _MAX32)
+        self._file.write(_END_ARCHIVE.pack(b"PK\x05\x06", 0, 0, count, count, size, start, 0))
+
+    def _shutdown(self) -> None:
+        self._members.put(_STOP)
+        self._writer.join()
+        self._pool.shutdown(wait=True)
+
+    def close(self) -> None:
+        """Wait for queued members, write the central directory and close."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._shutdown()
+            if self._error is not None:
+                raise self._error
+            self._write_central_directory()
+        finally:
+            self._file.close()
+
+    def abort(self) -> None:
+        """Stop writing (the archive is left incomplete for the caller to delete)."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._error is None:
+            self._error = RuntimeError("ZIP export aborted")
+        try:
+            self._shutdown()
+        finally:
+            self._file.close()
+
+    def __enter__(self) -> "ParallelZipWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -24,6 +24,7 @@ from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from .audit import ProcessingAuditSummary, create_processing_stats
 from .export import ExportConfig, ExportResult, generate_export_folder_name
+from .input_store import InputStore
 
 
 @dataclass
@@ -114,6 +115,9 @@ class PipelineResult:
     # Audit data
     audit_logs: List[str] = field(default_factory=list)
     
+    # OCR engine pool warm-up (0.0 when no pool was supplied)
+    ocr_warmup_seconds: float = 0.0
+    
     # Export paths
     output_folder_name: str = ""
     zip_path: Optional[str] = None
@@ -132,15 +136,19 @@ class PipelineResult:
 def prepare_pipeline_inputs(
     file_buffers: List[Any],
     run_dir: Path,
+    store: Optional[InputStore] = None,
 ) -> List[Tuple[str, str]]:
     """
     Prepare input files for pipeline processing.
     
-    Writes file buffers to temporary files and returns paths.
+    Writes file buffers to temporary files and returns paths. With an
+    InputStore, each buffer is acquired from the store instead: uploads
+    already written by an earlier stage are reused, not written again.
     
     Args:
         file_buffers: List of file buffer objects with .getbuffer()
         run_dir: Directory for temporary files
+        store: Optional run input store (RunPaths.tmp_dir / "inputs")
         
     Returns:
         List of (original_filename, temp_input_path) tuples
@@ -148,6 +156,10 @@ def prepare_pipeline_inputs(
     inputs = []
     
     for fb in file_buffers:
+        if store is not None:
+            inputs.append((fb.name, store.acquire(fb).path))
+            continue
+
         # Create temp input file
         temp_input = tempfile.NamedTemporaryFile(
             delete=False, 
@@ -162,6 +174,99 @@ def prepare_pipeline_inputs(
     return inputs
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# EXECUTOR MODES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+EXECUTOR_SERIAL = "serial"
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+EXECUTOR_MODES = (EXECUTOR_SERIAL, EXECUTOR_THREAD, EXECUTOR_PROCESS)
+
+# Per-worker warm state (OCR pool, anonymizer caches, ...) of a worker
+# process, populated once by _init_worker(). Only ever set inside
+# ProcessPoolExecutor workers: serial and thread runs keep their state in
+# the run's own contexts, so concurrent runs in one process never share it.
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+def resolve_max_workers(max_workers: Optional[int], total_files: int) -> int:
+    """
+    Resolve a bounded worker count.
+    
+    Args:
+        max_workers: Requested workers (None or <= 0 means one per CPU core)
+        total_files: Number of files to process (never more workers than files)
+        
+    Returns:
+        Worker count >= 1
+    """
+    if not max_workers or max_workers <= 0:
+        max_workers = os.cpu_count() or 1
+    return max(1, min(max_workers, total_files))
+
+
+def _build_worker_state(
+    worker_initializer: Optional[Callable[[], Optional[Dict[str, Any]]]],
+) -> Dict[str, Any]:
+    """Call worker_initializer (if any) and return its warm state."""
+    if worker_initializer is None:
+        return {}
+    return dict(worker_initializer() or {})
+
+
+def _init_worker(
+    worker_initializer: Optional[Callable[[], Optional[Dict[str, Any]]]],
+) -> None:
+    """ProcessPoolExecutor initializer: build the worker process's warm state."""
+    _WORKER_STATE.clear()
+    _WORKER_STATE.update(_build_worker_state(worker_initializer))
+
+
+def _process_file(
+    file_processor: Callable[[str, str, Dict[str, Any]], bool],
+    original_filename: str,
+    input_path: str,
+    output_path: str,
+    context: Dict[str, Any],
+) -> FileProcessingResult:
+    """
+    Run file_processor for one file and capture the outcome.
+    
+    Module-level (not a closure) so it can be submitted to a process pool.
+    Serial and thread runs pass their warm state in context['worker_state'];
+    in a worker process it comes from _init_worker().
+    """
+    context = dict(context)
+    worker_state = context.get('worker_state')
+    if worker_state is None:
+        worker_state = context['worker_state'] = _WORKER_STATE
+    if worker_state.get('ocr_pool') is not None:
+        context['ocr_pool'] = worker_state['ocr_pool']
+    
+    file_result = FileProcessingResult(
+        input_filename=original_filename,
+        input_bytes=os.path.getsize(input_path) if os.path.exists(input_path) else 0,
+    )
+    
+    try:
+        success = file_processor(input_path, output_path, context)
+        
+        if success and os.path.exists(output_path):
+            file_result.success = True
+            file_result.output_path = output_path
+            file_result.output_bytes = os.path.getsize(output_path)
+        else:
+            file_result.success = False
+            file_result.error = "Processing returned failure"
+            
+    except Exception as e:
+        file_result.success = False
+        file_result.error = str(e)
+    
+    return file_result
+
+
 def run_pipeline(
     file_inputs: List[Tuple[str, str]],
     config: PipelineConfig,
@@ -170,13 +275,18 @@ def run_pipeline(
     run_root: Path,
     file_processor: Callable[[str, str, Dict[str, Any]], bool],
     progress_callback: Optional[Callable[[int, int, str], None]] = None,
+    ocr_pool: Optional[Any] = None,
+    executor_mode: str = EXECUTOR_SERIAL,
+    max_workers: Optional[int] = None,
+    worker_initializer: Optional[Callable[[], Optional[Dict[str, Any]]]] = None,
+    memory_scheduler: Optional[Any] = None,
 ) -> PipelineResult:
     """
     Run the complete processing pipeline.
     
     This is the main pipeline orchestration function. It:
     1. Iterates through input files
-    2. Calls file_processor for each file
+    2. Calls file_processor for each file (serially or on a worker pool)
     3. Aggregates results
     4. Returns PipelineResult
     
@@ -184,6 +294,25 @@ def run_pipeline(
     It's passed in via file_processor callback. This keeps the pipeline
     orchestration separate from the processing implementation.
     
+    Executor modes:
+    - "serial": one file at a time in the calling thread (default).
+      progress_callback(idx, total, filename) fires before each file.
+    - "thread": bounded ThreadPoolExecutor. Suits processors that release
+      the GIL (OCR, OpenCV, zlib, file I/O).
+    - "process": bounded ProcessPoolExecutor. file_processor and
+      worker_initializer must be picklable (module-level functions).
+      The caller's ocr_pool is not shipped to workers; each worker
+      builds its own warm state via worker_initializer.
+    In the parallel modes progress_callback(completed, total, filename)
+    fires in the calling thread as each file completes. In every mode
+    processed_files keeps input order.
+    
+    With a memory_scheduler, each file is planned from its header and
+    only submitted once its estimated pixel memory fits the global
+    budget (first-in first-out): small files run concurrently, a file
+    planned CHUNKED runs alone. The plan reaches file_processor as
+    context['memory_admission'] (pass it on to process_dicom).
+    
     Args:
         file_inputs: List of (original_filename, input_path) tuples
         config: Pipeline configuration
@@ -191,11 +320,31 @@ def run_pipeline(
         run_root: Root directory for this run
         file_processor: Callback(input_path, output_path, context) -> success
         progress_callback: Optional callback(current, total, filename) for progress
+        ocr_pool: Optional OCR engine pool (ocr_pool.OCREnginePool). It is
+            warmed once before the first file and exposed to file_processor
+            as context['ocr_pool'] so engines are borrowed, not reloaded.
+        executor_mode: One of EXECUTOR_MODES
+        max_workers: Upper bound on concurrent files (None = CPU count)
+        worker_initializer: Optional zero-arg callable returning a dict of
+            per-worker warm state, exposed as context['worker_state'].
+            An 'ocr_pool' entry overrides context['ocr_pool'].
+        memory_scheduler: Optional memory_scheduler.MemoryBudgetScheduler
+            that admits files against a global pixel memory budget.
         
     Returns:
         PipelineResult with all processing results
+        
+    Raises:
+        ValueError: If executor_mode is not recognised
     """
     import time
+    from collections import deque
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+    
+    if executor_mode not in EXECUTOR_MODES:
+        raise ValueError(
+            f"Unknown executor_mode {executor_mode!r}; expected one of {EXECUTOR_MODES}"
+        )
     
     start_time = time.time()
     
@@ -205,12 +354,13 @@ def run_pipeline(
     
     total_files = len(file_inputs)
     
-    for idx, (original_filename, input_path) in enumerate(file_inputs):
-        # Report progress
-        if progress_callback:
-            progress_callback(idx, total_files, original_filename)
-        
-        # Create output path
+    # Warm OCR engines once for the whole run (not once per file)
+    if ocr_pool is not None and total_files:
+        result.ocr_warmup_seconds = ocr_pool.warm()
+    
+    # Create output paths up front (in the parent, under run_root)
+    jobs = []
+    for original_filename, input_path in file_inputs:
         output_tmp = tempfile.NamedTemporaryFile(
             delete=False,
             suffix="_processed.dcm",
@@ -225,32 +375,101 @@ def run_pipeline(
             'run_id': run_id,
             'original_filename': original_filename,
             'mask_coords': config.mask_coords,
+            'ocr_pool': ocr_pool if executor_mode != EXECUTOR_PROCESS else None,
+            'memory_admission': (
+                memory_scheduler.plan_path(input_path) if memory_scheduler is not None else None
+            ),
         }
+        jobs.append((original_filename, input_path, output_path, context))
+    
+    file_results: List[Optional[FileProcessingResult]] = [None] * total_files
+    
+    if executor_mode != EXECUTOR_PROCESS:
+        # Serial and thread runs share this process: build this run's warm
+        # state once and hand it to every file through its context
+        worker_state = _build_worker_state(worker_initializer)
+        for job in jobs:
+            job[3]['worker_state'] = worker_state
+    
+    if executor_mode == EXECUTOR_SERIAL or total_files == 0:
+        for idx, (original_filename, input_path, output_path, context) in enumerate(jobs):
+            # Report progress
+            if progress_callback:
+                progress_callback(idx, total_files, original_filename)
+            admission = context['memory_admission']
+            if admission is not None:
+                memory_scheduler.acquire(admission)
+            try:
+                file_results[idx] = _process_file(
+                    file_processor, original_filename, input_path, output_path, context
+                )
+            finally:
+                if admission is not None:
+                    memory_scheduler.release(admission)
+    else:
+        workers = resolve_max_workers(max_workers, total_files)
+        if executor_mode == EXECUTOR_THREAD:
+            executor = ThreadPoolExecutor(max_workers=workers)
+        else:
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(worker_initializer,),
+            )
         
-        # Process file
-        file_result = FileProcessingResult(
-            input_filename=original_filename,
-            input_bytes=os.path.getsize(input_path) if os.path.exists(input_path) else 0,
-        )
-        
-        try:
-            success = file_processor(input_path, output_path, context)
-            
-            if success and os.path.exists(output_path):
-                file_result.success = True
-                file_result.output_path = output_path
-                file_result.output_bytes = os.path.getsize(output_path)
-                result.files_processed += 1
-            else:
-                file_result.success = False
-                file_result.error = "Processing returned failure"
-                result.files_failed += 1
+        with executor:
+            pending = deque(range(total_files))
+            running = {}
+            queued_since: Dict[int, float] = {}
+            completed = 0
+            while pending or running:
+                # Submit in input order while the memory budget allows
+                while pending:
+                    idx = pending[0]
+                    admission = jobs[idx][3]['memory_admission']
+                    if admission is not None:
+                        admitted_at = time.monotonic()
+                        if memory_scheduler.try_acquire(admission):
+                            pass
+                        elif running:
+                            # Queue behind files already in flight
+                            queued_since.setdefault(idx, admitted_at)
+                            break
+                        else:
+                            # Budget held elsewhere: block (acquire records its own wait)
+                            memory_scheduler.acquire(admission)
+                        if idx in queued_since:
+                            memory_scheduler.record_queued(
+                                admission, admitted_at - queued_since.pop(idx)
+                            )
+                    pending.popleft()
+                    running[executor.submit(_process_file, file_processor, *jobs[idx])] = idx
                 
-        except Exception as e:
-            file_result.success = False
-            file_result.error = str(e)
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    idx = running.pop(future)
+                    original_filename = jobs[idx][0]
+                    admission = jobs[idx][3]['memory_admission']
+                    if admission is not None:
+                        memory_scheduler.release(admission)
+                    try:
+                        file_results[idx] = future.result()
+                    except Exception as e:
+                        # Worker died or result could not be returned
+                        file_results[idx] = FileProcessingResult(
+                            input_filename=original_filename,
+                            success=False,
+                            error=str(e),
+                        )
+                    completed += 1
+                    if progress_callback:
+                        progress_callback(completed, total_files, original_filename)
+    
+    for file_result in file_results:
+        if file_result.success:
+            result.files_processed += 1
+        else:
             result.files_failed += 1
-        
         result.processed_files.append(file_result)
         result.total_input_bytes += file_result.input_bytes
         result.total_output_bytes += file_result.output_bytes
@@ -262,15 +481,24 @@ def run_pipeline(
     return result
 
 
-def cleanup_temp_files(file_inputs: List[Tuple[str, str]]) -> None:
+def cleanup_temp_files(
+    file_inputs: List[Tuple[str, str]],
+    store: Optional[InputStore] = None,
+) -> None:
     """
     Clean up temporary input files after processing.
     
+    Store-backed inputs are released (the stored file is deleted once no
+    stage holds it); any other path is deleted.
+    
     Args:
         file_inputs: List of (original_filename, temp_path) tuples
+        store: InputStore the inputs were acquired from, if any
     """
     for _, temp_path in file_inputs:
         try:
+            if store is not None and store.release(temp_path):
+                continue
             if os.path.exists(temp_path):
                 os.unlink(temp_path)
         except Exception:
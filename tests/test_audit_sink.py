@@ -0,0 +1,348 @@
+"""
+Unit tests for audit_sink.py (pooled, batched audit writes)
+
+Tests:
+- One pooled WAL connection per database file, reopened if the file is replaced
+- insert_many() commits outside a group and queues inside one
+- Groups flush once on exit, also when the block raises (and a failed
+  flush never hides the block's own exception)
+- AuditLogger.batch() / log_scrub_events() and DecisionTraceWriter.batch()
+  / commit() write through executemany with one commit
+- AsyncAuditWriter writes on its own thread; flush() is a durability
+  barrier that AtomicScrubOperation waits on and that reports failures
+  only to the sink whose rows failed
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+
+import pytest
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import audit_sink
+from audit_sink import (
+    AUDIT_SYNCHRONOUS_ENV_VAR,
+    AsyncAuditWriter,
+    AuditSink,
+    close_pool,
+    pooled_connection,
+    resolve_audit_synchronous,
+)
+from audit_manager import AtomicScrubOperation, AuditLogger
+from decision_trace import DecisionTraceCollector, DecisionTraceWriter, ReasonCode
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool():
+    close_pool()
+    yield
+    close_pool()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "audit.db")
+
+
+def _count(db_path, table):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def _dataset():
+    ds = Dataset()
+    ds.file_meta = FileMetaDataset()
+    ds.file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds.SOPClassUID = "1.2.840.10008.5.1.4.1.1.7"
+    ds.SOPInstanceUID = generate_uid()
+    return ds
+
+
+def _event(i):
+    return dict(
+        operator_id="OP",
+        original_filename=f"{i}.dcm",
+        scrub_uuid=f"uuid-{i}",
+        reason_code="TEST",
+    )
+
+
+class TestPool:
+
+    def test_one_connection_per_file(self, db_path):
+        assert pooled_connection(db_path) is pooled_connection(db_path)
+
+    def test_wal_and_synchronous(self, db_path, monkeypatch):
+        monkeypatch.setenv(AUDIT_SYNCHRONOUS_ENV_VAR, "full")
+        conn = pooled_connection(db_path).conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL
+
+    def test_replaced_file_reopens(self, db_path):
+        first = pooled_connection(db_path)
+        os.remove(db_path)
+        assert pooled_connection(db_path) is not first
+
+    def test_synchronous_resolution(self, monkeypatch):
+        monkeypatch.delenv(AUDIT_SYNCHRONOUS_ENV_VAR, raising=False)
+        assert resolve_audit_synchronous() == "NORMAL"
+        assert resolve_audit_synchronous("off") == "OFF"
+        monkeypatch.setenv(AUDIT_SYNCHRONOUS_ENV_VAR, "bogus")
+        assert resolve_audit_synchronous() == "NORMAL"
+
+
+class TestAuditSink:
+
+    SQL = "INSERT INTO t (v) VALUES (?)"
+
+    @pytest.fixture
+    def sink(self, db_path):
+        sink = AuditSink(db_path)
+        sink.ensure_schema("t", ["CREATE TABLE IF NOT EXISTS t (v INTEGER)"])
+        return sink
+
+    def test_insert_many_commits(self, sink, db_path):
+        assert sink.insert_many(self.SQL, [(1,), (2,)]) == 2
+        assert _count(db_path, "t") == 2
+
+    def test_group_commits_once_on_exit(self, sink, db_path):
+        with sink.group():
+            with sink.group():
+                sink.insert_many(self.SQL, [(1,)])
+            sink.insert_many(self.SQL, [(2,), (3,)])
+            assert sink.pending == 3
+            assert _count(db_path, "t") == 0
+        assert sink.pending == 0
+        assert _count(db_path, "t") == 3
+
+    def test_group_flushes_when_block_raises(self, sink, db_path):
+        with pytest.raises(RuntimeError):
+            with sink.group():
+                sink.insert_many(self.SQL, [(1,)])
+                raise RuntimeError("run failed")
+        assert _count(db_path, "t") == 1
+
+    def test_flush_failure_does_not_hide_block_error(self, sink, capsys):
+        with pytest.raises(RuntimeError, match="run failed") as excinfo:
+            with sink.group():
+                sink.insert_many("INSERT INTO missing (v) VALUES (?)", [(1,)])
+                raise RuntimeError("run failed")
+        assert excinfo.value.__cause__ is None
+        assert "grouped audit rows not written" in capsys.readouterr().out
+        if sys.version_info >= (3, 11):
+            assert any("group flush also failed" in note for note in excinfo.value.__notes__)
+        assert not sink.grouped
+
+    def test_group_flush_failure_raised_on_clean_exit(self, sink):
+        with pytest.raises(sqlite3.OperationalError):
+            with sink.group():
+                sink.insert_many("INSERT INTO missing (v) VALUES (?)", [(1,)])
+
+    def test_group_flushes_at_row_limit(self, sink, db_path, monkeypatch):
+        monkeypatch.setattr(audit_sink, "GROUP_COMMIT_MAX_ROWS", 2)
+        with sink.group():
+            sink.insert_many(self.SQL, [(1,), (2,)])
+            assert _count(db_path, "t") == 2
+
+    def test_failed_statement_rolled_back(self, sink, db_path):
+        with pytest.raises(sqlite3.Error):
+            with sink.connection() as conn:
+                conn.execute(self.SQL, (1,))
+                conn.execute("INSERT INTO missing VALUES (1)")
+        sink.insert_many(self.SQL, [(2,)])
+        assert _count(db_path, "t") == 1
+
+
+class TestWriters:
+
+    def test_audit_logger_bulk_events(self, db_path):
+        logger = AuditLogger(db_path=db_path)
+        assert logger.log_scrub_event(**_event(0)) == 1
+        assert logger.log_scrub_events(_event(i) for i in range(1, 5)) == 4
+        assert _count(db_path, "scrub_events") == 5
+        assert logger.get_event_by_uuid("uuid-3")["original_filename"] == "3.dcm"
+
+    def test_audit_logger_batch(self, db_path):
+        logger = AuditLogger(db_path=db_path)
+        with logger.batch():
+            assert logger.log_scrub_event(**_event(0)) is None
+            assert logger.log_scrub_events(_event(i) for i in range(1, 3)) == 2
+            assert logger.log_scrub_event(**_event(3), defer=False) == 1
+            assert _count(db_path, "scrub_events") == 1
+        assert _count(db_path, "scrub_events") == 4
+
+    def test_atomic_operation_writes_synchronously(self, db_path, tmp_path):
+        logger = AuditLogger(db_path=db_path)
+        ok, scrub_uuid = AtomicScrubOperation(logger).execute_scrub(
+            dataset=_dataset(),
+            output_path=str(tmp_path / "out.dcm"),
+            operator_id="OP",
+            reason_code="TEST",
+            original_filename="in.dcm",
+        )
+        assert ok and logger.get_event_by_uuid(scrub_uuid)["success"] == 1
+
+    def test_decision_trace_batch(self, db_path):
+        writer = DecisionTraceWriter(db_path)
+        with writer.batch():
+            for scrub in ("a", "b"):
+                collector = DecisionTraceCollector()
+                collector.add("INSTANCE", "REMOVED", "TAG", "PatientName", ReasonCode.HIPAA_NAME, "test")
+                assert writer.commit(scrub, collector) == 1
+            assert _count(db_path, "decision_trace") == 0
+        assert _count(db_path, "decision_trace") == 2
+
+    def test_decision_trace_commit(self, db_path):
+        writer = DecisionTraceWriter(db_path)
+        for scrub in ("a", "b"):
+            collector = DecisionTraceCollector()
+            for tag in ("PatientName", "PatientID"):
+                collector.add("INSTANCE", "REMOVED", "TAG", tag, ReasonCode.HIPAA_NAME, "test")
+            assert writer.commit(scrub, collector) == 2
+        assert _count(db_path, "decision_trace") == 4
+        assert [d["target_name"] for d in writer.get_decisions_for_scrub("b")] == ["PatientName", "PatientID"]
+
+
+@pytest.fixture
+def writer():
+    writer = AsyncAuditWriter(max_queue=8)
+    yield writer
+    writer.close()
+
+
+@pytest.fixture
+def blocked(monkeypatch):
+    """Hold the writer thread before its next commit until released."""
+    gate = threading.Event()
+    real = AsyncAuditWriter._commit
+
+    def gated(self, db_path, statements):
+        gate.wait(5)
+        return real(self, db_path, statements)
+
+    monkeypatch.setattr(AsyncAuditWriter, "_commit", gated)
+    return gate
+
+
+class TestAsyncAuditWriter:
+
+    def test_writes_off_thread_until_flush(self, db_path, writer, blocked):
+        logger = AuditLogger(db_path=db_path, writer=writer)
+        for i in range(3):
+            assert logger.log_scrub_event(**_event(i)) is None
+        assert _count(db_path, "scrub_events") == 0
+
+        blocked.set()
+        logger.flush()
+        assert _count(db_path, "scrub_events") == 3
+
+    def test_accumulated_rows_share_a_transaction(self, db_path, writer, blocked):
+        logger = AuditLogger(db_path=db_path, writer=writer)
+        logger.log_scrub_event(**_event(0))  # Held at the gate
+        for i in range(1, 6):
+            logger.log_scrub_event(**_event(i))
+        blocked.set()
+        logger.flush()
+
+        assert writer.stats()["rows_written"] == 6
+        assert writer.stats()["transactions"] <= 2
+
+    def test_failure_reported_by_flush_without_losing_other_rows(self, db_path, writer):
+        logger = AuditLogger(db_path=db_path, writer=writer)
+        logger.log_scrub_event(**_event(0))
+        logger.log_scrub_event(**_event(0))  # Duplicate scrub_uuid
+        logger.log_scrub_event(**_event(1))
+
+        with pytest.raises(sqlite3.IntegrityError):
+            logger.flush()
+        assert _count(db_path, "scrub_events") == 2
+        logger.flush()  # Error reported once
+
+    def test_failure_reported_only_to_its_sink(self, db_path, writer):
+        a = AuditLogger(db_path=db_path, writer=writer)
+        b = AuditLogger(db_path=db_path, writer=writer)
+        a.log_scrub_event(**_event(0))
+        a.log_scrub_event(**_event(0))  # Duplicate scrub_uuid: a's failure
+        b.log_scrub_event(**_event(1))
+
+        b.flush()
+        with pytest.raises(sqlite3.IntegrityError):
+            a.flush()
+        assert _count(db_path, "scrub_events") == 2
+
+    def test_submit_returns_ticket(self, db_path, writer):
+        sink = AuditSink(db_path, writer=writer)
+        sink.ensure_schema("t", ["CREATE TABLE IF NOT EXISTS t (v INTEGER)"])
+        ticket = writer.submit(db_path, [("INSERT INTO t (v) VALUES (?)", [(1,), (2,)])])
+        assert ticket.result(5) == 2
+        bad = writer.submit(db_path, [("INSERT INTO missing VALUES (?)", [(1,)])])
+        writer.flush()  # Plain barrier: failures stay on their tickets
+        with pytest.raises(sqlite3.OperationalError):
+            writer.flush([bad])
+
+    def test_atomic_operation_waits_on_barrier(self, db_path, writer, tmp_path, monkeypatch):
+        logger = AuditLogger(db_path=db_path, writer=writer)
+        flushed = []
+        real_flush = logger.flush
+        monkeypatch.setattr(logger, "flush", lambda: flushed.append(1) or real_flush())
+        out = tmp_path / "out.dcm"
+
+        ok, scrub_uuid = AtomicScrubOperation(logger).execute_scrub(
+            dataset=_dataset(), output_path=str(out), operator_id="OP",
+            reason_code="TEST", original_filename="in.dcm",
+        )
+
+        assert ok and flushed and out.exists()
+        assert logger.get_event_by_uuid(scrub_uuid)["success"] == 1
+
+    def test_atomic_operation_refuses_save_when_log_fails(self, db_path, writer, tmp_path, monkeypatch):
+        logger = AuditLogger(db_path=db_path, writer=writer)
+        monkeypatch.setattr(logger, "flush", lambda: (_ for _ in ()).throw(sqlite3.OperationalError("disk I/O error")))
+        out = tmp_path / "out.dcm"
+
+        with pytest.raises(RuntimeError, match="ATOMIC SAFETY"):
+            AtomicScrubOperation(logger).execute_scrub(
+                dataset=_dataset(), output_path=str(out), operator_id="OP",
+                reason_code="TEST", original_filename="in.dcm",
+            )
+        assert not out.exists()
+
+    def test_decision_trace_flush(self, db_path, writer):
+        trace = DecisionTraceWriter(db_path, writer=writer)
+        collector = DecisionTraceCollector()
+        collector.add("INSTANCE", "REMOVED", "TAG", "PatientName", ReasonCode.HIPAA_NAME, "test")
+        assert trace.commit("a", collector) == 1
+        trace.flush()
+        assert _count(db_path, "decision_trace") == 1
+
+    def test_close_drains_queue(self, db_path, blocked):
+        writer = AsyncAuditWriter()
+        logger = AuditLogger(db_path=db_path, writer=writer)
+        logger.log_scrub_event(**_event(0))
+        blocked.set()
+        writer.close()
+        assert _count(db_path, "scrub_events") == 1
+        with pytest.raises(RuntimeError):
+            logger.log_scrub_event(**_event(1))
+
+    def test_full_queue_blocks_producer(self, db_path, blocked):
+        writer = AsyncAuditWriter(max_queue=1)
+        sink = AuditSink(db_path, writer=writer)
+        sink.ensure_schema("t", ["CREATE TABLE IF NOT EXISTS t (v INTEGER)"])
+        sink.insert_many("INSERT INTO t (v) VALUES (?)", [(0,)])  # Taken by the thread, held at the gate
+        sink.insert_many("INSERT INTO t (v) VALUES (?)", [(1,)])  # Fills the queue
+
+        third = threading.Thread(target=sink.insert_many, args=("INSERT INTO t (v) VALUES (?)", [(2,)]))
+        third.start()
+        third.join(0.2)
+        assert third.is_alive()
+
+        blocked.set()
+        third.join(5)
+        writer.close()
+        assert _count(db_path, "t") == 3
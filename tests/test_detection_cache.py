@@ -0,0 +1,186 @@
+"""
+Unit tests for detection_cache.py and its use in process_dicom
+
+Tests:
+- Cache keys change with pixels, sampling, preprocessing and engine
+- Round trip, miss counting, corrupt entries, key validation
+- LRU eviction under a byte budget (hits refresh recency)
+- process_dicom reuses a cached detection (no OCR on the repeat run),
+  stores no text, and records hit/miss counters in the evidence bundle
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from detection_cache import DetectionCache, detection_cache_key
+
+
+PARAMS = {"scale_factor": 2, "white_threshold": 200}
+
+
+def _key(pixels="ab" * 32, indices=(0, 9), params=PARAMS, engine="paddleocr==3.0"):
+    return detection_cache_key(pixels, indices, params, engine)
+
+
+class TestKeys:
+
+    def test_every_component_changes_the_key(self):
+        base = _key()
+        assert _key(pixels="cd" * 32) != base
+        assert _key(indices=(0, 8)) != base
+        assert _key(params={**PARAMS, "white_threshold": 180}) != base
+        assert _key(engine="paddleocr==3.1") != base
+
+    def test_hash_prefix_and_dict_order_ignored(self):
+        assert _key(pixels="sha256:" + "ab" * 32) == _key()
+        assert _key(params={"white_threshold": 200, "scale_factor": 2}) == _key()
+
+
+class TestStore:
+
+    def test_round_trip_and_counters(self, tmp_path):
+        cache = DetectionCache(tmp_path)
+        key = _key()
+
+        assert cache.get(key) is None
+        cache.put(key, {"static_box": [1, 2, 3, 4]})
+        assert cache.get(key) == {"static_box": [1, 2, 3, 4]}
+
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.stores, stats.entries) == (1, 1, 1, 1)
+
+    def test_persists_across_instances(self, tmp_path):
+        DetectionCache(tmp_path).put(_key(), {"ok": True})
+        assert DetectionCache(tmp_path).get(_key()) == {"ok": True}
+
+    def test_corrupt_entry_is_a_miss_and_removed(self, tmp_path):
+        cache = DetectionCache(tmp_path)
+        key = _key()
+        (tmp_path / f"{key}.json").write_text("{not json")
+
+        assert cache.get(key) is None
+        assert not (tmp_path / f"{key}.json").exists()
+
+    def test_rejects_non_hash_keys(self, tmp_path):
+        with pytest.raises(ValueError):
+            DetectionCache(tmp_path).get("../../etc/passwd")
+
+    def test_lru_eviction(self, tmp_path):
+        keys = [_key(indices=(i,)) for i in range(4)]
+        cache = DetectionCache(tmp_path, max_bytes=10 ** 9)
+        for age, key in enumerate(keys[:3]):
+            cache.put(key, {"n": age})
+            os.utime(tmp_path / f"{key}.json", (1000 + age, 1000 + age))
+        entry_size = (tmp_path / f"{keys[0]}.json").stat().st_size
+
+        cache.get(keys[0])  # Oldest entry becomes most recently used
+        cache.max_bytes = 3 * entry_size
+        cache.put(keys[3], {"n": 3})
+
+        assert cache.get(keys[1]) is None  # Least recently used: evicted
+        assert cache.get(keys[0]) == {"n": 0}
+        assert cache.stats().evictions == 1
+        assert cache.stats().bytes <= cache.max_bytes
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# process_dicom integration
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class CountingEngine:
+    """OCR engine stand-in returning one fixed box per image."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def _result(self):
+        return {"det_boxes": [[[20, 20], [120, 20], [120, 40], [20, 40]]], "det_scores": [0.91]}
+
+    def predict(self, images):
+        self.calls += 1
+        if isinstance(images, list):
+            return [self._result() for _ in images]
+        return [self._result()]
+
+
+class RecordingBundle:
+
+    def __init__(self):
+        self.calls = {}
+        self.detection_results = []
+
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.calls.setdefault(name, []).append(args or kwargs)
+        return record
+
+
+def _write_cine(path):
+    from pydicom.dataset import Dataset, FileMetaDataset
+    from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+    ds = Dataset()
+    ds.file_meta = FileMetaDataset()
+    ds.file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds.SOPClassUID = ds.file_meta.MediaStorageSOPClassUID = "1.2.840.10008.5.1.4.1.1.6.1"
+    ds.SOPInstanceUID = ds.file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    ds.StudyInstanceUID = generate_uid()
+    ds.SeriesInstanceUID = generate_uid()
+    ds.Modality = "US"
+    ds.PatientName = "DOE^JANE"
+    ds.PatientID = "12345"
+    ds.Rows, ds.Columns = 48, 64
+    ds.SamplesPerPixel = 3
+    ds.PhotometricInterpretation = "RGB"
+    ds.PlanarConfiguration = 0
+    ds.BitsAllocated, ds.BitsStored, ds.HighBit = 8, 8, 7
+    ds.PixelRepresentation = 0
+    ds.NumberOfFrames = 4
+    arr = np.zeros((4, 48, 64, 3), dtype=np.uint8)
+    arr[:, 10:20, 10:60] = 255
+    ds.PixelData = arr.tobytes()
+    ds.save_as(path, enforce_file_format=True)
+
+
+def test_process_dicom_reuses_cached_detection(tmp_path, monkeypatch):
+    import run_on_dicom
+    from ocr_pool import OCREnginePool
+
+    monkeypatch.chdir(tmp_path)  # Debug image goes to ./studies
+    src = str(tmp_path / "in.dcm")
+    _write_cine(src)
+    engine = CountingEngine()
+    pool = OCREnginePool(size=1, engine_factory=lambda: engine)
+    cache = DetectionCache(tmp_path / "cache")
+
+    outputs, bundles = [], []
+    for run in range(2):
+        bundle = RecordingBundle()
+        out = str(tmp_path / f"out{run}.dcm")
+        np.random.seed(0)
+        assert run_on_dicom.process_dicom(
+            src, out, "DOE", "NEW NAME",
+            evidence_bundle=bundle, ocr_pool=pool, detection_cache=cache,
+        )
+        outputs.append(open(out, "rb").read())
+        bundles.append(bundle)
+
+    assert engine.calls == 1  # Second run served from the cache
+    first, second = ([c for c in b.calls["add_detection"]] for b in bundles)
+    assert first == second
+    assert bundles[1].calls["set_cache_stats"][-1][0] == "detection_cache"
+    stats = bundles[1].calls["set_cache_stats"][-1][1]
+    assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 1, 1)
+
+    entry = json.loads(next((tmp_path / "cache").glob("*.json")).read_text())
+    assert set(entry["payload"]) == {
+        "static_box", "all_detected_boxes", "detection_strength", "ocr_failure",
+        "confidence_scores", "region_zones", "image_height", "transient_boxes",
+    }
+    assert entry["payload"]["all_detected_boxes"][0] == [10, 10, 50, 10]
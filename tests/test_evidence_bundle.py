@@ -0,0 +1,270 @@
+"""
+Unit tests for audit/evidence_bundle.py (Model B evidence bundles)
+
+Tests:
+- Streaming and in-memory bundles produce identical record files and counts
+- Streaming keeps no records in memory and appends files as records arrive
+- Record hashes match the bytes on disk; MANIFEST and SIGNATURE are consistent
+- recover_bundle() seals a crashed streaming run as a partial bundle
+- run_on_dicom's CLI seals its streamed bundle when processing fails
+- Compressed bundles keep the MANIFEST hash tree and load back through
+  audit.bundle_reader into the same dataclasses as plain bundles
+"""
+
+import csv
+import gzip
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from audit import evidence_bundle
+from audit.bundle_reader import iter_records, read_bundle
+from audit.evidence_bundle import (
+    IN_PROGRESS_FILENAME,
+    RECORD_FILES,
+    EvidenceBundle,
+    recover_bundle,
+)
+from voxelmask_core.hashing import hash_file
+
+
+def _populate(bundle, instances=3):
+    bundle.set_source_study("1.2.3", "Study")
+    for i in range(instances):
+        src, out = f"1.2.3.{i}", f"9.9.9.{i}"
+        bundle.add_source_hash(src, f"sha256:{i:064d}", "1.2.3.100", instance_number=i)
+        bundle.add_detection(src, [1, 2, 3, 4], 0.9, "header", "ocr", "1", "rules", "cfg")
+        if i % 2 == 0:
+            bundle.add_masking_action(out, "black_box", [1, 2, 3, 4], {"fill": 0}, "success")
+        bundle.add_linkage("1.2.3", "1.2.3.100", src, "9.9.9", "9.9.9.100", out)
+        bundle.add_decision("MASK" if i % 2 == 0 else "SKIP", src, out, 1, i % 2 == 0, "complete")
+        bundle.add_masked_hash(out, f"sha256:{i:064d}", "9.9.9.100")
+    bundle.add_exception("TEST", "warning only", "WARNING")
+    bundle.add_exception("TEST", "failed", "ERROR", source_sop_uid="1.2.3.0")
+
+
+def _record_bytes(bundle_dir):
+    return {rel: (bundle_dir / rel).read_bytes() for rel, _ in RECORD_FILES.values()}
+
+
+def _without_timestamps(data):
+    lines = []
+    for line in data.splitlines():
+        if line.startswith(b"{"):
+            record = json.loads(line)
+            record.pop("timestamp", None)
+            line = json.dumps(record, sort_keys=True).encode()
+        lines.append(line)
+    return lines
+
+
+class TestStreaming:
+
+    def test_same_output_as_in_memory(self, tmp_path):
+        memory = EvidenceBundle(processing_run_id="mem")
+        _populate(memory)
+        memory_dir = memory.finalize(tmp_path / "mem")
+
+        streaming = EvidenceBundle(processing_run_id="str")
+        streaming.stream_to(tmp_path / "str")
+        _populate(streaming)
+        streaming_dir = streaming.finalize()
+
+        a, b = _record_bytes(memory_dir), _record_bytes(streaming_dir)
+        assert a.keys() == b.keys()
+        for rel in a:
+            assert _without_timestamps(a[rel]) == _without_timestamps(b[rel]), rel
+
+        counts = [json.loads((d / "MANIFEST.json").read_text())["counts"] for d in (memory_dir, streaming_dir)]
+        assert counts[0] == counts[1]
+        assert counts[1] == {
+            "studies_in": 1, "series_in": 0, "instances_in": 3, "instances_out": 3,
+            "detections_total": 3, "instances_masked": 2, "instances_skipped": 1, "failures": 1,
+        }
+
+    def test_records_hit_disk_not_memory(self, tmp_path):
+        bundle = EvidenceBundle()
+        bundle_dir = bundle.stream_to(tmp_path)
+        assert (bundle_dir / IN_PROGRESS_FILENAME).exists()
+
+        _populate(bundle, instances=2)
+
+        assert bundle.source_hashes == [] and bundle.decision_log == []
+        assert bundle.detection_count == 2
+        rows = list(csv.reader((bundle_dir / "INPUT/source_hashes.csv").open(newline="")))
+        assert len(rows) == 3  # Header + 2, before finalize()
+
+        assert bundle.finalize() == bundle_dir
+        assert not (bundle_dir / IN_PROGRESS_FILENAME).exists()
+
+    def test_records_before_stream_to_are_written(self, tmp_path):
+        bundle = EvidenceBundle()
+        bundle.add_exception("EARLY", "before streaming", "INFO")
+        bundle_dir = bundle.stream_to(tmp_path)
+        bundle.finalize()
+        lines = (bundle_dir / "QA/exceptions.jsonl").read_text().splitlines()
+        assert [json.loads(line)["exception_type"] for line in lines] == ["EARLY"]
+
+    def test_hashes_match_disk(self, tmp_path):
+        bundle = EvidenceBundle()
+        bundle.stream_to(tmp_path)
+        _populate(bundle)
+        bundle_dir = bundle.finalize()
+
+        manifest = json.loads((bundle_dir / "MANIFEST.json").read_text())
+        for rec in manifest["files"]:
+            path = bundle_dir / rec["path"]
+            assert hash_file(str(path))["sha256"] == rec["sha256"], rec["path"]
+            assert path.stat().st_size == rec["bytes"]
+            assert (path.parent / (path.name + ".sha256")).read_text().split()[0] == rec["sha256"]
+
+        tree = (bundle_dir / "SIGNATURE/bundle_tree.txt").read_text().splitlines()
+        assert len(tree) == len(manifest["files"])
+
+    def test_in_memory_requires_output_dir(self):
+        with pytest.raises(ValueError):
+            EvidenceBundle().finalize()
+
+
+class TestRecovery:
+
+    def test_crashed_run_sealed_as_partial(self, tmp_path):
+        bundle = EvidenceBundle(processing_run_id="crashed")
+        bundle.start_processing()
+        bundle_dir = bundle.stream_to(tmp_path)
+        _populate(bundle)
+        # Simulate a crash mid-write: half a JSONL line, no finalize()
+        with open(bundle_dir / "DECISIONS/decision_log.jsonl", "ab") as f:
+            f.write(b'{"decision_type": "MA')
+        del bundle
+
+        assert recover_bundle(bundle_dir) == bundle_dir
+
+        manifest = json.loads((bundle_dir / "MANIFEST.json").read_text())
+        assert manifest["partial"] is True
+        assert manifest["processing_run_id"] == "crashed"
+        assert manifest["counts"]["instances_in"] == 3
+        assert manifest["counts"]["instances_skipped"] == 1
+        assert manifest["counts"]["instances_masked"] == 2
+        assert manifest["counts"]["failures"] == 1
+        for rec in manifest["files"]:
+            assert hash_file(str(bundle_dir / rec["path"]))["sha256"] == rec["sha256"]
+
+        exceptions = (bundle_dir / "QA/exceptions.jsonl").read_text().splitlines()
+        assert json.loads(exceptions[-1])["exception_type"] == "BUNDLE_RECOVERED"
+        report = json.loads((bundle_dir / "QA/verification_report.json").read_text())
+        assert report["verification_status"] == "unverifiable"
+        assert not (bundle_dir / IN_PROGRESS_FILENAME).exists()
+
+    def test_finished_bundle_rejected(self, tmp_path):
+        bundle = EvidenceBundle()
+        bundle.stream_to(tmp_path)
+        bundle_dir = bundle.finalize()
+        with pytest.raises(ValueError):
+            recover_bundle(bundle_dir)
+
+
+def test_cli_seals_bundle_when_processing_fails(tmp_path, monkeypatch):
+    import run_on_dicom
+
+    monkeypatch.setattr(run_on_dicom, "process_dicom", lambda **kwargs: False)
+    monkeypatch.setattr(sys, "argv", [
+        "run_on_dicom.py", "-i", "in.dcm", "-o", str(tmp_path / "out.dcm"),
+        "--old", "X", "--new", "Y", "--evidence-bundle-dir", str(tmp_path / "evidence"),
+    ])
+
+    with pytest.raises(SystemExit) as excinfo:
+        run_on_dicom.main()
+
+    assert excinfo.value.code == 1
+    (bundle_dir,) = [p for p in (tmp_path / "evidence").iterdir() if p.is_dir()]
+    assert not (bundle_dir / IN_PROGRESS_FILENAME).exists()
+    contents = read_bundle(bundle_dir)
+    assert contents.exceptions[-1].exception_type == "PROCESSING_FAILURE"
+
+
+class TestCompressedEncoding:
+
+    def _bundle(self, tmp_path, encoding, stream=True, **kwargs):
+        bundle = EvidenceBundle(processing_run_id=encoding, encoding=encoding, codec="gzip", **kwargs)
+        if stream:
+            bundle.stream_to(tmp_path / encoding)
+        _populate(bundle)
+        return bundle
+
+    def test_reader_round_trip_matches_plain(self, tmp_path):
+        plain = read_bundle(self._bundle(tmp_path, "plain").finalize())
+        compressed = read_bundle(self._bundle(tmp_path, "compressed").finalize())
+
+        assert compressed.manifest["encoding"]["codec"] == "gzip"
+        assert "encoding" not in plain.manifest
+        assert compressed.manifest["counts"] == plain.manifest["counts"]
+        for name in RECORD_FILES:
+            a, b = getattr(plain, name), getattr(compressed, name)
+            assert len(a) == len(b) > 0, name
+            if name not in ("decision_log", "exceptions"):  # Timestamped
+                assert a == b, name
+        assert compressed.source_hashes[1].instance_number == 1
+        assert compressed.instance_linkages[0].deterministic_salt_id is None
+
+    def test_record_files_compressed_and_hashed_on_disk(self, tmp_path):
+        bundle_dir = self._bundle(tmp_path, "compressed", stream=False).finalize(tmp_path)
+
+        assert not (bundle_dir / "DECISIONS/decision_log.jsonl").exists()
+        lines = gzip.decompress((bundle_dir / "DECISIONS/decision_log.jsonl.gz").read_bytes()).splitlines()
+        assert len(lines) == 3
+        assert (bundle_dir / "INPUT/source_hashes.csv").exists()  # Index CSVs stay plain
+
+        # Gate 3 check: each .sha256 matches the bytes beside it
+        for hash_file_path in bundle_dir.rglob("*.sha256"):
+            target = hash_file_path.parent / hash_file_path.name[:-len(".sha256")]
+            if target.exists():
+                assert hash_file(str(target))["sha256"] == hash_file_path.read_text().split()[0], target
+
+    def test_tampered_file_rejected(self, tmp_path):
+        bundle_dir = self._bundle(tmp_path, "compressed").finalize()
+        with open(bundle_dir / "QA/exceptions.jsonl.gz", "ab") as f:
+            f.write(b"\0")
+        with pytest.raises(ValueError, match="exceptions"):
+            read_bundle(bundle_dir)
+        assert len(list(iter_records(bundle_dir, "detection_results"))) == 3
+
+    def test_crashed_compressed_run_recovered(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(evidence_bundle, "COMPRESSED_FLUSH_RECORDS", 1)  # Every record reaches disk
+        bundle = self._bundle(tmp_path, "compressed")
+        bundle_dir = bundle.bundle_dir
+        for stream in bundle._streams.values():
+            stream._file.close()  # Crash: compressed streams never finished
+        del bundle
+
+        recover_bundle(bundle_dir)
+
+        contents = read_bundle(bundle_dir)
+        assert contents.partial
+        assert contents.exceptions[-1].exception_type == "BUNDLE_RECOVERED"
+        assert len(contents.decision_log) == 3
+        assert contents.manifest["counts"]["instances_masked"] == 2
+        assert not (bundle_dir / "QA/exceptions.jsonl.gz.tmp").exists()
+
+    def test_csv_header_survives_crash_before_first_block(self, tmp_path):
+        bundle = self._bundle(tmp_path, "compressed")  # Fewer records than COMPRESSED_FLUSH_RECORDS
+        bundle_dir = bundle.bundle_dir
+        for stream in bundle._streams.values():
+            stream._file.close()
+        del bundle
+
+        recover_bundle(bundle_dir)
+
+        header = gzip.decompress((bundle_dir / "LINKAGE/instance_linkage.csv.gz").read_bytes())
+        assert header.decode().startswith("source_study_uid,")
+        contents = read_bundle(bundle_dir)
+        assert contents.partial and contents.instance_linkages == []
+        assert min(contents.manifest["counts"].values()) >= 0
+
+    def test_unknown_encoding_rejected(self):
+        with pytest.raises(ValueError):
+            EvidenceBundle(encoding="parquet")
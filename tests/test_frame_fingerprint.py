@@ -0,0 +1,222 @@
+"""
+Unit tests for frame_fingerprint.py and OCR frame sampling
+
+Tests:
+- frame_grids block means (grayscale, RGB, dtypes OpenCV cannot resize)
+- zone_fingerprints keeps header/footer rows only and rescales >8-bit data
+- Static clips collapse to first + last frame
+- Text appearing only mid-clip is sampled; body-only motion is ignored
+- Samples are bounded, diverse, sorted and always include frame 0
+- run_on_dicom._ocr_sample_indices wires fingerprints to a frame source
+- Header/footer text found only mid-clip is masked along with the static box
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from frame_fingerprint import (
+    collapse_duplicate_frames,
+    frame_grids,
+    select_diverse_frames,
+    zone_fingerprints,
+)
+
+
+def _cine(num_frames=60, h=120, w=160, seed=0):
+    """US-like clip: static header text, live (noisy) body."""
+    rng = np.random.default_rng(seed)
+    frames = np.zeros((num_frames, h, w, 3), dtype=np.uint8)
+    frames[:, 3:10, 10:90] = 230  # Static header text
+    frames[:, 30:90, 30:130] = rng.integers(0, 200, size=(num_frames, 60, 100, 1), dtype=np.uint8)
+    return frames
+
+
+class TestFrameGrids:
+
+    def test_block_means(self):
+        frames = np.arange(2 * 8 * 12, dtype=np.uint16).reshape(2, 8, 12)
+        grids = frame_grids(frames, grid=4)
+
+        assert grids.shape == (2, 4, 4)
+        assert grids[1, 0, 0] == pytest.approx(frames[1, 0:2, 0:3].mean(), abs=0.5)
+        assert grids[1, 3, 3] == pytest.approx(frames[1, 6:8, 9:12].mean(), abs=0.5)
+
+    def test_unsupported_dtype_cast(self):
+        frames = np.full((1, 6, 6), 70000, dtype=np.int32)
+        assert np.allclose(frame_grids(frames, grid=3), 70000)
+
+    def test_rgb_averaged_to_gray_and_grid_capped(self):
+        frames = np.zeros((1, 4, 4, 3), dtype=np.uint8)
+        frames[..., 0] = 90
+
+        grids = frame_grids(frames, grid=32)
+
+        assert grids.shape == (1, 4, 4)
+        assert np.allclose(grids, 30)
+
+
+class TestZoneFingerprints:
+
+    def test_only_annotation_rows_kept(self):
+        grids = np.zeros((1, 10, 4), dtype=np.float32)
+        grids[0, 5] = 100  # Body row
+
+        fingerprints = zone_fingerprints(grids, 0.12, 0.88)
+
+        assert fingerprints.shape == (1, 2 * 4)  # Row centres 0.05 and 0.95
+        assert fingerprints.max() == 0
+
+    def test_high_bit_depth_rescaled(self):
+        grids = np.full((1, 4, 4), 4095, dtype=np.float32)
+        assert zone_fingerprints(grids, 0.3, 0.7, max_value=4095).max() == pytest.approx(255)
+
+
+class TestSelection:
+
+    def _fingerprints(self, frames):
+        return zone_fingerprints(frame_grids(frames), 0.12, 0.88)
+
+    def test_static_clip_samples_first_and_last(self):
+        fingerprints = self._fingerprints(_cine())
+
+        assert collapse_duplicate_frames(fingerprints) == [0]
+        assert select_diverse_frames(fingerprints) == [0, 59]
+
+    def test_mid_clip_text_is_sampled(self):
+        frames = _cine()
+        frames[25:31, 108:116, 100:150] = 255  # Footer annotation, mid-clip only
+
+        indices = select_diverse_frames(self._fingerprints(frames))
+
+        assert indices[0] == 0
+        assert any(25 <= i < 31 for i in indices)
+        assert len(indices) <= 10
+
+    def test_bounded_diverse_sample(self):
+        frames = np.zeros((200, 64, 64), dtype=np.uint8)
+        for i in range(200):
+            frames[i, :4, (i % 40):(i % 40) + 8] = 255  # Header changes every frame
+
+        fingerprints = zone_fingerprints(frame_grids(frames), 0.1, 0.9)
+        indices = select_diverse_frames(fingerprints, max_samples=6)
+
+        assert len(indices) == 6
+        assert indices == sorted(set(indices))
+        assert indices[0] == 0 and indices[-1] == 199
+
+    def test_single_frame(self):
+        assert select_diverse_frames(np.zeros((1, 4), np.float32)) == [0]
+
+
+def test_ocr_sample_indices_uses_source_grids():
+    import run_on_dicom
+
+    frames = _cine()
+    frames[40:44, 2:12, 100:150] = 255  # Header text added mid-clip
+
+    class Source:
+        num_frames = len(frames)
+
+        def frame_grids(self):
+            return frame_grids(frames)
+
+    indices = run_on_dicom._ocr_sample_indices(Source(), "US")
+    assert indices[0] == 0 and any(40 <= i < 44 for i in indices)
+
+    class BrokenSource(Source):
+        def frame_grids(self):
+            raise MemoryError("too big")
+
+    assert run_on_dicom._ocr_sample_indices(BrokenSource(), "US") == [0, 1, 2, 3, 4, 55, 56, 57, 58, 59]
+
+
+class _FrameEngine:
+    """OCR stand-in reporting fixed boxes (frame coordinates) per image, in call order."""
+
+    def __init__(self, boxes_per_image):
+        self.boxes_per_image = boxes_per_image
+
+    def _result(self, boxes):
+        import run_on_dicom
+        k = run_on_dicom.OCR_SCALE_FACTOR
+        return {
+            "det_boxes": [[[x * k, y * k], [(x + w) * k, y * k], [(x + w) * k, (y + h) * k], [x * k, (y + h) * k]]
+                          for x, y, w, h in boxes],
+            "det_scores": [0.95] * len(boxes),
+        }
+
+    def predict(self, images):
+        return [self._result(boxes) for boxes in self.boxes_per_image[:len(images)]]
+
+
+class _Corrector:
+    def __init__(self, engine):
+        self.ocr = engine
+
+    @staticmethod
+    def _boxes_overlap(a, b, tolerance=20):
+        return abs(a[0] - b[0]) <= tolerance and abs(a[1] - b[1]) <= tolerance
+
+
+def test_mid_clip_annotation_boxes_are_transient():
+    import run_on_dicom
+
+    header, footer, body = (20, 10, 200, 20), (300, 560, 150, 20), (300, 300, 100, 20)
+    engine = _FrameEngine([[header], [header, footer], [header, body], [header, footer]])
+    result = run_on_dicom.detect_text_box_from_array(
+        _Corrector(engine), np.zeros((4, 600, 800, 3), np.uint8), modality="US"
+    )
+
+    assert result.static_box == header
+    assert result.transient_boxes == [footer]
+
+
+def test_process_dicom_masks_transient_boxes(tmp_path, monkeypatch):
+    import pydicom
+    import run_on_dicom
+    from ocr_pool import OCREnginePool
+    from pydicom.dataset import Dataset, FileMetaDataset
+    from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+    ds = Dataset()
+    ds.file_meta = FileMetaDataset()
+    ds.file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds.SOPClassUID = ds.file_meta.MediaStorageSOPClassUID = "1.2.840.10008.5.1.4.1.1.6.1"
+    ds.SOPInstanceUID = ds.file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    ds.StudyInstanceUID = generate_uid()
+    ds.SeriesInstanceUID = generate_uid()
+    ds.Modality = "US"
+    ds.PatientName = "DOE^JANE"
+    ds.PatientID = "12345"
+    ds.Rows, ds.Columns = 48, 64
+    ds.SamplesPerPixel = 3
+    ds.PhotometricInterpretation = "RGB"
+    ds.PlanarConfiguration = 0
+    ds.BitsAllocated, ds.BitsStored, ds.HighBit = 8, 8, 7
+    ds.PixelRepresentation = 0
+    ds.NumberOfFrames = 4
+    ds.PixelData = np.full((4, 48, 64, 3), 200, np.uint8).tobytes()
+    src, out = str(tmp_path / "in.dcm"), str(tmp_path / "out.dcm")
+    ds.save_as(src, enforce_file_format=True)
+
+    detection = run_on_dicom.DetectionResult(
+        static_box=(10, 2, 20, 4), all_detected_boxes=[(10, 2, 20, 4), (30, 40, 20, 4)],
+        detection_strength="HIGH", ocr_failure=False, confidence_scores=[0.95, 0.95],
+        transient_boxes=[(30, 40, 20, 4)],
+    )
+    monkeypatch.setattr(run_on_dicom, "detect_text_box_from_array", lambda *args, **kwargs: detection)
+    monkeypatch.chdir(tmp_path)  # Debug image goes to ./studies
+    (tmp_path / "studies").mkdir()
+
+    assert run_on_dicom.process_dicom(
+        src, out, "DOE", "NEW NAME", ocr_pool=OCREnginePool(size=1, engine_factory=object),
+    )
+
+    pixels = pydicom.dcmread(out).pixel_array
+    assert (pixels[:, 40:44, 30:50] == 0).all()
+    assert (pixels[:, 20:30, 5:25] == 200).all()  # Unmasked body untouched
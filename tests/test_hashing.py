@@ -0,0 +1,128 @@
+# tests/test_hashing.py
+"""
+Unit tests for voxelmask_core.hashing (streaming multi-algorithm hashing).
+
+Tests:
+- Digests match one-shot hashlib for every block size, read and mmap paths
+- Several algorithms computed in a single pass
+- file_sha256 memo is invalidated when the file changes
+- compute_file_hash, audit.calculate_file_hash and evidence bundle
+  records agree with hashlib
+"""
+import hashlib
+import io
+import os
+
+import pytest
+
+from src.voxelmask_core.hashing import (
+    DEDUPE_ALGORITHMS,
+    MultiHasher,
+    file_sha256,
+    hash_bytes,
+    hash_file,
+    hash_fileobj,
+)
+import src.voxelmask_core.hashing as hashing_module
+from src.voxelmask_core.export import compute_file_hash
+
+
+DATA = os.urandom(3 * 1024 + 17)
+
+
+def _expected(data, name):
+    return hashlib.new(name, data).hexdigest()
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(DATA)
+    return str(path)
+
+
+@pytest.mark.parametrize("block_size", [1, 1000, 1024, 1 << 20])
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_hash_file_matches_hashlib(data_file, block_size, use_mmap):
+    digests = hash_file(data_file, DEDUPE_ALGORITHMS, block_size=block_size, use_mmap=use_mmap)
+    assert digests == {name: _expected(DATA, name) for name in DEDUPE_ALGORITHMS}
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_empty_file(tmp_path, use_mmap):
+    path = tmp_path / "empty.bin"
+    path.write_bytes(b"")
+    assert hash_file(str(path), use_mmap=use_mmap) == {"sha256": _expected(b"", "sha256")}
+
+
+def test_hash_bytes_and_fileobj_match(data_file):
+    expected = {name: _expected(DATA, name) for name in DEDUPE_ALGORITHMS}
+    assert hash_bytes(DATA, DEDUPE_ALGORITHMS, block_size=100) == expected
+    assert hash_bytes(memoryview(bytearray(DATA)), DEDUPE_ALGORITHMS) == expected
+    assert hash_fileobj(io.BytesIO(DATA), DEDUPE_ALGORITHMS, block_size=100) == expected
+
+
+def test_fileobj_without_readinto():
+    class ReadOnly:
+        def __init__(self, data):
+            self._fh = io.BytesIO(data)
+
+        def read(self, n):
+            return self._fh.read(n)
+
+    assert hash_fileobj(ReadOnly(DATA), block_size=7)["sha256"] == _expected(DATA, "sha256")
+
+
+def test_multihasher_counts_bytes_and_dedupes_names():
+    hasher = MultiHasher(["sha256", "sha256", "blake2b"])
+    hasher.update(b"abc")
+    hasher.update(memoryview(b"defg"))
+    assert hasher.algorithms == ("sha256", "blake2b")
+    assert hasher.nbytes == 7
+    assert hasher.hexdigests()["sha256"] == _expected(b"abcdefg", "sha256")
+
+
+def test_unknown_algorithm_rejected():
+    with pytest.raises(ValueError):
+        MultiHasher(["not-a-hash"])
+    with pytest.raises(ValueError):
+        MultiHasher([])
+
+
+def test_file_sha256_memoized_until_file_changes(tmp_path, monkeypatch):
+    calls = []
+    real = hashing_module.hash_file
+    monkeypatch.setattr(hashing_module, "hash_file", lambda *a, **k: calls.append(1) or real(*a, **k))
+    path = tmp_path / "f.bin"
+    path.write_bytes(b"first")
+
+    assert file_sha256(str(path)) == _expected(b"first", "sha256")
+    assert file_sha256(str(path)) == _expected(b"first", "sha256")
+    assert len(calls) == 1
+
+    path.write_bytes(b"second!")
+    assert file_sha256(str(path)) == _expected(b"second!", "sha256")
+    assert len(calls) == 2
+
+
+def test_compute_file_hash(data_file):
+    assert compute_file_hash(data_file) == _expected(DATA, "sha256")
+    assert compute_file_hash(data_file, "blake2b", block_size=64, use_mmap=True) == _expected(DATA, "blake2b")
+
+
+def test_audit_calculate_file_hash(data_file):
+    import importlib.util
+    path = os.path.join(os.path.dirname(__file__), "..", "src", "audit.py")
+    spec = importlib.util.spec_from_file_location("audit_module_hashing", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    assert module.calculate_file_hash(data_file, block_size=10) == _expected(DATA, "sha256")
+    # Same result without the shared hashing module (standalone load)
+    shared = module.file_sha256
+    module.file_sha256 = None
+    try:
+        assert module.calculate_file_hash(data_file, block_size=10) == _expected(DATA, "sha256")
+    finally:
+        module.file_sha256 = shared
+    assert module.calculate_file_hash(os.path.join(os.path.dirname(data_file), "missing")) == "HASH_ERROR"
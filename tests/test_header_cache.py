@@ -0,0 +1,204 @@
+"""
+Unit tests for header_cache.py (persistent header records by content hash)
+
+Tests:
+- Records round-trip; PHI-free mode stores no identifying fields
+- Entries expire after the TTL; foreign versions are misses
+- A HeaderIndex backed by the cache parses nothing on a re-upload
+  (PHI-free: only the identifying tags are read back)
+"""
+
+import os
+import sqlite3
+import sys
+
+import numpy as np
+import pytest
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import header_cache
+import voxelmask_core.header_index as header_index
+from header_cache import (
+    HEADER_CACHE_PHI_FREE_ENV_VAR,
+    HEADER_CACHE_TTL_ENV_VAR,
+    DEFAULT_TTL_SECONDS,
+    HeaderCache,
+    resolve_header_cache_phi_free,
+    resolve_header_cache_ttl,
+)
+from voxelmask_core.hashing import file_sha256
+from voxelmask_core.header_index import HEADER_RECORD_TAGS, HeaderIndex, read_header_record
+
+
+def _write_dicom(path):
+    ds = Dataset()
+    ds.file_meta = FileMetaDataset()
+    ds.file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds.SOPClassUID = ds.file_meta.MediaStorageSOPClassUID = "1.2.840.10008.5.1.4.1.1.6.1"
+    ds.SOPInstanceUID = ds.file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    ds.SeriesInstanceUID = generate_uid()
+    ds.SeriesDescription = "DOE JANE RENAL"
+    ds.AcquisitionTime = "101500"
+    ds.Modality = "US"
+    ds.SeriesNumber, ds.InstanceNumber = 2, 5
+    ds.Rows, ds.Columns = 4, 6
+    ds.BitsAllocated = ds.BitsStored = 8
+    ds.HighBit = 7
+    ds.SamplesPerPixel = 1
+    ds.PixelRepresentation = 0
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.PixelData = np.zeros((4, 6), dtype=np.uint8).tobytes()
+    ds.save_as(str(path), enforce_file_format=True)
+    return str(path)
+
+
+@pytest.fixture
+def dicom(tmp_path):
+    path = _write_dicom(tmp_path / "a.dcm")
+    return path, file_sha256(path)
+
+
+@pytest.fixture
+def count_reads(monkeypatch):
+    """Tag sets requested from read_header_record()."""
+    calls = []
+    real = header_index.read_header_record
+
+    def counting(path, tags=HEADER_RECORD_TAGS):
+        calls.append(tags)
+        return real(path, tags)
+
+    monkeypatch.setattr(header_index, "read_header_record", counting)
+    return calls
+
+
+def _raw_rows(db_path):
+    with sqlite3.connect(str(db_path)) as conn:
+        return [row[0] for row in conn.execute("SELECT record FROM header_records")]
+
+
+class TestHeaderCache:
+
+    def test_full_mode_round_trip(self, tmp_path, dicom):
+        path, digest = dicom
+        record = read_header_record(path)
+        cache = HeaderCache(tmp_path / "h.db", phi_free=False)
+
+        assert cache.get(digest) is None
+        cache.put(digest, record)
+        cached, phi_free = cache.get(digest)
+
+        assert not phi_free
+        assert cached.path == ""
+        assert cached.sop_instance_uid == record.sop_instance_uid
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    def test_phi_free_mode_stores_no_identifiers(self, tmp_path, dicom):
+        path, digest = dicom
+        record = read_header_record(path)
+        cache = HeaderCache(tmp_path / "h.db", phi_free=True)
+        cache.put(digest, record)
+
+        cached, phi_free = cache.get(digest)
+        assert phi_free
+        assert cached.modality == "US" and cached.instance_number == 5
+        assert cached.sop_instance_uid == cached.series_description == ""
+
+        raw = "".join(_raw_rows(tmp_path / "h.db"))
+        for value in (record.sop_instance_uid, record.series_instance_uid, "DOE JANE", "101500", path):
+            assert value not in raw
+
+    def test_identifying_entries_dropped_in_phi_free_mode(self, tmp_path, dicom):
+        path, digest = dicom
+        full = HeaderCache(tmp_path / "h.db", phi_free=False)
+        full.put(digest, read_header_record(path))
+
+        phi_free = HeaderCache(tmp_path / "h.db", phi_free=True)  # Purged on open
+        assert phi_free.stats()["entries"] == 0
+
+        full.put(digest, read_header_record(path))  # Written while the PHI-free cache is open
+        assert phi_free.get(digest) is None
+        assert phi_free.stats()["entries"] == 0
+        assert "DOE JANE" not in "".join(_raw_rows(tmp_path / "h.db"))
+
+    def test_entries_expire(self, tmp_path, dicom, monkeypatch):
+        path, digest = dicom
+        now = [1_000_000.0]
+        monkeypatch.setattr(header_cache.time, "time", lambda: now[0])
+        cache = HeaderCache(tmp_path / "h.db", ttl_seconds=60)
+        cache.put(digest, read_header_record(path))
+
+        now[0] += 30
+        assert cache.get(digest) is not None
+        now[0] += 60
+        assert cache.get(digest) is None
+        assert cache.purge_expired() == 1
+        assert cache.stats()["entries"] == 0
+
+    def test_other_version_is_miss(self, tmp_path, dicom, monkeypatch):
+        path, digest = dicom
+        cache = HeaderCache(tmp_path / "h.db")
+        cache.put(digest, read_header_record(path))
+        monkeypatch.setattr(header_cache, "HEADER_CACHE_VERSION", 999)
+        assert cache.get(digest) is None
+
+    def test_error_records_not_stored(self, tmp_path):
+        cache = HeaderCache(tmp_path / "h.db")
+        cache.put("0" * 64, read_header_record(str(tmp_path / "missing.dcm")))
+        assert cache.stats()["entries"] == 0
+
+
+class TestConfig:
+
+    def test_ttl_resolution(self, monkeypatch):
+        monkeypatch.delenv(HEADER_CACHE_TTL_ENV_VAR, raising=False)
+        assert resolve_header_cache_ttl() == DEFAULT_TTL_SECONDS
+        assert resolve_header_cache_ttl(10) == 10
+        monkeypatch.setenv(HEADER_CACHE_TTL_ENV_VAR, "2")
+        assert resolve_header_cache_ttl() == 2 * 24 * 3600
+        monkeypatch.setenv(HEADER_CACHE_TTL_ENV_VAR, "junk")
+        assert resolve_header_cache_ttl() == DEFAULT_TTL_SECONDS
+
+    def test_phi_free_resolution(self, monkeypatch):
+        monkeypatch.delenv(HEADER_CACHE_PHI_FREE_ENV_VAR, raising=False)
+        assert resolve_header_cache_phi_free() is True
+        monkeypatch.setenv(HEADER_CACHE_PHI_FREE_ENV_VAR, "off")
+        assert resolve_header_cache_phi_free() is False
+        assert resolve_header_cache_phi_free(True) is True
+
+
+class TestIndexIntegration:
+
+    def test_reupload_skips_header_parsing(self, tmp_path, dicom, count_reads):
+        path, digest = dicom
+        cache = HeaderCache(tmp_path / "h.db", phi_free=False)
+        first = HeaderIndex(cache=cache).build([path], digests=[digest])
+        assert count_reads == [HEADER_RECORD_TAGS]
+
+        count_reads.clear()
+        index = HeaderIndex(cache=cache)
+        second = index.build([path], digests=[digest])
+
+        assert count_reads == []
+        assert second == first
+        assert index.stats()["cache_hits"] == 1
+
+    def test_phi_free_reupload_reads_identifying_tags_only(self, tmp_path, dicom, count_reads):
+        path, digest = dicom
+        cache = HeaderCache(tmp_path / "h.db", phi_free=True)
+        first = HeaderIndex(cache=cache).build([path], digests=[digest])
+
+        count_reads.clear()
+        second = HeaderIndex(cache=cache).build([path], digests=[digest])
+
+        assert count_reads == [header_index.IDENTIFYING_TAGS]
+        assert second == first
+
+    def test_without_digest_cache_unused(self, tmp_path, dicom):
+        path, _ = dicom
+        cache = HeaderCache(tmp_path / "h.db")
+        HeaderIndex(cache=cache).build([path])
+        assert cache.stats()["entries"] == 0
@@ -0,0 +1,239 @@
+"""
+Unit tests for voxelmask_core/header_index.py (shared header index)
+
+Tests:
+- Records carry the header fields the pre-processing stages use
+- Each header is read once per file, concurrently in build()
+- Rewritten files are read again; unreadable files give error records
+- Tag-targeted reads skip large trailing sequences and fall back to a full parse
+- classify_header() / preflight_scan_header() match the dataset-based paths
+"""
+
+import os
+import sys
+import threading
+
+import numpy as np
+import pydicom
+import pytest
+from pydicom import filereader
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.sequence import Sequence
+from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import voxelmask_core.header_index as header_index
+from voxelmask_core.classify import classify_dicom_file, classify_header
+from voxelmask_core.header_index import CLASSIFY_TAGS, HeaderIndex, read_header_record
+from review_session import SOP_CLASS_UIDS, preflight_scan_dataset, preflight_scan_header
+
+
+def _write_dicom(path, modality="US", sop_class=SOP_CLASS_UIDS["SECONDARY_CAPTURE"], **elements):
+    ds = Dataset()
+    ds.file_meta = FileMetaDataset()
+    ds.file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds.SOPClassUID = ds.file_meta.MediaStorageSOPClassUID = sop_class
+    ds.SOPInstanceUID = ds.file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    ds.SeriesInstanceUID = generate_uid()
+    ds.Modality = modality
+    ds.Rows, ds.Columns = 4, 6
+    ds.BitsAllocated = ds.BitsStored = 8
+    ds.HighBit = 7
+    ds.SamplesPerPixel = 1
+    ds.PixelRepresentation = 0
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.PixelData = np.zeros((4, 6), dtype=np.uint8).tobytes()
+    for keyword, value in elements.items():
+        setattr(ds, keyword, value)
+    ds.save_as(str(path), enforce_file_format=True)
+    return ds
+
+
+@pytest.fixture
+def count_reads(monkeypatch):
+    """Count header reads per path."""
+    counts = {}
+    real = header_index.read_header_record
+
+    def counting(path):
+        counts[path] = counts.get(path, 0) + 1
+        return real(path)
+
+    monkeypatch.setattr(header_index, "read_header_record", counting)
+    return counts
+
+
+class TestReadHeaderRecord:
+
+    def test_fields(self, tmp_path):
+        path = tmp_path / "a.dcm"
+        ds = _write_dicom(path, SeriesNumber=3, InstanceNumber=7, ContentTime="101500",
+                          SeriesDescription="Abdomen", NumberOfFrames=2)
+
+        record = read_header_record(str(path))
+
+        assert record.ok and record.part10
+        assert record.modality == "US"
+        assert record.sop_instance_uid == ds.SOPInstanceUID
+        assert record.series_instance_uid == ds.SeriesInstanceUID
+        assert (record.series_number, record.instance_number) == (3, 7)
+        assert record.acquisition_time == "101500"  # ContentTime fallback
+        assert (record.rows, record.columns, record.number_of_frames) == (4, 6, 2)
+        assert record.transfer_syntax_uid == ExplicitVRLittleEndian
+        assert record.file_size == os.path.getsize(path)
+        assert record.bits_stored == 8
+        assert record.photometric_interpretation == "MONOCHROME2"
+
+    def test_missing_file_gives_error_record(self, tmp_path):
+        record = read_header_record(str(tmp_path / "missing.dcm"))
+        assert not record.ok
+        assert record.modality == ""
+
+    def test_absent_elements_are_none(self, tmp_path):
+        path = tmp_path / "a.dcm"
+        _write_dicom(path)
+        record = read_header_record(str(path))
+        assert record.instance_number is None
+        assert record.acquisition_time == ""
+
+
+def _add_private_sequence(path, items=50):
+    """Append an undefined-length vendor sequence after the image module."""
+    ds = pydicom.dcmread(str(path))
+    ds.add_new(0x00290010, "LO", "VENDOR")
+    seq = Sequence()
+    for i in range(items):
+        item = Dataset()
+        item.add_new(0x00291001, "OB", os.urandom(1024))
+        seq.append(item)
+    ds.add_new(0x00291010, "SQ", seq)
+    ds[0x00291010].is_undefined_length = True
+    ds.save_as(str(path), enforce_file_format=True)
+
+
+@pytest.fixture
+def count_sequences(monkeypatch):
+    """Count undefined-length sequences parsed by pydicom."""
+    calls = []
+    real = filereader.read_sequence
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(filereader, "read_sequence", counting)
+    return calls
+
+
+class TestTargetedReads:
+
+    def test_trailing_private_sequence_not_parsed(self, tmp_path, count_sequences):
+        path = tmp_path / "a.dcm"
+        _write_dicom(path, InstanceNumber=4)
+        _add_private_sequence(path)
+
+        record = read_header_record(str(path))
+        assert count_sequences == []
+        assert record.instance_number == 4 and record.rows == 4
+
+        full = read_header_record(str(path), tags=None)
+        assert count_sequences
+        assert full == record
+
+    def test_declared_tags_only(self, tmp_path):
+        path = tmp_path / "a.dcm"
+        _write_dicom(path, modality="OT", InstanceNumber=4)
+
+        record = read_header_record(str(path), tags=CLASSIFY_TAGS)
+
+        assert record.modality == "OT" and record.sop_class_uid
+        assert record.instance_number is None and record.rows is None
+
+    def test_falls_back_to_full_parse(self, tmp_path, monkeypatch):
+        path = tmp_path / "a.dcm"
+        _write_dicom(path, modality="CT")
+
+        def broken(path, tags):
+            raise ValueError("truncated")
+
+        monkeypatch.setattr(header_index, "_read_targeted", broken)
+        record = read_header_record(str(path))
+        assert record.ok and record.modality == "CT"
+
+    def test_nothing_identifying_falls_back(self, tmp_path, monkeypatch):
+        path = tmp_path / "a.dcm"
+        _write_dicom(path, modality="CT")
+        monkeypatch.setattr(header_index, "_read_targeted", lambda path, tags: Dataset())
+
+        assert read_header_record(str(path)).modality == "CT"
+
+
+class TestHeaderIndex:
+
+    def test_build_reads_each_file_once(self, tmp_path, count_reads):
+        paths = []
+        for i in range(6):
+            path = tmp_path / f"{i}.dcm"
+            _write_dicom(path, InstanceNumber=i)
+            paths.append(str(path))
+        index = HeaderIndex(max_workers=4)
+
+        records = index.build(paths + paths[:2])
+        again = index.build(paths)
+
+        assert [r.instance_number for r in records] == [0, 1, 2, 3, 4, 5, 0, 1]
+        assert again == records[:6]
+        assert all(count == 1 for count in count_reads.values())
+        assert index.stats()["reads"] == 6
+
+    def test_build_uses_worker_threads(self, tmp_path, monkeypatch):
+        paths = []
+        for i in range(4):
+            path = tmp_path / f"{i}.dcm"
+            _write_dicom(path)
+            paths.append(str(path))
+        threads = set()
+        real = header_index.read_header_record
+
+        def recording(path):
+            threads.add(threading.current_thread().name)
+            return real(path)
+
+        monkeypatch.setattr(header_index, "read_header_record", recording)
+        HeaderIndex(max_workers=4).build(paths)
+
+        assert threads and all(name.startswith("header-index") for name in threads)
+
+    def test_rewritten_file_is_read_again(self, tmp_path, count_reads):
+        path = tmp_path / "a.dcm"
+        _write_dicom(path, modality="US")
+        index = HeaderIndex()
+        assert index.read(str(path)).modality == "US"
+
+        _write_dicom(path, modality="CT", SeriesDescription="changed size")
+        os.utime(path, ns=(0, 1))  # Force a different mtime as well
+
+        assert index.read(str(path)).modality == "CT"
+        assert count_reads[str(path)] == 2
+
+
+class TestConsumers:
+
+    @pytest.mark.parametrize("modality,sop_class", [
+        ("US", "1.2.840.10008.5.1.4.1.1.6.1"),
+        ("OT", SOP_CLASS_UIDS["SECONDARY_CAPTURE"]),
+        ("DOC", SOP_CLASS_UIDS["ENCAPSULATED_PDF"]),
+        ("CT", "1.2.840.10008.5.1.4.1.1.2"),
+    ])
+    def test_header_paths_match_dataset_paths(self, tmp_path, modality, sop_class):
+        path = tmp_path / "a.dcm"
+        ds = _write_dicom(path, modality=modality, sop_class=sop_class)
+        record = read_header_record(str(path))
+
+        assert classify_header(record) == classify_dicom_file(str(path))
+        assert preflight_scan_header(record) == preflight_scan_dataset(ds)
+
+    def test_classify_unreadable_raises(self, tmp_path):
+        with pytest.raises(ValueError):
+            classify_dicom_file(str(tmp_path / "missing.dcm"))
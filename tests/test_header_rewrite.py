@@ -0,0 +1,231 @@
+"""
+Unit tests for header_rewrite.py (metadata-only fast path)
+
+Tests:
+- Output is byte-identical to a full pydicom read/rewrite/write for native
+  (explicit and implicit VR) and encapsulated PixelData
+- Streaming pixel invariant: hashes match ds.PixelData; tampering fails
+- Unsupported layouts are rejected before the output is written
+- pydicom 2.x write path; header write errors fall back as unsupported
+- Research-mode anonymize_file takes the fast path for CT and produces
+  the same file as the full path
+"""
+
+import hashlib
+import os
+import sys
+
+import numpy as np
+import pydicom
+import pytest
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.uid import ExplicitVRLittleEndian, ImplicitVRLittleEndian, RLELossless, generate_uid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import header_rewrite
+from header_rewrite import (
+    HeaderRewriteUnsupported,
+    read_header,
+    rewrite_header,
+    rewrite_header_in_place,
+)
+
+
+def _write_ct(path, syntax=ExplicitVRLittleEndian, rle=False, frames=3, pixels=True, trailing=False):
+    ds = Dataset()
+    ds.file_meta = FileMetaDataset()
+    ds.file_meta.TransferSyntaxUID = syntax
+    ds.SOPClassUID = ds.file_meta.MediaStorageSOPClassUID = "1.2.840.10008.5.1.4.1.1.2"
+    ds.SOPInstanceUID = ds.file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    ds.StudyInstanceUID = generate_uid()
+    ds.SeriesInstanceUID = generate_uid()
+    ds.Modality = "CT"
+    ds.PatientName = "DOE^JANE"
+    ds.PatientID = "12345"
+    ds.StudyDate = "20240102"
+    if pixels:
+        ds.Rows, ds.Columns = 16, 12
+        ds.SamplesPerPixel = 1
+        ds.PhotometricInterpretation = "MONOCHROME2"
+        ds.BitsAllocated, ds.BitsStored, ds.HighBit = 16, 12, 11
+        ds.PixelRepresentation = 0
+        ds.NumberOfFrames = frames
+        arr = np.random.default_rng(0).integers(0, 4096, (frames, 16, 12), dtype=np.uint16)
+        ds.PixelData = arr.tobytes()
+        if rle:
+            ds.compress(RLELossless, arr)
+    if trailing:
+        ds.add_new(0xFFFCFFFC, "OB", b"\0\0")  # Data Set Trailing Padding
+    ds.save_as(path, enforce_file_format=True)
+    return path
+
+
+def _rename(ds):
+    ds.PatientName = "ANON^PATIENT"
+    ds.SOPInstanceUID = "1.2.3.4"
+    del ds.StudyDate
+
+
+def _full_rewrite(src, dst):
+    ds = pydicom.dcmread(src)
+    _rename(ds)
+    ds.save_as(dst)
+
+
+@pytest.mark.parametrize("syntax, rle", [
+    (ExplicitVRLittleEndian, False),
+    (ImplicitVRLittleEndian, False),
+    (ExplicitVRLittleEndian, True),
+])
+def test_matches_full_rewrite(tmp_path, syntax, rle):
+    src = _write_ct(str(tmp_path / "in.dcm"), syntax, rle)
+    _full_rewrite(src, str(tmp_path / "full.dcm"))
+
+    result = rewrite_header(src, str(tmp_path / "fast.dcm"), _rename)
+
+    assert (tmp_path / "fast.dcm").read_bytes() == (tmp_path / "full.dcm").read_bytes()
+    expected = hashlib.sha256(pydicom.dcmread(src).PixelData).hexdigest()
+    assert result.pixel_invariant.status == "PASS"
+    assert result.pixel_invariant.input_hash == result.pixel_invariant.output_hash == expected
+    assert "PixelData" not in result.dataset
+    assert result.header_bytes + result.pixel_bytes == (tmp_path / "fast.dcm").stat().st_size
+
+
+def test_small_chunks_hash_value_bytes_only(tmp_path):
+    src = _write_ct(str(tmp_path / "in.dcm"), rle=True)
+    result = rewrite_header(src, str(tmp_path / "out.dcm"), _rename, chunk_size=7)
+    assert result.pixel_invariant.input_hash == hashlib.sha256(pydicom.dcmread(src).PixelData).hexdigest()
+
+
+def test_read_header_span(tmp_path):
+    src = _write_ct(str(tmp_path / "in.dcm"))
+    with open(src, "rb") as fp:
+        ds, span = read_header(fp)
+    assert "PixelData" not in ds
+    assert span.value_length == 3 * 16 * 12 * 2
+    assert span.end_offset == os.path.getsize(src)
+
+
+def test_no_pixel_data(tmp_path):
+    src = _write_ct(str(tmp_path / "in.dcm"), pixels=False)
+    result = rewrite_header(src, str(tmp_path / "out.dcm"), _rename)
+    assert result.pixel_invariant.status == "N/A"
+    assert result.pixel_bytes == 0
+    assert str(pydicom.dcmread(str(tmp_path / "out.dcm")).PatientName) == "ANON^PATIENT"
+
+
+def test_trailing_elements_rejected_before_writing(tmp_path):
+    src = _write_ct(str(tmp_path / "in.dcm"), trailing=True)
+    with pytest.raises(HeaderRewriteUnsupported):
+        rewrite_header(src, str(tmp_path / "out.dcm"), _rename)
+    assert not (tmp_path / "out.dcm").exists()
+
+
+def test_transfer_syntax_change_rejected(tmp_path):
+    src = _write_ct(str(tmp_path / "in.dcm"))
+
+    def transcode(ds):
+        ds.file_meta.TransferSyntaxUID = ImplicitVRLittleEndian
+
+    with pytest.raises(HeaderRewriteUnsupported):
+        rewrite_header(src, str(tmp_path / "out.dcm"), transcode)
+
+
+def test_invariant_violation_removes_output(tmp_path, monkeypatch):
+    src = _write_ct(str(tmp_path / "in.dcm"))
+    monkeypatch.setattr(header_rewrite, "_hash_span", lambda fp, span, chunk_size: "0" * 64)
+    with pytest.raises(RuntimeError, match="Pixel invariant violated"):
+        rewrite_header(src, str(tmp_path / "out.dcm"), _rename)
+    assert not (tmp_path / "out.dcm").exists()
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_pydicom_2_write_path_matches(tmp_path, monkeypatch):
+    src = _write_ct(str(tmp_path / "in.dcm"), syntax=ImplicitVRLittleEndian)
+    rewrite_header(src, str(tmp_path / "v3.dcm"), _rename)
+    calls = []
+
+    def dcmwrite_2x(fp, ds, write_like_original=True):
+        calls.append(write_like_original)
+        ds.is_implicit_VR, ds.is_little_endian = ds.original_encoding
+        pydicom.filewriter.dcmwrite(fp, ds, enforce_file_format=not write_like_original)
+
+    monkeypatch.setattr(header_rewrite, "_PYDICOM_3", False)
+    monkeypatch.setattr(header_rewrite.pydicom, "dcmwrite", dcmwrite_2x)
+    rewrite_header(src, str(tmp_path / "v2.dcm"), _rename)
+
+    assert calls == [True]
+    assert (tmp_path / "v2.dcm").read_bytes() == (tmp_path / "v3.dcm").read_bytes()
+
+
+def test_header_write_error_is_unsupported(tmp_path, monkeypatch):
+    src = _write_ct(str(tmp_path / "in.dcm"))
+
+    def dcmwrite(fp, ds, **kwargs):
+        raise TypeError("dcmwrite() got an unexpected keyword argument")
+
+    monkeypatch.setattr(header_rewrite.pydicom, "dcmwrite", dcmwrite)
+    with pytest.raises(HeaderRewriteUnsupported):
+        rewrite_header(src, str(tmp_path / "out.dcm"), _rename)
+    assert not (tmp_path / "out.dcm").exists()
+
+
+def test_in_place(tmp_path):
+    src = _write_ct(str(tmp_path / "in.dcm"), rle=True)
+    pixels = pydicom.dcmread(src).PixelData
+
+    rewrite_header_in_place(src, _rename)
+
+    ds = pydicom.dcmread(src)
+    assert str(ds.PatientName) == "ANON^PATIENT"
+    assert ds.PixelData == pixels
+    assert sorted(os.listdir(tmp_path)) == ["in.dcm"]
+
+
+def test_refuses_same_path(tmp_path):
+    src = _write_ct(str(tmp_path / "in.dcm"))
+    with pytest.raises(ValueError):
+        rewrite_header(src, src, _rename)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Research mode
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def test_research_anonymize_file_fast_path(tmp_path, monkeypatch):
+    from research_mode.anonymizer import DicomAnonymizer
+
+    src = _write_ct(str(tmp_path / "in.dcm"))
+    anonymizer = DicomAnonymizer()
+    calls = []
+    real_rewrite = rewrite_header
+    monkeypatch.setattr(
+        "research_mode.anonymizer.rewrite_header",
+        lambda *a, **k: calls.append(a) or real_rewrite(*a, **k),
+    )
+
+    fast = anonymizer.anonymize_file(src, tmp_path / "fast.dcm")
+    monkeypatch.setattr(anonymizer, "_anonymize_file_metadata_only", lambda i, o: None)
+    full = anonymizer.anonymize_file(src, tmp_path / "full.dcm")
+
+    assert len(calls) == 1
+    assert fast.success and full.success
+    assert (tmp_path / "fast.dcm").read_bytes() == (tmp_path / "full.dcm").read_bytes()
+    assert fast.original_pixel_hash == full.original_pixel_hash
+    assert fast.pixel_data_preserved and fast.pixel_clean
+
+
+def test_research_masking_modality_takes_full_path(tmp_path, monkeypatch):
+    from research_mode.anonymizer import DicomAnonymizer
+
+    src = _write_ct(str(tmp_path / "in.dcm"))
+    ds = pydicom.dcmread(src)
+    ds.Modality = "US"
+    ds.save_as(src)
+    monkeypatch.setattr("research_mode.anonymizer.rewrite_header", None)  # Must not be called
+
+    result = DicomAnonymizer().anonymize_file(src, tmp_path / "out.dcm")
+
+    assert result.success
+    assert result.pixel_data_modified
@@ -0,0 +1,196 @@
+"""
+Unit tests for voxelmask_core/input_store.py (content-addressed input store)
+
+Tests:
+- Uploads are written once and shared by every stage that asks for them
+- Identical content is stored once (dedupe by SHA-256)
+- Reference counts delete stored files when the last holder releases
+- prepare_pipeline_inputs() / cleanup_temp_files() go through the store
+"""
+
+import hashlib
+import io
+import os
+import sys
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from voxelmask_core.input_store import InputStore, StoredInput
+from voxelmask_core.pipeline import cleanup_temp_files, prepare_pipeline_inputs
+from zip_ingest import ZipMemberBuffer, buffer_sha256, copy_buffer
+
+
+class FileBuffer:
+    """Stand-in for an uploaded file; counts getbuffer() calls."""
+
+    def __init__(self, name, data):
+        self.name = name
+        self.size = len(data)
+        self._data = data
+        self.reads = 0
+
+    def getbuffer(self):
+        self.reads += 1
+        return memoryview(self._data)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = InputStore(tmp_path / "inputs")
+    yield store
+    store.close()
+
+
+def _stored_files(store):
+    return sorted(p.name for p in store.root.iterdir())
+
+
+class TestPut:
+
+    def test_stores_content_under_its_hash(self, store):
+        data = b"DICOM" * 1000
+        entry = store.put(FileBuffer("a.dcm", data))
+
+        assert isinstance(entry, StoredInput)
+        assert entry.name == "a.dcm"
+        assert entry.size == len(data)
+        assert entry.sha256 == hashlib.sha256(data).hexdigest()
+        assert os.path.basename(entry.path) == f"{entry.sha256}.dcm"
+        with open(entry.path, "rb") as fh:
+            assert fh.read() == data
+
+    def test_same_buffer_written_once(self, store):
+        fb = FileBuffer("a.dcm", b"x" * 4096)
+        first = store.put(fb)
+        second = store.put(fb)
+        third = store.acquire(fb)
+
+        assert first is second is third
+        assert fb.reads == 1
+        assert store.stats()["bytes_written"] == 4096
+
+    def test_identical_content_deduplicated(self, store):
+        a = store.put(FileBuffer("a.dcm", b"same"))
+        b = store.put(FileBuffer("b.dcm", b"same"))
+
+        assert a.path == b.path
+        assert (a.name, b.name) == ("a.dcm", "b.dcm")
+        assert _stored_files(store) == [f"{a.sha256}.dcm"]
+        assert store.stats()["bytes_written"] == 4
+
+    def test_zip_member_streamed_into_store(self, store):
+        raw = io.BytesIO()
+        with zipfile.ZipFile(raw, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("dir/img.dcm", b"member" * 500)
+        archive = zipfile.ZipFile(raw)
+        member = ZipMemberBuffer(archive, archive.getinfo("dir/img.dcm"))
+
+        entry = store.put(member)
+
+        assert entry.name == "img.dcm"
+        assert entry.sha256 == hashlib.sha256(b"member" * 500).hexdigest()
+
+    def test_failed_write_leaves_nothing(self, store):
+        class Broken(FileBuffer):
+            def getbuffer(self):
+                raise OSError("read failed")
+
+        with pytest.raises(OSError):
+            store.put(Broken("bad.dcm", b""))
+        assert _stored_files(store) == []
+
+
+class TestStoredInput:
+
+    def test_getbuffer_is_mapped_view(self, store):
+        data = bytes(range(256)) * 64
+        entry = store.put(FileBuffer("a.dcm", data))
+
+        view = entry.getbuffer()
+        assert isinstance(view, memoryview)
+        assert view.readonly
+        assert bytes(view) == data
+        view.release()
+
+    def test_empty_file(self, store):
+        entry = store.put(FileBuffer("empty.dcm", b""))
+        assert bytes(entry.getbuffer()) == b""
+
+    def test_helpers_use_stored_hash_and_stream(self, store):
+        entry = store.put(FileBuffer("a.dcm", b"payload"))
+        out = io.BytesIO()
+        copy_buffer(entry, out)
+
+        assert out.getvalue() == b"payload"
+        assert buffer_sha256(entry) == entry.sha256
+
+    def test_stored_input_put_again_is_not_rewritten(self, store):
+        entry = store.put(FileBuffer("a.dcm", b"payload"))
+        written = store.stats()["bytes_written"]
+
+        assert store.put(entry).sha256 == entry.sha256
+        assert store.stats()["bytes_written"] == written
+
+
+class TestRefcounts:
+
+    def test_release_deletes_at_zero(self, store):
+        entry = store.acquire(FileBuffer("a.dcm", b"data"))
+        assert store.refcount(entry) == 2  # Pinned by put + one holder
+
+        assert store.release(entry)
+        assert os.path.exists(entry.path)
+        assert store.release(entry.path)
+        assert not os.path.exists(entry.path)
+        assert store.refcount(entry) == 0
+
+    def test_shared_content_kept_until_all_released(self, store):
+        a = store.put(FileBuffer("a.dcm", b"same"))
+        store.put(FileBuffer("b.dcm", b"same"))
+
+        store.release(a)
+        assert os.path.exists(a.path)
+        store.release(a)
+        assert not os.path.exists(a.path)
+
+    def test_release_ignores_foreign_paths(self, store, tmp_path):
+        other = tmp_path / "other.dcm"
+        other.write_bytes(b"x")
+        assert store.release(str(other)) is False
+        assert other.exists()
+
+    def test_close_deletes_everything(self, store):
+        store.acquire(FileBuffer("a.dcm", b"a"))
+        store.put(FileBuffer("b.dcm", b"b"))
+        store.close()
+
+        assert _stored_files(store) == []
+        assert store.stats()["files"] == 0
+
+
+class TestPipelineIntegration:
+
+    def test_prepare_and_cleanup_through_store(self, store, tmp_path):
+        fb = FileBuffer("a.dcm", b"pipeline")
+        analysed = store.put(fb)  # Earlier stage (manifest analysis)
+
+        inputs = prepare_pipeline_inputs([fb], tmp_path, store=store)
+        assert inputs == [("a.dcm", analysed.path)]
+        assert fb.reads == 1
+
+        cleanup_temp_files(inputs, store=store)
+        assert os.path.exists(analysed.path)  # Still pinned for the run
+        store.close()
+        assert not os.path.exists(analysed.path)
+
+    def test_without_store_writes_temp_files(self, tmp_path):
+        inputs = prepare_pipeline_inputs([FileBuffer("a.dcm", b"legacy")], tmp_path)
+        (_, path), = inputs
+        with open(path, "rb") as fh:
+            assert fh.read() == b"legacy"
+
+        cleanup_temp_files(inputs)
+        assert not os.path.exists(path)
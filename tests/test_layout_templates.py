@@ -0,0 +1,233 @@
+"""
+Unit tests for layout_templates.py and its use in process_dicom
+
+Tests:
+- DeviceSignature from DICOM headers (anonymous devices excluded)
+- Learning only from accepted sessions, only all-frame masked regions
+  (or the masks the export applied, when given)
+- Template round trip, relearning, unreadable/foreign files ignored
+- verify_template coverage rules
+- process_dicom uses a verified template after one-frame OCR and falls
+  back to full detection when verification finds unexpected text
+"""
+
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from layout_templates import (
+    LAYOUT_TEMPLATE_VERSION,
+    DeviceSignature,
+    LayoutTemplateStore,
+    verify_template,
+)
+from review_session import ReviewSession
+
+
+def _header(**overrides):
+    fields = dict(Manufacturer="Acme", ManufacturerModelName="Sono 5",
+                  Rows=48, Columns=64, SoftwareVersions="1.2")
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+def _accepted_session(regions=((0, 0, 64, 8),)):
+    session = ReviewSession.create(sop_instance_uid="1.2.3")
+    for x, y, w, h in regions:
+        session.add_ocr_region(x, y, w, h)
+    session.start_review()
+    session.accept()
+    return session
+
+
+class TestDeviceSignature:
+
+    def test_from_dataset(self):
+        sig = DeviceSignature.from_dataset(_header(SoftwareVersions=["1.2", "b7"]))
+        assert sig == DeviceSignature("Acme", "Sono 5", 48, 64, "1.2\\b7")
+
+    def test_anonymous_device_has_no_signature(self):
+        assert DeviceSignature.from_dataset(_header(Manufacturer="")) is None
+        assert DeviceSignature.from_dataset(SimpleNamespace(Rows=1, Columns=1)) is None
+
+    def test_geometry_and_firmware_change_key(self):
+        base = DeviceSignature.from_dataset(_header()).key()
+        assert DeviceSignature.from_dataset(_header(Rows=600)).key() != base
+        assert DeviceSignature.from_dataset(_header(SoftwareVersions="1.3")).key() != base
+
+
+class TestLearning:
+
+    def test_requires_accepted_session(self, tmp_path):
+        session = ReviewSession.create(sop_instance_uid="1.2.3")
+        with pytest.raises(RuntimeError):
+            LayoutTemplateStore(tmp_path).learn(DeviceSignature.from_dataset(_header()), session)
+
+    def test_learns_masked_all_frame_regions_only(self, tmp_path):
+        session = ReviewSession.create(sop_instance_uid="1.2.3")
+        session.add_ocr_region(0, 0, 64, 8)
+        session.add_ocr_region(0, 40, 64, 8).set_unmask()
+        session.add_manual_region(5, 5, 10, 10, frame_index=3)
+        session.start_review()
+        session.accept()
+        store = LayoutTemplateStore(tmp_path)
+        sig = DeviceSignature.from_dataset(_header())
+
+        store.learn(sig, session)
+
+        template = store.get(sig)
+        assert template.regions == [(0, 0, 64, 8)]
+        assert template.session_id == session.session_id
+        assert store.get(DeviceSignature.from_dataset(_header(Rows=600))) is None
+        assert store.stats()["hits"] == 1 and store.stats()["misses"] == 1
+
+    def test_learns_applied_masks_when_given(self, tmp_path):
+        store = LayoutTemplateStore(tmp_path)
+        sig = DeviceSignature.from_dataset(_header())
+        session = _accepted_session(((0, 40, 64, 8),))
+
+        template = store.learn(sig, session, [(0, 0, 64, 12), (1, 1, 0, 5)])
+
+        assert template.regions == [(0, 0, 64, 12)]
+        assert template.session_id == session.session_id
+
+    def test_nothing_to_learn(self, tmp_path):
+        store = LayoutTemplateStore(tmp_path)
+        assert store.learn(DeviceSignature.from_dataset(_header()), _accepted_session(())) is None
+        assert store.learn(None, _accepted_session()) is None
+        assert store.templates() == []
+
+    def test_relearning_replaces_regions(self, tmp_path):
+        store = LayoutTemplateStore(tmp_path)
+        sig = DeviceSignature.from_dataset(_header())
+        store.learn(sig, _accepted_session())
+        store.learn(sig, _accepted_session(((0, 0, 64, 10), (0, 40, 30, 8))))
+
+        template = LayoutTemplateStore(tmp_path).get(sig)
+        assert template.regions == [(0, 0, 64, 10), (0, 40, 30, 8)]
+        assert template.accept_count == 2
+
+    def test_unreadable_or_old_templates_ignored(self, tmp_path):
+        store = LayoutTemplateStore(tmp_path)
+        sig = DeviceSignature.from_dataset(_header())
+        store.learn(sig, _accepted_session())
+        path = tmp_path / f"{sig.key()}.json"
+        data = json.loads(path.read_text())
+
+        path.write_text(json.dumps({**data, "version": LAYOUT_TEMPLATE_VERSION + 1}))
+        assert store.get(sig) is None
+        path.write_text("{")
+        assert store.get(sig) is None
+
+    def test_record_verification(self, tmp_path):
+        store = LayoutTemplateStore(tmp_path)
+        sig = DeviceSignature.from_dataset(_header())
+        template = store.learn(sig, _accepted_session())
+
+        store.record_verification(template, True)
+        store.record_verification(template, False)
+
+        stored = store.get(sig)
+        assert (stored.verified_uses, stored.rejected_uses) == (1, 1)
+        assert (store.stats()["verified"], store.stats()["rejected"]) == (1, 1)
+
+
+class TestVerifyTemplate:
+
+    def test_boxes_inside_regions(self):
+        regions = [(0, 0, 64, 8), (0, 40, 64, 8)]
+        assert verify_template(regions, [(2, 1, 30, 6), (10, 41, 20, 5)])
+        assert verify_template(regions, [(0, 0, 66, 10)])  # Within tolerance
+        assert verify_template(regions, [])
+
+    def test_box_outside_regions(self):
+        assert not verify_template([(0, 0, 64, 8)], [(2, 20, 30, 6)])
+        assert not verify_template([], [(2, 20, 30, 6)])
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# process_dicom integration
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class BoxEngine:
+    """OCR engine stand-in: one fixed box per image (2x OCR scale); counts images."""
+
+    def __init__(self, y):
+        self.y = y
+        self.images = 0
+
+    def _result(self):
+        y = self.y
+        return {"det_boxes": [[[20, y], [60, y], [60, y + 10], [20, y + 10]]], "det_scores": [0.9]}
+
+    def predict(self, images):
+        if isinstance(images, list):
+            self.images += len(images)
+            return [self._result() for _ in images]
+        self.images += 1
+        return [self._result()]
+
+
+def _write_cine(path, frames=12):
+    from pydicom.dataset import Dataset, FileMetaDataset
+    from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+    ds = Dataset()
+    ds.file_meta = FileMetaDataset()
+    ds.file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds.SOPClassUID = ds.file_meta.MediaStorageSOPClassUID = "1.2.840.10008.5.1.4.1.1.6.1"
+    ds.SOPInstanceUID = ds.file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    ds.StudyInstanceUID = generate_uid()
+    ds.SeriesInstanceUID = generate_uid()
+    ds.Modality = "US"
+    ds.Manufacturer = "Acme"
+    ds.ManufacturerModelName = "Sono 5"
+    ds.SoftwareVersions = "1.2"
+    ds.PatientName = "DOE^JANE"
+    ds.PatientID = "12345"
+    ds.Rows, ds.Columns = 48, 64
+    ds.SamplesPerPixel = 3
+    ds.PhotometricInterpretation = "RGB"
+    ds.PlanarConfiguration = 0
+    ds.BitsAllocated, ds.BitsStored, ds.HighBit = 8, 8, 7
+    ds.PixelRepresentation = 0
+    ds.NumberOfFrames = frames
+    rng = np.random.default_rng(1)
+    ds.PixelData = rng.integers(0, 256, (frames, 48, 64, 3), dtype=np.uint8).tobytes()
+    ds.save_as(path, enforce_file_format=True)
+
+
+@pytest.mark.parametrize("ocr_y, expect_template", [(2, True), (60, False)])
+def test_process_dicom_uses_verified_template(tmp_path, monkeypatch, ocr_y, expect_template):
+    import pydicom
+    import run_on_dicom
+    from ocr_pool import OCREnginePool
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "studies").mkdir()
+    src, out = str(tmp_path / "in.dcm"), str(tmp_path / "out.dcm")
+    _write_cine(src)
+    store = LayoutTemplateStore(tmp_path / "layouts")
+    store.learn(DeviceSignature.from_dataset(pydicom.dcmread(src)), _accepted_session(((0, 0, 64, 16),)))
+    engine = BoxEngine(ocr_y)
+    pool = OCREnginePool(size=1, engine_factory=lambda: engine)
+
+    assert run_on_dicom.process_dicom(src, out, "DOE", "NEW", ocr_pool=pool, layout_templates=store)
+
+    below_template = np.array_equal(
+        pydicom.dcmread(out).pixel_array[:, 16:], pydicom.dcmread(src).pixel_array[:, 16:]
+    )
+    if expect_template:
+        assert engine.images == 1  # One-frame verification only
+        assert store.stats()["verified"] == 1
+        assert below_template  # Only the template band was masked
+    else:
+        assert engine.images > 1  # Full detection ran after rejection
+        assert store.stats()["rejected"] == 1
+        assert not below_template  # Detected box below the band was masked
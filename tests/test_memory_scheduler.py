@@ -0,0 +1,297 @@
+"""
+Unit tests for memory_scheduler.py
+
+Tests:
+- Header-only planning: FULL / CHUNKED / SKIP and frames_per_chunk
+- Budget resolution (argument, environment, fallback)
+- Admission: small files share the budget, CHUNKED files run alone, FIFO order
+- Queueing is recorded in the evidence bundle
+- run_pipeline admits files against the scheduler's budget
+- Chunked pixel scrub helpers match a whole-clip scrub
+"""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from memory_scheduler import (
+    DEFAULT_MEMORY_BUDGET_BYTES,
+    MEMORY_BUDGET_ENV_VAR,
+    PLAN_CHUNKED,
+    PLAN_FULL,
+    PLAN_SKIP,
+    MemoryBudgetScheduler,
+    plan_pixel_memory,
+    resolve_memory_budget,
+)
+
+
+def _make_ds(rows=100, cols=100, frames=1, bits=8, samples=1, sop="1.2.3"):
+    return SimpleNamespace(
+        Rows=rows,
+        Columns=cols,
+        NumberOfFrames=frames,
+        BitsAllocated=bits,
+        SamplesPerPixel=samples,
+        SOPInstanceUID=sop,
+    )
+
+
+class FakeBundle:
+    def __init__(self):
+        self.exceptions = []
+
+    def add_exception(self, exception_type, message, severity, source_sop_uid=None):
+        self.exceptions.append((exception_type, severity, source_sop_uid))
+
+
+class TestPlanning:
+
+    def test_small_file_is_full(self):
+        admission = plan_pixel_memory(_make_ds(frames=2), budget_bytes=10_000_000)
+
+        assert admission.plan == PLAN_FULL
+        assert admission.estimated_bytes == 20_000
+        assert admission.reserved_bytes == 20_000 * 8
+        assert admission.frames_per_chunk is None
+        assert admission.sop_instance_uid == "1.2.3"
+
+    def test_large_cine_is_chunked_not_skipped(self):
+        # 1000 frames x 10 KB = 10 MB raw; 80 KB peak per frame
+        admission = plan_pixel_memory(_make_ds(frames=1000), budget_bytes=8_000_000)
+
+        assert admission.plan == PLAN_CHUNKED
+        assert admission.chunked is True
+        assert admission.frames_per_chunk == 100
+        assert admission.reserved_bytes == 8_000_000
+
+    def test_oversize_single_frame_is_skipped(self):
+        admission = plan_pixel_memory(_make_ds(rows=1000, cols=1000), budget_bytes=1_000_000)
+
+        assert admission.plan == PLAN_SKIP
+        assert admission.skipped is True
+        assert admission.reserved_bytes == 0
+
+    def test_default_budget_matches_legacy_cutoff(self):
+        # 75 MB raw was the old should_render_pixels limit
+        at_limit = _make_ds(rows=1000, cols=1000, frames=75)
+        over_limit = _make_ds(rows=1000, cols=1000, frames=76)
+
+        assert plan_pixel_memory(at_limit).plan == PLAN_FULL
+        assert plan_pixel_memory(over_limit).plan == PLAN_CHUNKED
+
+
+class TestResolveBudget:
+
+    def test_explicit_budget_wins(self, monkeypatch):
+        monkeypatch.setenv(MEMORY_BUDGET_ENV_VAR, "1")
+        assert resolve_memory_budget(5000) == 5000
+
+    def test_env_var_in_megabytes(self, monkeypatch):
+        monkeypatch.setenv(MEMORY_BUDGET_ENV_VAR, "2")
+        assert resolve_memory_budget() == 2 * 1024 * 1024
+
+    def test_invalid_values_fall_back(self, monkeypatch):
+        monkeypatch.setenv(MEMORY_BUDGET_ENV_VAR, "plenty")
+        assert resolve_memory_budget() == DEFAULT_MEMORY_BUDGET_BYTES
+        assert resolve_memory_budget(0) == DEFAULT_MEMORY_BUDGET_BYTES
+
+
+class TestAdmission:
+
+    def test_small_files_share_the_budget(self):
+        scheduler = MemoryBudgetScheduler(budget_bytes=1_000_000)
+        small = scheduler.plan(_make_ds(frames=1))  # 80 KB reserved
+
+        held = [small for _ in range(12)]
+        assert all(scheduler.try_acquire(a) for a in held)
+        assert scheduler.try_acquire(small) is False  # 13 x 80 KB > 1 MB
+
+        stats = scheduler.stats()
+        assert stats.active == 12
+        assert stats.in_use_bytes == 12 * 80_000
+
+        for a in held:
+            scheduler.release(a)
+        assert scheduler.stats().in_use_bytes == 0
+
+    def test_chunked_file_runs_alone(self):
+        scheduler = MemoryBudgetScheduler(budget_bytes=1_000_000)
+        small = scheduler.plan(_make_ds())
+        huge = scheduler.plan(_make_ds(frames=500))
+        assert huge.chunked
+
+        assert scheduler.try_acquire(small)
+        assert scheduler.try_acquire(huge) is False
+        scheduler.release(small)
+
+        assert scheduler.try_acquire(huge)
+        assert scheduler.try_acquire(small) is False
+        scheduler.release(huge)
+        assert scheduler.stats().chunked == 1
+
+    def test_acquire_times_out(self):
+        scheduler = MemoryBudgetScheduler(budget_bytes=1_000_000)
+        huge = scheduler.plan(_make_ds(frames=500))
+
+        with scheduler.admit(huge):
+            with pytest.raises(TimeoutError):
+                scheduler.acquire(scheduler.plan(_make_ds()), timeout=0.01)
+        assert scheduler.stats().in_use_bytes == 0
+
+    def test_waiters_are_admitted_in_fifo_order(self):
+        scheduler = MemoryBudgetScheduler(budget_bytes=1_000_000)
+        huge = scheduler.plan(_make_ds(frames=500))
+        order = []
+
+        def waiter(name):
+            with scheduler.admit(huge):
+                order.append(name)
+
+        scheduler.acquire(huge)
+        threads = []
+        for name in ("first", "second", "third"):
+            t = threading.Thread(target=waiter, args=(name,))
+            t.start()
+            threads.append(t)
+            while scheduler.stats().queued < len(threads):
+                time.sleep(0.001)
+        scheduler.release(huge)
+        for t in threads:
+            t.join()
+
+        assert order == ["first", "second", "third"]
+
+    def test_queue_wait_recorded_in_evidence_bundle(self):
+        bundle = FakeBundle()
+        scheduler = MemoryBudgetScheduler(budget_bytes=1_000_000, evidence_bundle=bundle)
+        huge = scheduler.plan(_make_ds(frames=500, sop="9.9.9"))
+
+        def waiter():
+            with scheduler.admit(huge):
+                pass
+
+        scheduler.acquire(huge)
+        t = threading.Thread(target=waiter)
+        t.start()
+        time.sleep(0.05)
+        scheduler.release(huge)
+        t.join()
+
+        assert ("PIXEL_PROCESSING_QUEUED", "INFO", "9.9.9") in bundle.exceptions
+
+    def test_plan_path_reads_header_only(self, tmp_path):
+        from pydicom.dataset import Dataset, FileMetaDataset
+        from pydicom.uid import ExplicitVRLittleEndian
+
+        ds = Dataset()
+        ds.file_meta = FileMetaDataset()
+        ds.file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+        ds.SOPClassUID = ds.file_meta.MediaStorageSOPClassUID = "1.2.840.10008.5.1.4.1.1.3.1"
+        ds.SOPInstanceUID = ds.file_meta.MediaStorageSOPInstanceUID = "1.2.840.1"
+        ds.Rows, ds.Columns, ds.NumberOfFrames = 10, 10, 3
+        ds.BitsAllocated, ds.SamplesPerPixel = 8, 1
+        ds.PixelData = bytes(300)
+        path = tmp_path / "cine.dcm"
+        ds.save_as(path, enforce_file_format=True)
+
+        admission = MemoryBudgetScheduler().plan_path(str(path))
+        assert admission.plan == PLAN_FULL
+        assert admission.estimated_bytes == 300
+        assert admission.sop_instance_uid == "1.2.840.1"
+
+        unreadable = MemoryBudgetScheduler().plan_path(str(tmp_path / "missing.dcm"))
+        assert unreadable.plan == PLAN_FULL
+        assert unreadable.reserved_bytes == 0
+
+
+class TestRunPipelineAdmission:
+
+    def test_huge_file_never_overlaps_small_files(self, tmp_path):
+        from src.voxelmask_core.pipeline import EXECUTOR_THREAD, PipelineConfig, run_pipeline
+
+        huge = plan_pixel_memory(_make_ds(frames=500), budget_bytes=1_000_000)
+        small = plan_pixel_memory(_make_ds(), budget_bytes=1_000_000)
+
+        class HeaderlessScheduler(MemoryBudgetScheduler):
+            def plan_path(self, path):
+                return huge if "huge" in os.path.basename(path) else small
+
+        bundle = FakeBundle()
+        scheduler = HeaderlessScheduler(budget_bytes=1_000_000, evidence_bundle=bundle)
+        active = set()
+        overlaps = []
+        max_concurrent = [0]
+        guard = threading.Lock()
+
+        def processor(input_path, output_path, context):
+            name = context['original_filename']
+            with guard:
+                if active and ("huge" in name or any("huge" in a for a in active)):
+                    overlaps.append(name)
+                active.add(name)
+                max_concurrent[0] = max(max_concurrent[0], len(active))
+            time.sleep(0.02)
+            with guard:
+                active.discard(name)
+            Path(output_path).write_bytes(b"ok")
+            return context['memory_admission'] is not None
+
+        names = ["s0.dcm", "s1.dcm", "huge.dcm", "s2.dcm", "s3.dcm"]
+        inputs = []
+        for name in names:
+            p = tmp_path / name
+            p.write_bytes(b"x")
+            inputs.append((name, str(p)))
+
+        result = run_pipeline(
+            inputs,
+            PipelineConfig(),
+            run_id="VM_RUN_test",
+            run_root=tmp_path,
+            file_processor=processor,
+            executor_mode=EXECUTOR_THREAD,
+            max_workers=4,
+            memory_scheduler=scheduler,
+        )
+
+        assert result.files_processed == 5
+        assert overlaps == []
+        assert max_concurrent[0] >= 2
+        assert scheduler.stats().in_use_bytes == 0
+        assert any(e[0] == "PIXEL_PROCESSING_QUEUED" for e in bundle.exceptions)
+
+
+class TestChunkedScrubHelpers:
+
+    def test_chunked_scrub_matches_whole_clip(self):
+        from pixel_mask_engine import PixelMaskEngine
+        from run_on_dicom import _as_frame_stack, _to_display_rgb
+
+        rng = np.random.default_rng(0)
+        src = rng.integers(0, 4000, size=(7, 32, 40), dtype=np.uint16)
+        frames = _as_frame_stack(src)
+        max_value = frames.max()
+        masks = [(2, 3, 10, 5), (30, 20, 20, 20)]
+        overlay = np.full((5, 10, 3), 200, dtype=np.uint8)
+        engine = PixelMaskEngine(masks, 40, 32, overlay=overlay, overlay_box=masks[0])
+
+        whole = engine.apply(_to_display_rgb(frames, max_value))
+
+        chunked = np.empty_like(whole)
+        for start in range(0, 7, 3):
+            chunked[start:start + 3] = engine.apply(_to_display_rgb(frames[start:start + 3], max_value))
+
+        assert np.array_equal(whole, chunked)
+        assert (whole[:, 20:, 30:] == 0).all()
+        assert (whole[:, 3:8, 2:12] == 200).all()
+        # Source data is never modified
+        assert src.max() > 255 and frames.shape == (7, 32, 40, 1)
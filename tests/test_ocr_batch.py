@@ -0,0 +1,145 @@
+"""
+Unit tests for ocr_batch.py and the batched detection path
+
+Tests:
+- preprocess_frames_for_ocr matches ClinicalCorrector._preprocess_for_ocr
+  frame by frame (RGB, grayscale, RGBA, tiny frames)
+- predict_batch only accepts one result per frame
+- detect_text_box_from_array makes one OCR call per clip and returns the
+  same DetectionResult as per-frame OCR (dict and list result formats)
+"""
+
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import run_on_dicom
+from clinical_corrector import ClinicalCorrector
+from ocr_batch import predict_batch, preprocess_frames_for_ocr
+
+
+@pytest.fixture
+def corrector():
+    return ClinicalCorrector(load_ocr=False)
+
+
+class TestPreprocessFrames:
+
+    @pytest.mark.parametrize("shape", [(10, 48, 64, 3), (3, 1, 5, 3), (1, 33, 47, 3)])
+    def test_matches_per_frame_preprocessing(self, corrector, shape):
+        frames = np.random.default_rng(0).integers(0, 256, size=shape, dtype=np.uint8)
+
+        batch = preprocess_frames_for_ocr(frames)
+
+        expected = np.stack([corrector._preprocess_for_ocr(f) for f in frames])
+        assert batch.shape == (shape[0], shape[1] * 2, shape[2] * 2, 3)
+        assert np.array_equal(batch, expected)
+
+    def test_grayscale_and_rgba_converted_like_cv2(self, corrector):
+        rng = np.random.default_rng(1)
+        gray = rng.integers(0, 256, size=(4, 20, 30), dtype=np.uint8)
+        rgba = rng.integers(0, 256, size=(4, 20, 30, 4), dtype=np.uint8)
+
+        for frames, code in ((gray, cv2.COLOR_GRAY2BGR), (rgba, cv2.COLOR_RGBA2BGR)):
+            expected = np.stack([corrector._preprocess_for_ocr(cv2.cvtColor(f, code)) for f in frames])
+            assert np.array_equal(preprocess_frames_for_ocr(frames), expected)
+
+
+    def test_raw_rgba_matches_per_frame_detection_path(self, corrector):
+        """Raw RGBA frames, converted the way the per-frame loop did it."""
+        rng = np.random.default_rng(2)
+        frames = rng.integers(0, 256, size=(3, 24, 32, 4), dtype=np.uint8)
+        frames[..., 0] = 255  # Bright red only: channel order decides the threshold
+        frames[..., 3] = 7    # Alpha must not reach the OCR input
+
+        expected = []
+        for frame in frames:
+            if frame.ndim == 2:
+                frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+            elif frame.shape[2] == 4:
+                frame = cv2.cvtColor(frame, cv2.COLOR_RGBA2BGR)
+            expected.append(corrector._preprocess_for_ocr(frame))
+
+        batch = preprocess_frames_for_ocr(frames)
+        assert np.array_equal(batch, np.stack(expected))
+        assert not np.array_equal(batch, preprocess_frames_for_ocr(frames[..., :3]))  # Order matters here
+
+
+class TestPredictBatch:
+
+    def test_rejects_result_count_mismatch(self):
+        class SingleResultEngine:
+            def predict(self, images):
+                return [{"det_boxes": []}]
+
+        assert predict_batch(SingleResultEngine(), np.zeros((3, 4, 4, 3), np.uint8)) is None
+
+    def test_engine_error_returns_none(self):
+        class FailingEngine:
+            def predict(self, images):
+                raise RuntimeError("no batching")
+
+        assert predict_batch(FailingEngine(), np.zeros((2, 4, 4, 3), np.uint8)) is None
+
+
+def _single_result(frame, list_format):
+    """Deterministic per-frame OCR output derived from the frame's pixels."""
+    lit = np.argwhere(frame[..., 0] > 0)
+    if lit.size == 0:
+        return [] if list_format else {"det_boxes": [], "det_scores": []}
+    (y0, x0), (y1, x1) = lit.min(axis=0), lit.max(axis=0)
+    points = [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+    score = 0.5 + (y0 % 7) / 20
+    if list_format:
+        return [[points, ("TEXT", score)]]
+    return {"det_boxes": [points], "det_scores": [score]}
+
+
+class BatchingEngine:
+    def __init__(self, list_format):
+        self.list_format = list_format
+        self.calls = 0
+
+    def predict(self, images):
+        self.calls += 1
+        if isinstance(images, list):
+            return [_single_result(f, self.list_format) for f in images]
+        return [_single_result(images, self.list_format)]
+
+
+class PerFrameEngine(BatchingEngine):
+    def predict(self, images):
+        if isinstance(images, list):
+            raise TypeError("single image only")
+        return super().predict(images)
+
+
+@pytest.mark.parametrize("list_format", [False, True])
+def test_batched_detection_matches_per_frame(corrector, list_format):
+    frames = np.zeros((30, 60, 80, 3), dtype=np.uint8)
+    frames[:, 4:12, 10:50] = 255  # Static header text
+    frames[27:, 40:50, 20:30] = 255  # Text near the end of the clip only
+
+    results = []
+    for engine in (BatchingEngine(list_format), PerFrameEngine(list_format)):
+        corrector.ocr = engine
+        results.append(run_on_dicom.detect_text_box_from_array(corrector, frames))
+
+    batched, per_frame = results
+    assert batched == per_frame
+    assert batched.static_box is not None
+    assert len(batched.all_detected_boxes) == 10
+
+
+def test_batched_detection_makes_one_ocr_call(corrector):
+    engine = BatchingEngine(list_format=False)
+    corrector.ocr = engine
+
+    run_on_dicom.detect_text_box_from_array(corrector, np.zeros((30, 60, 80, 3), dtype=np.uint8))
+
+    assert engine.calls == 1
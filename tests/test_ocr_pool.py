@@ -0,0 +1,203 @@
+"""
+Unit tests for ocr_pool.py
+
+Tests:
+- Engines are created lazily and reused across borrows
+- warm() pre-loads the full pool and reports warm-up time
+- Pool never exceeds its size; borrowers block / time out
+- Singleton helpers and pool-size resolution
+- run_pipeline warms a supplied pool once and exposes it to file_processor
+"""
+
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import ocr_pool
+from ocr_pool import (
+    OCREnginePool,
+    configure_ocr_pool,
+    get_ocr_pool,
+    reset_ocr_pool,
+    resolve_pool_size,
+    POOL_SIZE_ENV_VAR,
+)
+
+
+class CountingFactory:
+    """Engine factory stub that counts how many engines were built."""
+
+    def __init__(self):
+        self.created = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.created += 1
+            return f"engine-{self.created}"
+
+
+@pytest.fixture(autouse=True)
+def _isolate_singleton():
+    reset_ocr_pool()
+    yield
+    reset_ocr_pool()
+
+
+class TestResolvePoolSize:
+
+    def test_explicit_size_wins(self, monkeypatch):
+        monkeypatch.setenv(POOL_SIZE_ENV_VAR, "4")
+        assert resolve_pool_size(2) == 2
+
+    def test_env_var_used_when_no_argument(self, monkeypatch):
+        monkeypatch.setenv(POOL_SIZE_ENV_VAR, "3")
+        assert resolve_pool_size() == 3
+
+    def test_invalid_values_fall_back_to_default(self, monkeypatch):
+        monkeypatch.setenv(POOL_SIZE_ENV_VAR, "lots")
+        assert resolve_pool_size() == ocr_pool.DEFAULT_POOL_SIZE
+        assert resolve_pool_size(0) == ocr_pool.DEFAULT_POOL_SIZE
+
+
+class TestOCREnginePool:
+
+    def test_engine_is_reused_across_borrows(self):
+        factory = CountingFactory()
+        pool = OCREnginePool(size=1, engine_factory=factory)
+
+        with pool.borrow() as first:
+            pass
+        with pool.borrow() as second:
+            pass
+
+        assert first == second
+        assert factory.created == 1
+        assert pool.stats().borrows == 2
+
+    def test_warm_creates_all_engines_once(self):
+        factory = CountingFactory()
+        pool = OCREnginePool(size=3, engine_factory=factory)
+
+        elapsed = pool.warm()
+        pool.warm()
+
+        stats = pool.stats()
+        assert elapsed >= 0.0
+        assert factory.created == 3
+        assert stats.engines_created == 3
+        assert stats.engines_idle == 3
+        assert stats.warmup_seconds >= 0.0
+
+    def test_borrow_times_out_when_pool_exhausted(self):
+        pool = OCREnginePool(size=1, engine_factory=CountingFactory())
+
+        with pool.borrow():
+            with pytest.raises(TimeoutError):
+                with pool.borrow(timeout=0.01):
+                    pass
+
+    def test_concurrent_borrowers_never_share_an_engine(self):
+        factory = CountingFactory()
+        pool = OCREnginePool(size=2, engine_factory=factory)
+        in_use = set()
+        violations = []
+        guard = threading.Lock()
+
+        def worker():
+            for _ in range(20):
+                with pool.borrow() as engine:
+                    with guard:
+                        if engine in in_use:
+                            violations.append(engine)
+                        in_use.add(engine)
+                    with guard:
+                        in_use.discard(engine)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert violations == []
+        assert factory.created <= 2
+
+    def test_failed_engine_creation_releases_slot(self):
+        calls = {"n": 0}
+
+        def flaky():
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise RuntimeError("model load failed")
+            return "engine"
+
+        pool = OCREnginePool(size=1, engine_factory=flaky)
+        with pytest.raises(RuntimeError):
+            with pool.borrow():
+                pass
+
+        with pool.borrow() as engine:
+            assert engine == "engine"
+
+    def test_corrector_wraps_borrowed_engine(self):
+        pool = OCREnginePool(size=1, engine_factory=lambda: "shared-engine")
+
+        with pool.corrector() as corrector:
+            assert corrector.ocr == "shared-engine"
+
+
+class TestSingleton:
+
+    def test_get_ocr_pool_returns_same_instance(self):
+        assert get_ocr_pool() is get_ocr_pool()
+
+    def test_configure_replaces_pool(self):
+        before = get_ocr_pool()
+        after = configure_ocr_pool(size=2, engine_factory=CountingFactory())
+
+        assert after is not before
+        assert get_ocr_pool() is after
+        assert after.size == 2
+
+
+class TestRunPipelineIntegration:
+
+    def test_pool_warmed_once_and_passed_to_processor(self, tmp_path):
+        from src.voxelmask_core.pipeline import PipelineConfig, run_pipeline
+
+        factory = CountingFactory()
+        pool = OCREnginePool(size=1, engine_factory=factory)
+        inputs = []
+        for i in range(3):
+            p = tmp_path / f"in_{i}.dcm"
+            p.write_bytes(b"x")
+            inputs.append((p.name, str(p)))
+
+        seen_pools = []
+
+        def processor(input_path, output_path, context):
+            seen_pools.append(context['ocr_pool'])
+            with context['ocr_pool'].borrow():
+                pass
+            Path(output_path).write_bytes(b"y")
+            return True
+
+        result = run_pipeline(
+            inputs,
+            PipelineConfig(),
+            run_id="VM_RUN_test",
+            run_root=tmp_path,
+            file_processor=processor,
+            ocr_pool=pool,
+        )
+
+        assert result.files_processed == 3
+        assert all(p is pool for p in seen_pools)
+        assert factory.created == 1
+        assert result.ocr_warmup_seconds >= 0.0
@@ -0,0 +1,255 @@
+"""
+Unit tests for the run_pipeline executor modes (voxelmask_core/pipeline.py)
+
+Tests:
+- serial, thread and process modes produce identical, input-ordered results
+- progress_callback fires once per file as files complete
+- worker_initializer state reaches file_processor via context['worker_state'],
+  scoped to its run (concurrent serial/thread runs never share it)
+- failures are isolated per file and counted
+- bounded worker resolution and unknown mode rejection
+"""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.voxelmask_core.pipeline import (
+    EXECUTOR_MODES,
+    EXECUTOR_PROCESS,
+    EXECUTOR_SERIAL,
+    EXECUTOR_THREAD,
+    PipelineConfig,
+    resolve_max_workers,
+    run_pipeline,
+)
+
+
+# Module-level helpers so the process pool can pickle them
+
+def copy_processor(input_path, output_path, context):
+    """Copy input to output; inputs named *fail* report failure, *boom* raise."""
+    name = context['original_filename']
+    if 'boom' in name:
+        raise RuntimeError("processor exploded")
+    if 'fail' in name:
+        return False
+    # Reverse completion order relative to input order
+    time.sleep(0.01 * (5 - int(name.split('_')[1].split('.')[0]) % 5))
+    data = Path(input_path).read_bytes()
+    tag = context['worker_state'].get('tag', b'')
+    Path(output_path).write_bytes(data + tag)
+    return True
+
+
+def tag_initializer():
+    return {'tag': b'-warm'}
+
+
+def _make_inputs(tmp_path, names):
+    inputs = []
+    for name in names:
+        p = tmp_path / name
+        p.write_bytes(name.encode())
+        inputs.append((name, str(p)))
+    return inputs
+
+
+@pytest.mark.parametrize("mode", EXECUTOR_MODES)
+def test_results_keep_input_order(tmp_path, mode):
+    names = [f"file_{i}.dcm" for i in range(6)]
+    inputs = _make_inputs(tmp_path, names)
+
+    result = run_pipeline(
+        inputs,
+        PipelineConfig(),
+        run_id="VM_RUN_test",
+        run_root=tmp_path,
+        file_processor=copy_processor,
+        executor_mode=mode,
+        max_workers=3,
+        worker_initializer=tag_initializer,
+    )
+
+    assert result.success is True
+    assert result.files_processed == 6
+    assert [r.input_filename for r in result.processed_files] == names
+    for name, r in zip(names, result.processed_files):
+        assert Path(r.output_path).read_bytes() == name.encode() + b'-warm'
+    assert result.total_output_bytes == sum(r.output_bytes for r in result.processed_files)
+
+
+@pytest.mark.parametrize("mode", [EXECUTOR_THREAD, EXECUTOR_PROCESS])
+def test_progress_callback_fires_per_completed_file(tmp_path, mode):
+    inputs = _make_inputs(tmp_path, [f"file_{i}.dcm" for i in range(4)])
+    calls = []
+    caller_thread = threading.get_ident()
+
+    def progress(current, total, filename):
+        calls.append((current, total, filename, threading.get_ident()))
+
+    run_pipeline(
+        inputs,
+        PipelineConfig(),
+        run_id="VM_RUN_test",
+        run_root=tmp_path,
+        file_processor=copy_processor,
+        progress_callback=progress,
+        executor_mode=mode,
+        max_workers=2,
+    )
+
+    assert [c[0] for c in calls] == [1, 2, 3, 4]
+    assert all(c[1] == 4 for c in calls)
+    assert sorted(c[2] for c in calls) == sorted(name for name, _ in inputs)
+    # Callbacks run in the calling thread (safe for UI updates)
+    assert all(c[3] == caller_thread for c in calls)
+
+
+@pytest.mark.parametrize("mode", EXECUTOR_MODES)
+def test_failures_are_isolated_per_file(tmp_path, mode):
+    names = ["file_0.dcm", "fail_1.dcm", "boom_2.dcm", "file_3.dcm"]
+    inputs = _make_inputs(tmp_path, names)
+
+    result = run_pipeline(
+        inputs,
+        PipelineConfig(),
+        run_id="VM_RUN_test",
+        run_root=tmp_path,
+        file_processor=copy_processor,
+        executor_mode=mode,
+        max_workers=2,
+    )
+
+    assert result.success is False
+    assert result.files_processed == 2
+    assert result.files_failed == 2
+    by_name = {r.input_filename: r for r in result.processed_files}
+    assert by_name["fail_1.dcm"].error == "Processing returned failure"
+    assert "processor exploded" in by_name["boom_2.dcm"].error
+    assert by_name["file_3.dcm"].success is True
+
+
+def test_thread_mode_shares_caller_ocr_pool(tmp_path):
+    class FakePool:
+        def warm(self):
+            return 0.0
+
+    pool = FakePool()
+    seen = []
+
+    def processor(input_path, output_path, context):
+        seen.append(context['ocr_pool'])
+        Path(output_path).write_bytes(b"ok")
+        return True
+
+    inputs = _make_inputs(tmp_path, [f"file_{i}.dcm" for i in range(3)])
+    run_pipeline(
+        inputs,
+        PipelineConfig(),
+        run_id="VM_RUN_test",
+        run_root=tmp_path,
+        file_processor=processor,
+        ocr_pool=pool,
+        executor_mode=EXECUTOR_THREAD,
+    )
+
+    assert seen == [pool, pool, pool]
+
+
+@pytest.mark.parametrize("mode", [EXECUTOR_SERIAL, EXECUTOR_THREAD])
+def test_concurrent_runs_keep_their_own_worker_state(tmp_path, mode):
+    import src.voxelmask_core.pipeline as pipeline_module
+    started = threading.Barrier(2)
+    seen = {}
+
+    def run(tag):
+        def initializer():
+            started.wait(5)  # Both runs initialised before either processes a file
+            return {'tag': tag}
+
+        def processor(input_path, output_path, context):
+            seen.setdefault(tag, set()).add(context['worker_state']['tag'])
+            Path(output_path).write_bytes(b"ok")
+            return True
+
+        run_dir = tmp_path / tag.decode()
+        run_dir.mkdir()
+        run_pipeline(
+            _make_inputs(run_dir, [f"file_{i}.dcm" for i in range(3)]),
+            PipelineConfig(),
+            run_id=f"VM_RUN_{tag.decode()}",
+            run_root=run_dir,
+            file_processor=processor,
+            executor_mode=mode,
+            max_workers=2,
+            worker_initializer=initializer,
+        )
+
+    runs = [threading.Thread(target=run, args=(tag,)) for tag in (b"a", b"b")]
+    for t in runs:
+        t.start()
+    for t in runs:
+        t.join(10)
+
+    assert seen == {b"a": {b"a"}, b"b": {b"b"}}
+    assert pipeline_module._WORKER_STATE == {}
+
+
+def test_worker_ocr_pool_leaves_shared_pool_alone(monkeypatch):
+    import ocr_pool
+    monkeypatch.setattr(ocr_pool.OCREnginePool, "warm", lambda self: 0.0)
+    shared = ocr_pool.get_ocr_pool()
+
+    state = ocr_pool.init_worker_ocr_pool(size=1)
+
+    assert state['ocr_pool'] is not shared
+    assert ocr_pool.get_ocr_pool() is shared
+
+
+def test_empty_input_returns_empty_success(tmp_path):
+    result = run_pipeline(
+        [],
+        PipelineConfig(),
+        run_id="VM_RUN_test",
+        run_root=tmp_path,
+        file_processor=copy_processor,
+        executor_mode=EXECUTOR_PROCESS,
+    )
+
+    assert result.success is True
+    assert result.processed_files == []
+
+
+def test_unknown_executor_mode_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        run_pipeline(
+            [],
+            PipelineConfig(),
+            run_id="VM_RUN_test",
+            run_root=tmp_path,
+            file_processor=copy_processor,
+            executor_mode="gpu",
+        )
+
+
+class TestResolveMaxWorkers:
+
+    def test_never_exceeds_file_count(self):
+        assert resolve_max_workers(16, 3) == 3
+
+    def test_defaults_to_cpu_count(self):
+        assert resolve_max_workers(None, 10_000) == (os.cpu_count() or 1)
+
+    def test_at_least_one(self):
+        assert resolve_max_workers(0, 0) == 1
+        assert resolve_max_workers(4, 0) == 1
+
+    def test_serial_default(self):
+        assert EXECUTOR_SERIAL in EXECUTOR_MODES
@@ -18,6 +18,7 @@ This test suite permanently locks the invariant:
 """
 
 import hashlib
+import io
 import pytest
 import pydicom
 from pydicom.dataset import Dataset, FileDataset
@@ -29,6 +30,8 @@ from src.pixel_invariant import (
     PixelAction,
     PixelInvariantResult,
     sha256_bytes,
+    sha256_stream,
+    pixel_sha256,
     get_pixel_data_safe,
     decide_pixel_action,
     enforce_pixel_passthrough_invariant,
@@ -181,6 +184,80 @@ class TestSha256Bytes:
         assert hash1 == hash2
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# TEST CLASS: Streaming and memoized hashes
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@pytest.fixture
+def count_hashes(monkeypatch):
+    """Count full hash computations made through sha256_stream."""
+    import src.pixel_invariant as module
+    calls = []
+    real = module.sha256_stream
+    monkeypatch.setattr(module, "sha256_stream", lambda *a, **k: calls.append(1) or real(*a, **k))
+    return calls
+
+
+class TestStreamingHashes:
+    """Tests for sha256_stream and pixel_sha256."""
+    
+    def test_stream_matches_one_shot_across_chunks(self):
+        data = bytes(range(256)) * 41
+        assert sha256_stream(data, chunk_size=1000) == sha256_bytes(data)
+        assert sha256_stream(bytearray(data), chunk_size=7) == sha256_bytes(data)
+    
+    def test_stream_file_object_restores_position(self):
+        fh = io.BytesIO(b"0123456789")
+        fh.seek(4)
+        assert sha256_stream(fh, chunk_size=3) == sha256_bytes(b"0123456789")
+        assert fh.tell() == 4
+    
+    def test_pixel_hash_computed_once(self, minimal_uncompressed_ds, count_hashes):
+        expected = sha256_bytes(minimal_uncompressed_ds.PixelData)
+        assert pixel_sha256(minimal_uncompressed_ds) == expected
+        assert pixel_sha256(minimal_uncompressed_ds) == expected
+        assert len(count_hashes) == 1
+    
+    def test_pixel_hash_invalidated_on_reassignment(self, minimal_uncompressed_ds, count_hashes):
+        before = pixel_sha256(minimal_uncompressed_ds)
+        minimal_uncompressed_ds.PixelData = bytes(len(minimal_uncompressed_ds.PixelData))
+        after = pixel_sha256(minimal_uncompressed_ds)
+        assert after != before
+        assert after == sha256_bytes(minimal_uncompressed_ds.PixelData)
+        assert len(count_hashes) == 2
+    
+    def test_memo_does_not_keep_replaced_pixel_data(self, minimal_uncompressed_ds):
+        import sys
+        old = bytes(minimal_uncompressed_ds.PixelData)
+        minimal_uncompressed_ds.PixelData = old
+        pixel_sha256(minimal_uncompressed_ds)
+        minimal_uncompressed_ds.PixelData = bytes(len(old))
+        assert sys.getrefcount(old) == 2  # Only `old` and the call argument
+    
+    def test_element_value_assignment_drops_memo(self, minimal_uncompressed_ds, count_hashes):
+        before = pixel_sha256(minimal_uncompressed_ds)
+        minimal_uncompressed_ds["PixelData"].value = bytes(len(minimal_uncompressed_ds.PixelData))
+        assert pixel_sha256(minimal_uncompressed_ds) != before
+        assert len(count_hashes) == 2
+    
+    def test_mutable_pixel_data_never_memoized(self, minimal_uncompressed_ds):
+        minimal_uncompressed_ds.PixelData = bytearray(minimal_uncompressed_ds.PixelData)
+        before = pixel_sha256(minimal_uncompressed_ds)
+        minimal_uncompressed_ds.PixelData[0] ^= 0xFF  # In-place change, no reassignment
+        assert pixel_sha256(minimal_uncompressed_ds) != before
+    
+    def test_pixel_hash_none_without_pixel_data(self):
+        assert pixel_sha256(Dataset()) is None
+    
+    def test_invariant_shares_memo(self, minimal_uncompressed_ds, copy_dataset, count_hashes):
+        output_ds = copy_dataset()
+        pixel_sha256(minimal_uncompressed_ds)
+        enforce_pixel_passthrough_invariant(minimal_uncompressed_ds, output_ds, enabled=True, why="test")
+        enforce_pixel_passthrough_invariant(minimal_uncompressed_ds, output_ds, enabled=True, why="test")
+        # Input and output hashed once each, despite two checks
+        assert len(count_hashes) == 2
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # TEST CLASS: get_pixel_data_safe
 # ═══════════════════════════════════════════════════════════════════════════════
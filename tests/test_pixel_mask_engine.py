@@ -0,0 +1,113 @@
+"""
+Unit tests for pixel_mask_engine.py
+
+Tests:
+- combine_regions covers exactly the union of boxes with disjoint rectangles
+- PixelMaskEngine output equals the legacy per-frame eraser/overlay loop
+  for RGB, grayscale and 16-bit stacks
+- Clamping of boxes and overlays at frame edges
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pixel_mask_engine import PixelMaskEngine, clamp_box, combine_regions
+
+
+def _legacy_scrub(frames, masks, overlay, overlay_box, frame_w, frame_h):
+    """Per-frame loop the engine replaces."""
+    for frame in frames:
+        for box in masks:
+            x_start, y_start, x_end, y_end = clamp_box(box, frame_w, frame_h)
+            frame[y_start:y_end, x_start:x_end] = 0
+    if overlay is not None:
+        x_start, y_start, x_end, y_end = clamp_box(overlay_box, frame_w, frame_h)
+        w, h = x_end - x_start, y_end - y_start
+        for frame in frames:
+            frame[y_start:y_start + h, x_start:x_start + w] = overlay[:h, :w]
+
+
+def _coverage(rects, w, h):
+    counts = np.zeros((h, w), dtype=int)
+    for x0, y0, x1, y1 in rects:
+        counts[y0:max(0, y1), x0:max(0, x1)] += 1
+    return counts
+
+
+class TestCombineRegions:
+
+    def test_union_is_covered_exactly_once(self):
+        rng = np.random.default_rng(3)
+        for _ in range(20):
+            boxes = [clamp_box((int(rng.integers(-5, 60)), int(rng.integers(-5, 40)),
+                                int(rng.integers(1, 30)), int(rng.integers(1, 20))), 64, 48)
+                     for _ in range(int(rng.integers(1, 12)))]
+            combined = combine_regions(boxes)
+
+            union = _coverage(boxes, 64, 48) > 0
+            counts = _coverage(combined, 64, 48)
+            assert np.array_equal(counts > 0, union)
+            assert counts.max() <= 1
+
+    def test_contained_and_duplicate_boxes_collapse(self):
+        outer = (0, 0, 50, 20)
+        assert combine_regions([outer, (5, 5, 10, 10), outer]) == [outer]
+
+    def test_empty_boxes_dropped(self):
+        assert combine_regions([(10, 10, 10, 20), (5, 5, 2, 9)]) == []
+
+    def test_box_left_of_frame_erases_nothing(self):
+        frames = np.ones((2, 10, 10), dtype=np.uint8)
+        PixelMaskEngine([(-8, 0, 3, 5)], 10, 10).erase(frames)
+        assert (frames == 1).all()
+
+
+@pytest.mark.parametrize(
+    "shape,dtype",
+    [
+        ((6, 40, 50, 3), np.uint8),
+        ((6, 40, 50), np.uint16),
+        ((1, 40, 50, 4), np.uint8),
+    ],
+)
+def test_engine_matches_per_frame_loop(shape, dtype):
+    rng = np.random.default_rng(0)
+    frames = rng.integers(1, 4000 if dtype == np.uint16 else 255, size=shape).astype(dtype)
+    masks = [(2, 3, 10, 5), (5, 4, 30, 8), (-3, 30, 20, 20), (45, -2, 10, 10)]
+    overlay = None
+    if len(shape) == 4:
+        overlay = np.full((5, 10, shape[3]), 200, dtype=np.uint8)
+
+    expected = frames.copy()
+    _legacy_scrub(expected, masks, overlay, masks[0], 50, 40)
+
+    engine = PixelMaskEngine(masks, 50, 40, overlay=overlay, overlay_box=masks[0])
+    engine.apply(frames)
+
+    assert np.array_equal(frames, expected)
+
+
+def test_overlay_clipped_at_frame_edge():
+    frames = np.ones((3, 20, 30, 3), dtype=np.uint8)
+    overlay = np.full((10, 20, 3), 9, dtype=np.uint8)
+    engine = PixelMaskEngine([], 30, 20, overlay=overlay, overlay_box=(20, 15, 20, 10))
+
+    engine.stamp(frames)
+
+    assert (frames[:, 15:, 20:] == 9).all()
+    assert (frames[:, :15] == 1).all()
+    assert engine.regions == []
+
+
+def test_overlay_outside_frame_is_ignored():
+    frames = np.ones((2, 10, 10, 3), dtype=np.uint8)
+    engine = PixelMaskEngine([], 10, 10, overlay=np.zeros((5, 5, 3), np.uint8), overlay_box=(12, 0, 5, 5))
+
+    engine.apply(frames)
+
+    assert (frames == 1).all()
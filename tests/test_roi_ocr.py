@@ -0,0 +1,113 @@
+"""
+Unit tests for ROI (header/footer band) OCR in detect_text_box_from_array
+
+Tests:
+- _roi_bands geometry per modality, merged bands on short frames
+- Band boxes mapped back to frame coordinates
+- Confident band detections skip the full-frame pass
+- Low confidence, no text or OCR failure fall back to full-frame OCR
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from run_on_dicom import ROI_MIN_CONFIDENCE, _roi_bands, detect_text_box_from_array
+
+
+class BandEngine:
+    """
+    OCR stand-in that reports one text box at a fixed OCR-image position
+    for every image taller than min_height; records image heights.
+    """
+
+    def __init__(self, box=(20, 10, 100, 30), score=0.95, min_height=0, fail=False):
+        self.box = box
+        self.score = score
+        self.min_height = min_height
+        self.fail = fail
+        self.heights = []
+
+    def _result(self, image):
+        self.heights.append(image.shape[0])
+        if image.shape[0] < self.min_height:
+            return {"det_boxes": [], "det_scores": []}
+        x0, y0, x1, y1 = self.box
+        return {"det_boxes": [[[x0, y0], [x1, y0], [x1, y1], [x0, y1]]], "det_scores": [self.score]}
+
+    def predict(self, images):
+        if self.fail:
+            raise RuntimeError("engine crashed")
+        if isinstance(images, list):
+            return [self._result(image) for image in images]
+        return [self._result(images)]
+
+
+class Corrector:
+    def __init__(self, engine):
+        self.ocr = engine
+
+    @staticmethod
+    def _boxes_overlap(a, b, tolerance=20):
+        return abs(a[0] - b[0]) <= tolerance and abs(a[1] - b[1]) <= tolerance
+
+
+@pytest.fixture
+def frames():
+    return np.zeros((4, 600, 800, 3), dtype=np.uint8)
+
+
+class TestRoiBands:
+
+    def test_us_bands(self):
+        assert _roi_bands(600, "US") == [(0, 96), (504, 600)]
+
+    def test_default_bands(self):
+        assert _roi_bands(600) == [(0, 114), (486, 600)]
+
+    def test_overlapping_bands_merge(self, monkeypatch):
+        import run_on_dicom
+        monkeypatch.setattr(run_on_dicom, "ROI_BAND_MARGIN", 0.4)
+        assert _roi_bands(600, "US") == [(0, 600)]
+
+    def test_bands_cut_ocr_pixels(self):
+        bands = _roi_bands(600, "US")
+        assert sum(y1 - y0 for y0, y1 in bands) / 600 <= 0.4
+
+
+class TestRoiDetection:
+
+    def test_confident_bands_skip_full_frame(self, frames):
+        engine = BandEngine()
+        result = detect_text_box_from_array(Corrector(engine), frames, roi=True, modality="US")
+
+        assert set(engine.heights) == {2 * 96}  # Band-sized images only
+        assert len(engine.heights) == 2 * len(frames)
+        assert result.static_box == (10, 5, 40, 10)
+        # Footer band box shifted back into frame coordinates
+        assert (10, 504 + 5, 40, 10) in result.all_detected_boxes
+        assert result.detection_strength == "HIGH"
+
+    def test_matches_full_frame_detection(self, frames):
+        roi = detect_text_box_from_array(Corrector(BandEngine()), frames, roi=True, modality="US")
+        full = detect_text_box_from_array(Corrector(BandEngine()), frames)
+        assert roi.static_box == full.static_box
+
+    @pytest.mark.parametrize("engine", [
+        BandEngine(score=ROI_MIN_CONFIDENCE - 0.1),
+        BandEngine(min_height=2 * 600),  # Text only visible to full-frame OCR
+    ])
+    def test_not_confident_falls_back(self, frames, engine):
+        result = detect_text_box_from_array(Corrector(engine), frames, roi=True, modality="US")
+
+        assert engine.heights[-len(frames):] == [2 * 600] * len(frames)
+        assert result.all_detected_boxes
+
+    def test_ocr_failure_falls_back_and_is_reported(self, frames):
+        result = detect_text_box_from_array(Corrector(BandEngine(fail=True)), frames, roi=True)
+        assert result.ocr_failure is True
+        assert result.detection_strength is None
@@ -0,0 +1,148 @@
+"""
+Tests for the frame-chunked streaming pixel scrub in run_on_dicom.py
+
+Tests:
+- _StreamedFrames decodes the same frames, max, source hash and
+  fingerprint grids as the in-memory source (native and RLE-compressed input)
+- _SpoolFrameSink hashes the pixel bytes and pads to even length
+- process_dicom with a CHUNKED plan writes byte-identical output and
+  evidence hashes to the whole-clip path
+"""
+
+import os
+import sys
+
+import numpy as np
+import pydicom
+import pytest
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.uid import ExplicitVRLittleEndian, RLELossless, generate_uid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import run_on_dicom
+from memory_scheduler import PLAN_CHUNKED, MemoryAdmission
+from pixel_invariant import sha256_bytes
+
+pytestmark = pytest.mark.skipif(
+    not run_on_dicom.PIXEL_STREAMING_AVAILABLE,
+    reason="streaming decode requires pydicom >= 3",
+)
+
+
+def _write_dicom(path, modality="US", frames=5, dtype=np.uint8, samples=3, rle=False):
+    ds = Dataset()
+    ds.file_meta = FileMetaDataset()
+    ds.file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds.SOPClassUID = ds.file_meta.MediaStorageSOPClassUID = "1.2.840.10008.5.1.4.1.1.6.1"
+    ds.SOPInstanceUID = ds.file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    ds.StudyInstanceUID = generate_uid()
+    ds.SeriesInstanceUID = generate_uid()
+    ds.Modality = modality
+    ds.PatientName = "DOE^JANE"
+    ds.PatientID = "12345"
+    ds.Rows, ds.Columns = 24, 32
+    ds.SamplesPerPixel = samples
+    ds.PhotometricInterpretation = "RGB" if samples == 3 else "MONOCHROME2"
+    if samples == 3:
+        ds.PlanarConfiguration = 0
+    bits = np.dtype(dtype).itemsize * 8
+    ds.BitsAllocated, ds.BitsStored, ds.HighBit = bits, bits, bits - 1
+    ds.PixelRepresentation = 0
+    ds.NumberOfFrames = frames
+    shape = (frames, 24, 32) + ((3,) if samples == 3 else ())
+    arr = np.random.default_rng(7).integers(0, 4000 if bits == 16 else 255, size=shape).astype(dtype)
+    ds.PixelData = arr.tobytes()
+    if rle:
+        ds.compress(RLELossless, arr)
+    ds.save_as(path, enforce_file_format=True)
+    return arr
+
+
+class RecordingBundle:
+    """Minimal EvidenceBundle stand-in that records calls."""
+
+    def __init__(self):
+        self.calls = {}
+        self.detection_results = []
+
+    def __getattr__(self, name):
+        def record(**kwargs):
+            self.calls.setdefault(name, []).append(kwargs)
+        return record
+
+
+@pytest.mark.parametrize("rle", [False, True])
+def test_streamed_source_matches_in_memory(tmp_path, rle):
+    path = str(tmp_path / "cine.dcm")
+    _write_dicom(path, frames=7, dtype=np.uint8, rle=rle)
+
+    ds_stream = pydicom.dcmread(path, defer_size=run_on_dicom.DEFERRED_READ_SIZE)
+    streamed = run_on_dicom._StreamedFrames(path, ds_stream)
+    ds_full = pydicom.dcmread(path)
+    if rle:
+        ds_full.decompress()
+    in_memory = run_on_dicom._InMemoryFrames(ds_full)
+
+    assert streamed.shape == in_memory.shape == (7, 24, 32, 3)
+    assert streamed.max_value() == in_memory.max_value()
+    assert streamed.source_hash() == in_memory.source_hash()
+    assert np.allclose(streamed.frame_grids(), in_memory.frame_grids())
+    assert np.array_equal(streamed.take([0, 6]), in_memory.take([0, 6]))
+
+    chunks = list(streamed.chunks(3))
+    assert [(start, stop) for start, stop, _ in chunks] == [(0, 3), (3, 6), (6, 7)]
+    assert np.array_equal(np.concatenate([c for _, _, c in chunks]), in_memory.take(list(range(7))))
+
+
+def test_spool_sink_hashes_and_pads(tmp_path):
+    sink = run_on_dicom._SpoolFrameSink(str(tmp_path))
+    chunk = np.arange(27, dtype=np.uint8).reshape(1, 3, 3, 3)
+    sink.write(0, 1, chunk)
+
+    buffer = sink.finish()
+    data = buffer.read()
+    sink.close()
+
+    assert sink.nbytes == 27
+    assert data == chunk.tobytes() + b"\x00"
+    assert sink.sha256 == sha256_bytes(chunk.tobytes())
+
+
+@pytest.mark.parametrize(
+    "modality,dtype,samples,rle",
+    [
+        ("US", np.uint8, 3, False),
+        ("US", np.uint8, 1, True),
+        ("CT", np.uint16, 1, False),
+    ],
+)
+def test_chunked_process_dicom_matches_whole_clip(tmp_path, modality, dtype, samples, rle):
+    path = str(tmp_path / "in.dcm")
+    _write_dicom(path, modality=modality, frames=5, dtype=dtype, samples=samples, rle=rle)
+    chunked = MemoryAdmission(
+        plan=PLAN_CHUNKED, estimated_bytes=1, reserved_bytes=1, num_frames=5, frames_per_chunk=2
+    )
+
+    outputs = []
+    bundles = []
+    for admission in (None, chunked):
+        out = str(tmp_path / f"out_{len(outputs)}.dcm")
+        bundle = RecordingBundle()
+        np.random.seed(0)  # Overlay texture is randomised
+        run_on_dicom.process_dicom(
+            path, out, "DOE", "NEW NAME",
+            manual_box=(2, 2, 12, 6),
+            evidence_bundle=bundle,
+            memory_admission=admission,
+        )
+        outputs.append(pydicom.dcmread(out))
+        bundles.append(bundle)
+
+    whole, streamed = outputs
+    assert streamed.PixelData == whole.PixelData
+    assert streamed.NumberOfFrames == whole.NumberOfFrames == 5
+    assert streamed.file_meta.TransferSyntaxUID == ExplicitVRLittleEndian
+    for key in ("add_source_hash", "add_masked_hash"):
+        assert bundles[0].calls[key][0]["pixel_hash"] == bundles[1].calls[key][0]["pixel_hash"]
+    assert [e["exception_type"] for e in bundles[1].calls["add_exception"]] == ["PIXEL_PROCESSING_CHUNKED"]
@@ -59,6 +59,13 @@ from src.voxelmask_core import (
     generate_export_folder_name,
     sanitize_filename,
     generate_repair_filename,
+    build_zip_bundle,
+    StreamingZipBundle,
+    CompressionPolicy,
+    resolve_zip_compression,
+    resolve_zip_level,
+    ParallelZipWriter,
+    resolve_zip_workers,
 )
 
 
@@ -465,6 +472,249 @@ class TestGenerateExportFolderName:
         assert 'VoxelMask_FOI_Legal_20240101_120000' == name
 
 
+class TestStreamingZipBundle:
+    """Tests for StreamingZipBundle (on-disk ZIP built entry by entry)."""
+    
+    def test_entries_written_as_added(self, tmp_path):
+        """Files are appended under the root folder and counted."""
+        import zipfile
+        src = tmp_path / "a.dcm"
+        src.write_bytes(b"DICM" * 100)
+        
+        bundle = StreamingZipBundle(tmp_path / "out" / "run.zip", "run")
+        bundle.add_file(src, "Study/S001/IMG_0001.dcm")
+        bundle.add_bytes("README.txt", "hello")
+        result = bundle.close()
+        
+        assert result.success and result.file_count == 1 and result.total_bytes == 400
+        with zipfile.ZipFile(result.zip_path) as zf:
+            assert zf.namelist() == ["run/Study/S001/IMG_0001.dcm", "run/README.txt"]
+            assert zf.read("run/Study/S001/IMG_0001.dcm") == src.read_bytes()
+    
+    def test_failed_export_discarded(self, tmp_path):
+        """An exception inside the context removes the partial ZIP."""
+        zip_path = tmp_path / "run.zip"
+        with pytest.raises(RuntimeError):
+            with StreamingZipBundle(zip_path, "run") as bundle:
+                bundle.add_bytes("README.txt", "partial")
+                raise RuntimeError("export failed")
+        assert bundle.closed and not zip_path.exists()
+    
+    def test_build_zip_bundle_uses_output_paths(self, tmp_path):
+        """build_zip_bundle copies processed files from disk."""
+        import zipfile
+        src = tmp_path / "x.dcm"
+        src.write_bytes(b"data")
+        result = build_zip_bundle(
+            [{'output_path': str(src), 'filename': 'x.dcm'}],
+            tmp_path, "export", audit_logs=["one", "two"],
+        )
+        assert result.success and result.file_count == 1
+        with zipfile.ZipFile(result.zip_path) as zf:
+            assert zf.read("export/DICOM/x.dcm") == b"data"
+            assert zf.read("export/audit_log.txt") == b"one\n\ntwo"
+
+
+def _write_dicom(path, transfer_syntax):
+    """Minimal Part 10 file (no pixel data) declaring a transfer syntax."""
+    from pydicom.dataset import Dataset, FileMetaDataset
+    ds = Dataset()
+    ds.file_meta = FileMetaDataset()
+    ds.file_meta.TransferSyntaxUID = transfer_syntax
+    ds.file_meta.MediaStorageSOPClassUID = ds.SOPClassUID = "1.2.840.10008.5.1.4.1.1.6.1"
+    ds.file_meta.MediaStorageSOPInstanceUID = ds.SOPInstanceUID = "1.2.3.4"
+    ds.PatientComments = "A" * 4096
+    ds.save_as(str(path), enforce_file_format=True)
+    return path
+
+
+class TestCompressionPolicy:
+    """Tests for adaptive ZIP member compression."""
+    
+    def test_compressed_transfer_syntax_stored(self, tmp_path):
+        """JPEG-encapsulated DICOMs are stored, uncompressed ones deflated."""
+        import zipfile
+        from pydicom.uid import ExplicitVRLittleEndian, JPEGBaseline8Bit
+        policy = CompressionPolicy()
+        jpeg = _write_dicom(tmp_path / "jpeg.dcm", JPEGBaseline8Bit)
+        raw = _write_dicom(tmp_path / "raw.dcm", ExplicitVRLittleEndian)
+        assert policy.choose("jpeg.dcm", path=jpeg) == (zipfile.ZIP_STORED, "compressed_transfer_syntax")
+        assert policy.choose("raw.dcm", path=raw) == (zipfile.ZIP_DEFLATED, "compressible")
+    
+    def test_compressed_formats_and_samples_stored(self, tmp_path):
+        """.nii.gz is stored by name; random bytes fail the sampled test."""
+        import os
+        import zipfile
+        policy = CompressionPolicy()
+        noise = tmp_path / "noise.bin"
+        noise.write_bytes(os.urandom(1 << 20))
+        assert policy.choose("brain.nii.gz", data=b"\0" * 1000)[0] == zipfile.ZIP_STORED
+        assert policy.choose("noise.bin", path=noise) == (zipfile.ZIP_STORED, "incompressible_sample")
+        assert policy.choose("README.txt", data="text " * 200)[0] == zipfile.ZIP_DEFLATED
+    
+    def test_fixed_modes(self):
+        """store/deflate modes apply to every member."""
+        import zipfile
+        assert CompressionPolicy(mode="store").choose("a.txt", data="x" * 1000)[0] == zipfile.ZIP_STORED
+        assert CompressionPolicy(mode="deflate").choose("a.gz", data=b"x")[0] == zipfile.ZIP_DEFLATED
+    
+    def test_env_resolution(self, monkeypatch):
+        """Mode and level: argument > environment > default."""
+        monkeypatch.setenv("VOXELMASK_ZIP_COMPRESSION", "STORE")
+        monkeypatch.setenv("VOXELMASK_ZIP_LEVEL", "12")
+        assert resolve_zip_compression() == "store"
+        assert resolve_zip_compression("bogus") == "adaptive"
+        assert resolve_zip_level() == 6
+        assert resolve_zip_level(1) == 1
+    
+    def test_summary_reports_member_ratios(self, tmp_path):
+        """Stored members keep ratio 1, deflated ones shrink."""
+        import os
+        noise = tmp_path / "noise.bin"
+        noise.write_bytes(os.urandom(100_000))
+        with StreamingZipBundle(tmp_path / "out.zip", "run", CompressionPolicy()) as bundle:
+            bundle.add_file(noise, "noise.bin")
+            bundle.add_bytes("README.txt", "VoxelMask " * 1000)
+        summary = bundle.close().compression
+        
+        assert summary['stored'] == 1 and summary['deflated'] == 1
+        members = {m['name']: m for m in summary['members']}
+        assert members['noise.bin']['ratio'] == 1.0
+        assert members['README.txt']['ratio'] < 0.05
+        assert summary['compressed_bytes'] < summary['bytes']
+
+
+def _assert_valid_zip(zip_path):
+    """CRCs check out in zipfile and, where installed, in unzip."""
+    import shutil
+    import subprocess
+    import zipfile
+    with zipfile.ZipFile(zip_path) as zf:
+        assert zf.testzip() is None
+    if shutil.which("unzip"):
+        subprocess.run(["unzip", "-tq", str(zip_path)], check=True, capture_output=True)
+
+
+class TestParallelZipWriter:
+    """Tests for the thread-pool ZIP writer."""
+    
+    def test_round_trip(self, tmp_path):
+        """Multi-chunk, empty, stored and non-ASCII members read back intact."""
+        import os
+        import zipfile
+        data = os.urandom(100_000) * 3 + b"VoxelMask " * 50_000
+        big = tmp_path / "big.bin"
+        big.write_bytes(data)
+        empty = tmp_path / "empty.bin"
+        empty.write_bytes(b"")
+        
+        with ParallelZipWriter(tmp_path / "out.zip", workers=4, chunk_bytes=64 * 1024) as writer:
+            writer.add_file(big, "run/big.bin")
+            writer.add_file(empty, "run/empty.bin")
+            writer.add_bytes("run/stored.txt", "x" * 1000, method=zipfile.ZIP_STORED)
+            writer.add_bytes("run/Ünïcode.txt", "text")
+        
+        _assert_valid_zip(tmp_path / "out.zip")
+        with zipfile.ZipFile(tmp_path / "out.zip") as zf:
+            assert zf.namelist() == ["run/big.bin", "run/empty.bin", "run/stored.txt", "run/Ünïcode.txt"]
+            assert zf.read("run/big.bin") == data
+            assert zf.getinfo("run/big.bin").compress_size < len(data) * 0.8  # Dictionary carried across chunks
+            assert zf.getinfo("run/stored.txt").compress_type == zipfile.ZIP_STORED
+            assert [i.filename for i in writer.infolist] == zf.namelist()
+    
+    def test_zip64_records(self, tmp_path, monkeypatch):
+        """Past the Zip64 limits, sizes, offsets and the entry count move to Zip64 records."""
+        import os
+        import zipfile
+        import src.voxelmask_core.parallel_zip as parallel_zip
+        monkeypatch.setattr(parallel_zip, "ZIP64_LIMIT", 1000)
+        monkeypatch.setattr(parallel_zip, "ZIP_FILECOUNT_LIMIT", 3)
+        src = tmp_path / "a.bin"
+        src.write_bytes(os.urandom(5000))
+        
+        with ParallelZipWriter(tmp_path / "out.zip", workers=2) as writer:
+            for i in range(5):
+                writer.add_file(src, f"{i}.bin")
+        
+        _assert_valid_zip(tmp_path / "out.zip")
+        with zipfile.ZipFile(tmp_path / "out.zip") as zf:
+            assert len(zf.infolist()) == 5
+            assert zf.read("4.bin") == src.read_bytes()
+    
+    def test_compression_error_raised_on_close(self, tmp_path, monkeypatch):
+        """A failed chunk surfaces from close(); the bundle deletes its archive."""
+        import src.voxelmask_core.parallel_zip as parallel_zip
+        
+        def fail(*args):
+            raise OSError("deflate failed")
+        
+        monkeypatch.setattr(parallel_zip, "_compress_chunk", fail)
+        zip_path = tmp_path / "run.zip"
+        with pytest.raises(OSError, match="deflate failed"):
+            with StreamingZipBundle(zip_path, "run", CompressionPolicy(mode="deflate"), workers=2) as bundle:
+                bundle.add_bytes("README.txt", "hello")
+                bundle.close()
+        assert not zip_path.exists()
+    
+    def test_unreadable_input_raised_by_add(self, tmp_path):
+        """A missing input fails add_file() and leaves the writer closable."""
+        writer = ParallelZipWriter(tmp_path / "out.zip", workers=2)
+        with pytest.raises(OSError):
+            writer.add_file(tmp_path / "missing.dcm", "missing.dcm")
+        writer.add_bytes("ok.txt", "ok")
+        writer.close()
+        _assert_valid_zip(tmp_path / "out.zip")
+    
+    def test_bundle_matches_serial_zipfile(self, tmp_path):
+        """Same members, contents and methods with workers=1 (zipfile) and workers=4."""
+        import os
+        import zipfile
+        noise = tmp_path / "noise.bin"
+        noise.write_bytes(os.urandom(300_000))
+        text = tmp_path / "a.dcm"
+        text.write_bytes(b"DICM" * 200_000)
+        
+        summaries = {}
+        for workers in (1, 4):
+            with StreamingZipBundle(tmp_path / f"w{workers}.zip", "run", CompressionPolicy(), workers) as bundle:
+                bundle.add_file(noise, "noise.bin")
+                bundle.add_file(text, "S001/IMG_0001.dcm")
+                bundle.add_bytes("README.txt", "VoxelMask " * 1000)
+            result = bundle.close()
+            assert bundle.parallel == (workers > 1)
+            summaries[workers] = result.compression
+            _assert_valid_zip(result.zip_path)
+        
+        serial, parallel = summaries[1], summaries[4]
+        assert parallel['workers'] == 4
+        assert [(m['name'], m['method'], m['bytes']) for m in parallel['members']] == \
+            [(m['name'], m['method'], m['bytes']) for m in serial['members']]
+        assert parallel['compressed_bytes'] <= serial['compressed_bytes'] * 1.01
+        with zipfile.ZipFile(tmp_path / "w1.zip") as a, zipfile.ZipFile(tmp_path / "w4.zip") as b:
+            for name in a.namelist():
+                assert a.read(name) == b.read(name)
+    
+    def test_build_zip_bundle_workers(self, tmp_path):
+        """build_zip_bundle passes the worker count through."""
+        src = tmp_path / "x.dcm"
+        src.write_bytes(b"data" * 1000)
+        result = build_zip_bundle(
+            [{'output_path': str(src), 'filename': 'x.dcm'}], tmp_path, "export", workers=3,
+        )
+        assert result.success and result.compression['workers'] == 3
+        _assert_valid_zip(result.zip_path)
+    
+    def test_workers_resolution(self, monkeypatch):
+        """Workers: argument > environment > CPU count (at most 8)."""
+        monkeypatch.setenv("VOXELMASK_ZIP_WORKERS", "3")
+        assert resolve_zip_workers() == 3
+        assert resolve_zip_workers(1) == 1
+        monkeypatch.setenv("VOXELMASK_ZIP_WORKERS", "many")
+        assert 1 <= resolve_zip_workers() <= 8
+        monkeypatch.setenv("VOXELMASK_ZIP_WORKERS", "0")
+        assert resolve_zip_workers() == 1
+
+
 class TestSanitizeFilename:
     """Tests for sanitize_filename function."""
     
@@ -607,3 +857,15 @@ class TestNoStreamlitImports:
         import src.voxelmask_core.pipeline as pipeline_module
         source = Path(pipeline_module.__file__).read_text()
         assert 'import streamlit' not in source
+    
+    def test_no_streamlit_in_hashing(self):
+        """hashing.py has no streamlit imports."""
+        import src.voxelmask_core.hashing as hashing_module
+        source = Path(hashing_module.__file__).read_text()
+        assert 'import streamlit' not in source
+    
+    def test_no_streamlit_in_parallel_zip(self):
+        """parallel_zip.py has no streamlit imports."""
+        import src.voxelmask_core.parallel_zip as parallel_zip_module
+        source = Path(parallel_zip_module.__file__).read_text()
+        assert 'import streamlit' not in source
@@ -0,0 +1,194 @@
+"""
+Unit tests for zip_ingest.py (streaming ZIP ingest)
+
+Tests:
+- Only DICOM members (by name filter and DICM magic) become handles
+- Scanning reads headers only, not member bodies
+- Handles are seekable, readable by pydicom and copy/hash/materialize
+  without extraction
+"""
+
+import hashlib
+import io
+import os
+import sys
+import zipfile
+
+import pydicom
+import pytest
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from zip_ingest import (
+    ZipIngest,
+    ZipMemberBuffer,
+    buffer_sha256,
+    copy_buffer,
+    has_dicom_magic,
+    is_candidate_name,
+    materialize_buffer,
+)
+
+
+def _dicom_bytes(payload_size=64):
+    ds = Dataset()
+    ds.file_meta = FileMetaDataset()
+    ds.file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds.SOPClassUID = ds.file_meta.MediaStorageSOPClassUID = "1.2.840.10008.5.1.4.1.1.7"
+    ds.SOPInstanceUID = ds.file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    ds.PatientName = "DOE^JANE"
+    ds.Modality = "OT"
+    ds.add_new(0x00091010, "OB", os.urandom(payload_size))  # Bulk payload
+    buf = io.BytesIO()
+    ds.save_as(buf, enforce_file_format=True)
+    return buf.getvalue()
+
+
+class CountingReader(io.BytesIO):
+    """BytesIO that counts the bytes read from it."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+@pytest.fixture
+def archive_bytes():
+    members = {
+        "study/series1/IM0001": _dicom_bytes(),
+        "study/series1/IM0002.dcm": _dicom_bytes(),
+        "study/not_dicom.dcm": b"\0" * 200,
+        "study/index.html": b"<html></html>",
+        "__MACOSX/study/._IM0001": _dicom_bytes(),
+        "study/.hidden": _dicom_bytes(),
+        "short": b"DICM",
+    }
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("study/", b"")
+        for name, data in members.items():
+            compress = zipfile.ZIP_STORED if name.endswith(".dcm") else zipfile.ZIP_DEFLATED
+            zf.writestr(name, data, compress_type=compress)
+    return buf.getvalue(), members
+
+
+def test_candidate_names():
+    assert is_candidate_name("a/b/IM0001")
+    assert not is_candidate_name("a/.DS_Store")
+    assert not is_candidate_name("__MACOSX/a/._IM0001")
+    assert not is_candidate_name("a/report.PDF")
+    assert not is_candidate_name("a/")
+
+
+def test_magic():
+    assert has_dicom_magic(b"\0" * 128 + b"DICM")
+    assert not has_dicom_magic(b"DICM")
+    assert not has_dicom_magic(b"\0" * 132)
+
+
+def test_scan_finds_dicom_members(archive_bytes):
+    data, members = archive_bytes
+    ingest = ZipIngest(io.BytesIO(data))
+
+    assert [m.arcname for m in ingest.members] == ["study/series1/IM0001", "study/series1/IM0002.dcm"]
+    assert [m.name for m in ingest.members] == ["IM0001", "IM0002.dcm"]
+    assert ingest.skipped == 2  # not_dicom.dcm and the 4-byte member
+    assert ingest.unreadable == 0
+    for member in ingest.members:
+        assert member.size == len(members[member.arcname])
+        assert member.getbuffer() == members[member.arcname]
+
+
+def test_scan_reads_headers_only():
+    body = _dicom_bytes(payload_size=4 * 1024 * 1024)
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("IM0001", body, compress_type=zipfile.ZIP_STORED)
+        zf.writestr("IM0002", body, compress_type=zipfile.ZIP_DEFLATED)
+    source = CountingReader(buf.getvalue())
+
+    ingest = ZipIngest(source)
+
+    assert len(ingest.members) == 2
+    assert source.bytes_read < 64 * 1024
+
+
+def test_member_handle_is_seekable_and_readable_by_pydicom(archive_bytes):
+    data, _ = archive_bytes
+    member = ZipIngest(io.BytesIO(data)).members[0]
+
+    with member.open() as fh:
+        assert fh.seekable()
+        fh.seek(128)
+        assert fh.read(4) == b"DICM"
+        fh.seek(0)
+        ds = pydicom.dcmread(fh, stop_before_pixels=True)
+    assert str(ds.PatientName) == "DOE^JANE"
+
+
+def test_copy_hash_and_materialize(archive_bytes, tmp_path):
+    data, members = archive_bytes
+    member = ZipIngest(io.BytesIO(data)).members[1]
+    expected = members[member.arcname]
+
+    out = io.BytesIO()
+    copy_buffer(member, out)
+    assert out.getvalue() == expected
+    assert buffer_sha256(member) == hashlib.sha256(expected).hexdigest()
+
+    path = materialize_buffer(member, tmp_path)
+    assert os.path.dirname(path) == str(tmp_path)
+    assert path.endswith(".dcm")
+    with open(path, "rb") as fh:
+        assert fh.read() == expected
+
+
+def test_plain_buffers_share_the_helpers(tmp_path):
+    upload = io.BytesIO(b"\0" * 128 + b"DICM" + b"rest")
+    upload.name = "upload.dcm"
+
+    path = materialize_buffer(upload, tmp_path)
+    with open(path, "rb") as fh:
+        assert fh.read() == upload.getvalue()
+    assert buffer_sha256(upload) == hashlib.sha256(upload.getvalue()).hexdigest()
+
+
+def test_materialize_failure_leaves_no_file(tmp_path):
+    class Broken:
+        name = "broken.dcm"
+
+        def getbuffer(self):
+            raise OSError("gone")
+
+    with pytest.raises(OSError):
+        materialize_buffer(Broken(), tmp_path)
+    assert os.listdir(tmp_path) == []
+
+
+def test_not_a_zip():
+    with pytest.raises(zipfile.BadZipFile):
+        ZipIngest(io.BytesIO(b"not a zip"))
+
+
+def test_unreadable_member_counted(archive_bytes, monkeypatch):
+    data, _ = archive_bytes
+    real_open = zipfile.ZipFile.open
+
+    def encrypted(self, name, *args, **kwargs):
+        arcname = name.filename if isinstance(name, zipfile.ZipInfo) else name
+        if arcname.endswith("IM0001"):
+            raise RuntimeError("File is encrypted, password required for extraction")
+        return real_open(self, name, *args, **kwargs)
+
+    monkeypatch.setattr(zipfile.ZipFile, "open", encrypted)
+    ingest = ZipIngest(io.BytesIO(data))
+    assert ingest.unreadable == 1
+    assert [m.name for m in ingest.members] == ["IM0002.dcm"]
+    assert isinstance(ingest.members[0], ZipMemberBuffer)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark: whole-file reads vs streaming multi-algorithm hashing
+================================================================
+
+Compares the legacy hashlib.sha256(f.read()) with voxelmask_core.hashing
+on files of 10 MB to 2 GB: buffered block reads, mmap, and SHA-256 plus
+BLAKE2b in one pass versus two separate passes. Peak Python allocation
+(tracemalloc) is reported next to wall time, since the legacy read holds
+the whole file in memory. Digests are asserted equal before timings are
+reported.
+
+Files are written to a temp directory (or --dir) and removed afterwards;
+the page cache is warm after the first run, so timings measure hashing
+rather than disk.
+
+Usage:
+    python tools/bench_file_hashing.py
+    python tools/bench_file_hashing.py --sizes 10M,100M,1G,2G --block-size 4M
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '../src'))
+
+from voxelmask_core.hashing import DEDUPE_ALGORITHMS, hash_file  # noqa: E402
+
+_UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def _parse_size(text):
+    text = text.strip().upper()
+    if text and text[-1] in _UNITS:
+        return int(float(text[:-1]) * _UNITS[text[-1]])
+    return int(text)
+
+
+def _write_file(path, size):
+    block = os.urandom(1024 * 1024)
+    with open(path, "wb") as fh:
+        remaining = size
+        while remaining:
+            n = min(remaining, len(block))
+            fh.write(block[:n])
+            remaining -= n
+
+
+def legacy_sha256(path):
+    """What audit.calculate_file_hash used to do."""
+    with open(path, "rb") as f:
+        return {"sha256": hashlib.sha256(f.read()).hexdigest()}
+
+
+def _measure(fn, repeat):
+    best = float("inf")
+    peak = 0
+    result = None
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return best, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming file hashing")
+    parser.add_argument("--sizes", default="10M,100M,1G",
+                        help="Comma-separated file sizes (K/M/G suffixes), e.g. 10M,100M,1G,2G")
+    parser.add_argument("--block-size", default="1M")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--legacy-max", default="1G",
+                        help="Skip the whole-file read above this size")
+    parser.add_argument("--dir", default=None, help="Directory for the test files")
+    args = parser.parse_args()
+
+    block_size = _parse_size(args.block_size)
+    legacy_max = _parse_size(args.legacy_max)
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        for size_text in args.sizes.split(","):
+            size = _parse_size(size_text)
+            path = os.path.join(tmp, f"bench_{size}.bin")
+            _write_file(path, size)
+
+            cases = []
+            if size <= legacy_max:
+                cases.append(("read-all sha256", lambda: legacy_sha256(path)))
+            cases += [
+                ("stream sha256", lambda: hash_file(path, ("sha256",), block_size)),
+                ("mmap sha256", lambda: hash_file(path, ("sha256",), block_size, use_mmap=True)),
+                ("2 passes sha256+b2b", lambda: {
+                    **hash_file(path, ("sha256",), block_size),
+                    **hash_file(path, ("blake2b",), block_size),
+                }),
+                ("1 pass sha256+b2b", lambda: hash_file(path, DEDUPE_ALGORITHMS, block_size)),
+            ]
+
+            print(f"size={size_text.strip()} block={args.block_size} (best of {args.repeat})")
+            reference = None
+            for label, fn in cases:
+                seconds, peak, digests = _measure(fn, args.repeat)
+                if reference is None:
+                    reference = digests["sha256"]
+                assert digests["sha256"] == reference, f"{label}: digest differs"
+                rate = size / seconds / (1024 ** 2)
+                print(f"  {label:22s}: {seconds * 1000:9.1f} ms  {rate:8.1f} MiB/s  "
+                      f"peak {peak / (1024 ** 2):8.2f} MiB")
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark: full header parse vs tag-targeted header reads
+=========================================================
+
+Compares pydicom.dcmread(stop_before_pixels=True) with the tag-targeted
+reader in voxelmask_core.header_index on synthetic files shaped like the
+slow cases seen in practice:
+
+- plain:    small image header, no extras
+- private:  vendor private block of undefined-length sequences after the
+            image module (megabytes of nested items)
+- private-ob: one large defined-length private OB value
+- sr:       Comprehensive SR with a deep, wide ContentSequence
+
+For each file two pairs are timed: the dcmread() that classification
+used to do against the CLASSIFY_TAGS read, and a HeaderRecord built from
+a full parse against one from the HEADER_RECORD_TAGS read. The targeted
+record is asserted equal to the full-parse one.
+
+Usage:
+    python tools/bench_header_reads.py
+    python tools/bench_header_reads.py --private-mb 16 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pydicom
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.sequence import Sequence
+from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '../src'))
+
+from voxelmask_core.header_index import CLASSIFY_TAGS, read_header_record  # noqa: E402
+
+US_IMAGE_STORAGE = "1.2.840.10008.5.1.4.1.1.6.1"
+COMPREHENSIVE_SR_STORAGE = "1.2.840.10008.5.1.4.1.1.88.33"
+
+
+def _base(sop_class, modality):
+    ds = Dataset()
+    ds.file_meta = FileMetaDataset()
+    ds.file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds.SOPClassUID = ds.file_meta.MediaStorageSOPClassUID = sop_class
+    ds.SOPInstanceUID = ds.file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    ds.SeriesInstanceUID = generate_uid()
+    ds.Modality = modality
+    ds.SeriesNumber = 1
+    ds.InstanceNumber = 1
+    return ds
+
+
+def _image(ds):
+    ds.Rows, ds.Columns = 64, 64
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.BitsAllocated = ds.BitsStored = 8
+    ds.HighBit = 7
+    ds.PixelRepresentation = 0
+    ds.PixelData = np.zeros((64, 64), dtype=np.uint8).tobytes()
+    return ds
+
+
+def make_plain():
+    return _image(_base(US_IMAGE_STORAGE, "US"))
+
+
+def make_private(total_bytes):
+    ds = _image(_base(US_IMAGE_STORAGE, "US"))
+    ds.add_new(0x00290010, "LO", "VENDOR")
+    outer = Sequence()
+    item_payload = 4096
+    per_item = 16
+    for _ in range(max(1, total_bytes // (item_payload * per_item))):
+        item = Dataset()
+        inner = Sequence()
+        for _ in range(per_item):
+            leaf = Dataset()
+            leaf.add_new(0x00291001, "OB", os.urandom(item_payload))
+            inner.append(leaf)
+        item.add_new(0x00291020, "SQ", inner)
+        item[0x00291020].is_undefined_length = True
+        outer.append(item)
+    ds.add_new(0x00291010, "SQ", outer)
+    ds[0x00291010].is_undefined_length = True
+    return ds
+
+
+def make_private_ob(total_bytes):
+    ds = _image(_base(US_IMAGE_STORAGE, "US"))
+    ds.add_new(0x00290010, "LO", "VENDOR")
+    ds.add_new(0x00291001, "OB", os.urandom(total_bytes))
+    return ds
+
+
+def make_sr(items):
+    ds = _base(COMPREHENSIVE_SR_STORAGE, "SR")
+    ds.ValueType = "CONTAINER"
+    content = Sequence()
+    for i in range(items):
+        item = Dataset()
+        item.RelationshipType = "CONTAINS"
+        item.ValueType = "TEXT"
+        item.TextValue = f"Measurement {i}: " + "x" * 200
+        concept = Dataset()
+        concept.CodeValue = str(i)
+        concept.CodingSchemeDesignator = "99LOCAL"
+        concept.CodeMeaning = "Finding"
+        item.ConceptNameCodeSequence = Sequence([concept])
+        content.append(item)
+    ds.ContentSequence = content
+    ds["ContentSequence"].is_undefined_length = True
+    return ds
+
+
+def _best(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tag-targeted header reads")
+    parser.add_argument("--private-mb", type=float, default=8.0,
+                        help="Size of the vendor private block (MB)")
+    parser.add_argument("--sr-items", type=int, default=5000,
+                        help="Items in the SR ContentSequence")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    private_bytes = int(args.private_mb * 1024 * 1024)
+    cases = [
+        ("plain", make_plain()),
+        ("private", make_private(private_bytes)),
+        ("private-ob", make_private_ob(private_bytes)),
+        ("sr", make_sr(args.sr_items)),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"best of {args.repeat}")
+        for label, ds in cases:
+            path = os.path.join(tmp, f"{label}.dcm")
+            ds.save_as(path, enforce_file_format=True)
+            size_mb = os.path.getsize(path) / (1024 ** 2)
+
+            full_s, _ = _best(lambda: pydicom.dcmread(path, stop_before_pixels=True, force=True), args.repeat)
+            classify_s, _ = _best(lambda: read_header_record(path, tags=CLASSIFY_TAGS), args.repeat)
+            full_record_s, full_record = _best(lambda: read_header_record(path, tags=None), args.repeat)
+            record_s, record = _best(lambda: read_header_record(path), args.repeat)
+            assert record == full_record, f"{label}: targeted record differs"
+
+            print(f"  {label:10s} {size_mb:7.2f} MB  "
+                  f"dcmread {full_s * 1000:8.2f} ms -> classify {classify_s * 1000:6.2f} ms "
+                  f"({full_s / classify_s:6.1f}x)  "
+                  f"record full {full_record_s * 1000:8.2f} ms -> targeted {record_s * 1000:6.2f} ms "
+                  f"({full_record_s / record_s:6.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-frame mask loop vs PixelMaskEngine
+=================================================
+
+Compares the legacy process_dicom eraser/overlay loop (Python loop over
+frames, one slice write per mask per frame, progress print every 10
+frames) with the vectorized PixelMaskEngine on a synthetic cine loop.
+Both the 8-bit RGB display array and the original 16-bit array are
+masked, as in the zero-loss path. Output equality is asserted before
+timings are reported.
+
+Usage:
+    python tools/bench_pixel_mask.py
+    python tools/bench_pixel_mask.py --frames 600 --rows 768 --cols 1024 --masks 24
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '../src'))
+
+from pixel_mask_engine import PixelMaskEngine  # noqa: E402
+
+
+def legacy_scrub(arr, arr_original_depth, all_masks, overlay, overlay_box, frame_w, frame_h):
+    """The per-frame loop process_dicom used before PixelMaskEngine."""
+    num_frames = arr.shape[0]
+    for i in range(num_frames):
+        frame = arr[i]
+        frame_orig = arr_original_depth[i] if arr_original_depth is not None else None
+        for (x, y, w, h) in all_masks:
+            x_end = min(x + w, frame_w)
+            y_end = min(y + h, frame_h)
+            x_start = max(0, x)
+            y_start = max(0, y)
+            frame[y_start:y_end, x_start:x_end] = 0
+            if frame_orig is not None:
+                frame_orig[y_start:y_end, x_start:x_end] = 0
+        if (i + 1) % 10 == 0 or i == num_frames - 1:
+            print(f"  [PIXEL SCRUB] Erased frame {i + 1}/{num_frames}")
+
+    x, y, w, h = overlay_box
+    x_end = min(x + w, frame_w)
+    y_end = min(y + h, frame_h)
+    x_start = max(0, x)
+    y_start = max(0, y)
+    actual_w = x_end - x_start
+    actual_h = y_end - y_start
+    overlay_resized = overlay[:actual_h, :actual_w]
+    for i in range(num_frames):
+        arr[i, y_start:y_start + actual_h, x_start:x_start + actual_w] = overlay_resized
+
+
+def vectorized_scrub(arr, arr_original_depth, all_masks, overlay, overlay_box, frame_w, frame_h):
+    """The same work through one PixelMaskEngine."""
+    engine = PixelMaskEngine(all_masks, frame_w, frame_h, overlay=overlay, overlay_box=overlay_box)
+    engine.apply(arr)
+    if arr_original_depth is not None:
+        engine.erase(arr_original_depth)
+
+
+def _make_masks(count, frame_w, frame_h, rng):
+    masks = [(0, 0, frame_w, max(1, frame_h // 10))]  # Header band
+    for _ in range(count - 1):
+        w = int(rng.integers(20, max(21, frame_w // 4)))
+        h = int(rng.integers(10, max(11, frame_h // 12)))
+        masks.append((int(rng.integers(-10, frame_w)), int(rng.integers(-10, frame_h)), w, h))
+    return masks
+
+
+def _time(fn, repeat, make_args):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        args = make_args()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn(*args)
+        best = min(best, time.perf_counter() - start)
+        result = args
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized pixel mask engine")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--rows", type=int, default=600)
+    parser.add_argument("--cols", type=int, default=800)
+    parser.add_argument("--masks", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rgb = rng.integers(0, 256, size=(args.frames, args.rows, args.cols, 3), dtype=np.uint8)
+    orig = rng.integers(0, 4096, size=(args.frames, args.rows, args.cols), dtype=np.uint16)
+    masks = _make_masks(args.masks, args.cols, args.rows, rng)
+    overlay_box = masks[0]
+    overlay = np.full((overlay_box[3], overlay_box[2], 3), 200, dtype=np.uint8)
+
+    def make_args():
+        return (rgb.copy(), orig.copy(), masks, overlay, overlay_box, args.cols, args.rows)
+
+    legacy_s, legacy_out = _time(legacy_scrub, args.repeat, make_args)
+    vector_s, vector_out = _time(vectorized_scrub, args.repeat, make_args)
+
+    assert np.array_equal(legacy_out[0], vector_out[0]), "RGB output differs"
+    assert np.array_equal(legacy_out[1], vector_out[1]), "original-depth output differs"
+
+    print(f"frames={args.frames} size={args.cols}x{args.rows} masks={args.masks} "
+          f"(best of {args.repeat})")
+    print(f"  per-frame loop : {legacy_s * 1000:9.2f} ms")
+    print(f"  vectorized     : {vector_s * 1000:9.2f} ms")
+    print(f"  speedup        : {legacy_s / vector_s:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
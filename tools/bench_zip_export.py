@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serial zipfile vs parallel ZIP member compression
+============================================================
+
+Builds a synthetic study (uncompressed 16-bit CT-like slices, the case
+where the adaptive policy has to deflate everything) and exports it
+through StreamingZipBundle once per worker count: workers=1 is the
+zipfile engine, larger counts use ParallelZipWriter. Wall time,
+throughput, archive size and peak Python allocation (tracemalloc) are
+reported, and every archive is checked with ZipFile.testzip() (and
+unzip -t where installed) before its timing is printed.
+
+The default study is 2 GB; use --size for a quicker run. Speed-up is
+bounded by the cores available (os.cpu_count() is printed first).
+
+Usage:
+    python tools/bench_zip_export.py
+    python tools/bench_zip_export.py --size 256M --workers 1,2,4,8 --level 6
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '../src'))
+
+from voxelmask_core.export import CompressionPolicy, StreamingZipBundle  # noqa: E402
+
+_UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def _parse_size(text):
+    text = text.strip().upper()
+    if text and text[-1] in _UNITS:
+        return int(float(text[:-1]) * _UNITS[text[-1]])
+    return int(text)
+
+
+def _write_study(study_dir, total_size, slice_size):
+    """CT-like slices: smooth anatomy plus acquisition noise, 12 bits stored."""
+    rng = np.random.default_rng(0)
+    side = int((slice_size // 2) ** 0.5)
+    yy, xx = np.mgrid[0:side, 0:side]
+    body = ((xx - side / 2) ** 2 + (yy - side / 2) ** 2) < (side * 0.45) ** 2
+    paths = []
+    for i in range(max(1, total_size // (side * side * 2))):
+        pixels = np.where(body, 1000 + 200 * np.sin(xx / 17.0 + i / 9.0) * np.cos(yy / 23.0), 0)
+        pixels = (pixels + rng.normal(0, 20, pixels.shape)).clip(0, 4095).astype("<u2")
+        path = os.path.join(study_dir, f"IMG_{i + 1:05d}.dcm")
+        with open(path, "wb") as fh:
+            fh.write(b"\0" * 128 + b"DICM")
+            fh.write(pixels.tobytes())
+        paths.append(path)
+    return paths
+
+
+def _export(paths, zip_path, workers, level):
+    policy = CompressionPolicy(mode="deflate", level=level)
+    with StreamingZipBundle(zip_path, "study", policy, workers) as bundle:
+        for path in paths:
+            bundle.add_file(path, f"DICOM/{os.path.basename(path)}")
+        bundle.add_bytes("README.txt", "Benchmark export\n")
+    return bundle.close()
+
+
+def _verify(zip_path):
+    with zipfile.ZipFile(zip_path) as zf:
+        bad = zf.testzip()
+        assert bad is None, f"{zip_path}: CRC mismatch in {bad}"
+    if shutil.which("unzip"):
+        subprocess.run(["unzip", "-tq", zip_path], check=True, stdout=subprocess.DEVNULL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel ZIP export compression")
+    parser.add_argument("--size", default="2G", help="Study size (K/M/G suffixes)")
+    parser.add_argument("--slice-size", default="512K", help="Bytes per synthetic slice")
+    parser.add_argument("--workers", default="1,2,4,8",
+                        help="Comma-separated worker counts (1 = zipfile)")
+    parser.add_argument("--level", type=int, default=6)
+    parser.add_argument("--dir", default=None, help="Directory for the study and archives")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        study_dir = os.path.join(tmp, "study")
+        os.makedirs(study_dir)
+        paths = _write_study(study_dir, _parse_size(args.size), _parse_size(args.slice_size))
+        size = sum(os.path.getsize(p) for p in paths)
+
+        print(f"study={size / (1024 ** 2):.0f} MiB in {len(paths)} files, "
+              f"level={args.level}, cpu_count={os.cpu_count()}")
+        baseline = None
+        for workers in (int(w) for w in args.workers.split(",")):
+            zip_path = os.path.join(tmp, f"export_w{workers}.zip")
+            tracemalloc.start()
+            start = time.perf_counter()
+            result = _export(paths, zip_path, workers, args.level)
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            _verify(zip_path)
+
+            baseline = baseline or seconds
+            label = "zipfile (serial)" if workers == 1 else f"parallel x{workers}"
+            print(f"  {label:17s}: {seconds:8.2f} s  {size / seconds / (1024 ** 2):8.1f} MiB/s  "
+                  f"speed-up {baseline / seconds:5.2f}  ratio {result.compression['ratio']:.3f}  "
+                  f"peak {peak / (1024 ** 2):7.2f} MiB")
+            os.unlink(zip_path)
+
+
+if __name__ == "__main__":
+    main()